@@ -0,0 +1,6 @@
+"""
+Micro-benchmarks for the ASCII Tag client.
+
+Each module is runnable from the repository root, e.g.:
+    python -m bench.bench_wire
+"""
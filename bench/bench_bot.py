@@ -0,0 +1,143 @@
+"""
+Benchmark — bot opponents as a headless load source.
+
+Runs `--matches` bot-vs-bot matches side by side on one map, every bot
+deciding once per game tick as in `--bot` play, and reports whether the
+decisions fit the tick:
+  - build:    time to build the map's shared distance tables (once per
+              map, before the first tick);
+  - dec/s:    decisions per second across all bots;
+  - decide:   p50 / p99 / max time of one decision;
+  - tick p99: time for every bot's decision in one tick;
+  - over:     ticks whose decisions took longer than the tick period;
+  - hits / misses: field lookups served from the shared cache or not.
+
+All decisions of a tick share one search deadline — half the tick
+period, as the client allows its bot — so on maps too large for
+all-pairs tables the field searches are time-sliced across ticks and
+the other half is left for the rest of the decisions. The order the
+matches decide in rotates every tick, so each gets its turn before the
+deadline.
+Finished matches are reset, so each map runs for the full tick count.
+
+Usage:
+    python -m bench.bench_bot [--matches 100] [--ticks 500]
+                              [--tick-rate 60] [--sizes 10x10,32x32,256x256]
+"""
+
+import argparse
+import time
+from typing import List
+
+from bench.bench_udp import percentile
+from bot import Bot, tables_for
+from engine import GameState
+from maps import Terrain, parse_size
+
+
+def pillars(w: int, h: int) -> Terrain:
+    """
+    Return a `w`×`h` map with a wall on every other cell of every other row.
+    """
+    return Terrain(
+        w, h, [(x, y) for x in range(1, w - 1, 2) for y in range(1, h - 1, 2)]
+    )
+
+
+def play(terrain: Terrain, matches: int, ticks: int, tick_rate: float, skill: float):
+    """
+    Step `matches` bot-vs-bot matches for `ticks` ticks.
+
+    Args:
+        terrain (Terrain): Map shared by every match.
+        matches (int): Concurrent matches (two bots each).
+        ticks (int): Ticks to run.
+        tick_rate (float): Ticks per second the budget is derived from.
+        skill (float): Skill of every bot.
+
+    Returns:
+        dict: build, decide and tick samples (seconds), the tick period,
+        catches and the shared tables.
+    """
+    t0 = time.perf_counter()
+    tables = tables_for(terrain)
+    build = time.perf_counter() - t0
+    states = []
+    bots = []
+    for i in range(matches):
+        st = GameState(0, 0, terrain)
+        st.reset()
+        states.append(st)
+        bots.append(
+            (Bot(terrain, "it", skill, 2 * i), Bot(terrain, "runner", skill, 2 * i + 1))
+        )
+    period = 1 / tick_rate
+    decide: List[float] = []
+    per_tick: List[float] = []
+    catches = 0
+    clock = time.perf_counter
+    for n in range(ticks):
+        start = clock()
+        deadline = start + period / 2
+        k = n % matches
+        for st, (it, runner) in zip(states[k:] + states[:k], bots[k:] + bots[:k]):
+            a, b = (st.xs[0], st.ys[0]), (st.xs[1], st.ys[1])
+            t = clock()
+            m0 = it.decide(a, b, deadline)
+            t1 = clock()
+            m1 = runner.decide(b, a, deadline)
+            t2 = clock()
+            decide.append(t1 - t)
+            decide.append(t2 - t1)
+            if st.step((m0, m1)) is not None:
+                catches += 1
+                st.reset()
+        per_tick.append(clock() - start)
+    return {
+        "build": build,
+        "decide": decide,
+        "tick": per_tick,
+        "period": period,
+        "catches": catches,
+        "tables": tables,
+    }
+
+
+def main() -> None:
+    """
+    Run the bot load for every map size and print one row per map.
+    """
+    ap = argparse.ArgumentParser(description="Bot decision-time benchmark")
+    ap.add_argument("--matches", type=int, default=100)
+    ap.add_argument("--ticks", type=int, default=500)
+    ap.add_argument("--tick-rate", type=float, default=60.0, metavar="HZ")
+    ap.add_argument("--skill", type=float, default=0.8)
+    ap.add_argument("--sizes", default="10x10,32x32,256x256", metavar="WxH,...")
+    args = ap.parse_args()
+
+    print(
+        f"{args.matches} matches ({2 * args.matches} bots), {args.ticks} ticks "
+        f"at {args.tick_rate:g} Hz ({1000 / args.tick_rate:.2f} ms per tick)"
+    )
+    print(
+        f"{'map':<10} {'tables':<9} {'build ms':>9} {'dec/s':>10} "
+        f"{'p50 µs':>7} {'p99 µs':>7} {'max ms':>7} {'tick p99':>9} "
+        f"{'over':>5} {'catches':>8} {'hits':>8} {'misses':>7}"
+    )
+    for size in args.sizes.split(","):
+        w, h = parse_size(size)
+        r = play(pillars(w, h), args.matches, args.ticks, args.tick_rate, args.skill)
+        t = r["tables"]
+        dec = r["decide"]
+        over = sum(1 for x in r["tick"] if x > r["period"])
+        print(
+            f"{size:<10} {'all-pairs' if t.all_pairs else 'searched':<9} "
+            f"{r['build'] * 1e3:>9.1f} {len(dec) / sum(r['tick']):>10,.0f} "
+            f"{percentile(dec, 50) * 1e6:>7.1f} {percentile(dec, 99) * 1e6:>7.1f} "
+            f"{max(dec) * 1e3:>7.2f} {percentile(r['tick'], 99) * 1e3:>7.2f}ms "
+            f"{over:>5} {r['catches']:>8} {t.hits:>8} {t.misses:>7}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Benchmark — headless rules engine throughput.
+
+Steps random-walk matches through the rules in `engine` and reports
+ticks per second for three modes:
+  - single: one `GameState` stepped in a tight loop,
+  - many:   a list of `GameState`s stepped round-robin (bot-vs-bot style),
+  - batch:  one NumPy `BatchState` stepping every match per call.
+
+Finished matches are reset so every mode runs for the full tick budget.
+
+Usage:
+    python -m bench.bench_engine [--ticks 1000000] [--matches 1000]
+"""
+
+import argparse
+import random
+import time
+
+from engine import BatchState, GameState
+
+try:
+    import numpy as np
+except ImportError:  # the batch figure is skipped without NumPy
+    np = None  # type: ignore[assignment]
+
+GRID = 10
+
+
+def bench_single(ticks: int) -> float:
+    """
+    Step one match `ticks` times with pre-generated random moves.
+
+    Args:
+        ticks (int): Total ticks to run.
+
+    Returns:
+        float: Ticks per second.
+    """
+    rng = random.Random(1)
+    moves = [(rng.randrange(5), rng.randrange(5)) for _ in range(4096)]
+    st = GameState(GRID, GRID)
+    step = st.step
+    t0 = time.perf_counter()
+    for i in range(ticks):
+        if step(moves[i & 4095]) is not None:
+            st.reset()
+    return ticks / (time.perf_counter() - t0)
+
+
+def bench_many(ticks: int, matches: int) -> float:
+    """
+    Step `matches` matches round-robin until `ticks` match-ticks have run.
+
+    Args:
+        ticks (int): Total match-ticks to run.
+        matches (int): Number of concurrent matches.
+
+    Returns:
+        float: Match-ticks per second.
+    """
+    rng = random.Random(2)
+    moves = [(rng.randrange(5), rng.randrange(5)) for _ in range(4096)]
+    states = [GameState(GRID, GRID) for _ in range(matches)]
+    rounds = max(1, ticks // matches)
+    t0 = time.perf_counter()
+    k = 0
+    for _ in range(rounds):
+        for st in states:
+            if st.step(moves[k & 4095]) is not None:
+                st.reset()
+            k += 1
+    return rounds * matches / (time.perf_counter() - t0)
+
+
+def bench_batch(ticks: int, matches: int) -> float:
+    """
+    Step a NumPy batch of `matches` matches until `ticks` match-ticks have run.
+
+    Args:
+        ticks (int): Total match-ticks to run.
+        matches (int): Number of matches in the batch.
+
+    Returns:
+        float: Match-ticks per second.
+    """
+    rng = np.random.default_rng(3)
+    pool = rng.integers(0, 5, size=(64, matches, 2), dtype=np.int64)
+    b = BatchState(matches, GRID, GRID)
+    rounds = max(1, ticks // matches)
+    t0 = time.perf_counter()
+    for i in range(rounds):
+        b.step(pool[i & 63])
+        if i & 63 == 63:
+            done = b.over
+            b.x[done] = (0, GRID - 1)
+            b.y[done] = (0, GRID - 1)
+            b.over[:] = False
+    return rounds * matches / (time.perf_counter() - t0)
+
+
+def main() -> None:
+    """
+    Run every engine benchmark and print ticks per second.
+    """
+    ap = argparse.ArgumentParser(description="Rules engine benchmark")
+    ap.add_argument("--ticks", type=int, default=1_000_000)
+    ap.add_argument("--matches", type=int, default=1000)
+    args = ap.parse_args()
+
+    print(f"{'mode':<8} {'ticks/s':>14}")
+    print(f"{'single':<8} {bench_single(args.ticks):>14,.0f}")
+    print(f"{'many':<8} {bench_many(args.ticks, args.matches):>14,.0f}")
+    if np is not None:
+        print(f"{'batch':<8} {bench_batch(args.ticks * 10, args.matches):>14,.0f}")
+    else:
+        print(f"{'batch':<8} {'(numpy missing)':>14}")
+
+
+if __name__ == "__main__":
+    main()
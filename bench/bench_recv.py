@@ -0,0 +1,94 @@
+"""
+Benchmark — peer receive path: per-message wait_for vs batched buffer.
+
+A sender thread streams pre-encoded `pos` frames over a loopback socket,
+`--burst` frames per send call. The event-loop thread receives them with:
+  - read:  the previous loop — `asyncio.wait_for(codec.read(reader), ...)`
+           per message (one timer and one wrapper per message);
+  - batch: `inbox.PeerReader.batch` — whatever arrived is decoded in one
+           pass, with one idle deadline for the whole stream.
+
+Reports messages per second and receive-side CPU time per message (the
+event-loop thread only, so the sender is not counted).
+
+Usage:
+    python -m bench.bench_recv [--n 200000] [--burst 1]
+"""
+
+import argparse
+import asyncio
+import socket
+import threading
+import time
+
+from inbox import PeerReader
+from wire import BinaryCodec, JsonCodec
+
+TIMEOUT = 5.0
+
+
+def _sender(sock: socket.socket, frame: bytes, n: int, burst: int) -> None:
+    chunk = frame * burst
+    for _ in range(n // burst):
+        sock.sendall(chunk)
+    sock.shutdown(socket.SHUT_WR)
+
+
+async def _receive(codec, mode: str, n: int, burst: int) -> dict:
+    a, b = socket.socketpair()
+    reader, writer = await asyncio.open_connection(sock=a)
+    frame = codec.encode({"type": "pos", "x": 7, "y": 3, "t": 1 << 40, "n": 1})
+    n -= n % burst
+    th = threading.Thread(target=_sender, args=(b, frame, n, burst))
+    got = 0
+    cpu0, t0 = time.thread_time(), time.perf_counter()
+    th.start()
+    if mode == "read":
+        while True:
+            m = await asyncio.wait_for(codec.read(reader), TIMEOUT)
+            if m is None:
+                break
+            got += 1
+    else:
+        inbox = PeerReader(reader)
+        inbox.expect_within(TIMEOUT)
+        while True:
+            msgs = await inbox.batch(codec)
+            if msgs is None:
+                break
+            got += len(msgs)
+        inbox.close()
+    wall, cpu = time.perf_counter() - t0, time.thread_time() - cpu0
+    th.join()
+    writer.close()
+    b.close()
+    assert got == n, (got, n)
+    return {"msgs_per_s": n / wall, "cpu_us": cpu / n * 1e6}
+
+
+def main() -> None:
+    """
+    Run both receive loops for both codecs and print a comparison table.
+    """
+    ap = argparse.ArgumentParser(description="Peer receive path benchmark")
+    ap.add_argument("--n", type=int, default=200_000, help="messages per run")
+    ap.add_argument("--burst", type=int, default=1, help="frames per send call")
+    args = ap.parse_args()
+
+    print(f"{args.n} pos messages, {args.burst} per send")
+    print(f"{'codec':<8} {'loop':<6} {'msgs/s':>10} {'cpu µs/msg':>11}")
+    for codec in (JsonCodec(), BinaryCodec()):
+        rows = {}
+        for mode in ("read", "batch"):
+            r = rows[mode] = asyncio.run(_receive(codec, mode, args.n, args.burst))
+            print(
+                f"{codec.name:<8} {mode:<6} {r['msgs_per_s']:>10.0f} "
+                f"{r['cpu_us']:>11.2f}"
+            )
+        speedup = rows["batch"]["msgs_per_s"] / rows["read"]["msgs_per_s"]
+        saving = rows["read"]["cpu_us"] / rows["batch"]["cpu_us"]
+        print(f"{'':<15} {speedup:>9.1f}x {saving:>10.1f}x")
+
+
+if __name__ == "__main__":
+    main()
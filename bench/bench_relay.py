@@ -0,0 +1,131 @@
+"""
+Benchmark — relay latency, throughput and CPU.
+
+Starts `relay.py` in a subprocess, opens N relayed pairs and measures:
+  - round-trip time of a 15-byte `pos` frame bounced through the relay
+    (two relay hops per sample), and
+  - bulk throughput of a stream of `pos` frames in one direction,
+and reads the relay process's CPU time from /proc to report CPU per
+forwarded message.
+
+Usage:
+    python -m bench.bench_relay [--pairs 50] [--pings 200] [--frames 20000]
+"""
+
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import time
+
+from bench.bench_udp import percentile
+from relay import open_relayed
+from wire import BinaryCodec
+
+_codec = BinaryCodec()
+FRAME = _codec.encode({"type": "pos", "x": 1, "y": 2, "t": 3})
+
+
+def _cpu_seconds(pid: int) -> float:
+    """
+    Return user+system CPU seconds used by a process (Linux only).
+    """
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+    except OSError:
+        return 0.0
+    return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+
+
+async def _pair(port: int, i: int):
+    token = f"bench-{i}"
+    return await asyncio.gather(
+        open_relayed("127.0.0.1", port, token), open_relayed("127.0.0.1", port, token)
+    )
+
+
+async def _pingpong(a, b, n: int, rtts: list) -> None:
+    (ra, wa), (rb, wb) = a, b
+    size = len(FRAME)
+    for _ in range(n):
+        t0 = time.perf_counter()
+        wa.write(FRAME)
+        wb.write(await rb.readexactly(size))
+        await ra.readexactly(size)
+        rtts.append(time.perf_counter() - t0)
+
+
+async def _stream(a, b, n: int) -> None:
+    (_, wa), (rb, _) = a, b
+    wa.write(FRAME * n)
+    await rb.readexactly(len(FRAME) * n)
+
+
+async def _main(args) -> None:
+    proc = subprocess.Popen(
+        [sys.executable, "relay.py", "--host", "127.0.0.1", "--port", str(args.port)],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        for _ in range(50):
+            try:
+                _, w = await asyncio.open_connection("127.0.0.1", args.port)
+                w.close()
+                break
+            except OSError:
+                await asyncio.sleep(0.1)
+
+        pairs = await asyncio.gather(*[_pair(args.port, i) for i in range(args.pairs)])
+
+        rtts: list = []
+        cpu0 = _cpu_seconds(proc.pid)
+        t0 = time.perf_counter()
+        await asyncio.gather(*[_pingpong(a, b, args.pings, rtts) for a, b in pairs])
+        ping_time = time.perf_counter() - t0
+        ping_cpu = _cpu_seconds(proc.pid) - cpu0
+        ping_msgs = 2 * len(rtts)
+
+        cpu0 = _cpu_seconds(proc.pid)
+        t0 = time.perf_counter()
+        await asyncio.gather(*[_stream(a, b, args.frames) for a, b in pairs])
+        stream_time = time.perf_counter() - t0
+        stream_cpu = _cpu_seconds(proc.pid) - cpu0
+        stream_msgs = args.frames * args.pairs
+
+        ms = [r * 1000 for r in rtts]
+        print(f"pairs={args.pairs}  frame={len(FRAME)} B")
+        print(
+            f"ping-pong  p50={percentile(ms, 50):.3f} ms  p99={percentile(ms, 99):.3f} ms  "
+            f"{ping_msgs / ping_time:,.0f} msg/s  "
+            f"relay cpu {ping_cpu / ping_msgs * 1e6:.2f} µs/msg"
+        )
+        print(
+            f"stream     {stream_msgs / stream_time:,.0f} msg/s  "
+            f"{stream_msgs * len(FRAME) / stream_time / 1e6:.1f} MB/s  "
+            f"relay cpu {stream_cpu / stream_msgs * 1e6:.3f} µs/msg"
+        )
+        for a, b in pairs:
+            a[1].close()
+            b[1].close()
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+def main() -> None:
+    """
+    Parse options and run the relay benchmark.
+    """
+    ap = argparse.ArgumentParser(description="Relay benchmark")
+    ap.add_argument("--port", type=int, default=34780)
+    ap.add_argument("--pairs", type=int, default=50)
+    ap.add_argument("--pings", type=int, default=200, help="round trips per pair")
+    ap.add_argument("--frames", type=int, default=20_000, help="frames per pair")
+    asyncio.run(_main(ap.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Benchmark — time from game over to the next game.
+
+Runs two headless clients against an in-process signaling server and
+times, per round, how long it takes until both are playing again:
+  - connect:  a fresh start — signaling connection, queue, match and
+              peer link, as before every game without a session;
+  - rematch:  both press R after a match; the peer link is reused and
+              only the game state is reset;
+  - requeue:  one presses N; both go back into the queue on their open
+              signaling connections and, nobody else waiting, are
+              matched again over a new link.
+
+Usage:
+    python -m bench.bench_rematch [--rounds 20]
+"""
+
+import argparse
+import asyncio
+import time
+from typing import Dict, List
+
+import websockets
+
+from bench.bench_udp import percentile
+from game import Game
+from server import WS_OPTIONS, Matchmaker
+
+
+async def _until(cond) -> None:
+    while not cond():
+        await asyncio.sleep(0.001)
+
+
+def _finish(a: Game, b: Game) -> None:
+    """
+    End the current match: IT steps onto the runner and calls the win.
+    """
+    it = a if a.am_it else b
+    it.state.place(it.op, it.my_x, it.my_y)
+    it._check_win()
+
+
+async def _main(args) -> Dict[str, List[float]]:
+    out: Dict[str, List[float]] = {"connect": [], "rematch": [], "requeue": []}
+    mm = Matchmaker()
+    async with websockets.serve(mm.handler, "127.0.0.1", 0, **WS_OPTIONS) as srv:
+        url = "ws://127.0.0.1:%d" % srv.sockets[0].getsockname()[1]
+        for _ in range(args.rounds):
+            a, b = Game(url), Game(url)
+            for g in (a, b):
+                g._refresh = lambda: None
+            playing = lambda: a.phase == b.phase == "playing"  # noqa: E731
+            t0 = time.perf_counter()
+            tasks = [asyncio.create_task(g._network()) for g in (a, b)]
+            await _until(playing)
+            out["connect"].append(time.perf_counter() - t0)
+
+            _finish(a, b)
+            await _until(lambda: a.phase == b.phase == "end")
+            t0 = time.perf_counter()
+            a._request_rematch()
+            b._request_rematch()
+            await _until(playing)
+            out["rematch"].append(time.perf_counter() - t0)
+
+            _finish(a, b)
+            await _until(lambda: a.phase == b.phase == "end")
+            t0 = time.perf_counter()
+            a._requeue("New opponent")
+            await _until(playing)
+            out["requeue"].append(time.perf_counter() - t0)
+
+            for t in tasks:
+                t.cancel()
+            for g in (a, b):
+                g.phase = "end"
+                g._drop_link()
+            await asyncio.gather(*tasks, return_exceptions=True)
+    return out
+
+
+def main() -> None:
+    """
+    Run the rounds and print p50 / p99 / max per path.
+    """
+    ap = argparse.ArgumentParser(description="Game-over-to-next-game benchmark")
+    ap.add_argument("--rounds", type=int, default=20)
+    args = ap.parse_args()
+
+    out = asyncio.run(_main(args))
+    print(f"{args.rounds} rounds, two clients on 127.0.0.1")
+    print(f"{'path':<9} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    for name, xs in out.items():
+        print(
+            f"{name:<9} {percentile(xs, 50) * 1e3:>8.2f} "
+            f"{percentile(xs, 99) * 1e3:>8.2f} {max(xs) * 1e3:>8.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Benchmark — match recording size and replay speed.
+
+Records a synthetic match (a random walk where each player moves on a
+given fraction of ticks) and reports:
+  - recording cost per tick and file size,
+  - headless replay rate (`Recording.summary`, what `replay.py
+    --headless` runs) and full playhead replay rate,
+  - random seek latency through the keyframe index.
+
+Usage:
+    python -m bench.bench_replay [--ticks 1000000] [--activity 0.1]
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from engine import GameState
+from maps import Terrain
+from recording import Recorder, Recording
+
+
+def _record(path: str, ticks: int, activity: float) -> float:
+    rng = random.Random(7)
+    state = GameState(0, 0, Terrain(200, 200))
+    rec = Recorder(path, state.terrain, me=0, tick_rate=60.0)  # type: ignore[arg-type]
+    t0 = time.perf_counter()
+    for n in range(1, ticks + 1):
+        mv = 0
+        if rng.random() < activity:
+            mv = rng.randint(1, 4)
+            state.move(0, mv)
+        if rng.random() < activity:
+            state.move(1, rng.randint(1, 4))
+        rec.tick(n, state.xs, state.ys, state.it, mv)
+    rec.close()
+    return time.perf_counter() - t0
+
+
+def main() -> None:
+    """
+    Parse options and run the replay benchmark.
+    """
+    ap = argparse.ArgumentParser(description="Recording and replay benchmark")
+    ap.add_argument("--ticks", type=int, default=1_000_000)
+    ap.add_argument(
+        "--activity", type=float, default=0.1, help="chance a player moves per tick"
+    )
+    ap.add_argument("--seeks", type=int, default=2000)
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.tagrec")
+        took = _record(path, args.ticks, args.activity)
+        size = os.path.getsize(path)
+        print(f"{args.ticks} ticks, activity {args.activity:g}")
+        print(f"  record     {took / args.ticks * 1e6:6.2f} µs/tick")
+        print(f"  file       {size} bytes ({size / args.ticks:.2f} B/tick)")
+
+        with Recording(path) as rec:
+            t0 = time.perf_counter()
+            rec.summary()
+            took = time.perf_counter() - t0
+            print(f"  headless   {args.ticks / took / 1e6:6.1f} M ticks/s")
+
+            t0 = time.perf_counter()
+            rec.playhead().advance(rec.last_tick)
+            took = time.perf_counter() - t0
+            print(f"  playhead   {args.ticks / took / 1e6:6.1f} M ticks/s")
+
+            rng = random.Random(1)
+            head = rec.playhead()
+            targets = [rng.randint(1, rec.last_tick) for _ in range(args.seeks)]
+            t0 = time.perf_counter()
+            for t in targets:
+                head.seek(t)
+            took = time.perf_counter() - t0
+            print(f"  seek       {took / args.seeks * 1e6:6.1f} µs (random tick)")
+
+
+if __name__ == "__main__":
+    main()
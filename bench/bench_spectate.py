@@ -0,0 +1,283 @@
+"""
+Benchmark — spectator fan-out on one core.
+
+Starts a `BroadcastRelay` in a process of its own (one event loop, one
+core) and subscribes `--spectators` viewers to one match from
+`--procs` worker processes. The bench process then publishes a match
+for `--seconds` at `--tick-rate`: two random walkers moving at game
+speed (one cell per TICK), a new match after every tag. Half-way,
+`--late` viewers join and time how long it takes until they hold the
+full current state (late-join catch-up).
+
+The report shows the relay's CPU time (its own `process_time`) as a
+share of one core and per tick, writes and bytes fanned out, what each
+viewer receives per second compared with a keyframe every tick, the
+late-join latency, and whether every checked viewer ended in sync with
+the publisher.
+
+Slow viewers are not simulated: at a few hundred bytes per second, a
+stalled viewer takes minutes to fill even the capped socket buffers
+before the relay starts skipping it. `test/test_broadcast.py` covers
+the skip-to-keyframe path.
+
+Usage:
+    python -m bench.bench_spectate [--spectators 2000] [--procs 4]
+                                   [--seconds 10] [--tick-rate 60]
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional
+
+from bench.bench_udp import percentile
+from bench.loadgen import _raise_fd_limit
+from broadcast import FRAME, BroadcastRelay, Spectator, open_publisher
+from config import TICK
+from engine import MOVE_NONE, GameState
+from keyframes import KEY
+from maps import Terrain
+
+MATCH = "bench"
+
+
+def _relay(port_q, conn) -> None:
+    """
+    Relay process: serve, and answer every message on `conn` with stats.
+    """
+
+    async def run() -> None:
+        relay = BroadcastRelay()
+        srv = await relay.start("127.0.0.1", 0)
+        port_q.put(srv.sockets[0].getsockname()[1])
+
+        def report() -> None:
+            conn.recv()
+            conn.send(
+                dict(relay.stats, spectators=relay.spectators, cpu=time.process_time())
+            )
+
+        asyncio.get_running_loop().add_reader(conn.fileno(), report)
+        await asyncio.Event().wait()
+
+    _raise_fd_limit()
+    asyncio.run(run())
+
+
+class _Sink(asyncio.Protocol):
+    """
+    A viewer that only counts what it receives.
+    """
+
+    def __init__(self, done: asyncio.Future) -> None:
+        self.done = done
+        self.bytes = 0
+
+    def connection_made(self, transport) -> None:  # type: ignore[override]
+        transport.write(b"SUB1 " + MATCH.encode() + b"\n")
+
+    def data_received(self, data: bytes) -> None:
+        self.bytes += len(data)
+
+    def connection_lost(self, exc: Optional[Exception]) -> None:
+        if not self.done.done():
+            self.done.set_result(self.bytes)
+
+
+async def _sinks(port: int, n: int) -> List[int]:
+    loop = asyncio.get_running_loop()
+    done: List[asyncio.Future] = []
+    for i in range(0, n, 200):
+        batch = [loop.create_future() for _ in range(min(200, n - i))]
+        await asyncio.gather(
+            *(
+                loop.create_connection(lambda f=f: _Sink(f), "127.0.0.1", port)
+                for f in batch
+            )
+        )
+        done += batch
+    return list(await asyncio.gather(*done))
+
+
+def _viewers(port: int, n: int) -> List[int]:
+    """
+    Worker process: subscribe `n` sinks, return the bytes each received
+    once the relay closed them.
+    """
+    _raise_fd_limit()
+    return asyncio.run(_sinks(port, n))
+
+
+def _stats(conn) -> dict:
+    conn.send(None)
+    return conn.recv()
+
+
+async def _drain(sp: Spectator) -> None:
+    async for _ in sp.updates():
+        pass
+
+
+async def _late_join(addr: str, took: List[float]) -> Spectator:
+    sp = Spectator()
+    t0 = time.perf_counter()
+    await sp.connect(addr, MATCH)
+    async for _ in sp.updates():
+        if sp.terrain is not None and sp.stats["keys"]:
+            break
+    took.append(time.perf_counter() - t0)
+    return sp
+
+
+async def _publish(args, addr: str, conn) -> dict:
+    terrain = Terrain(32, 32)
+    pub = await open_publisher(addr, MATCH, terrain, args.tick_rate)
+    checker = Spectator()
+    await checker.connect(addr, MATCH)
+    watch = [asyncio.create_task(_drain(checker))]
+
+    rng = random.Random(1)
+    st = GameState(0, 0, terrain)
+    st.reset()
+    move_every = max(1, round(args.tick_rate * TICK))
+    period = 1 / args.tick_rate
+    ticks = int(args.seconds * args.tick_rate)
+    late_took: List[float] = []
+    late: List[asyncio.Task] = []
+    pub_time = 0.0
+    matches = 1
+    s0 = _stats(conn)
+    t_start = next_at = time.perf_counter()
+    for n in range(1, ticks + 1):
+        t0 = time.perf_counter()
+        moves = [MOVE_NONE, MOVE_NONE]
+        if n % move_every == 0:
+            moves = [rng.randrange(5), rng.randrange(5)]
+        if st.step(moves) is not None:
+            pub.end(n, st.xs, st.ys, st.it, st.winner)
+            st.reset()
+            matches += 1
+        else:
+            pub.tick(n, st.xs, st.ys, st.it)
+        pub_time += time.perf_counter() - t0
+        if n == ticks // 2:
+            late = [
+                asyncio.create_task(_late_join(addr, late_took))
+                for _ in range(args.late)
+            ]
+        next_at += period
+        await asyncio.sleep(max(0.0, next_at - time.perf_counter()))
+    elapsed = time.perf_counter() - t_start
+    s1 = _stats(conn)
+
+    final = (list(st.xs), list(st.ys))
+    checked = [checker] + list(await asyncio.gather(*late))
+    for sp in checked[1:]:
+        watch.append(asyncio.create_task(_drain(sp)))
+    deadline = time.perf_counter() + 5.0
+    while time.perf_counter() < deadline and any(
+        (sp.xs, sp.ys) != final for sp in checked
+    ):
+        await asyncio.sleep(0.01)
+    in_sync = sum((sp.xs, sp.ys) == final for sp in checked)
+    pub.close()
+    await asyncio.gather(*watch)
+    return {
+        "ticks": ticks,
+        "elapsed": elapsed,
+        "matches": matches,
+        "pub_us": pub_time / ticks * 1e6,
+        "pub_bytes": pub.stats["bytes"],
+        "before": s0,
+        "after": s1,
+        "late": late_took,
+        "checker_bytes": checker.stats["bytes"],
+        "in_sync": in_sync,
+        "watchers": len(checked),
+    }
+
+
+async def _main(args, conn, port: int) -> dict:
+    shares = [args.spectators // args.procs] * args.procs
+    shares[0] += args.spectators - sum(shares)
+    loop = asyncio.get_running_loop()
+    with ProcessPoolExecutor(args.procs) as pool:
+        futures = [loop.run_in_executor(pool, _viewers, port, n) for n in shares]
+        deadline = time.perf_counter() + 60
+        while _stats(conn)["spectators"] < args.spectators:
+            if time.perf_counter() > deadline:
+                raise SystemExit("viewers did not connect in time")
+            await asyncio.sleep(0.1)
+        r = await _publish(args, "127.0.0.1:%d" % port, conn)
+        received = [b for f in await asyncio.gather(*futures) for b in f]
+    r["received"] = received
+    return r
+
+
+def main() -> None:
+    """
+    Parse options, run the fan-out and print the report.
+    """
+    ap = argparse.ArgumentParser(description="Spectator broadcast benchmark")
+    ap.add_argument("--spectators", type=int, default=2000)
+    ap.add_argument("--procs", type=int, default=4)
+    ap.add_argument("--seconds", type=float, default=10.0)
+    ap.add_argument("--tick-rate", type=float, default=60.0, metavar="HZ")
+    ap.add_argument("--late", type=int, default=20)
+    args = ap.parse_args()
+
+    _raise_fd_limit()
+    port_q: multiprocessing.Queue = multiprocessing.Queue()
+    conn, child = multiprocessing.Pipe()
+    relay = multiprocessing.Process(target=_relay, args=(port_q, child), daemon=True)
+    relay.start()
+    try:
+        r = asyncio.run(_main(args, conn, port_q.get(timeout=30)))
+    finally:
+        relay.terminate()
+
+    a, b = r["before"], r["after"]
+    d = {k: b[k] - a[k] for k in a if k != "spectators"}
+    secs = r["elapsed"]
+    cpu = d["cpu"]
+    viewers = b["spectators"]
+    rx = sorted(r["received"])
+    key_bps = (FRAME.size + KEY.size) * args.tick_rate
+    late = r["late"]
+    print(
+        f"{args.spectators} spectators on {args.procs} procs, one match for "
+        f"{secs:.1f} s at {args.tick_rate:g} Hz ({r['ticks']} ticks, "
+        f"{r['matches']} matches)"
+    )
+    print(
+        f"relay      {cpu / secs * 100:.1f}% of one core, "
+        f"{cpu / r['ticks'] * 1e6:.0f} µs per tick, "
+        f"{cpu / max(1, d['writes']) * 1e9:.0f} ns per write "
+        f"({d['writes'] / secs:,.0f} writes/s, {d['bytes_out'] / secs / 1e6:.2f} MB/s)"
+    )
+    print(
+        f"publisher  {r['pub_us']:.1f} µs per tick, "
+        f"{r['pub_bytes'] / secs:.0f} B/s to the relay"
+    )
+    print(
+        f"per viewer {r['checker_bytes'] / secs:.0f} B/s "
+        f"(a keyframe every tick: {key_bps:.0f} B/s); "
+        f"received min/median {rx[0]}/{rx[len(rx) // 2]} B"
+    )
+    if late:
+        print(
+            f"late join  {len(late)} viewers, full state after "
+            f"p50 {percentile(late, 50) * 1e3:.2f} ms  "
+            f"p99 {percentile(late, 99) * 1e3:.2f} ms"
+        )
+    print(
+        f"in sync    {r['in_sync']}/{r['watchers']} checked viewers at the end; "
+        f"relay skipped={d['skipped']} resyncs={d['resyncs']}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Benchmark — star-match host cost as the player count grows.
+
+For each player count, a `StarHost` and N-1 `StarClient`s run in one
+process over localhost TCP. Every client sends a random move per tick and
+drains snapshots. The host tick is driven as fast as the clients keep up,
+and the report shows host CPU per tick, snapshot size and bandwidth at
+the default tick rate, next to what a full mesh of point-to-point `pos`
+messages would cost.
+
+Usage:
+    python -m bench.bench_star [--ticks 500] [--players 2 4 8 16 32]
+"""
+
+import argparse
+import asyncio
+import random
+import time
+
+from engine import GameState
+from star import TICK, StarClient, StarHost
+from wire import HEADER, POS
+
+
+async def _drain(client: StarClient) -> None:
+    async for _ in client.snapshots():
+        pass
+
+
+async def bench_players(n: int, ticks: int) -> dict:
+    """
+    Run `ticks` host ticks with `n` players.
+
+    Args:
+        n (int): Players in the match (host included).
+        ticks (int): Host ticks to run.
+
+    Returns:
+        dict: Measurements for the report row.
+    """
+    host = StarHost(GameState(200, 200, players=n))
+    port = await host.listen("127.0.0.1")
+    clients = [StarClient() for _ in range(n - 1)]
+    await asyncio.gather(*(c.connect("127.0.0.1", port) for c in clients))
+    await host.wait_full(5.0)
+    drains = [asyncio.create_task(_drain(c)) for c in clients]
+
+    rng = random.Random(n)
+    cpu0 = time.process_time()
+    frame = b""
+    for _ in range(ticks):
+        for c in clients:
+            c.send_move(rng.randrange(5))
+        await asyncio.sleep(0)
+        frame = host.step()
+        await asyncio.sleep(0)
+    cpu = time.process_time() - cpu0
+
+    for d in drains:
+        d.cancel()
+    for c in clients:
+        c.close()
+    host.close()
+
+    s = host.stats
+    mesh_frame = HEADER.size + POS.size
+    return {
+        "players": n,
+        "step_us": s["step_time"] / s["ticks"] * 1e6,
+        "cpu_us": cpu / ticks * 1e6,
+        "snap_bytes": len(frame),
+        "star_bps": s["bytes_out"] / s["ticks"] / TICK,
+        "mesh_bps": n * (n - 1) * mesh_frame / TICK,
+        "skipped": s["skipped"],
+    }
+
+
+async def _main(args) -> None:
+    print(
+        f"{'players':>7} {'host us/tick':>12} {'proc us/tick':>12} "
+        f"{'snap B':>7} {'star B/s':>10} {'mesh B/s':>10} {'skipped':>7}"
+    )
+    for n in args.players:
+        r = await bench_players(n, args.ticks)
+        print(
+            f"{r['players']:>7} {r['step_us']:>12.1f} {r['cpu_us']:>12.1f} "
+            f"{r['snap_bytes']:>7} {r['star_bps']:>10.0f} {r['mesh_bps']:>10.0f} "
+            f"{r['skipped']:>7}"
+        )
+
+
+def main() -> None:
+    """
+    Parse options and run the player-count sweep.
+    """
+    ap = argparse.ArgumentParser(description="Star-match host benchmark")
+    ap.add_argument("--ticks", type=int, default=500)
+    ap.add_argument("--players", type=int, nargs="+", default=[2, 4, 8, 16, 32])
+    asyncio.run(_main(ap.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
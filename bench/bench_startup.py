@@ -0,0 +1,137 @@
+"""
+Benchmark — client startup time.
+
+Every figure is the median wall time of `--runs` fresh interpreters,
+measured from process spawn:
+  - `python -c pass`           interpreter baseline
+  - `python main.py --help`    CLI path (must not load the UI)
+  - `python -c "import game"`  cost of the UI module imports
+  - first paint                headless `Game` until its first refresh
+  - network up                 first paint + WebSocket library loaded and a
+                               connect attempt finished (against a closed
+                               local port, so it fails at once)
+and lists the slowest top-level imports of `game` from `-X importtime`.
+
+Usage:
+    python -m bench.bench_startup [--runs 7]
+"""
+
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PAINT = """
+import asyncio, sys
+from game import Game
+
+class Probe(Game):
+    # Textual runs Game.on_mount as well (handlers are called per class).
+    def on_mount(self):
+        self.call_after_refresh(lambda: print("paint", flush=True))
+
+    def _refresh(self):
+        super()._refresh()
+        if self.phase == "end":
+            print("network", flush=True)
+
+async def run():
+    app = Probe(sys.argv[1])
+    async with app.run_test():
+        while app.phase != "end":
+            await asyncio.sleep(0.001)
+
+asyncio.run(run())
+"""
+
+
+def _closed_port() -> int:
+    s = socket.socket()
+    s.bind(("127.0.0.1", 0))
+    port = s.getsockname()[1]
+    s.close()
+    return port
+
+
+def _wall(cmd: list) -> float:
+    t0 = time.perf_counter()
+    subprocess.run(cmd, cwd=ROOT, stdout=subprocess.DEVNULL, check=True)
+    return time.perf_counter() - t0
+
+
+def _marks(cmd: list) -> dict:
+    """
+    Run `cmd` and return the time at which each stdout line first appeared.
+    """
+    t0 = time.perf_counter()
+    p = subprocess.Popen(cmd, cwd=ROOT, stdout=subprocess.PIPE, text=True)
+    seen = {}
+    for line in p.stdout:  # type: ignore[union-attr]
+        seen.setdefault(line.strip(), time.perf_counter() - t0)
+    p.wait()
+    return seen
+
+
+def _slowest_imports(n: int) -> list:
+    """
+    Return the `n` slowest direct imports of `game` as (ms, module).
+    """
+    err = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import game"],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stderr
+    rows = []
+    for line in err.splitlines()[1:]:
+        _, cum_us, name = line.split(":", 1)[1].split("|")
+        name = name[1:]
+        # Direct imports of `game` are indented by exactly two spaces.
+        if name.startswith("   ") or not name.startswith("  "):
+            continue
+        rows.append((int(cum_us) / 1e3, name.strip()))
+    return sorted(rows, reverse=True)[:n]
+
+
+def main() -> None:
+    """
+    Parse options and run the startup benchmark.
+    """
+    ap = argparse.ArgumentParser(description="Client startup benchmark")
+    ap.add_argument("--runs", type=int, default=7)
+    args = ap.parse_args()
+
+    py = sys.executable
+    server = f"ws://127.0.0.1:{_closed_port()}"
+    cases = {
+        "python -c pass": lambda: _wall([py, "-c", "pass"]),
+        "main.py --help": lambda: _wall([py, "main.py", "--help"]),
+        "import game": lambda: _wall([py, "-c", "import game"]),
+    }
+    print(f"{'phase':<16} {'median ms':>10} {'min ms':>8}")
+    for name, fn in cases.items():
+        times = [fn() for _ in range(args.runs)]
+        print(f"{name:<16} {statistics.median(times) * 1e3:>10.1f} {min(times) * 1e3:>8.1f}")
+
+    runs = [_marks([py, "-c", PAINT, server]) for _ in range(args.runs)]
+    for mark, label in (("paint", "first paint"), ("network", "network up")):
+        times = [r[mark] for r in runs if mark in r]
+        if times:
+            print(
+                f"{label:<16} {statistics.median(times) * 1e3:>10.1f} "
+                f"{min(times) * 1e3:>8.1f}"
+            )
+
+    print("\nslowest imports of `game` (cumulative ms):")
+    for ms, name in _slowest_imports(8):
+        print(f"  {ms:>7.1f}  {name}")
+
+
+if __name__ == "__main__":
+    main()
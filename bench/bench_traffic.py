@@ -0,0 +1,126 @@
+"""
+Benchmark — peer link traffic of a mostly idle match.
+
+Runs two headless `Game` clients against each other through a counting
+TCP proxy. The caller (IT) takes one step every `--move-every` seconds
+on a large open arena, so nobody is caught; the callee stands still.
+Reports, per direction and scaled to one minute: bytes, messages (frames
+decoded from the captured stream) and socket reads (an upper bound on
+the sender's writes).
+
+Usage:
+    python -m bench.bench_traffic [--seconds 20] [--move-every 2]
+"""
+
+import argparse
+import asyncio
+import time
+
+from engine import KEY_MOVES
+from game import Game
+from maps import Terrain
+from wire import HEADER, WIRE_JSON
+
+Game.on_mount = lambda self: None
+
+
+class _Counter:
+    def __init__(self) -> None:
+        self.data = bytearray()
+        self.reads = 0
+
+
+async def _pipe(r: asyncio.StreamReader, w: asyncio.StreamWriter, c: _Counter) -> None:
+    try:
+        while True:
+            chunk = await r.read(65536)
+            if not chunk:
+                break
+            c.reads += 1
+            c.data += chunk
+            w.write(chunk)
+    except (ConnectionError, asyncio.CancelledError):
+        pass
+    finally:
+        w.close()
+
+
+def _count_frames(data: bytes, json_wire: bool, skip: int) -> int:
+    if json_wire:
+        return data.count(b"\n") - skip
+    n, i = 0, 0
+    # The READY exchange is newline-delimited JSON; skip those lines.
+    for _ in range(skip):
+        i = data.index(b"\n", i) + 1
+    while i + HEADER.size <= len(data):
+        _, size = HEADER.unpack_from(data, i)
+        i += HEADER.size + size
+        n += 1
+    return n
+
+
+async def _main(args) -> None:
+    up, down = _Counter(), _Counter()
+    conn = asyncio.get_running_loop().create_future()
+
+    async def on_host(r, w):
+        conn.set_result((r, w))
+
+    host_srv = await asyncio.start_server(on_host, "127.0.0.1", 0)
+    host_port = host_srv.sockets[0].getsockname()[1]
+
+    async def on_proxy(cr, cw):
+        hr, hw = await asyncio.open_connection("127.0.0.1", host_port)
+        asyncio.create_task(_pipe(cr, hw, up))
+        asyncio.create_task(_pipe(hr, cw, down))
+
+    proxy = await asyncio.start_server(on_proxy, "127.0.0.1", 0)
+    proxy_port = proxy.sockets[0].getsockname()[1]
+
+    wire = WIRE_JSON if args.json else None
+    kw = {} if wire is None else {"wire": wire}
+    a = Game("ws://unused", terrain=Terrain(100, 100), **kw)
+    b = Game("ws://unused", terrain=Terrain(100, 100), **kw)
+    async with a.run_test(), b.run_test():
+        b._reader, b._writer = await asyncio.open_connection("127.0.0.1", proxy_port)
+        a._reader, a._writer = await conn
+        a.am_caller = True
+        await asyncio.gather(a._start_game(), b._start_game())
+
+        t0 = time.monotonic()
+        keys = "dddddddddddddddddddddddddddddddddddsss"
+        i = 0
+        while time.monotonic() - t0 < args.seconds:
+            a.inputs.push(KEY_MOVES[keys[i % len(keys)]])
+            i += 1
+            await asyncio.sleep(args.move_every)
+        elapsed = time.monotonic() - t0
+        a.phase = b.phase = "end"
+        await asyncio.sleep(0.2)
+
+    scale = 60.0 / elapsed
+    print(f"{elapsed:.0f} s idle-ish match, wire={a._codec.name}, one move per {args.move_every} s")
+    print(f"{'direction':<18} {'bytes/min':>10} {'msgs/min':>9} {'reads/min':>10}")
+    for name, c in (("callee -> caller", up), ("caller -> callee", down)):
+        msgs = _count_frames(bytes(c.data), args.json, skip=1)
+        print(
+            f"{name:<18} {len(c.data) * scale:>10.0f} {msgs * scale:>9.0f} "
+            f"{c.reads * scale:>10.0f}"
+        )
+    host_srv.close()
+    proxy.close()
+
+
+def main() -> None:
+    """
+    Parse options and run the traffic benchmark.
+    """
+    ap = argparse.ArgumentParser(description="Peer link traffic benchmark")
+    ap.add_argument("--seconds", type=float, default=20.0)
+    ap.add_argument("--move-every", type=float, default=2.0, help="seconds per step")
+    ap.add_argument("--json", action="store_true", help="use the JSON wire format")
+    asyncio.run(_main(ap.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
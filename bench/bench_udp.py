@@ -0,0 +1,161 @@
+"""
+Benchmark — position latency over TCP vs UDP on a lossy link.
+
+Streams `pos` updates through `bench.netsim` proxies at several loss
+rates and reports how long it takes until the receiver holds a position
+at least as new as each one sent. A lost UDP datagram is superseded by
+the next update; a lost TCP segment stalls every update behind it.
+
+Usage:
+    python -m bench.bench_udp [--seconds 5] [--interval 0.02] [--delay 0.02]
+"""
+
+import argparse
+import asyncio
+import time
+from typing import Dict, List
+
+from bench.netsim import LossyDatagramProxy, LossyStreamProxy
+from udp import open_udp_client, open_udp_host
+from wire import BinaryCodec
+
+
+def percentile(samples: List[float], q: float) -> float:
+    """
+    Return the q-th percentile (0–100) of `samples` by nearest rank.
+
+    Args:
+        samples (list[float]): Unsorted samples.
+        q (float): Percentile to compute.
+
+    Returns:
+        float: The percentile value, or 0.0 for an empty list.
+    """
+    if not samples:
+        return 0.0
+    s = sorted(samples)
+    return s[min(len(s) - 1, int(round(q / 100 * (len(s) - 1))))]
+
+
+class _Tracker:
+    """
+    Turns (seq sent, newest seq received) events into per-update latency.
+    """
+
+    def __init__(self) -> None:
+        self.sent: Dict[int, float] = {}
+        self.next_open = 1
+        self.latency: List[float] = []
+
+    def on_send(self, seq: int) -> None:
+        self.sent[seq] = time.monotonic()
+
+    def on_recv(self, seq: int) -> None:
+        now = time.monotonic()
+        while self.next_open <= seq:
+            t = self.sent.pop(self.next_open, None)
+            if t is not None:
+                self.latency.append(now - t)
+            self.next_open += 1
+
+
+async def _run_udp(args, loss: float) -> List[float]:
+    host, port = await open_udp_host()
+    proxy = LossyDatagramProxy(
+        ("127.0.0.1", port), loss, args.delay, args.jitter, seed=1
+    )
+    paddr = await proxy.start()
+    client = await open_udp_client(*paddr)
+    tr = _Tracker()
+
+    async def rx() -> None:
+        while True:
+            m = await host.recv()
+            if m is None:
+                return
+            if m.get("type") == "pos":
+                tr.on_recv(m["t"])
+
+    rx_task = asyncio.create_task(rx())
+    n = int(args.seconds / args.interval)
+    for seq in range(1, n + 1):
+        tr.on_send(seq)
+        client.send({"type": "pos", "x": 0, "y": 0, "t": seq})
+        await asyncio.sleep(args.interval)
+    await asyncio.sleep(args.delay + args.jitter + 0.05)
+    rx_task.cancel()
+    client.close()
+    host.close()
+    proxy.close()
+    return tr.latency
+
+
+async def _run_tcp(args, loss: float) -> List[float]:
+    codec = BinaryCodec()
+    tr = _Tracker()
+    done = asyncio.Event()
+
+    async def accept(r: asyncio.StreamReader, w: asyncio.StreamWriter) -> None:
+        while True:
+            m = await codec.read(r)
+            if m is None:
+                break
+            tr.on_recv(m["t"])
+        done.set()
+
+    srv = await asyncio.start_server(accept, "127.0.0.1", 0)
+    port = srv.sockets[0].getsockname()[1]
+    proxy = LossyStreamProxy(
+        ("127.0.0.1", port), loss, args.delay, args.jitter, args.rto, seed=1
+    )
+    paddr = await proxy.start()
+    _, w = await asyncio.open_connection(*paddr)
+    n = int(args.seconds / args.interval)
+    for seq in range(1, n + 1):
+        tr.on_send(seq)
+        w.write(codec.encode({"type": "pos", "x": 0, "y": 0, "t": seq}))
+        await asyncio.sleep(args.interval)
+    w.close()
+    try:
+        await asyncio.wait_for(done.wait(), timeout=args.rto * 10 + 1)
+    except asyncio.TimeoutError:
+        pass
+    proxy.close()
+    srv.close()
+    return tr.latency
+
+
+async def _main(args) -> None:
+    print(
+        f"{'transport':<9} {'loss':>5} {'n':>6} "
+        f"{'p50 ms':>7} {'p95 ms':>7} {'p99 ms':>7} {'max ms':>7}"
+    )
+    for loss in args.loss:
+        for name, fn in (("tcp", _run_tcp), ("udp", _run_udp)):
+            lat = await fn(args, loss)
+            ms = [x * 1000 for x in lat]
+            print(
+                f"{name:<9} {loss:>5.0%} {len(ms):>6} "
+                f"{percentile(ms, 50):>7.1f} {percentile(ms, 95):>7.1f} "
+                f"{percentile(ms, 99):>7.1f} {max(ms, default=0):>7.1f}"
+            )
+
+
+def main() -> None:
+    """
+    Parse options and run the TCP vs UDP tail-latency comparison.
+    """
+    ap = argparse.ArgumentParser(description="Lossy-link latency benchmark")
+    ap.add_argument("--seconds", type=float, default=5.0)
+    ap.add_argument("--interval", type=float, default=0.02, help="send period")
+    ap.add_argument("--delay", type=float, default=0.02, help="one-way delay")
+    ap.add_argument("--jitter", type=float, default=0.005)
+    ap.add_argument("--rto", type=float, default=0.2, help="TCP retransmit model")
+    ap.add_argument(
+        "--loss", type=float, nargs="+", default=[0.01, 0.05, 0.10]
+    )
+    asyncio.run(_main(ap.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Benchmark — JSON vs binary peer wire format.
+
+Measures encode and decode cost per message and the resulting bandwidth
+for a steady stream of `pos` updates at the default tick rate.
+
+Usage:
+    python -m bench.bench_wire [--n 200000]
+"""
+
+import argparse
+import time
+
+from wire import BinaryCodec, JsonCodec
+
+TICK = 0.12
+
+
+def _sample_pos() -> dict:
+    """
+    Build a representative `pos` message.
+
+    Returns:
+        dict: A position update with a current millisecond timestamp.
+    """
+    return {"type": "pos", "x": 7, "y": 3, "t": int(time.time() * 1000)}
+
+
+def bench_codec(codec, n: int) -> dict:
+    """
+    Time `n` encodes and `n` decodes of a `pos` message with one codec.
+
+    Args:
+        codec: A codec instance from `wire`.
+        n (int): Number of iterations for each operation.
+
+    Returns:
+        dict: Per-message encode/decode nanoseconds, frame size and bytes/s.
+    """
+    msg = _sample_pos()
+    enc = codec.encode
+    dec = codec.decode
+
+    t0 = time.perf_counter()
+    for _ in range(n):
+        frame = enc(msg)
+    t1 = time.perf_counter()
+    for _ in range(n):
+        dec(frame)
+    t2 = time.perf_counter()
+
+    size = len(frame)
+    return {
+        "codec": codec.name,
+        "encode_ns": (t1 - t0) / n * 1e9,
+        "decode_ns": (t2 - t1) / n * 1e9,
+        "bytes": size,
+        "bytes_per_sec": size / TICK,
+    }
+
+
+def main() -> None:
+    """
+    Run the benchmark for both codecs and print a comparison table.
+    """
+    ap = argparse.ArgumentParser(description="Peer wire format benchmark")
+    ap.add_argument("--n", type=int, default=200_000, help="iterations per op")
+    args = ap.parse_args()
+
+    rows = [bench_codec(JsonCodec(), args.n), bench_codec(BinaryCodec(), args.n)]
+    print(f"{'codec':<8} {'enc ns':>9} {'dec ns':>9} {'bytes':>6} {'B/s @tick':>10}")
+    for r in rows:
+        print(
+            f"{r['codec']:<8} {r['encode_ns']:>9.0f} {r['decode_ns']:>9.0f} "
+            f"{r['bytes']:>6} {r['bytes_per_sec']:>10.1f}"
+        )
+    js, bn = rows
+    print(
+        f"binary: {js['bytes'] / bn['bytes']:.1f}x smaller, "
+        f"{js['encode_ns'] / bn['encode_ns']:.1f}x faster encode, "
+        f"{js['decode_ns'] / bn['decode_ns']:.1f}x faster decode"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+Load generator for the signaling server.
+
+Opens many WebSocket clients (ramped in batches), lets the server pair
+them, has every caller relay a fake 'ice-candidate' to its callee, keeps
+all sockets open for `--hold` seconds so the server sees the full
+concurrent load, then disconnects. Reports time-to-match and relay
+latency percentiles plus the error count.
+
+Usage:
+    python server.py &                      # or pass --local
+    python -m bench.loadgen --clients 10000 [--url ws://127.0.0.1:8080]
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from typing import List
+
+import websockets
+
+from bench.bench_udp import percentile
+from server import WS_OPTIONS, Matchmaker
+
+
+def _raise_fd_limit() -> None:
+    try:
+        import resource
+    except ImportError:  # not available on Windows
+        return
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft < hard:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+
+
+class _Results:
+    def __init__(self) -> None:
+        self.match: List[float] = []
+        self.relay: List[float] = []
+        self.errors = 0
+
+
+async def _client(url: str, res: _Results, hold: asyncio.Event) -> None:
+    t0 = time.monotonic()
+    try:
+        async with websockets.connect(url, compression=None, open_timeout=60) as ws:
+            while True:
+                msg = json.loads(await ws.recv())
+                if msg["type"] == "matched":
+                    break
+            res.match.append(time.monotonic() - t0)
+            if msg["role"] == "caller":
+                await ws.send(
+                    json.dumps(
+                        {"type": "ice-candidate", "ip": "127.0.0.1", "port": 1,
+                         "t": time.monotonic()}
+                    )
+                )
+            else:
+                cand = json.loads(await ws.recv())
+                res.relay.append(time.monotonic() - cand["t"])
+            await hold.wait()
+    except Exception:
+        res.errors += 1
+
+
+async def _main(args) -> None:
+    _raise_fd_limit()
+    url = args.url
+    server = None
+    if args.local:
+        server = await websockets.serve(
+            Matchmaker().handler, "127.0.0.1", 0, **WS_OPTIONS
+        )
+        url = "ws://127.0.0.1:%d" % server.sockets[0].getsockname()[1]
+
+    res = _Results()
+    hold = asyncio.Event()
+    tasks = []
+    t0 = time.monotonic()
+    for i in range(0, args.clients, args.batch):
+        n = min(args.batch, args.clients - i)
+        tasks += [asyncio.create_task(_client(url, res, hold)) for _ in range(n)]
+        await asyncio.sleep(args.ramp)
+    while len(res.match) + res.errors < args.clients and time.monotonic() - t0 < 120:
+        await asyncio.sleep(0.1)
+    ramp_time = time.monotonic() - t0
+    await asyncio.sleep(args.hold)
+    hold.set()
+    await asyncio.gather(*tasks)
+    if server is not None:
+        server.close()
+        await server.wait_closed()
+
+    ms = [x * 1000 for x in res.match]
+    rl = [x * 1000 for x in res.relay]
+    print(f"clients={args.clients} matched={len(ms)} errors={res.errors} "
+          f"elapsed={ramp_time:.1f}s")
+    for name, xs in (("time-to-match", ms), ("relay", rl)):
+        print(
+            f"{name:<14} p50={percentile(xs, 50):.1f}ms p90={percentile(xs, 90):.1f}ms "
+            f"p99={percentile(xs, 99):.1f}ms max={max(xs, default=0):.1f}ms"
+        )
+
+
+def main() -> None:
+    """
+    Parse options and run the load test.
+    """
+    ap = argparse.ArgumentParser(description="Signaling server load generator")
+    ap.add_argument("--url", default="ws://127.0.0.1:8080")
+    ap.add_argument("--local", action="store_true", help="run a server in-process")
+    ap.add_argument("--clients", type=int, default=10_000)
+    ap.add_argument("--batch", type=int, default=200, help="clients per ramp step")
+    ap.add_argument("--ramp", type=float, default=0.05, help="seconds between steps")
+    ap.add_argument("--hold", type=float, default=5.0, help="seconds to stay connected")
+    asyncio.run(_main(ap.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,457 @@
+"""
+Load test — thousands of headless clients over the full match path.
+
+Where `bench.loadgen` stops at matchmaking, every client here plays a
+whole match the way the game client does:
+  - signaling: wait for 'matched' (`Game._signaling`);
+  - connect: the caller opens a listener and relays its address in an
+    'ice-candidate', the callee races a connection to it (`_host`/`_join`);
+  - READY: JSON handshake, then the negotiated wire format (`_start_game`);
+  - play: `--ticks` ticks on a `TickScheduler`, positions and pings sent
+    through a `PeerWriter`, everything received through a `PeerReader`
+    and answered like `_recv_loop` (pong, win). IT sends 'win' on a tag.
+
+Moves are a random walk, or `bot.Bot` decisions with `--moves bot`
+(needs NumPy). A client that has played its ticks, or saw the tag,
+half-closes its stream; the peer's end of stream is only a failure if
+it comes before the peer's last tick.
+
+Clients are spread across `--procs` worker processes, each running its
+share of asyncio clients on one event loop, ramped over `--ramp`
+seconds. `--local` starts a signaling server in a process of its own.
+
+The report — percentiles of time-to-match (WebSocket open → 'matched'),
+time-to-connect ('matched' → peer link up), READY handshake latency,
+tick jitter (lateness of tick starts) and ping RTT, plus failures per
+stage — is printed and written as JSON to `--out`.
+
+Usage:
+    python server.py &                      # or pass --local
+    python -m bench.loadtest --clients 2000 --procs 4 [--out loadtest.json]
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+
+import websockets
+
+from bench.bench_udp import percentile
+from bench.loadgen import _raise_fd_limit
+from candidates import listen_socket, race
+from config import PEER_TIMEOUT, TICK
+from engine import MOVE_RIGHT, MOVE_UP, GameState
+from inbox import PeerReader
+from latency import PING_INTERVAL, LatencyMonitor, now_ms
+from maps import Terrain, parse_size
+from outbox import PeerWriter
+from scheduler import TickScheduler
+from server import WS_OPTIONS, Matchmaker
+from wire import WIRE_JSON, WIRE_VERSION, codec_for, negotiate
+
+STAGES = ("ws", "match", "connect", "ready", "play")
+LINGER = 5.0
+
+
+class _Client:
+    """
+    One scripted headless client; `run` fills in `rec`.
+    """
+
+    def __init__(self, opts: dict, seed: int) -> None:
+        self.opts = opts
+        self.rec: Dict[str, object] = {
+            "fail": None,
+            "error": None,
+            "role": None,
+            "match": None,
+            "connect": None,
+            "ready": None,
+            "late": [],
+            "rtt": [],
+            "ticks": 0,
+            "tagged": False,
+        }
+        self._rng = random.Random(seed)
+        self._bot = None
+        self._stage: Optional[str] = None  # set once play starts
+
+    async def run(self, url: str) -> dict:
+        """
+        Play one match through `url`; never raises.
+
+        Returns:
+            dict: The client's record (`fail` names the stage that failed).
+        """
+        rec = self.rec
+        timeout = self.opts["timeout"]
+        stage = "ws"
+        try:
+            async with websockets.connect(
+                url,
+                compression=None,
+                open_timeout=timeout,
+                ping_interval=None,
+                ping_timeout=None,
+            ) as ws:
+                stage = "match"
+                t0 = time.perf_counter()
+                caller = await asyncio.wait_for(self._matched(ws), timeout)
+                rec["role"] = "caller" if caller else "callee"
+                rec["match"] = time.perf_counter() - t0
+
+                stage = "connect"
+                t0 = time.perf_counter()
+                link = self._host(ws) if caller else self._join(ws)
+                reader, writer = await asyncio.wait_for(link, timeout)
+                rec["connect"] = time.perf_counter() - t0
+
+                stage = "ready"
+                try:
+                    await self._match(reader, writer, caller)
+                finally:
+                    writer.transport.abort()
+        except Exception as exc:
+            rec["fail"] = self._stage or stage
+            rec["error"] = f"{type(exc).__name__}: {exc}"
+        return rec
+
+    async def _matched(self, ws) -> bool:
+        while True:
+            msg = json.loads(await ws.recv())
+            if msg.get("type") == "matched":
+                return msg["role"] == "caller"
+
+    async def _host(self, ws):
+        connected: asyncio.Future = asyncio.get_running_loop().create_future()
+
+        def _accept(r: asyncio.StreamReader, w: asyncio.StreamWriter) -> None:
+            if connected.done():
+                w.close()
+            else:
+                connected.set_result((r, w))
+
+        srv = await asyncio.start_server(_accept, sock=listen_socket())
+        port = srv.sockets[0].getsockname()[1]
+        addr = self.opts["addr"]
+        await ws.send(
+            json.dumps(
+                {"type": "ice-candidate", "ip": addr, "addrs": [addr], "port": port}
+            )
+        )
+        try:
+            return await connected
+        finally:
+            srv.close()
+
+    async def _join(self, ws):
+        while True:
+            msg = json.loads(await ws.recv())
+            kind = msg.get("type")
+            if kind == "peer-left":
+                raise ConnectionError("peer left before connecting")
+            if kind == "ice-candidate":
+                break
+        addrs = msg.get("addrs") or [msg.get("ip", "127.0.0.1")]
+        reader, writer, _ = await race(addrs, int(msg["port"]))
+        return reader, writer
+
+    async def _match(self, reader, writer, caller: bool) -> None:
+        send = PeerWriter(writer)
+        send.start()
+        inbox = PeerReader(reader)
+        try:
+            await self._play(send, inbox, writer, caller)
+        finally:
+            inbox.close()
+            send.close()
+
+    async def _play(self, send: PeerWriter, inbox: PeerReader, writer, caller: bool):
+        rec = self.rec
+        opts = self.opts
+        terrain = Terrain(opts["w"], opts["h"])
+        rate = opts["tick_rate"]
+        codec = codec_for(WIRE_JSON)
+
+        # READY handshake, as in Game._start_game
+        t0 = time.perf_counter()
+        ready = {"type": "ready", "wire": WIRE_VERSION, "rate": rate}
+        send.send(codec.encode({**ready, **terrain.describe()}))
+        inbox.expect_within(opts["timeout"])
+        while True:
+            msgs = await inbox.batch(codec, limit=1)
+            if msgs is None:
+                raise ConnectionError("peer closed before READY")
+            if msgs[0].get("type") == "ready":
+                codec = codec_for(negotiate(WIRE_VERSION, msgs[0]))
+                break
+        rec["ready"] = time.perf_counter() - t0
+
+        # play, as in Game._game_tick / _recv_loop
+        self._stage = "play"
+        state = GameState(0, 0, terrain)
+        state.reset()
+        me, op = (0, 1) if caller else (1, 0)
+        if opts["moves"] == "bot":
+            from bot import Bot
+
+            role = "it" if me == state.it else "runner"
+            self._bot = Bot(terrain, role, opts["skill"], self._rng.randrange(1 << 30))
+        move_every = max(1, round(rate * TICK))
+        ping_every = max(1, round(rate * PING_INTERVAL))
+        ticks = opts["ticks"]
+        link = LatencyMonitor()
+        late: List[float] = rec["late"]  # type: ignore[assignment]
+        rtts: List[float] = rec["rtt"]  # type: ignore[assignment]
+        over = False
+        peer_tick = 0
+
+        async def step(n: int) -> None:
+            nonlocal over
+            late.append(time.monotonic() - start - n * ticker.period)
+            if n % move_every == 0:
+                state.move(me, self._move(state, me, op))
+            pos = {
+                "type": "pos",
+                "x": state.xs[me],
+                "y": state.ys[me],
+                "t": int(time.time() * 1000),
+                "n": n,
+            }
+            send.send(codec.encode(pos), "pos")
+            if n % ping_every == 1 and not send.congested:
+                send.send(codec.encode(link.ping()), "ping")
+            if me == state.it and state.caught() is not None:
+                send.send(codec.encode({"type": "win", "n": n}))
+                rec["tagged"] = over = True
+            rec["ticks"] = n
+
+        async def receive() -> None:
+            nonlocal over, peer_tick
+            inbox.expect_within(PEER_TIMEOUT)
+            while True:
+                msgs = await inbox.batch(codec)
+                if msgs is None:
+                    if inbox.idle:
+                        raise ConnectionError("peer silent")
+                    if not over and peer_tick < ticks and not rec["tagged"]:
+                        raise ConnectionError("peer closed mid-match")
+                    return
+                arrived = now_ms()
+                for m in msgs:
+                    t = m.get("type")
+                    if t == "pos":
+                        state.place(op, int(m["x"]), int(m["y"]))
+                        peer_tick = max(peer_tick, int(m.get("n", 0)))
+                    elif t == "ping":
+                        send.send(codec.encode(LatencyMonitor.pong(m, arrived)), "pong")
+                    elif t == "pong":
+                        rtt = link.on_pong(m, arrived)
+                        if rtt is not None:
+                            rtts.append(rtt / 1000)
+                    elif t == "win":
+                        rec["tagged"] = over = True
+
+        ticker = TickScheduler(step, rate)
+        recv = asyncio.create_task(receive())
+        start = time.monotonic()
+        play = asyncio.create_task(
+            ticker.run(lambda: not over and ticker.tick < ticks and not recv.done())
+        )
+        await asyncio.wait((play, recv), return_when=asyncio.FIRST_COMPLETED)
+        over = True
+        if recv.done():
+            play.cancel()
+            recv.result()  # peer failure
+            return
+        await play
+        # flush what is queued, half-close, and let the peer finish too
+        while len(send) and not send.closed:
+            await asyncio.sleep(0.01)
+        if writer.can_write_eof():
+            writer.write_eof()
+        await asyncio.wait_for(recv, LINGER)
+
+    def _move(self, state: GameState, me: int, op: int) -> int:
+        if self._bot is not None:
+            return self._bot.decide(
+                (state.xs[me], state.ys[me]), (state.xs[op], state.ys[op])
+            )
+        return self._rng.randint(MOVE_UP, MOVE_RIGHT)
+
+
+async def run_clients(url: str, clients: int, opts: dict, seed: int = 0) -> List[dict]:
+    """
+    Run `clients` clients on the current loop, ramped over `opts["ramp"]`.
+
+    Args:
+        url (str): Signaling server URL.
+        clients (int): Number of clients.
+        opts (dict): Load options (see `main`).
+        seed (int): Seed for the clients' random moves.
+
+    Returns:
+        list[dict]: One record per client.
+    """
+    tasks = []
+    gap = opts["ramp"] / clients if clients else 0.0
+    for i in range(clients):
+        tasks.append(asyncio.create_task(_Client(opts, seed + i).run(url)))
+        if gap:
+            await asyncio.sleep(gap)
+    return list(await asyncio.gather(*tasks))
+
+
+def _worker(url: str, clients: int, opts: dict, seed: int) -> List[dict]:
+    _raise_fd_limit()
+    return asyncio.run(run_clients(url, clients, opts, seed))
+
+
+def _serve(port_q) -> None:
+    async def run() -> None:
+        mm = Matchmaker()
+        async with websockets.serve(mm.handler, "127.0.0.1", 0, **WS_OPTIONS) as srv:
+            port_q.put(srv.sockets[0].getsockname()[1])
+            await asyncio.Future()
+
+    _raise_fd_limit()
+    asyncio.run(run())
+
+
+def _stats(samples: List[float]) -> dict:
+    ms = [x * 1000 for x in samples]
+    return {
+        "n": len(ms),
+        "p50": percentile(ms, 50),
+        "p90": percentile(ms, 90),
+        "p99": percentile(ms, 99),
+        "max": max(ms, default=0.0),
+    }
+
+
+def summarize(recs: List[dict], elapsed: float, config: dict) -> dict:
+    """
+    Reduce client records to the report written to `--out`.
+
+    Args:
+        recs (list[dict]): Records from every client.
+        elapsed (float): Wall-clock seconds the run took.
+        config (dict): Options to record alongside the results.
+
+    Returns:
+        dict: Percentiles in milliseconds, failure counts and rates.
+    """
+    failures = {s: 0 for s in STAGES}
+    errors: Dict[str, int] = {}
+    for r in recs:
+        if r["fail"] is not None:
+            failures[r["fail"]] += 1
+            errors[r["error"]] = errors.get(r["error"], 0) + 1
+    failed = sum(failures.values())
+    n = len(recs)
+    return {
+        "config": config,
+        "clients": n,
+        "completed": n - failed,
+        "tagged": sum(1 for r in recs if r["tagged"] and r["role"] == "caller"),
+        "elapsed_s": elapsed,
+        "failure_rate": failed / n if n else 0.0,
+        "failures": failures,
+        "errors": dict(sorted(errors.items(), key=lambda kv: -kv[1])[:10]),
+        "time_to_match_ms": _stats(
+            [r["match"] for r in recs if r["match"] is not None]
+        ),
+        "time_to_connect_ms": _stats(
+            [r["connect"] for r in recs if r["connect"] is not None]
+        ),
+        "ready_ms": _stats([r["ready"] for r in recs if r["ready"] is not None]),
+        "tick_jitter_ms": _stats([x for r in recs for x in r["late"]]),
+        "rtt_ms": _stats([x for r in recs for x in r["rtt"]]),
+    }
+
+
+def main() -> None:
+    """
+    Parse options, run the clients across the process pool and report.
+    """
+    ap = argparse.ArgumentParser(description="Full match-path load test")
+    ap.add_argument("--url", default="ws://127.0.0.1:8080")
+    ap.add_argument("--local", action="store_true", help="start a server process")
+    ap.add_argument("--clients", type=int, default=1000)
+    ap.add_argument("--procs", type=int, default=os.cpu_count() or 1)
+    ap.add_argument("--ramp", type=float, default=5.0, help="seconds to start all")
+    ap.add_argument("--ticks", type=int, default=300, help="ticks per match")
+    ap.add_argument("--tick-rate", type=float, default=1 / TICK, metavar="HZ")
+    ap.add_argument("--size", default="10x10", metavar="WxH")
+    ap.add_argument("--moves", choices=("random", "bot"), default="random")
+    ap.add_argument("--skill", type=float, default=0.8, help="bot skill (--moves bot)")
+    ap.add_argument("--addr", default="127.0.0.1", help="address callers advertise")
+    ap.add_argument("--timeout", type=float, default=30.0, help="seconds per stage")
+    ap.add_argument("--out", default="loadtest.json", metavar="PATH")
+    args = ap.parse_args()
+
+    clients = args.clients + args.clients % 2
+    procs = max(1, min(args.procs, clients))
+    w, h = parse_size(args.size)
+    opts = {
+        "ramp": args.ramp,
+        "ticks": args.ticks,
+        "tick_rate": args.tick_rate,
+        "w": w,
+        "h": h,
+        "moves": args.moves,
+        "skill": args.skill,
+        "addr": args.addr,
+        "timeout": args.timeout,
+    }
+    _raise_fd_limit()
+    server = None
+    url = args.url
+    if args.local:
+        port_q: multiprocessing.Queue = multiprocessing.Queue()
+        server = multiprocessing.Process(target=_serve, args=(port_q,), daemon=True)
+        server.start()
+        url = "ws://127.0.0.1:%d" % port_q.get(timeout=30)
+
+    shares = [clients // procs + (i < clients % procs) for i in range(procs)]
+    t0 = time.monotonic()
+    try:
+        with ProcessPoolExecutor(procs) as pool:
+            futures = [
+                pool.submit(_worker, url, n, opts, i * clients)
+                for i, n in enumerate(shares)
+            ]
+            recs = [r for f in futures for r in f.result()]
+    finally:
+        if server is not None:
+            server.terminate()
+    elapsed = time.monotonic() - t0
+
+    report = summarize(recs, elapsed, {**opts, "clients": clients, "procs": procs})
+    with open(args.out, "w") as f:
+        json.dump(report, f, indent=2)
+
+    print(
+        f"clients={clients} procs={procs} completed={report['completed']} "
+        f"failure_rate={report['failure_rate']:.2%} elapsed={elapsed:.1f}s"
+    )
+    for key in ("time_to_match", "time_to_connect", "ready", "tick_jitter", "rtt"):
+        s = report[key + "_ms"]
+        print(
+            f"{key:<16} p50={s['p50']:7.1f}ms p90={s['p90']:7.1f}ms "
+            f"p99={s['p99']:7.1f}ms max={s['max']:7.1f}ms  (n={s['n']})"
+        )
+    failed = {k: v for k, v in report["failures"].items() if v}
+    if failed:
+        print("failures:", ", ".join(f"{k}={v}" for k, v in failed.items()))
+    print(f"report written to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+"""
+Local lossy-link simulator for benchmarks.
+
+Two in-process proxies that sit between a pair of peers on localhost and
+impair the traffic passing through them:
+
+  - `LossyDatagramProxy` drops each datagram with probability `loss` and
+    delays the rest by `delay` plus up to `jitter` seconds.
+  - `LossyStreamProxy` models TCP over the same link: a "lost" chunk is
+    delivered only after an extra retransmission timeout, and, because the
+    stream is ordered, every chunk behind it waits too (head-of-line).
+"""
+
+import asyncio
+import random
+from typing import Optional, Tuple
+
+Addr = Tuple[str, int]
+
+
+class _Impairment:
+    """
+    Shared loss/delay model used by both proxies.
+
+    Attributes:
+        loss (float): Probability that a packet is lost (0.0–1.0).
+        delay (float): Base one-way delay in seconds.
+        jitter (float): Maximum extra random delay in seconds.
+        dropped (int): Number of packets lost so far.
+        passed (int): Number of packets delivered so far.
+    """
+
+    def __init__(
+        self, loss: float, delay: float, jitter: float, seed: Optional[int]
+    ) -> None:
+        self.loss = loss
+        self.delay = delay
+        self.jitter = jitter
+        self.dropped = 0
+        self.passed = 0
+        self._rng = random.Random(seed)
+
+    def lost(self) -> bool:
+        if self._rng.random() < self.loss:
+            self.dropped += 1
+            return True
+        self.passed += 1
+        return False
+
+    def latency(self) -> float:
+        return self.delay + self._rng.random() * self.jitter
+
+
+class LossyDatagramProxy(asyncio.DatagramProtocol, _Impairment):
+    """
+    UDP proxy between one client and a fixed upstream address.
+
+    Point the client at `addr`; datagrams are forwarded to `upstream` and
+    replies are sent back to whichever client address spoke last.
+    """
+
+    def __init__(
+        self,
+        upstream: Addr,
+        loss: float = 0.0,
+        delay: float = 0.0,
+        jitter: float = 0.0,
+        seed: Optional[int] = None,
+    ) -> None:
+        _Impairment.__init__(self, loss, delay, jitter, seed)
+        self.upstream = upstream
+        self.client: Optional[Addr] = None
+        self.transport: Optional[asyncio.DatagramTransport] = None
+        self.addr: Optional[Addr] = None
+
+    async def start(self) -> Addr:
+        """
+        Bind the proxy on an ephemeral localhost port.
+
+        Returns:
+            tuple: The (ip, port) clients should send to.
+        """
+        loop = asyncio.get_event_loop()
+        await loop.create_datagram_endpoint(lambda: self, local_addr=("127.0.0.1", 0))
+        assert self.transport is not None
+        self.addr = self.transport.get_extra_info("sockname")[:2]
+        return self.addr
+
+    def connection_made(self, transport) -> None:  # type: ignore[override]
+        self.transport = transport
+
+    def datagram_received(self, data: bytes, addr) -> None:
+        if addr == self.upstream:
+            dest = self.client
+        else:
+            self.client = addr
+            dest = self.upstream
+        if dest is None or self.lost():
+            return
+        asyncio.get_event_loop().call_later(self.latency(), self._forward, data, dest)
+
+    def _forward(self, data: bytes, dest: Addr) -> None:
+        if self.transport is not None and not self.transport.is_closing():
+            self.transport.sendto(data, dest)
+
+    def close(self) -> None:
+        if self.transport is not None:
+            self.transport.close()
+
+
+class LossyStreamProxy(_Impairment):
+    """
+    TCP proxy that reproduces head-of-line blocking under loss.
+
+    Each chunk read from one side is scheduled for delivery at
+    `now + latency`, or `now + latency + rto` when the chunk is "lost";
+    delivery times never go backwards, so later chunks queue behind a
+    retransmitted one exactly as they would in a real TCP stream.
+    """
+
+    def __init__(
+        self,
+        upstream: Addr,
+        loss: float = 0.0,
+        delay: float = 0.0,
+        jitter: float = 0.0,
+        rto: float = 0.2,
+        seed: Optional[int] = None,
+    ) -> None:
+        _Impairment.__init__(self, loss, delay, jitter, seed)
+        self.upstream = upstream
+        self.rto = rto
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._tasks: list = []
+
+    async def start(self) -> Addr:
+        """
+        Listen on an ephemeral localhost port.
+
+        Returns:
+            tuple: The (ip, port) clients should connect to.
+        """
+        self._server = await asyncio.start_server(self._accept, "127.0.0.1", 0)
+        return self._server.sockets[0].getsockname()[:2]
+
+    async def _accept(self, r: asyncio.StreamReader, w: asyncio.StreamWriter) -> None:
+        ur, uw = await asyncio.open_connection(*self.upstream)
+        self._tasks.append(asyncio.create_task(self._pump(r, uw)))
+        self._tasks.append(asyncio.create_task(self._pump(ur, w)))
+
+    async def _pump(self, r: asyncio.StreamReader, w: asyncio.StreamWriter) -> None:
+        loop = asyncio.get_event_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        deliver = asyncio.create_task(self._deliver(queue, w))
+        self._tasks.append(deliver)
+        release = 0.0
+        while True:
+            chunk = await r.read(65536)
+            now = loop.time()
+            if not chunk:
+                queue.put_nowait((max(release, now), b""))
+                return
+            at = now + self.latency() + (self.rto if self.lost() else 0.0)
+            release = max(release, at)
+            queue.put_nowait((release, chunk))
+
+    async def _deliver(self, queue: asyncio.Queue, w: asyncio.StreamWriter) -> None:
+        loop = asyncio.get_event_loop()
+        while True:
+            at, chunk = await queue.get()
+            await asyncio.sleep(max(0.0, at - loop.time()))
+            if not chunk:
+                w.close()
+                return
+            w.write(chunk)
+
+    def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+        for t in self._tasks:
+            t.cancel()
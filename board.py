@@ -0,0 +1,216 @@
+"""
+ASCII Tag Game — Board Widget
+
+A Textual line-API widget that draws the bordered game grid one row at a
+time. On maps larger than the widget only a camera viewport centred on
+the focus cell (the local player) is drawn, so frame cost depends on the
+terminal size and not on the map size. While the camera stays put, only
+the rows whose contents changed since the previous frame (where a symbol
+left or arrived) are invalidated and re-rendered.
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+from rich.segment import Segment
+from textual.geometry import Region, Size
+from textual.strip import Strip
+from textual.widget import Widget
+
+from maps import Terrain
+
+Marks = Dict[str, Tuple[int, int]]
+
+_ROW_CACHE = 512
+
+
+class Board(Widget):
+    """
+    Line-rendered game board that repaints only changed rows.
+
+    Line 0 and the last line are the border; the lines between show map
+    rows `top .. top + view_rows - 1` and columns `left .. left +
+    view_cols - 1`. Symbols are given as a mapping of symbol -> (x, y);
+    when two symbols share a cell the one inserted last is drawn on top.
+
+    Attributes:
+        terrain (Terrain): The map being drawn.
+        repainted (int): Number of grid lines re-rendered so far.
+    """
+
+    DEFAULT_CSS = """
+    Board { height: auto; width: auto; }
+    """
+
+    def __init__(self, terrain: Terrain, empty: str = ".", **kwargs) -> None:
+        """
+        Initialise the board for a map.
+
+        Args:
+            terrain (Terrain): The map to draw.
+            empty (str): Character drawn in floor cells.
+            **kwargs: Passed through to `Widget` (id, classes, ...).
+        """
+        super().__init__(**kwargs)
+        self.empty = empty
+        self.repainted = 0
+        self._marks: Marks = {}
+        self._focus: Optional[Tuple[int, int]] = None
+        self._camera = (0, 0)
+        self._strips: Dict[int, Strip] = {}
+        self.set_terrain(terrain)
+
+    def set_terrain(self, terrain: Terrain) -> None:
+        """
+        Switch to a different map and redraw everything.
+
+        Args:
+            terrain (Terrain): The new map.
+        """
+        self.terrain = terrain
+        self._terrain_rows: Dict[int, str] = {}  # visible columns only
+        self._row_span = (0, 0)  # (left, cols) the cached rows cover
+        self._strips.clear()
+        self._marks = {}
+        self._camera = (0, 0)
+        if self.is_mounted:
+            self.refresh(layout=True)
+
+    # ── geometry ────────────────────────────────────────────────────────
+
+    def view_size(self) -> Tuple[int, int]:
+        """
+        Return how many map cells fit in the widget.
+
+        Returns:
+            tuple: (columns, rows) of the viewport, never larger than the map.
+        """
+        t = self.terrain
+        w, h = self.size
+        cols = min(t.w, max(1, (w - 3) // 2)) if w else t.w
+        rows = min(t.h, max(1, h - 2)) if h else t.h
+        return cols, rows
+
+    def _camera_for(self, focus: Optional[Tuple[int, int]]) -> Tuple[int, int]:
+        if focus is None:
+            return self._camera
+        cols, rows = self.view_size()
+        fx, fy = focus
+        left = min(max(0, fx - cols // 2), self.terrain.w - cols)
+        top = min(max(0, fy - rows // 2), self.terrain.h - rows)
+        return left, top
+
+    # ── updates ─────────────────────────────────────────────────────────
+
+    def place(
+        self, marks: Optional[Marks], focus: Optional[Tuple[int, int]] = None
+    ) -> None:
+        """
+        Move the symbols on the board and invalidate the lines that changed.
+
+        Args:
+            marks (dict | None): Symbol -> (x, y) for every visible piece;
+                                 None or {} shows an empty board.
+            focus (tuple | None): Cell to centre the camera on; None keeps
+                                  the camera where it is.
+        """
+        marks = dict(marks or {})
+        self._focus = focus
+        camera = self._camera_for(focus)
+        if camera != self._camera:
+            self._camera = camera
+            self._marks = marks
+            self._strips.clear()
+            self.refresh()
+            return
+        if marks == self._marks:
+            return
+
+        old = self._marks
+        self._marks = marks
+        touched = {y for _, y in old.values()} | {y for _, y in marks.values()}
+        top = self._camera[1]
+        _, rows = self.view_size()
+        dirty: List[int] = []
+        for y in touched:
+            before = [(s, p) for s, p in old.items() if p[1] == y]
+            after = [(s, p) for s, p in marks.items() if p[1] == y]
+            if before != after and top <= y < top + rows:
+                line = y - top + 1
+                self._strips.pop(line, None)
+                dirty.append(line)
+
+        if dirty:
+            width = self.size.width
+            self.refresh(*(Region(0, line, width, 1) for line in dirty))
+
+    def text(self) -> str:
+        """
+        Return the visible viewport as a plain multi-line string.
+
+        Returns:
+            str: The same layout the widget draws, border included.
+        """
+        _, rows = self.view_size()
+        return "\n".join(self._line_text(y) for y in range(rows + 2))
+
+    # ── line rendering ──────────────────────────────────────────────────
+
+    def _terrain_row(self, y: int, left: int, cols: int) -> str:
+        if self._row_span != (left, cols):
+            self._row_span = (left, cols)
+            self._terrain_rows.clear()
+        row = self._terrain_rows.get(y)
+        if row is None:
+            if len(self._terrain_rows) >= _ROW_CACHE:
+                self._terrain_rows.clear()
+            row = self.terrain.row_text(y, self.empty, left, left + cols)
+            self._terrain_rows[y] = row
+        return row
+
+    def _line_text(self, y: int) -> str:
+        cols, rows = self.view_size()
+        if y == 0 or y == rows + 1:
+            return "+" + "-" * (cols * 2 + 1) + "+"
+        if not 0 < y <= rows:
+            return ""
+        left, top = self._camera
+        my = top + y - 1
+        cells = self._terrain_row(my, left, cols)
+        hits = [(x, s) for s, (x, sy) in self._marks.items() if sy == my]
+        if hits:
+            chars = list(cells)
+            for x, sym in hits:
+                if left <= x < left + cols:
+                    chars[2 * (x - left)] = sym
+            cells = "".join(chars)
+        return "| " + cells + " |"
+
+    # ── Textual line API ────────────────────────────────────────────────
+
+    def get_content_width(self, container: Size, viewport: Size) -> int:
+        return min(self.terrain.w * 2 + 3, max(5, container.width))
+
+    def get_content_height(self, container: Size, viewport: Size, width: int) -> int:
+        return min(self.terrain.h + 2, max(3, container.height))
+
+    def on_resize(self) -> None:
+        self._strips.clear()
+        self._camera = self._camera_for(self._focus)
+
+    def notify_style_update(self) -> None:
+        self._strips.clear()
+        super().notify_style_update()
+
+    def render_line(self, y: int) -> Strip:
+        strip = self._strips.get(y)
+        if strip is not None:
+            return strip
+        text = self._line_text(y)
+        if text.startswith("|"):
+            self.repainted += 1
+        style = self.rich_style
+        strip = Strip([Segment(text, style)]).adjust_cell_length(
+            self.size.width, style
+        )
+        self._strips[y] = strip
+        return strip
@@ -0,0 +1,399 @@
+"""
+ASCII Tag Game — Bot Opponent
+
+A local opponent for `--bot`, and a load source for headless benchmarks.
+Every decision is a table lookup: the bot reads the BFS distance field
+towards its opponent's cell and steps to the neighbour that lowers it
+(IT) or raises it (runner).
+
+Distance fields are computed with NumPy and cached per map (keyed by the
+terrain digest, shared by every bot on that map):
+  - maps with at most ALL_PAIRS_MAX open cells get every field up front
+    (all-pairs, one BFS from every source at once), so decisions never
+    compute anything — if the table fits in FIELD_MEMORY: it has a row
+    per open cell but a column per padded cell, walls included, so a
+    big map that is mostly wall stays on the path below;
+  - larger maps keep the most recent fields (FIELD_CACHE, capped at
+    FIELD_MEMORY bytes). A field is built by a breadth-first search from
+    the opponent's cell that expands whole layers at once and stops as
+    soon as it reaches the bot's cell and its neighbours — all a decision
+    reads — or when the decision's deadline passes. Searches are cached
+    partial and shared, so any bot needing the same field resumes the
+    same search. A bot finishes the search it started before it starts
+    one towards where the opponent has moved since, and until then it
+    follows the last field it used (distances change by at most one cell
+    per move, so a field for where the opponent just was is still a good
+    guide).
+
+With equal speeds a perfect runner is never caught (and a perfect IT
+never lets a cornered runner go), so `skill` sets the share of decisions
+that follow the field; the rest are random moves.
+
+The grid is padded with a ring of wall cells and flattened, so the four
+neighbours of cell `p` are `p ± 1` and `p ± stride` with no bounds checks.
+"""
+
+import random
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from engine import MOVE_DOWN, MOVE_LEFT, MOVE_NONE, MOVE_RIGHT, MOVE_UP
+from maps import Terrain
+
+ALL_PAIRS_MAX = 1024
+FIELD_CACHE = 32
+FIELD_MEMORY = 64 << 20
+_PAIR_BYTES = 6  # per table entry while building: int16 dist, 4 bool masks
+ROLES = ("it", "runner")
+
+_MOVES = (MOVE_UP, MOVE_DOWN, MOVE_LEFT, MOVE_RIGHT)
+_tables: Dict[str, "DistanceTables"] = {}
+
+
+class _Search:
+    """
+    Breadth-first search from one cell, resumable between decisions.
+
+    Attributes:
+        target (int): Padded flat index of the target cell.
+        dist (numpy.ndarray): Distances found so far (-1 = not yet / never).
+        done (bool): True once every reachable cell has its distance.
+    """
+
+    __slots__ = ("target", "dist", "done", "_frontier", "_d", "_tables")
+
+    def __init__(self, tables: "DistanceTables", target: int) -> None:
+        self.target = target
+        self.dist = np.full(tables.open.size, -1, dtype=np.int32)
+        self.dist[target] = 0
+        self.done = False
+        self._frontier = np.array([target], dtype=np.int64)
+        self._d = 0
+        self._tables = tables
+
+    def covers(self, p: int) -> bool:
+        """
+        Return True if cell `p` and its neighbours have final distances.
+        """
+        return self.done or 0 <= self.dist[p] < self._d
+
+    def run(self, deadline: Optional[float] = None, p: Optional[int] = None) -> bool:
+        """
+        Expand layers until the search covers `p`, completes, or `deadline`
+        passes (checked before each layer).
+
+        Args:
+            deadline (float | None): `time.perf_counter()` value to stop at
+                                     (None runs until `p` is covered).
+            p (int | None): Padded flat index of the cell a decision reads
+                            (None runs to completion).
+
+        Returns:
+            bool: True if the search covers `p` (or is complete).
+        """
+        t = self._tables
+        open_, stamp, offs = t.open, t.stamp, t.offsets
+        dist = self.dist
+        frontier = self._frontier
+        while frontier.size:
+            if p is not None and 0 <= dist[p] < self._d:
+                break
+            if deadline is not None and time.perf_counter() >= deadline:
+                break
+            self._d += 1
+            nb = (frontier[:, None] + offs).ravel()
+            nb = nb[open_[nb] & (dist[nb] < 0)]
+            # keep the first occurrence of each cell without sorting
+            idx = np.arange(nb.size)
+            stamp[nb] = idx
+            nb = nb[stamp[nb] == idx]
+            dist[nb] = self._d
+            frontier = nb
+        self._frontier = frontier
+        self.done = not frontier.size
+        return self.done or p is not None and self.covers(p)
+
+
+class DistanceTables:
+    """
+    BFS distance fields for one map.
+
+    Attributes:
+        terrain (Terrain): The map.
+        stride (int): Width of the padded grid.
+        open (numpy.ndarray): Padded, flattened open-cell mask.
+        offsets (numpy.ndarray): Flat index offsets of up, down, left, right.
+        cells (int): Number of open cells.
+        degree (numpy.ndarray): Open neighbours of every padded cell.
+        all_pairs (bool): True if every field was computed up front.
+        hits / misses (int): Field lookups that did / did not find the
+                             cached field already covering the cell.
+    """
+
+    def __init__(self, terrain: Terrain, cache: int = FIELD_CACHE) -> None:
+        """
+        Build the padded grid and, on small maps, every distance field.
+
+        Args:
+            terrain (Terrain): The map.
+            cache (int): Fields to keep on maps too large for all-pairs
+                         (fewer if they would exceed FIELD_MEMORY).
+        """
+        self.terrain = terrain
+        w, h = terrain.w, terrain.h
+        self.stride = s = w + 2
+        bits = np.unpackbits(
+            np.frombuffer(bytes(terrain.bits), dtype=np.uint8), bitorder="little"
+        )[: w * h].reshape(h, w)
+        grid = np.zeros((h + 2, s), dtype=bool)
+        grid[1:-1, 1:-1] = bits == 0
+        self.open = grid.ravel()
+        self.stamp = np.empty(self.open.size, dtype=np.int64)
+        self.offsets = np.array([-s, s, -1, 1], dtype=np.int64)
+        # indexed by MOVE_* code (MOVE_NONE stays put)
+        self.move_offsets = (0, -s, s, -1, 1)
+        self.cells = int(self.open.sum())
+        # the wall ring keeps np.roll from wrapping open cells together
+        self.degree = sum(np.roll(self.open, int(o)) for o in self.offsets)
+        self.degree *= self.open
+        self.hits = 0
+        self.misses = 0
+        self._cache = max(1, min(cache, FIELD_MEMORY // (4 * self.open.size)))
+        self._fields: "OrderedDict[int, _Search]" = OrderedDict()
+        self.all_pairs = (
+            self.cells <= ALL_PAIRS_MAX
+            and self.cells * self.open.size * _PAIR_BYTES <= FIELD_MEMORY
+        )
+        if self.all_pairs:
+            self._rows, self._pairs = self._all_pairs()
+
+    def _all_pairs(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Run a BFS from every open cell at once, one layer for all per step.
+
+        Returns:
+            tuple: (row of each padded cell in the table, or -1;
+            (cells, padded cells) int16 distance table).
+        """
+        open_, s = self.open, self.stride
+        src = np.flatnonzero(open_)
+        rows = np.full(open_.size, -1, dtype=np.int64)
+        rows[src] = np.arange(src.size)
+        dist = np.full((src.size, open_.size), -1, dtype=np.int16)
+        frontier = np.zeros(dist.shape, dtype=bool)
+        frontier[rows[src], src] = True
+        dist[frontier] = 0
+        seen = frontier.copy()
+        d = 0
+        while frontier.any():
+            d += 1
+            nb = np.zeros_like(frontier)
+            nb[:, 1:] |= frontier[:, :-1]
+            nb[:, :-1] |= frontier[:, 1:]
+            nb[:, s:] |= frontier[:, :-s]
+            nb[:, :-s] |= frontier[:, s:]
+            nb &= open_
+            nb &= ~seen
+            seen |= nb
+            dist[nb] = d
+            frontier = nb
+        return rows, dist
+
+    def index(self, x: int, y: int) -> int:
+        """
+        Return the padded flat index of a cell.
+        """
+        return (y + 1) * self.stride + x + 1
+
+    def field(self, target: int, p: int) -> Optional[np.ndarray]:
+        """
+        Look up the distance field towards `target` if it covers cell `p`.
+
+        Args:
+            target (int): Padded flat index of the target cell.
+            p (int): Padded flat index of the cell the decision is for.
+
+        Returns:
+            numpy.ndarray | None: Distances to `target` by padded flat
+            index (-1 for walls and unreachable or unsearched cells), or
+            None if no cached field covers `p` yet.
+        """
+        if self.all_pairs:
+            self.hits += 1
+            r = self._rows[target]
+            return self._pairs[r] if r >= 0 else None
+        s = self._fields.get(target)
+        if s is None or not s.covers(p):
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._fields.move_to_end(target)
+        return s.dist
+
+    def search(
+        self, target: int, p: int, deadline: Optional[float] = None
+    ) -> Optional[np.ndarray]:
+        """
+        Start or resume the cached search towards `target` until it covers
+        cell `p` or `deadline` passes.
+
+        Args:
+            target (int): Padded flat index of the target cell.
+            p (int): Padded flat index of the cell the decision is for.
+            deadline (float | None): `time.perf_counter()` value to stop
+                                     searching at (None searches until `p`
+                                     is covered).
+
+        Returns:
+            numpy.ndarray | None: The field (see `field`), or None if the
+            search did not cover `p` in time.
+        """
+        s = self._fields.get(target)
+        if s is None:
+            if deadline is not None and time.perf_counter() >= deadline:
+                return None
+            s = self._fields[target] = _Search(self, target)
+            while len(self._fields) > self._cache:
+                self._fields.popitem(last=False)
+        else:
+            self._fields.move_to_end(target)
+        return s.dist if s.run(deadline, p) else None
+
+
+def tables_for(terrain: Terrain) -> DistanceTables:
+    """
+    Return the shared distance tables for a map, building them once.
+
+    Args:
+        terrain (Terrain): The map.
+
+    Returns:
+        DistanceTables: Tables keyed by the map's content digest.
+    """
+    t = _tables.get(terrain.digest)
+    if t is None:
+        t = _tables[terrain.digest] = DistanceTables(terrain)
+    return t
+
+
+class Bot:
+    """
+    One bot player.
+
+    Attributes:
+        role (str): "it" (chases) or "runner" (flees).
+        skill (float): Chance (0–1) that a decision follows the field.
+        tables (DistanceTables): Shared fields for the map.
+        stale (int): Decisions made on the previous field because the
+                     current one was not ready by the deadline.
+    """
+
+    def __init__(
+        self,
+        terrain: Terrain,
+        role: str,
+        skill: float = 1.0,
+        seed: Optional[int] = None,
+    ) -> None:
+        """
+        Create a bot.
+
+        Args:
+            terrain (Terrain): The map to play on.
+            role (str): "it" or "runner".
+            skill (float): Chance (0–1) that a decision follows the field.
+            seed (int | None): Seed for random moves and tie-breaking.
+
+        Raises:
+            ValueError: If the role is unknown.
+        """
+        if role not in ROLES:
+            raise ValueError(f"unknown bot role {role!r}")
+        self.role = role
+        self.skill = skill
+        self.tables = tables_for(terrain)
+        self.stale = 0
+        self._rng = random.Random(seed)
+        self._field: Optional[np.ndarray] = None
+        self._pending: Optional[int] = None
+
+    def decide(
+        self,
+        me: Tuple[int, int],
+        opponent: Tuple[int, int],
+        deadline: Optional[float] = None,
+    ) -> int:
+        """
+        Choose the next move.
+
+        Args:
+            me (tuple): The bot's (x, y).
+            opponent (tuple): The opponent's (x, y).
+            deadline (float | None): `time.perf_counter()` value by which
+                                     the decision must be made; a field
+                                     search still running then is resumed
+                                     by the next decision.
+
+        Returns:
+            int: A MOVE_* code (MOVE_NONE to stay).
+        """
+        if self.skill < 1.0 and self._rng.random() >= self.skill:
+            return self._rng.choice(_MOVES)
+        t = self.tables
+        p = t.index(*me)
+        target = t.index(*opponent)
+        f = t.field(target, p)
+        if f is None:
+            if self._pending is None:
+                self._pending = target
+            f = t.search(self._pending, p, deadline)
+            if f is None:
+                self.stale += 1
+                f = self._field
+                if f is None:
+                    return MOVE_NONE
+            else:
+                self._pending = None
+        self._field = f
+        return self._pick(f, p)
+
+    def _pick(self, f: np.ndarray, p: int) -> int:
+        """
+        Pick the best neighbour of padded cell `p` on field `f`.
+        """
+        t = self.tables
+        offs = t.move_offsets
+        if self.role == "it":
+            # any step down the field; staying put never helps IT
+            best = f[p] if f[p] >= 0 else None
+            moves = []
+            for mv in _MOVES:
+                d = f[p + offs[mv]]
+                if d < 0:
+                    continue
+                if best is None or d < best:
+                    best, moves = d, [mv]
+                elif d == best and moves:
+                    moves.append(mv)
+        else:
+            # furthest from IT, then the cell with the most ways out; an
+            # open cell without a distance is unreachable or beyond the
+            # search, so as far away as it gets
+            deg, far = t.degree, t.open.size
+            best = (int(f[p]) if f[p] >= 0 else far, int(deg[p]))
+            moves = [MOVE_NONE]
+            for mv in _MOVES:
+                q = p + offs[mv]
+                if not t.open[q]:
+                    continue
+                score = (int(f[q]) if f[q] >= 0 else far, int(deg[q]))
+                if score > best:
+                    best, moves = score, [mv]
+                elif score == best:
+                    moves.append(mv)
+        if not moves:
+            return MOVE_NONE
+        return moves[0] if len(moves) == 1 else self._rng.choice(moves)
@@ -0,0 +1,675 @@
+"""
+ASCII Tag Game — Spectator Broadcast
+
+Lets any number of spectators watch a match. The host publishes the
+match state once per tick to a broadcast relay, which fans it out to
+every spectator of that match; neither player pays for the audience:
+
+    host ──PUB1 <match>──► broadcast relay ──SUB1 <match>──► spectators
+
+After the hello line the stream is a sequence of frames, `FRAME` (type
+u8, body length u32) followed by the body, in network byte order:
+
+    INFO   w u16, h u16, tick rate f32, zlib wall bitmap   first frame
+    KEY    a KEY body (`keyframes.py`)                     full state
+    DELTA  tick u32, then a DELTA body                     one tick
+    END    an END body                                     match over
+
+The state bodies and their flags are the ones the match recording uses
+(`keyframes.py`). A tick where nothing moved is not sent at all;
+every `key_every` ticks (about once a second) a KEY is sent instead of
+a DELTA, and a new match (rematch) starts with one.
+
+The relay parses frame headers only. Each chunk read from the publisher
+is written, as the same bytes object, to every subscriber: a frame is
+encoded once, by the host, however many watch. The relay keeps the
+INFO frame and everything since the latest KEY, so a spectator who
+joins late gets the current state in its first read. A subscriber whose
+socket buffer holds more than `high_water` bytes is skipped until the
+next KEY and resumes from it — a slow viewer never holds up the others,
+its backlog stays bounded, and it never replays stale deltas. The
+kernel send buffer of each subscriber is capped at `SNDBUF` as well: a
+viewer stream is a few hundred bytes per second, so a default
+(auto-tuned, up to megabytes) buffer would hide minutes of lag and cost
+that much memory per stalled viewer. The host applies the same rule to
+its own connection to the relay.
+
+Usage:
+    python broadcast.py [--host 0.0.0.0] [--port 3479]
+"""
+
+import argparse
+import asyncio
+import logging
+import socket
+import struct
+import zlib
+from typing import AsyncIterator, Dict, List, Optional, Sequence, Set
+
+from keyframes import (
+    END,
+    KEY,
+    State,
+    apply_delta,
+    pack_delta,
+    pack_end,
+    pack_key,
+    winner_of,
+)
+from maps import Terrain
+from relay import parse_addr
+
+log = logging.getLogger("broadcast")
+
+PUB = b"PUB1 "
+SUB = b"SUB1 "
+MAX_HELLO = 80
+PORT = 3479
+HIGH_WATER = 4096
+SNDBUF = 16 * 1024
+KEY_SECONDS = 1.0
+CHUNK = 64 * 1024
+
+FRAME = struct.Struct("!BI")
+INFO = struct.Struct("!HHf")
+TICK = struct.Struct("!I")
+
+F_INFO = 1
+F_KEY = 2
+F_DELTA = 3
+F_END = 4
+
+
+def _frame(kind: int, body: bytes) -> bytes:
+    return FRAME.pack(kind, len(body)) + body
+
+
+def encode_info(terrain: Terrain, tick_rate: float) -> bytes:
+    """
+    Encode the INFO frame describing the arena.
+
+    Args:
+        terrain (Terrain): The match's map.
+        tick_rate (float): Ticks per second of the match.
+
+    Returns:
+        bytes: The frame.
+    """
+    walls = zlib.compress(bytes(terrain.bits))
+    return _frame(F_INFO, INFO.pack(terrain.w, terrain.h, tick_rate) + walls)
+
+
+def encode_key(n: int, cur: State) -> bytes:
+    """
+    Encode a KEY frame: the full state after tick `n`.
+
+    Args:
+        n (int): Tick number.
+        cur (tuple): (x0, y0, x1, y1, it).
+
+    Returns:
+        bytes: The frame.
+    """
+    return _frame(F_KEY, pack_key(n, cur))
+
+
+def encode_delta(n: int, cur: State, last: State) -> bytes:
+    """
+    Encode a DELTA frame: what changed between `last` and `cur` on tick `n`.
+
+    Args:
+        n (int): Tick number.
+        cur (tuple): (x0, y0, x1, y1, it) after the tick.
+        last (tuple): The state the spectator holds.
+
+    Returns:
+        bytes: The frame.
+    """
+    return _frame(F_DELTA, TICK.pack(n & 0xFFFFFFFF) + pack_delta(cur, last))
+
+
+def encode_end(n: int, winner: Optional[int]) -> bytes:
+    """
+    Encode an END frame.
+
+    Args:
+        n (int): Last tick of the match.
+        winner (int | None): Index of the winning player, if decided.
+
+    Returns:
+        bytes: The frame.
+    """
+    return _frame(F_END, pack_end(n, winner))
+
+
+class Publisher:
+    """
+    Host side of a broadcast: encodes the match once per tick.
+
+    Attributes:
+        match (str): Name spectators subscribe to.
+        key_every (int): Ticks between keyframes.
+        high_water (int): Buffered bytes above which frames are skipped
+                          until the next keyframe.
+        stats (dict): Counters — keys, deltas, bytes, skipped.
+    """
+
+    def __init__(
+        self,
+        writer: asyncio.StreamWriter,
+        match: str,
+        terrain: Terrain,
+        tick_rate: float,
+        key_every: int = 0,
+        high_water: int = HIGH_WATER,
+    ) -> None:
+        """
+        Send the hello line and the INFO frame on an open relay connection.
+
+        Args:
+            writer (asyncio.StreamWriter): Connection to the broadcast relay.
+            match (str): Match name.
+            terrain (Terrain): The match's map.
+            tick_rate (float): Ticks per second.
+            key_every (int): Ticks between keyframes; 0 for about one per
+                             KEY_SECONDS.
+            high_water (int): See the attribute.
+        """
+        self.match = match
+        self.key_every = key_every or max(1, round(tick_rate * KEY_SECONDS))
+        self.high_water = high_water
+        self.stats = {"keys": 0, "deltas": 0, "bytes": 0, "skipped": 0}
+        self._w = writer
+        self._last: Optional[State] = None
+        self._key_tick = 0
+        self._behind = False
+        writer.write(PUB + match.encode() + b"\n" + encode_info(terrain, tick_rate))
+
+    @property
+    def closed(self) -> bool:
+        """bool: True once the relay connection is gone."""
+        return self._w.is_closing()
+
+    def tick(self, n: int, xs: Sequence[int], ys: Sequence[int], it: int) -> None:
+        """
+        Publish the state after tick `n` (nothing if it did not change).
+
+        Args:
+            n (int): Tick number.
+            xs (Sequence[int]): Column of players 0 and 1.
+            ys (Sequence[int]): Row of players 0 and 1.
+            it (int): Index of the player who is IT.
+        """
+        cur = (xs[0], ys[0], xs[1], ys[1], it)
+        last = self._last
+        if last is None or self._behind or n - self._key_tick >= self.key_every:
+            if self._write(encode_key(n, cur), True):
+                self._last, self._key_tick = cur, n
+                self.stats["keys"] += 1
+        elif cur != last:
+            if self._write(encode_delta(n, cur, last), False):
+                self._last = cur
+                self.stats["deltas"] += 1
+
+    def end(
+        self,
+        n: int,
+        xs: Sequence[int],
+        ys: Sequence[int],
+        it: int,
+        winner: Optional[int],
+    ) -> None:
+        """
+        Publish the final state and the result; the next tick starts a
+        new match with a keyframe.
+
+        Args:
+            n (int): Last tick of the match.
+            xs (Sequence[int]): Column of players 0 and 1.
+            ys (Sequence[int]): Row of players 0 and 1.
+            it (int): Index of the player who is IT.
+            winner (int | None): Index of the winning player, if decided.
+        """
+        cur = (xs[0], ys[0], xs[1], ys[1], it)
+        if self._write(encode_key(n, cur) + encode_end(n, winner), True):
+            self.stats["keys"] += 1
+        self._last = None
+
+    def close(self) -> None:
+        """
+        Close the relay connection; the relay then closes every spectator.
+        """
+        self._w.close()
+
+    def _write(self, frame: bytes, key: bool) -> bool:
+        w = self._w
+        if w.is_closing():
+            return False
+        if w.transport.get_write_buffer_size() > self.high_water or (
+            self._behind and not key
+        ):
+            self._behind = True
+            self.stats["skipped"] += 1
+            return False
+        self._behind = False
+        w.write(frame)
+        self.stats["bytes"] += len(frame)
+        return True
+
+
+async def open_publisher(
+    addr: str, match: str, terrain: Terrain, tick_rate: float
+) -> Publisher:
+    """
+    Connect to a broadcast relay and start publishing a match.
+
+    Args:
+        addr (str): "host[:port]" of the relay.
+        match (str): Match name.
+        terrain (Terrain): The match's map.
+        tick_rate (float): Ticks per second.
+
+    Returns:
+        Publisher: The publisher.
+    """
+    host, port = parse_addr(addr, PORT)
+    _, w = await asyncio.open_connection(host, port)
+    return Publisher(w, match, terrain, tick_rate)
+
+
+class Spectator:
+    """
+    Subscriber side: keeps a local copy of the broadcast match.
+
+    Attributes:
+        terrain (Terrain | None): The arena, once INFO has arrived.
+        tick_rate (float): Ticks per second of the match.
+        tick (int): Tick of the state below.
+        xs (list[int]): Column of players 0 and 1.
+        ys (list[int]): Row of players 0 and 1.
+        it (int): Index of the player who is IT.
+        live (bool): True between a keyframe and the END of a match.
+        winner (int | None): Winner of the last match that ended.
+        stats (dict): Counters — keys, deltas, ends, bytes.
+    """
+
+    def __init__(self) -> None:
+        self.terrain: Optional[Terrain] = None
+        self.tick_rate = 0.0
+        self.tick = 0
+        self.xs = [0, 0]
+        self.ys = [0, 0]
+        self.it = 0
+        self.live = False
+        self.winner: Optional[int] = None
+        self.stats = {"keys": 0, "deltas": 0, "ends": 0, "bytes": 0}
+        self._buf = bytearray()
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+
+    async def connect(self, addr: str, match: str) -> None:
+        """
+        Subscribe to a match on a broadcast relay.
+
+        Args:
+            addr (str): "host[:port]" of the relay.
+            match (str): Match name.
+        """
+        host, port = parse_addr(addr, PORT)
+        r, w = await asyncio.open_connection(host, port)
+        w.write(SUB + match.encode() + b"\n")
+        self._reader, self._writer = r, w
+
+    async def updates(self) -> AsyncIterator[int]:
+        """
+        Apply the broadcast as it arrives until the relay closes.
+
+        Yields:
+            int: Frames applied by each read (at least one).
+        """
+        assert self._reader is not None
+        while True:
+            data = await self._reader.read(CHUNK)
+            if not data:
+                return
+            n = self.feed(data)
+            if n:
+                yield n
+
+    def feed(self, data: bytes) -> int:
+        """
+        Apply every complete frame in `data` (plus what was left over).
+
+        Args:
+            data (bytes): Bytes received from the relay.
+
+        Returns:
+            int: Frames applied; a trailing partial frame is kept.
+        """
+        buf = self._buf
+        buf += data
+        self.stats["bytes"] += len(data)
+        start, have, n = 0, len(buf), 0
+        while have - start >= FRAME.size:
+            kind, size = FRAME.unpack_from(buf, start)
+            at = start + FRAME.size
+            if at + size > have:
+                break
+            self._apply(kind, bytes(buf[at : at + size]))
+            start = at + size
+            n += 1
+        del buf[:start]
+        return n
+
+    def _apply(self, kind: int, body: bytes) -> None:
+        xs, ys = self.xs, self.ys
+        if kind == F_DELTA:
+            (self.tick,) = TICK.unpack_from(body)
+            flags, _ = apply_delta(body, TICK.size, xs, ys)
+            self.it = flags >> 2 & 1
+            self.stats["deltas"] += 1
+        elif kind == F_KEY:
+            self.tick, xs[0], ys[0], xs[1], ys[1], flags = KEY.unpack(body)
+            self.it = flags >> 2 & 1
+            if not self.live:
+                self.live, self.winner = True, None
+            self.stats["keys"] += 1
+        elif kind == F_END:
+            self.tick, won = END.unpack(body)
+            self.winner = winner_of(won)
+            self.live = False
+            self.stats["ends"] += 1
+        elif kind == F_INFO:
+            w, h, self.tick_rate = INFO.unpack_from(body)
+            terrain = Terrain(w, h)
+            terrain.bits[:] = zlib.decompress(body[INFO.size :])
+            self.terrain = terrain
+
+    def close(self) -> None:
+        """
+        Close the connection to the relay.
+        """
+        if self._writer is not None:
+            self._writer.close()
+
+
+class _Conn(asyncio.Protocol):
+    """
+    One relay connection: a publisher or a subscriber, once it said hello.
+    """
+
+    __slots__ = ("relay", "transport", "channel", "hello", "behind")
+
+    def __init__(self, relay: "BroadcastRelay") -> None:
+        self.relay = relay
+        self.transport: Optional[asyncio.Transport] = None
+        self.channel: Optional["Channel"] = None
+        self.hello = bytearray()
+        self.behind = False
+
+    def connection_made(self, transport) -> None:  # type: ignore[override]
+        self.transport = transport
+
+    def data_received(self, data: bytes) -> None:
+        ch = self.channel
+        if ch is not None:
+            if ch.publisher is self:
+                ch.feed(data)
+            return
+        self.hello += data
+        if b"\n" in self.hello:
+            line, _, rest = bytes(self.hello).partition(b"\n")
+            self.hello.clear()
+            self.relay.attach(self, line)
+            ch = self.channel
+            if rest and ch is not None and ch.publisher is self:
+                ch.feed(rest)
+        elif len(self.hello) > MAX_HELLO:
+            self.transport.close()  # type: ignore[union-attr]
+
+    def connection_lost(self, exc: Optional[Exception]) -> None:
+        self.relay.detach(self)
+
+
+class Channel:
+    """
+    One broadcast match on the relay: a publisher and its subscribers.
+
+    Attributes:
+        name (bytes): Match name.
+        publisher (_Conn | None): The publishing host, once connected.
+        subs (set): Subscribed connections.
+        info (bytes | None): The publisher's INFO frame.
+        backlog (list[bytes]): Chunks since (and including) the latest KEY.
+    """
+
+    __slots__ = ("relay", "name", "publisher", "subs", "info", "backlog", "_buf")
+
+    def __init__(self, relay: "BroadcastRelay", name: bytes) -> None:
+        self.relay = relay
+        self.name = name
+        self.publisher: Optional[_Conn] = None
+        self.subs: Set[_Conn] = set()
+        self.info: Optional[bytes] = None
+        self.backlog: List[bytes] = []
+        self._buf = bytearray()
+
+    def subscribe(self, conn: _Conn) -> None:
+        """
+        Add a subscriber and send it the current state.
+
+        Args:
+            conn (_Conn): The subscriber.
+        """
+        self.subs.add(conn)
+        if self.info is not None:
+            conn.transport.write(  # type: ignore[union-attr]
+                self.info + b"".join(self.backlog)
+            )
+
+    def feed(self, data: bytes) -> None:
+        """
+        Take bytes from the publisher and fan the complete frames out.
+
+        Args:
+            data (bytes): As read from the publisher's socket.
+        """
+        buf = self._buf
+        buf += data
+        start, have = 0, len(buf)
+        key_at = info_end = -1
+        while have - start >= FRAME.size:
+            kind, size = FRAME.unpack_from(buf, start)
+            end = start + FRAME.size + size
+            if end > have:
+                break
+            if kind == F_KEY:
+                key_at = start
+            elif kind == F_INFO:
+                self.info = bytes(buf[start:end])
+                info_end = end
+            start = end
+        if not start:
+            return
+        chunk = bytes(buf[:start])
+        del buf[:start]
+        from_key = None
+        if key_at >= 0:
+            from_key = chunk[key_at:] if key_at else chunk
+            self.backlog = [from_key]
+        elif self.backlog:
+            self.backlog.append(chunk[info_end:] if info_end > 0 else chunk)
+        self.relay.fan_out(self, chunk, from_key)
+
+
+class BroadcastRelay:
+    """
+    Fans each match's broadcast out to its spectators.
+
+    Attributes:
+        channels (dict): Match name -> Channel.
+        high_water (int): Subscriber buffer size (bytes) above which it is
+                          skipped until the next keyframe.
+        stats (dict): Counters — chunks, bytes_in, writes, bytes_out,
+                      skipped, resyncs.
+    """
+
+    def __init__(self, high_water: int = HIGH_WATER) -> None:
+        self.high_water = high_water
+        self.channels: Dict[bytes, Channel] = {}
+        self.stats = {
+            "chunks": 0,
+            "bytes_in": 0,
+            "writes": 0,
+            "bytes_out": 0,
+            "skipped": 0,
+            "resyncs": 0,
+        }
+
+    async def start(self, host: str = "0.0.0.0", port: int = PORT):
+        """
+        Start listening.
+
+        Args:
+            host (str): Interface to bind.
+            port (int): Port to bind, 0 for an OS-assigned one.
+
+        Returns:
+            asyncio.AbstractServer: The listening server.
+        """
+        loop = asyncio.get_event_loop()
+        return await loop.create_server(lambda: _Conn(self), host, port)
+
+    @property
+    def spectators(self) -> int:
+        """int: Subscribers across all channels."""
+        return sum(len(ch.subs) for ch in self.channels.values())
+
+    def attach(self, conn: _Conn, line: bytes) -> None:
+        if line.startswith(PUB):
+            publish = True
+        elif line.startswith(SUB):
+            publish = False
+        else:
+            conn.transport.close()  # type: ignore[union-attr]
+            return
+        name = line[len(PUB) :].strip()
+        ch = self.channels.get(name)
+        if ch is None:
+            ch = self.channels[name] = Channel(self, name)
+        if publish:
+            if ch.publisher is not None:
+                conn.transport.close()  # type: ignore[union-attr]
+                return
+            ch.publisher = conn
+            conn.channel = ch
+            log.debug("publisher for %s", name)
+        else:
+            sock = conn.transport.get_extra_info("socket")  # type: ignore[union-attr]
+            if sock is not None:
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, SNDBUF)
+            conn.channel = ch
+            ch.subscribe(conn)
+
+    def detach(self, conn: _Conn) -> None:
+        ch, conn.channel = conn.channel, None
+        if ch is None:
+            return
+        if ch.publisher is conn:
+            ch.publisher = None
+            ch.info = None
+            ch.backlog = []
+            ch._buf.clear()
+            for sub in ch.subs:
+                sub.transport.close()  # type: ignore[union-attr]
+        ch.subs.discard(conn)
+        if ch.publisher is None and not ch.subs:
+            self.channels.pop(ch.name, None)
+
+    def fan_out(self, ch: Channel, chunk: bytes, from_key: Optional[bytes]) -> None:
+        """
+        Write one chunk of frames to every subscriber of a channel.
+
+        Args:
+            ch (Channel): The channel.
+            chunk (bytes): Complete frames from the publisher.
+            from_key (bytes | None): The tail of `chunk` from its last KEY
+                                     on, if it has one; lagging subscribers
+                                     resume from it.
+        """
+        hw = self.high_water
+        writes = skipped = resyncs = out = 0
+        size = len(chunk)
+        for sub in ch.subs:
+            t = sub.transport
+            buffered = t.get_write_buffer_size()  # type: ignore[union-attr]
+            if sub.behind:
+                if from_key is None or buffered > hw:
+                    skipped += 1
+                    continue
+                sub.behind = False
+                t.write(from_key)  # type: ignore[union-attr]
+                resyncs += 1
+                out += len(from_key)
+            elif buffered > hw:
+                sub.behind = True
+                skipped += 1
+                continue
+            else:
+                t.write(chunk)  # type: ignore[union-attr]
+                out += size
+            writes += 1
+        st = self.stats
+        st["chunks"] += 1
+        st["bytes_in"] += size
+        st["writes"] += writes
+        st["bytes_out"] += out
+        st["skipped"] += skipped
+        st["resyncs"] += resyncs
+
+
+async def serve(host: str, port: int, stats_every: float = 10.0) -> None:
+    """
+    Run the broadcast relay forever.
+
+    Args:
+        host (str): Interface to bind.
+        port (int): Port to listen on.
+        stats_every (float): Seconds between stats log lines (0 disables).
+    """
+    relay = BroadcastRelay()
+    srv = await relay.start(host, port)
+    log.info("broadcast relay on %s:%d", host, port)
+    async with srv:
+        while True:
+            await asyncio.sleep(stats_every or 3600)
+            if stats_every:
+                log.info(
+                    "channels=%d spectators=%d %s",
+                    len(relay.channels),
+                    relay.spectators,
+                    " ".join(f"{k}={v}" for k, v in relay.stats.items()),
+                )
+
+
+def main() -> None:
+    """
+    Parse command-line arguments and run the broadcast relay.
+
+    CLI Args:
+        --host (str): Interface to bind. Defaults to "0.0.0.0".
+        --port (int): Port to listen on. Defaults to 3479.
+    """
+    ap = argparse.ArgumentParser(description="ASCII Tag spectator broadcast relay")
+    ap.add_argument("--host", default="0.0.0.0")
+    ap.add_argument("--port", type=int, default=PORT)
+    args = ap.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+    try:
+        asyncio.run(serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
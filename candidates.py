@@ -0,0 +1,174 @@
+"""
+ASCII Tag Game — Connection Candidates
+
+The host listens on every interface (one dual-stack socket where the OS
+supports it) and advertises all of its usable addresses instead of the
+single outbound one. The callee races TCP connects to them, happy
+eyeballs style (RFC 8305): attempts start `STAGGER` seconds apart — or
+at once when the previous one fails — the first to connect wins, and
+the rest are cancelled. A dead candidate therefore costs at most one
+stagger step instead of a full connect timeout.
+
+Loopback is only tried when the host advertises one of the callee's own
+addresses, i.e. both peers run on the same machine; it is then tried
+first. IPv6 link-local addresses are skipped (they need a scope id that
+is only meaningful on the host).
+"""
+
+import asyncio
+import ipaddress
+import logging
+import socket
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+log = logging.getLogger("game.candidates")
+
+STAGGER = 0.25
+ATTEMPT_TIMEOUT = 3.0
+# Destinations used only to ask the OS for its outbound route; no packet is sent.
+PROBES = ((socket.AF_INET, "8.8.8.8"), (socket.AF_INET6, "2001:4860:4860::8888"))
+LOOPBACK = ("127.0.0.1", "::1")
+
+
+def _route_address(family: int, dest: str) -> Optional[str]:
+    try:
+        with socket.socket(family, socket.SOCK_DGRAM) as s:
+            s.connect((dest, 80))
+            return s.getsockname()[0]
+    except OSError:
+        return None
+
+
+def _usable(addr: str) -> bool:
+    try:
+        ip = ipaddress.ip_address(addr.split("%", 1)[0])
+    except ValueError:
+        return False
+    return not (ip.is_loopback or ip.is_link_local or ip.is_unspecified)
+
+
+def local_addresses() -> List[str]:
+    """
+    List this machine's addresses worth advertising to a peer.
+
+    The outbound IPv4 and IPv6 addresses come first (the ones the OS
+    routes external traffic through), then any other address the host
+    name resolves to. Loopback and link-local addresses are left out.
+
+    Returns:
+        list[str]: Unique addresses, best first (may be empty when the
+        machine has no network).
+    """
+    found = [_route_address(family, dest) for family, dest in PROBES]
+    try:
+        infos = socket.getaddrinfo(socket.gethostname(), None, type=socket.SOCK_STREAM)
+        found += [info[4][0] for info in infos]
+    except OSError:
+        pass
+    out: List[str] = []
+    for addr in found:
+        if addr and _usable(addr) and addr not in out:
+            out.append(addr)
+    return out
+
+
+def dial_order(advertised: Iterable[str], mine: Sequence[str]) -> List[str]:
+    """
+    Decide which advertised addresses to try, and in what order.
+
+    Args:
+        advertised (Iterable[str]): The host's addresses, best first.
+        mine (Sequence[str]): This machine's own addresses.
+
+    Returns:
+        list[str]: Addresses to race; loopback first when the host shares
+        an address with us (same machine).
+    """
+    advertised = [a for a in advertised if a]
+    if set(advertised) & set(mine):
+        return [a for a in LOOPBACK if a not in advertised] + advertised
+    return advertised
+
+
+def listen_socket() -> socket.socket:
+    """
+    Create the host's listening socket on an OS-assigned port.
+
+    Returns:
+        socket.socket: A dual-stack IPv6 socket accepting IPv4 too where
+        the OS supports it, otherwise an IPv4 socket on all interfaces.
+    """
+    if socket.has_dualstack_ipv6():
+        try:
+            return socket.create_server(
+                ("::", 0), family=socket.AF_INET6, dualstack_ipv6=True
+            )
+        except OSError:
+            pass
+    return socket.create_server(("0.0.0.0", 0))
+
+
+async def _attempt(
+    addr: str, port: int, timeout: float
+) -> Tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+    return await asyncio.wait_for(asyncio.open_connection(addr, port), timeout)
+
+
+async def race(
+    addrs: Sequence[str],
+    port: int,
+    stagger: float = STAGGER,
+    timeout: float = ATTEMPT_TIMEOUT,
+) -> Tuple[asyncio.StreamReader, asyncio.StreamWriter, str]:
+    """
+    Connect to the first address that answers.
+
+    Attempts start in order, `stagger` seconds apart or as soon as the
+    previous attempt fails. The first connection to complete is kept;
+    attempts still in flight are cancelled and any other connection that
+    completed at the same moment is closed.
+
+    Args:
+        addrs (Sequence[str]): Candidate addresses, best first.
+        port (int): TCP port (the same on every address).
+        stagger (float): Seconds before the next attempt starts.
+        timeout (float): Seconds each attempt may take.
+
+    Returns:
+        tuple: (reader, writer, address) of the winning connection.
+
+    Raises:
+        ConnectionError: If every attempt failed (or `addrs` is empty).
+    """
+    todo = list(addrs)
+    pending: set = set()
+    errors: List[str] = []
+    try:
+        while todo or pending:
+            if todo:
+                addr = todo.pop(0)
+                task = asyncio.create_task(_attempt(addr, port, timeout))
+                task.addr = addr  # type: ignore[attr-defined]
+                pending.add(task)
+                log.debug("race: trying %s:%d", addr, port)
+            done, pending = await asyncio.wait(
+                pending,
+                timeout=stagger if todo else None,
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+            won = None
+            for task in done:
+                exc = task.exception()
+                if exc is not None:
+                    errors.append(f"{task.addr}: {exc or type(exc).__name__}")
+                elif won is None:
+                    won = task
+                else:
+                    task.result()[1].close()
+            if won is not None:
+                r, w = won.result()
+                return r, w, won.addr
+    finally:
+        for task in pending:
+            task.cancel()
+    raise ConnectionError("no candidate answered (" + "; ".join(errors) + ")")
@@ -0,0 +1,27 @@
+"""
+ASCII Tag Game — Client Defaults
+
+Constants shared by the command line (`main.py`) and the game client
+(`game.py`). Kept in a module of their own, with no imports, so that
+`main.py --help` can show the defaults without loading Textual.
+"""
+
+GRID_W = 10
+GRID_H = 10
+SYM_A = "@"
+SYM_B = "#"
+EMPTY = "."
+TICK = 0.12
+INTERP_DELAY = 0.1
+KEEPALIVE = 1.0
+PEER_TIMEOUT = 5.0
+HINT = "WASD  move  |  Q quit"
+END_HINT = "R rematch  |  N new opponent  |  Q quit"
+BOT_HINT = "R rematch  |  Q quit"
+STAR_HINT = "N new match  |  Q quit"
+STAR_SYMS = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"  # other players of a star match, by seat
+RELAY_WAIT = 45.0
+JOIN_ROUNDS = 3
+INPUT_POLICY = "one"
+INPUT_QUEUE = 8
+BOT_SKILL = 0.8
@@ -0,0 +1,305 @@
+"""
+ASCII Tag Game — Rules Engine
+
+The game rules, free of any UI or networking code. `GameState` holds one
+match and is what the Textual client drives; it also runs headless, so
+matches can be stepped in a tight loop for tests, simulations and
+benchmarks. `BatchState` steps many matches at once with NumPy, which is
+imported on first use so the client does not pay for it at startup.
+
+Moves are small integers (see `KEY_MOVES`) so that they can be stored in
+arrays and recorded compactly; `MOVE_NONE` means "stand still".
+"""
+
+from typing import List, Optional, Sequence, Tuple
+
+from maps import Terrain
+
+np = None  # NumPy, imported by the first BatchState (see _load_numpy)
+
+MOVE_NONE = 0
+MOVE_UP = 1
+MOVE_DOWN = 2
+MOVE_LEFT = 3
+MOVE_RIGHT = 4
+
+KEY_MOVES = {"w": MOVE_UP, "s": MOVE_DOWN, "a": MOVE_LEFT, "d": MOVE_RIGHT}
+DX = (0, 0, 0, -1, 1)
+DY = (0, -1, 1, 0, 0)
+
+
+def spawn_points(w: int, h: int, n: int) -> List[Tuple[int, int]]:
+    """
+    Compute spawn cells for `n` players on a `w`×`h` board.
+
+    The first two are the classic opposite corners; the next two are the
+    remaining corners; the rest are spread evenly along the border.
+
+    Args:
+        w (int): Board width in cells.
+        h (int): Board height in cells.
+        n (int): Number of players.
+
+    Returns:
+        list[tuple]: One (x, y) per player.
+    """
+    pts = [(0, 0), (w - 1, h - 1), (w - 1, 0), (0, h - 1)][:n]
+    extra = n - len(pts)
+    if extra > 0:
+        perim = 2 * (w + h) - 4
+        for k in range(extra):
+            d = (k + 1) * perim // (extra + 1)
+            if d < w:
+                pts.append((d, 0))
+            elif d < w + h - 1:
+                pts.append((w - 1, d - w + 1))
+            elif d < 2 * w + h - 2:
+                pts.append((2 * w + h - 3 - d, h - 1))
+            else:
+                pts.append((0, perim - d))
+    return pts
+
+
+class GameState:
+    """
+    State of a single match plus the rules that advance it.
+
+    Player 0 is the caller and starts as IT in the top-left corner;
+    player 1 is the callee and starts in the bottom-right corner. Further
+    players (star matches, see `star.py`) spawn on the remaining corners and
+    then evenly along the border. A tagged runner is out of the match; IT
+    wins once every runner is out, which in a two-player match is the first
+    tag. With a `Terrain`, walls block movement and spawns move to the
+    nearest open cell.
+
+    Attributes:
+        w (int): Board width in cells.
+        h (int): Board height in cells.
+        terrain (Terrain | None): Wall map, or None for an open board.
+        xs (list[int]): Column of each player.
+        ys (list[int]): Row of each player.
+        out (list[bool]): True for runners that have been tagged.
+        it (int): Index of the player who is IT.
+        tick (int): Number of steps taken since `reset`.
+        winner (int | None): Index of the winning player once the match is over.
+    """
+
+    __slots__ = ("w", "h", "terrain", "xs", "ys", "out", "it", "tick", "winner")
+
+    def __init__(
+        self, w: int, h: int, terrain: Optional[Terrain] = None, players: int = 2
+    ) -> None:
+        """
+        Create a match on a `w`×`h` board and place the players.
+
+        Args:
+            w (int): Board width in cells (ignored when `terrain` is given).
+            h (int): Board height in cells (ignored when `terrain` is given).
+            terrain (Terrain | None): Optional wall map.
+            players (int): Number of players (at least 2).
+        """
+        if terrain is not None:
+            w, h = terrain.w, terrain.h
+        self.w = w
+        self.h = h
+        self.terrain = terrain
+        self.xs = [0] * players
+        self.ys = [0] * players
+        self.out = [False] * players
+        self.it = 0
+        self.tick = 0
+        self.winner: Optional[int] = None
+        self.reset()
+
+    def reset(self) -> None:
+        """
+        Put every player back on their spawn cell and clear the result.
+        """
+        for i, (x, y) in enumerate(spawn_points(self.w, self.h, len(self.xs))):
+            if self.terrain is not None:
+                x, y = self.terrain.nearest_open(x, y)
+            self.xs[i], self.ys[i] = x, y
+            self.out[i] = False
+        self.it = 0
+        self.tick = 0
+        self.winner = None
+
+    @property
+    def over(self) -> bool:
+        """
+        bool: True once IT has tagged every runner.
+        """
+        return self.winner is not None
+
+    def place(self, i: int, x: int, y: int) -> None:
+        """
+        Set a player's position directly (e.g. from a peer update).
+
+        Args:
+            i (int): Player index.
+            x (int): New column.
+            y (int): New row.
+        """
+        self.xs[i] = x
+        self.ys[i] = y
+
+    def move(self, i: int, move: int) -> bool:
+        """
+        Move one player a single cell, refusing moves off the board or into walls.
+
+        Args:
+            i (int): Player index.
+            move (int): One of the MOVE_* constants.
+
+        Returns:
+            bool: True if the player's position changed.
+        """
+        if not move:
+            return False
+        nx = self.xs[i] + DX[move]
+        ny = self.ys[i] + DY[move]
+        if self.terrain is not None:
+            ok = self.terrain.open_cell(nx, ny)
+        else:
+            ok = 0 <= nx < self.w and 0 <= ny < self.h
+        if ok:
+            self.xs[i] = nx
+            self.ys[i] = ny
+            return True
+        return False
+
+    def caught(self) -> Optional[int]:
+        """
+        Find a runner still in the match standing on IT's cell.
+
+        Returns:
+            int | None: Index of the tagged runner, or None.
+        """
+        it = self.it
+        x, y = self.xs[it], self.ys[it]
+        xs, ys, out = self.xs, self.ys, self.out
+        for i in range(len(xs)):
+            if i != it and xs[i] == x and ys[i] == y and not out[i]:
+                return i
+        return None
+
+    def tag(self, i: int) -> bool:
+        """
+        Take a tagged runner out of the match and decide it if none remain.
+
+        Args:
+            i (int): Index of the tagged runner.
+
+        Returns:
+            bool: True if this tag ended the match.
+        """
+        self.out[i] = True
+        if all(self.out[j] for j in range(len(self.out)) if j != self.it):
+            self.winner = self.it
+            return True
+        return False
+
+    def step(self, moves: Sequence[int]) -> Optional[int]:
+        """
+        Advance the match by one tick: move every player, then check for tags.
+
+        Args:
+            moves (Sequence[int]): One MOVE_* constant per player.
+
+        Returns:
+            int | None: Index of a runner tagged on this tick, otherwise None.
+        """
+        if self.winner is not None:
+            return None
+        out = self.out
+        for i, mv in enumerate(moves):
+            if mv and not out[i]:
+                self.move(i, mv)
+        self.tick += 1
+        tagged = self.caught()
+        first = tagged
+        while tagged is not None and not self.tag(tagged):
+            tagged = self.caught()
+        return first
+
+
+def _load_numpy() -> None:
+    """
+    Import NumPy into the module namespace on first use.
+
+    Raises:
+        RuntimeError: If NumPy is not installed.
+    """
+    global np
+    if np is not None:
+        return
+    try:
+        import numpy
+    except ImportError:
+        raise RuntimeError("BatchState needs NumPy: pip install numpy") from None
+    np = numpy
+
+
+class BatchState:
+    """
+    Many independent two-player matches stepped together with NumPy.
+    Batches always use an open board (no terrain).
+
+    Matches that have ended are frozen; their moves are ignored.
+
+    Attributes:
+        w (int): Board width in cells.
+        h (int): Board height in cells.
+        x (numpy.ndarray): (matches, 2) player columns.
+        y (numpy.ndarray): (matches, 2) player rows.
+        over (numpy.ndarray): (matches,) True once a match has been decided.
+        tick (int): Number of batch steps taken.
+    """
+
+    __slots__ = ("w", "h", "x", "y", "over", "tick", "_dx", "_dy")
+
+    def __init__(self, matches: int, w: int, h: int) -> None:
+        """
+        Create `matches` fresh matches on a `w`×`h` board.
+
+        Args:
+            matches (int): Number of matches in the batch.
+            w (int): Board width in cells.
+            h (int): Board height in cells.
+
+        Raises:
+            RuntimeError: If NumPy is not installed.
+        """
+        _load_numpy()
+        self.w = w
+        self.h = h
+        self.x = np.zeros((matches, 2), dtype=np.int32)
+        self.y = np.zeros((matches, 2), dtype=np.int32)
+        self.x[:, 1] = w - 1
+        self.y[:, 1] = h - 1
+        self.over = np.zeros(matches, dtype=bool)
+        self.tick = 0
+        self._dx = np.array(DX, dtype=np.int32)
+        self._dy = np.array(DY, dtype=np.int32)
+
+    def step(self, moves) -> "np.ndarray":
+        """
+        Advance every live match by one tick.
+
+        Player 0 is IT in every match, as in `GameState`.
+
+        Args:
+            moves (numpy.ndarray): (matches, 2) array of MOVE_* constants.
+
+        Returns:
+            numpy.ndarray: Boolean mask of the matches decided by this tick.
+        """
+        live = ~self.over[:, None]
+        np.clip(self.x + self._dx[moves] * live, 0, self.w - 1, out=self.x)
+        np.clip(self.y + self._dy[moves] * live, 0, self.h - 1, out=self.y)
+        self.tick += 1
+        caught = (
+            (self.x[:, 0] == self.x[:, 1]) & (self.y[:, 0] == self.y[:, 1]) & ~self.over
+        )
+        self.over |= caught
+        return caught
@@ -0,0 +1,1808 @@
+"""
+ASCII Tag Game — TUI Client
+
+A two-player real-time tag game played over a terminal UI.
+Players connect via a WebSocket signaling server, then establish
+a direct TCP peer-to-peer connection for low-latency gameplay.
+
+This module is the Textual application; `main.py` parses the command
+line and imports it only once a UI is actually needed. The WebSocket
+library is imported by the network worker, which starts after the first
+frame is on screen, and the address to advertise is discovered on a
+thread while signaling is under way.
+
+The signaling connection stays open for the whole session. When a
+match ends, R offers a rematch over the same peer link (roles swap, only
+the game state is reset) and N re-enters the matchmaking queue on the
+same WebSocket; a peer that leaves or whose link dies sends this client
+back to the queue at once.
+
+With `bot` set there is no signaling or peer at all: a local `bot.Bot`
+plays the opponent, moved by the same tick that moves this player.
+
+With `broadcast` set, the host (or the player facing a bot) publishes
+every tick to a broadcast relay under a random match name shown in the
+title, for `main.py --spectate` viewers (see `broadcast.py`).
+
+With `players` above two the match is a star (see `star.py`): the
+signaling server gathers that many clients, the first one hosts the
+authoritative tick with `StarHost` and every other one sends its moves
+to it and draws the snapshots it broadcasts.
+
+Dependencies:
+    pip install textual websockets
+"""
+
+import asyncio
+import json
+import logging
+import sys
+import time
+import traceback
+from typing import List, Optional, Sequence, Tuple
+
+log = logging.getLogger("game")
+
+try:
+    from textual import events
+    from textual.app import App, ComposeResult
+    from textual.widgets import Static
+except ImportError as e:
+    sys.exit(f"Missing dep: {e}\n  pip install textual websockets")
+
+from board import Board
+from broadcast import Publisher, open_publisher
+from candidates import dial_order, listen_socket, local_addresses, race
+from config import (
+    BOT_HINT,
+    BOT_SKILL,
+    EMPTY,
+    END_HINT,
+    GRID_H,
+    GRID_W,
+    HINT,
+    INPUT_POLICY,
+    INPUT_QUEUE,
+    INTERP_DELAY,
+    JOIN_ROUNDS,
+    KEEPALIVE,
+    PEER_TIMEOUT,
+    RELAY_WAIT,
+    STAR_HINT,
+    STAR_SYMS,
+    SYM_A,
+    SYM_B,
+    TICK,
+)
+from engine import KEY_MOVES, GameState
+from inputs import InputQueue
+from inbox import PeerReader
+from interp import SnapshotBuffer
+from latency import PING_INTERVAL, LatencyMonitor, now_ms
+from maps import Terrain
+from metrics import Metrics
+from outbox import LATEST_VALUE, PeerWriter
+from recording import Recorder, match_path
+from relay import new_token, open_relayed, parse_addr
+from scheduler import RenderScheduler, TickScheduler
+from star import StarClient, StarHost, lobby_url
+from udp import UdpPeer, open_udp_client, open_udp_host
+from wire import WIRE_JSON, WIRE_VERSION, codec_for, negotiate
+
+
+class Game(App):  # type: ignore[type-arg]
+    """
+    Main Textual application class for the ASCII Tag game.
+
+    Manages the full lifecycle of a game session: WebSocket signaling,
+    TCP peer-to-peer connection setup, game state, input handling,
+    and TUI rendering. The caller acts as the TCP host; the callee
+    connects to the caller's advertised address.
+
+    Attributes:
+        server (str): WebSocket signaling server URL.
+        phase (str): Current game phase — one of: connecting, waiting,
+                     matched, playing, end. After 'end' the session goes
+                     back to 'playing' on a rematch or to 'waiting' when
+                     re-queued.
+        am_caller (bool): True if this client is the signaling caller (host).
+        state (GameState): Rules engine holding both players' positions;
+                           index 0 is the caller, index 1 the callee.
+        am_it (bool): True if this player is currently "IT" (the chaser).
+        my_x / my_y (int): This player's current grid position.
+        op_x / op_y (int): Opponent's last known grid position.
+        inputs (InputQueue): Timestamped WASD presses awaiting a tick.
+        bot (str | None): Role of the local bot opponent, if any.
+        status_msg (str): Message shown in the status bar when not playing.
+    """
+
+    CSS = """
+    Screen  { align: center middle; background: #111; }
+    #title  { width: 30; text-align: center; color: yellow; text-style: bold; margin-bottom: 1; }
+    #role   { width: 30; text-align: center; color: #88ff88; text-style: bold; }
+    #board  { min-width: 30; max-width: 100%; max-height: 60vh; color: #ddd; margin-top: 1; margin-bottom: 1; }
+    #status { width: 30; text-align: center; color: #aaaaaa; }
+    #hint   { width: 30; text-align: center; color: #444444; margin-top: 1; }
+    #metrics { width: 33; color: #5f87af; margin-top: 1; display: none; }
+    """
+
+    def __init__(
+        self,
+        server: str,
+        wire: int = WIRE_VERSION,
+        transport: str = "tcp",
+        max_fps: float = 60.0,
+        terrain: Optional[Terrain] = None,
+        relay: Optional[str] = None,
+        interp_delay: float = INTERP_DELAY,
+        tick_rate: float = 1 / TICK,
+        metrics: Optional[Metrics] = None,
+        record: Optional[str] = None,
+        input_policy: str = INPUT_POLICY,
+        input_queue: int = INPUT_QUEUE,
+        bot: Optional[str] = None,
+        bot_skill: float = BOT_SKILL,
+        broadcast: Optional[str] = None,
+        players: int = 2,
+    ) -> None:
+        """
+        Initialise the Game application with the given signaling server URL.
+
+        Args:
+            server (str): Full WebSocket URL of the signaling server
+                          (e.g. "ws://localhost:8080").
+            wire (int): Highest peer wire version to offer during READY.
+            transport (str): Peer transport to host with — "tcp" or "udp".
+                             The callee always follows the host's choice.
+            max_fps (float): Cap on repaints per second during play
+                             (0 repaints on every refresh request).
+            terrain (Terrain | None): Arena to play on; defaults to an open
+                                      GRID_W×GRID_H board.
+            relay (str | None): "host:port" of a relay server to fall back
+                                to when the direct TCP link fails.
+            interp_delay (float): Seconds the opponent is drawn in the past
+                                  so jittered updates arrive before they
+                                  are due (0 draws the latest report).
+            tick_rate (float): Game ticks per second. Players still move at
+                               most one cell per TICK seconds; a higher rate
+                               samples input and sends updates more often.
+            metrics (Metrics | None): Instrumentation registry; None (the
+                                      default) disables every measurement.
+            record (str | None): File to record the match to, tick by tick
+                                 (see `recording.py`); later matches of
+                                 the session go to numbered files
+                                 (`recording.match_path`).
+            input_policy (str): How ticks consume queued key presses —
+                                "one", "all" or "last" (see `inputs.py`).
+            input_queue (int): Maximum number of queued key presses.
+            bot (str | None): Play against a local bot in this role — "it"
+                              or "runner" — instead of a peer (see `bot.py`).
+            bot_skill (float): Share (0–1) of the bot's moves that follow
+                               its distance field; the rest are random.
+            broadcast (str | None): "host:port" of a broadcast relay to
+                                    publish the match to for spectators.
+            players (int): Players per match; above 2 the match is a star
+                           hosted by the first player (see `_host_star`).
+        """
+        super().__init__()
+        self.server = server
+        self.wire_max = wire
+        self.transport = transport
+        self.relay = relay
+        self._codec = codec_for(WIRE_JSON)
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._send: Optional[PeerWriter] = None
+        self._inbox: Optional[PeerReader] = None
+        self._peer_timeout = PEER_TIMEOUT
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._udp: Optional[UdpPeer] = None
+        self._recv_task: Optional[asyncio.Task] = None
+        self._tick_task: Optional[asyncio.Task] = None
+        self._match_gen = 0  # bumped per match; a stale tick loop stops
+        self._ping_task: Optional[asyncio.Task] = None
+        self._addrs: Optional[asyncio.Future] = None
+        self.tick_rate = tick_rate
+        self.ticker: Optional[TickScheduler] = None
+        self.peer_tick = 0
+        self._move_every = max(1, round(tick_rate * TICK))
+        self._moved_at = 0
+        self._sent_pos: Optional[Tuple[int, int]] = None
+        self._sent_at = 0.0
+        self.traffic = {"messages": 0}
+        self.link = LatencyMonitor()
+
+        self.phase = "connecting"
+        self.am_caller = False
+        self.terrain = terrain or Terrain(GRID_W, GRID_H)
+        self.players = players
+        self.state = GameState(0, 0, self.terrain, players=players)
+        self._seat = 0  # index in a star match
+        self._star: Optional[StarHost] = None
+        self._star_client: Optional[StarClient] = None
+        self._star_task: Optional[asyncio.Task] = None
+        self.interp_delay = interp_delay
+        self._op_hist = SnapshotBuffer()
+        self.inputs = InputQueue(input_policy, input_queue)
+        self._unpainted: List[float] = []
+        self.status_msg = "Connecting..."
+        self._shown: dict = {}
+        self.metrics = metrics
+        self.record = record
+        self._recorder: Optional[Recorder] = None
+        self._recorded = 0  # matches recorded so far, numbers the files
+        self.bot = bot
+        self.bot_skill = bot_skill
+        self._ws = None  # signaling connection, open for the whole session
+        self._ws_send: Optional[asyncio.Task] = None
+        self._rematch_me = False
+        self._rematch_peer = False
+        self._asked_at: Optional[float] = None
+        self._bot = None  # bot.Bot, created by _start_bot
+        self.broadcast = broadcast
+        self.match_id = new_token()[:8]
+        self._pub: Optional[Publisher] = None
+        self._pub_task: Optional[asyncio.Task] = None
+        self._bot_moved_at = 0
+        self._render = RenderScheduler(
+            self._timed_paint if metrics is not None else self._paint, max_fps
+        )
+
+    @property
+    def me(self) -> int:
+        """int: This player's index in `state` (0 = caller, 1 = callee)."""
+        if self.players > 2:
+            return self._seat
+        return 0 if self.am_caller else 1
+
+    @property
+    def op(self) -> int:
+        """int: The opponent's index in `state`."""
+        return 1 if self.am_caller else 0
+
+    @property
+    def am_it(self) -> bool:
+        """bool: True if this player is currently IT."""
+        return self.state.it == self.me
+
+    @property
+    def my_x(self) -> int:
+        return self.state.xs[self.me]
+
+    @property
+    def my_y(self) -> int:
+        return self.state.ys[self.me]
+
+    @property
+    def op_x(self) -> int:
+        return self.state.xs[self.op]
+
+    @property
+    def op_y(self) -> int:
+        return self.state.ys[self.op]
+
+    def compose(self) -> ComposeResult:
+        """
+        Declare and yield the static TUI widgets that make up the game screen.
+
+        Widgets are stacked vertically: title banner, role indicator,
+        game board, status line, and key-hint footer, plus the (hidden)
+        metrics overlay when instrumentation is enabled.
+
+        Yields:
+            ComposeResult: Sequence of Textual Static widgets.
+        """
+        yield Static("◈  ASCII TAG  ◈", id="title")
+        yield Static("", id="role")
+        yield Board(self.terrain, EMPTY, id="board")
+        yield Static("Connecting...", id="status")
+        yield Static(HINT, id="hint")
+        if self.metrics is not None:
+            yield Static("", id="metrics")
+
+    def on_mount(self) -> None:
+        """
+        Textual lifecycle hook called after the app mounts to the terminal.
+
+        Starts the network worker as an exclusive background task so that
+        WebSocket signaling and TCP setup run concurrently with the UI, and
+        the metrics probe/exporter and overlay timer when enabled. The
+        worker is started once the first frame has been drawn, so its
+        import of the WebSocket library does not delay it.
+        """
+        self.call_after_refresh(self._start_network)
+        if self.metrics is not None:
+            self.metrics.start()
+            self.set_interval(1.0, self._update_overlay)
+
+    def _start_network(self) -> None:
+        """
+        Launch `_network` as the exclusive background worker.
+        """
+        self.run_worker(self._network(), exclusive=True)
+
+    def _refresh(self) -> None:
+        """
+        Request that the TUI widgets be synchronised with the game state.
+
+        During 'playing', requests are coalesced by the render scheduler so
+        that bursts of ticks and peer messages cause at most one repaint per
+        display frame. In every other phase — including the transition to
+        'end' — the repaint happens immediately.
+        """
+        self._render.request(urgent=self.phase != "playing")
+
+    def _paint(self) -> None:
+        """
+        Synchronise all TUI widgets with the current game state.
+
+        Updates the title (with the match name while broadcasting), role
+        indicator, board grid, and status message based on the active
+        phase. During 'playing', the live board and role/IT status are
+        rendered, with the opponent at its interpolated position (see
+        `_op_view`) and the link statistics in the hint line; all other
+        phases show a blank board and the generic status message. The
+        board repaints only rows whose pieces moved, and text widgets are
+        only updated when their text changed.
+        """
+        if self.players > 2:
+            self._paint_star()
+            return
+        my_sym = SYM_A if self.am_caller else SYM_B
+        op_sym = SYM_B if self.am_caller else SYM_A
+
+        if self._pub is not None:
+            self._set_text("#title", f"◈  ASCII TAG  ◈  live {self.match_id}")
+        if self.phase in ("matched", "playing", "end"):
+            self._set_text("#role", f"You=[{my_sym}]  Opponent=[{op_sym}]")
+        else:
+            self._set_text("#role", "")
+
+        board_w = self.query_one("#board", Board)
+        if self.phase == "playing":
+            board_w.place(
+                {op_sym: self._op_view(), my_sym: (self.my_x, self.my_y)},
+                focus=(self.my_x, self.my_y),
+            )
+            msg = (
+                f"[{my_sym}] YOU ARE IT — chase [{op_sym}]!"
+                if self.am_it
+                else f"[{my_sym}] YOU ARE RUNNER — escape [{op_sym}]!"
+            )
+            self._set_text("#status", msg)
+        else:
+            board_w.place(None)
+            self._set_text("#status", self.status_msg)
+
+        if self.phase == "end" and self._bot is not None:
+            self._set_text("#hint", BOT_HINT)
+        elif self.phase == "end" and self._ws is not None:
+            self._set_text("#hint", END_HINT)
+        elif self.phase == "playing" and self.link.sent:
+            self._set_text("#hint", self.link.summary())
+        else:
+            self._set_text("#hint", HINT)
+
+    def _paint_star(self) -> None:
+        """
+        `_paint` for a star match: every player still in it is drawn, this
+        one as SYM_A and the others by seat (STAR_SYMS), and the status
+        line names IT and counts the runners left.
+        """
+        st = self.state
+        me = self.me
+        it_sym = SYM_A if st.it == me else STAR_SYMS[st.it]
+        if self.phase in ("matched", "playing", "end"):
+            self._set_text("#role", f"You=[{SYM_A}]  Players={len(st.xs)}")
+        else:
+            self._set_text("#role", "")
+
+        board_w = self.query_one("#board", Board)
+        if self.phase == "playing":
+            marks = {
+                STAR_SYMS[i]: (st.xs[i], st.ys[i])
+                for i in range(len(st.xs))
+                if i != me and not st.out[i]
+            }
+            marks[SYM_A] = (self.my_x, self.my_y)
+            board_w.place(marks, focus=(self.my_x, self.my_y))
+            left = sum(1 for i, o in enumerate(st.out) if not o and i != st.it)
+            if self.am_it:
+                msg = f"[{SYM_A}] YOU ARE IT — {left} runners left!"
+            elif st.out[me]:
+                msg = f"Tagged — [{it_sym}] is IT, {left} runners left"
+            else:
+                msg = f"[{SYM_A}] RUNNER — escape [{it_sym}]! ({left} left)"
+            self._set_text("#status", msg)
+        else:
+            board_w.place(None)
+            self._set_text("#status", self.status_msg)
+
+        ended = self.phase == "end" and self._ws is not None
+        self._set_text("#hint", STAR_HINT if ended else HINT)
+
+    def _timed_paint(self) -> None:
+        """
+        `_paint` wrapped with the render-time histogram (metrics enabled).
+        """
+        t0 = time.perf_counter()
+        self._paint()
+        self.metrics.observe("render", time.perf_counter() - t0)  # type: ignore[union-attr]
+        if self._unpainted:
+            pressed, self._unpainted = self._unpainted, []
+            self.call_after_refresh(self._observe_shown, pressed)
+
+    def _observe_shown(self, pressed: List[float]) -> None:
+        """
+        Record key press → screen latency once a repaint has been flushed.
+
+        Args:
+            pressed (list[float]): Monotonic press times of the moves shown.
+        """
+        now = time.monotonic()
+        for t in pressed:
+            self.metrics.observe("input_screen", now - t)  # type: ignore[union-attr]
+
+    def _update_overlay(self) -> None:
+        """
+        Refresh the metrics overlay text while it is shown.
+        """
+        w = self.query_one("#metrics", Static)
+        if w.display:
+            w.update(self.metrics.overlay())  # type: ignore[union-attr]
+
+    def _set_text(self, selector: str, text: str) -> None:
+        """
+        Update a Static widget only if its text differs from the last update.
+
+        Args:
+            selector (str): CSS selector of the Static widget (e.g. "#status").
+            text (str): The text the widget should show.
+        """
+        if self._shown.get(selector) == text:
+            return
+        self._shown[selector] = text
+        self.query_one(selector, Static).update(text)
+
+    def on_key(self, event: events.Key) -> None:
+        """
+        Handle keyboard input and queue directional keys with their arrival time.
+
+        Only WASD keys are accepted and only during the 'playing' phase.
+        The move is not applied immediately; it is pushed onto `inputs`
+        and consumed by the game ticks according to the input policy,
+        which keeps the fixed movement rate; in a star match it goes to
+        the host instead (see `_star_move`). Once a match has ended, R
+        asks for a rematch (two players only) and N for a new opponent. With metrics
+        enabled, M toggles the metrics overlay in any phase.
+
+        Args:
+            event (events.Key): The Textual key event fired on each keystroke.
+        """
+        if event.key == "m" and self.metrics is not None:
+            w = self.query_one("#metrics", Static)
+            w.display = not w.display
+            self._update_overlay()
+            return
+        key = event.key.lower()
+        if self.phase == "end":
+            if key == "r" and self.players == 2:
+                self._request_rematch()
+            elif key == "n" and self._ws is not None:
+                self._requeue("New opponent")
+            return
+        if self.phase != "playing":
+            return
+        if key in ("w", "a", "s", "d") and self.players > 2:
+            self._star_move(KEY_MOVES[key])
+        elif key in ("w", "a", "s", "d"):
+            self.inputs.push(KEY_MOVES[key])
+            log.debug("key queued: %s  queued=%d", key, len(self.inputs))
+
+    async def _game_tick(self, n: int = 0) -> None:
+        """
+        Execute one game tick: apply queued movement, broadcast position, check win.
+
+        Called once per tick by the tick scheduler. Once the player's move
+        cooldown of TICK seconds has passed, takes key presses from the
+        input queue (one, or all of them, depending on its policy) and
+        applies them in order through the rules engine (moves off the board
+        are refused), stopping early on a tag, and evaluates the win
+        condition. The board is re-rendered when the player moved. With
+        `--record`, every press taken on the tick is recorded with it.
+
+        Against a local bot, the bot then moves under the same cooldown;
+        its decision gets half a tick period (see `_bot_tick`).
+
+        The position (with the tick number) is only sent when it changed,
+        or as a keepalive once KEEPALIVE seconds have passed without one;
+        the keepalive lets the peer detect a dead link and heals a `pos`
+        lost on UDP. Everything the tick produces is queued before the
+        peer writer runs again, so it goes out in one write.
+
+        Args:
+            n (int): Tick number from the scheduler.
+        """
+        if self.phase != "playing":
+            return
+        self.state.tick = n
+
+        used: List[int] = []
+        applied: List[float] = []
+        if n - self._moved_at >= self._move_every:
+            for move, pressed in self.inputs.take():
+                used.append(move)
+                self._moved_at = n
+                if self.state.move(self.me, move):
+                    applied.append(pressed)
+                    if self._tagged():
+                        self.inputs.clear()
+                        break
+            if applied:
+                log.debug("moved to %d,%d", self.my_x, self.my_y)
+                if self.metrics is not None:
+                    self._unpainted.extend(applied)
+                self._refresh()
+        if self._bot is not None and not self._tagged():
+            self._bot_tick(n)
+        if self._recorder is not None:
+            st = self.state
+            self._recorder.tick(n, st.xs, st.ys, st.it, used)
+        if self._pub is not None:
+            st = self.state
+            self._pub.tick(n, st.xs, st.ys, st.it)
+
+        pos = (self.my_x, self.my_y)
+        now = time.monotonic()
+        if self._bot is None and (
+            pos != self._sent_pos or now - self._sent_at >= KEEPALIVE
+        ):
+            self._sent_pos, self._sent_at = pos, now
+            self._tcp_send(
+                {
+                    "type": "pos",
+                    "x": pos[0],
+                    "y": pos[1],
+                    "t": int(time.time() * 1000),
+                    "n": n,
+                }
+            )
+        self._check_win()
+        if applied and self.metrics is not None:
+            self._observe_inputs(applied)
+
+    def _bot_tick(self, n: int) -> None:
+        """
+        Move the local bot opponent once its move cooldown has passed.
+
+        The decision must be ready within half a tick period: on maps too
+        large for precomputed fields, a field search still running at that
+        deadline is resumed on the bot's next move (see `bot.py`).
+
+        Args:
+            n (int): Tick number from the scheduler.
+        """
+        if n - self._bot_moved_at < self._move_every:
+            return
+        self._bot_moved_at = n
+        t0 = time.perf_counter()
+        move = self._bot.decide(  # type: ignore[union-attr]
+            (self.op_x, self.op_y),
+            (self.my_x, self.my_y),
+            t0 + 0.5 / self.tick_rate,
+        )
+        if self.metrics is not None:
+            self.metrics.observe("bot_decide", time.perf_counter() - t0)
+        if self.state.move(self.op, move):
+            self._refresh()
+
+    def _observe_inputs(self, pressed: List[float]) -> None:
+        """
+        Record latency for key presses applied this tick (metrics enabled).
+
+        `input_wait` is press → applied. `input_peer` estimates press →
+        the peer receiving the new position: the time until this tick's
+        write plus half the latest ping round trip; it is skipped until the
+        first pong. Press → screen is recorded after the next repaint.
+
+        Args:
+            pressed (list[float]): Monotonic press times, oldest first.
+        """
+        m = self.metrics
+        now = time.monotonic()
+        rtt = self.link.rtt
+        for t in pressed:
+            m.observe("input_wait", now - t)  # type: ignore[union-attr]
+            if rtt is not None:
+                m.observe("input_peer", now - t + rtt / 2000)  # type: ignore[union-attr]
+
+    def _tcp_send(self, obj: dict) -> None:
+        """
+        Serialise a dictionary with the active codec and write it to the peer.
+
+        Uses newline-delimited JSON until the READY handshake has agreed on
+        the binary format (see `wire.py`). On a stream the frame is queued
+        on the connection's `PeerWriter` — `pos`, `ping` and `pong` in a
+        latest-value slot that a newer one replaces, everything else in
+        order. On a UDP link the message is handed to `UdpPeer.send`, which
+        picks the reliable or sequenced path.
+
+        Args:
+            obj (dict): The message payload to serialise and send.
+        """
+        self.traffic["messages"] += 1
+        m = self.metrics
+        if self._udp is not None:
+            self._udp.send(obj)
+            if m is not None:
+                m.count("messages_out")
+                m.count("bytes_out", len(self._codec.encode(obj)))
+            return
+        frame = self._codec.encode(obj)
+        if m is not None:
+            m.count("messages_out")
+            m.count("bytes_out", len(frame))
+        if self._send is not None:
+            t = obj.get("type")
+            self._send.send(frame, t if t in LATEST_VALUE else None)
+
+    def _expect_within(self, timeout: float) -> None:
+        """
+        Set how long the peer may stay silent before `_peer_batch` times out.
+
+        On a stream this (re)starts the reader's single idle deadline; on
+        UDP it is the timeout of each wait for the delivery queue.
+
+        Args:
+            timeout (float): Seconds.
+        """
+        self._peer_timeout = timeout
+        if self._inbox is not None:
+            self._inbox.expect_within(timeout)
+
+    async def _peer_batch(self, limit: int = 0) -> Optional[List[dict]]:
+        """
+        Wait for messages from the peer and return every one that has arrived.
+
+        Args:
+            limit (int): Return at most this many (0 = all); the READY
+                         handshake reads one at a time because the codec
+                         changes after it.
+
+        Returns:
+            list[dict] | None: Decoded messages (empty dicts if malformed),
+                               or None once the peer has closed the link.
+
+        Raises:
+            asyncio.TimeoutError: If the peer stayed silent for longer than
+                                  the `_expect_within` timeout.
+        """
+        if self._udp is not None:
+            return await asyncio.wait_for(self._udp.recv_batch(), self._peer_timeout)
+        assert self._inbox is not None
+        msgs = await self._inbox.batch(self._codec, limit)
+        if msgs is None and self._inbox.idle:
+            raise asyncio.TimeoutError
+        return msgs
+
+    def _op_view(self) -> Tuple[int, int]:
+        """
+        Return where the opponent is drawn: `interp_delay` in the past.
+
+        Returns:
+            tuple: (x, y) from the snapshot buffer, or the latest reported
+            position when there is nothing buffered yet.
+        """
+        if self.interp_delay > 0:
+            pos = self._op_hist.view(time.time() * 1000, self.interp_delay * 1000)
+            if pos is not None:
+                return pos
+        return self.op_x, self.op_y
+
+    def _check_win(self) -> None:
+        """
+        Evaluate the win condition by comparing both players' grid positions.
+
+        A tag occurs when both players occupy the same cell. If IT reaches
+        the runner's cell, IT wins and broadcasts a 'win' message to the
+        peer. If the runner lands on IT's cell (edge case), the runner loses
+        locally. Transitions the game phase to 'end' on conclusion.
+
+        IT's check is lag-compensated: reaching the cell where the runner
+        is drawn on IT's screen (at most `interp_delay` plus one update
+        behind the latest report) counts as a tag, so a runner is judged
+        by what IT could see rather than by packets still in flight. The
+        runner only ever judges by the latest positions.
+        """
+        if self.phase != "playing":
+            return
+        if self._tagged():
+            self.phase = "end"
+            self.state.winner = self.state.it
+            if self.am_it:
+                self.status_msg = "YOU WIN — opponent caught!"
+                self._tcp_send({"type": "win", "n": self.state.tick})
+            else:
+                self.status_msg = "YOU LOSE — you were caught!"
+            self._refresh()
+
+    def _tagged(self) -> bool:
+        """
+        Return True if the players are on the same cell (see `_check_win`).
+        """
+        if self.state.caught() is not None:
+            return True
+        return self.am_it and self._op_view() == (self.my_x, self.my_y)
+
+    async def _network(self) -> None:
+        """
+        Entry point for the background network worker.
+
+        Opens a WebSocket connection to the signaling server and delegates
+        all further signaling logic to `_signaling`. Catches and displays
+        any unhandled exception, transitioning the game to the 'end' phase
+        with an error message.
+
+        The local addresses are discovered on an executor thread, so they
+        do not block the event loop: discovery overlaps the WebSocket
+        import, connect and matchmaking, and is only awaited when this
+        client has to advertise or dial candidates. (The import itself
+        stays on the loop — Python's import locks do not tolerate a thread
+        importing while Textual imports lazily on the main thread.)
+        """
+        if self.bot is not None:
+            self._start_bot()
+            return
+        loop = asyncio.get_running_loop()
+        self._addrs = loop.run_in_executor(None, local_addresses)
+        try:
+            import websockets
+
+            async with websockets.connect(
+                lobby_url(self.server, self.players),
+                ping_interval=None,
+                ping_timeout=None,
+            ) as ws:
+                log.debug("ws connected")
+                self._ws = ws
+                try:
+                    await self._signaling(ws)
+                finally:
+                    self._ws = None
+        except Exception as exc:
+            log.error("_network: %s\n%s", exc, traceback.format_exc())
+            self.phase = "end"
+            self.status_msg = f"Error: {exc}"
+            self._refresh()
+
+    async def _signaling(self, ws) -> None:
+        """
+        Process all WebSocket signaling messages from the server.
+
+        Handles the full pre-game handshake sequence:
+          - 'waiting'       — server queuing this client for a match.
+          - 'matched'       — pair found; role (caller/callee) assigned.
+          - 'ice-candidate' — caller's TCP address relayed to the callee.
+          - 'peer-left'     — opponent disconnected; award win by default
+                              and go back to the queue (see `_requeue`).
+
+        In a star match 'matched' also carries the player count and this
+        client's seat, the host's candidate is marked "star", and
+        'peer-left' means the host is gone (see `_host_star`).
+
+        The caller proceeds to `_host()` to open a TCP server; the callee
+        proceeds to `_join()` once the host address is received. The loop
+        runs until the server closes the connection, so every following
+        match of the session is signaled on the same socket.
+
+        Args:
+            ws: An open websockets connection to the signaling server.
+        """
+        async for raw in ws:
+            msg = json.loads(raw)
+            kind = msg.get("type")
+            log.debug("ws ← %s", kind)
+
+            if kind == "waiting":
+                self.phase = "waiting"
+                self.status_msg = "Waiting for opponent..."
+                self._refresh()
+
+            elif kind == "matched" and "players" in msg:
+                self._drop_link()
+                self.am_caller = msg["role"] == "caller"
+                self._seat = int(msg.get("seat", 0))
+                self.phase = "matched"
+                self.status_msg = f"Matched! {msg['players']} players, You=[{SYM_A}]"
+                self._refresh()
+                if self.am_caller:
+                    await self._host_star(ws)
+
+            elif kind == "matched":
+                self._drop_link()
+                self.am_caller = msg["role"] == "caller"
+                self.phase = "matched"
+                my_sym = SYM_A if self.am_caller else SYM_B
+                op_sym = SYM_B if self.am_caller else SYM_A
+                self.status_msg = f"Matched! You=[{my_sym}] Opp=[{op_sym}]"
+                self._refresh()
+
+                if self.am_caller:
+                    await self._host(ws)
+
+            elif kind == "ice-candidate" and msg.get("star"):
+                if not self.am_caller:
+                    addrs = msg.get("addrs") or [msg.get("ip", "127.0.0.1")]
+                    self.status_msg = "Connecting to host..."
+                    self._refresh()
+                    await self._join_star(addrs, int(msg.get("port", 0)))
+
+            elif kind == "ice-candidate":
+                if not self.am_caller:
+                    ip = msg.get("ip", "127.0.0.1")
+                    port = int(msg.get("port", 0))
+                    proto = msg.get("transport", "tcp")
+                    addrs = msg.get("addrs") or [ip]
+                    log.debug("callee: got %s addrs %s port %d", proto, addrs, port)
+                    self.status_msg = f"Connecting to host..."
+                    self._refresh()
+                    if proto == "udp":
+                        await self._join_udp(ip, port)
+                    else:
+                        relay = msg.get("relay") or self.relay
+                        await self._join(addrs, port, relay, msg.get("token"))
+
+            elif kind == "peer-left" and self.players > 2:
+                if self.phase in ("matched", "playing", "end"):
+                    self._requeue("Host left")
+
+            elif kind == "peer-left":
+                if self.phase == "playing":
+                    self._requeue("Opponent left — you win")
+                elif self.phase in ("matched", "end"):
+                    self._requeue("Opponent left")
+
+    async def _host(self, ws) -> None:
+        """
+        Open an ephemeral TCP server, advertise its address, and await the peer.
+
+        Binds a TCP listener on all interfaces (IPv4 and, where supported,
+        IPv6) at an OS-assigned port, then relays every local address and
+        the port to the callee via the signaling channel using an
+        'ice-candidate' message; `ip` still carries the primary address for
+        older clients. Waits up to 15 seconds for the callee to connect
+        before timing out. On a successful connection, closes the listening
+        server, records the time-to-connect and proceeds to `_start_game`.
+
+        If a relay is configured, a session token and the relay address are
+        advertised alongside, and a relay registration runs in parallel with
+        the listener; whichever link completes first is used (the wait is
+        extended to RELAY_WAIT so the callee can exhaust its direct attempts).
+
+        With `transport="udp"` the work is delegated to `_host_udp`.
+
+        Args:
+            ws: An open websockets connection used to send the address relay.
+        """
+        if self.transport == "udp":
+            await self._host_udp(ws)
+            return
+
+        log.debug("host: starting TCP server")
+        connected: asyncio.Future = asyncio.get_event_loop().create_future()
+
+        async def _accept(r: asyncio.StreamReader, w: asyncio.StreamWriter) -> None:
+            log.debug("host: client connected from %s", w.get_extra_info("peername"))
+            if connected.done():
+                w.close()
+                return
+            connected.set_result((r, w))
+
+        srv = await asyncio.start_server(_accept, sock=listen_socket())
+        port = srv.sockets[0].getsockname()[1]
+        addrs = await self._local_addrs() or ["127.0.0.1"]
+        log.debug("host: listening on %s port %d", addrs, port)
+
+        candidate = {"type": "ice-candidate", "ip": addrs[0], "addrs": addrs, "port": port}
+        relayed: Optional[asyncio.Task] = None
+        wait = 15.0
+        if self.relay:
+            token = new_token()
+            candidate.update(relay=self.relay, token=token)
+            relayed = asyncio.create_task(self._relay_connect(self.relay, token))
+
+            def _relayed(t: asyncio.Task) -> None:
+                if t.cancelled() or t.exception() is not None or connected.done():
+                    return
+                log.debug("host: peer arrived through the relay")
+                connected.set_result(t.result())
+
+            relayed.add_done_callback(_relayed)
+            wait = RELAY_WAIT
+
+        await ws.send(json.dumps(candidate))
+        self.status_msg = f"Waiting for opponent to connect (:{port})..."
+        self._refresh()
+
+        t0 = time.perf_counter()
+        try:
+            self._reader, self._writer = await asyncio.wait_for(connected, wait)
+        except asyncio.TimeoutError:
+            self.phase = "end"
+            self.status_msg = "Timeout — opponent never connected."
+            self._refresh()
+            return
+        finally:
+            srv.close()
+            if relayed is not None and not relayed.done():
+                relayed.cancel()
+
+        peer = self._writer.get_extra_info("peername")
+        self._connected(peer[0] if peer else "?", t0)
+        await self._start_game()
+
+    async def _local_addrs(self) -> List[str]:
+        """
+        Return this machine's addresses, from the discovery `_network` started.
+
+        Returns:
+            list[str]: Addresses best first (see `local_addresses`).
+        """
+        if self._addrs is None:
+            loop = asyncio.get_running_loop()
+            self._addrs = loop.run_in_executor(None, local_addresses)
+        return await self._addrs
+
+    def _connected(self, addr: str, since: float) -> None:
+        """
+        Log and record the time it took to establish the peer link.
+
+        Args:
+            addr (str): Address the link was made with.
+            since (float): `time.perf_counter()` when connecting began.
+        """
+        took = time.perf_counter() - since
+        log.info("peer link via %s in %.0f ms", addr, took * 1000)
+        if self.metrics is not None:
+            self.metrics.observe("connect", took)
+
+    async def _host_udp(self, ws) -> None:
+        """
+        Bind a UDP game socket, advertise it, and await the peer's first datagram.
+
+        Mirrors `_host` for the UDP transport: the 'ice-candidate' carries
+        `"transport": "udp"` so the callee opens a datagram endpoint instead
+        of a TCP connection. The host locks onto the address of the first
+        datagram it receives (the callee's reliable READY).
+
+        Args:
+            ws: An open websockets connection used to send the address relay.
+        """
+        log.debug("host: starting UDP endpoint")
+        peer, port = await open_udp_host()
+        ip = next((a for a in await self._local_addrs() if ":" not in a), "127.0.0.1")
+        log.debug("host: udp listening on %s:%d", ip, port)
+
+        await ws.send(
+            json.dumps(
+                {"type": "ice-candidate", "ip": ip, "port": port, "transport": "udp"}
+            )
+        )
+        self.status_msg = f"Waiting for opponent to connect (udp :{port})..."
+        self._refresh()
+
+        try:
+            await asyncio.wait_for(asyncio.shield(peer.peer_seen), timeout=15.0)
+        except asyncio.TimeoutError:
+            peer.close()
+            self.phase = "end"
+            self.status_msg = "Timeout — opponent never connected."
+            self._refresh()
+            return
+
+        self._udp = peer
+        await self._start_game()
+
+    async def _join_udp(self, ip: str, port: int) -> None:
+        """
+        Open a UDP game socket toward the caller and start the game.
+
+        No connect retries are needed: the reliable READY sent by
+        `_start_game` is retransmitted until the host acknowledges it.
+
+        Args:
+            ip (str): IPv4 address of the caller's UDP endpoint.
+            port (int): Port number of the caller's UDP endpoint.
+        """
+        try:
+            self._udp = await open_udp_client(ip, port)
+        except Exception as exc:
+            log.warning("join udp failed: %s", exc)
+            self.phase = "end"
+            self.status_msg = "Could not reach host."
+            self._refresh()
+            return
+        await self._start_game()
+
+    async def _join(
+        self,
+        addrs: Sequence[str],
+        port: int,
+        relay: Optional[str] = None,
+        token: Optional[str] = None,
+    ) -> None:
+        """
+        Attempt to establish a TCP connection to the caller's game server.
+
+        Races connections to every advertised address (see
+        `candidates.race`): attempts start a quarter second apart, the first
+        to connect is kept and the others are cancelled. If no address
+        answers, the race is repeated up to JOIN_ROUNDS times with a 400 ms
+        pause in case the host was not ready yet. On success, delegates
+        immediately to `_start_game`. If every direct attempt fails and the
+        host advertised a relay session, the match is carried through the
+        relay instead; otherwise the game transitions to the 'end' phase
+        with an error.
+
+        Args:
+            addrs (Sequence[str]): The caller's addresses, best first.
+            port (int): Port number of the caller's TCP server.
+            relay (str | None): "host:port" of the relay to fall back to.
+            token (str | None): Relay session token advertised by the host.
+        """
+        order = dial_order(addrs, await self._local_addrs())
+        t0 = time.perf_counter()
+        for attempt in range(1, JOIN_ROUNDS + 1):
+            log.debug("join: round %d → %s port %d", attempt, order, port)
+            try:
+                self._reader, self._writer, addr = await race(order, port)
+            except Exception as exc:
+                log.warning("join round %d failed: %s", attempt, exc)
+                self.status_msg = f"Connecting... (attempt {attempt})"
+                self._refresh()
+                await asyncio.sleep(0.4)
+                continue
+            self._connected(addr, t0)
+            await self._start_game()
+            return
+
+        if relay and token:
+            self.status_msg = "Direct connection failed — trying relay..."
+            self._refresh()
+            try:
+                self._reader, self._writer = await asyncio.wait_for(
+                    self._relay_connect(relay, token), timeout=15.0
+                )
+            except Exception as exc:
+                log.warning("join: relay failed: %s", exc)
+            else:
+                self._connected(f"relay {relay}", t0)
+                await self._start_game()
+                return
+
+        self.phase = "end"
+        self.status_msg = "Could not reach host."
+        self._refresh()
+
+    async def _relay_connect(self, relay: str, token: str):
+        """
+        Open a relayed stream to the peer sharing `token`.
+
+        Args:
+            relay (str): "host:port" of the relay server.
+            token (str): Session token shared with the peer.
+
+        Returns:
+            tuple: (reader, writer) once the relay has paired both sides.
+        """
+        host, port = parse_addr(relay)
+        return await open_relayed(host, port, token)
+
+    async def _host_star(self, ws) -> None:
+        """
+        Host a star match: seat every other player, then run the tick.
+
+        Opens a `StarHost` listener at an OS-assigned port and advertises
+        its IPv4 addresses like `_host` does, with the candidate marked
+        "star". Once every seat is taken (within 15 seconds) the
+        authoritative tick runs in `_star_task`, so the signaling loop
+        keeps serving; this player moves as player 0 (see `_star_move`).
+
+        Args:
+            ws: An open websockets connection used to send the address relay.
+        """
+        self.state = GameState(0, 0, self.terrain, players=self.players)
+        host = StarHost(self.state, tick=TICK)
+        port = await host.listen()
+        addrs = [a for a in await self._local_addrs() if ":" not in a]
+        addrs = addrs or ["127.0.0.1"]
+        self._star = host
+        await ws.send(
+            json.dumps(
+                {
+                    "type": "ice-candidate",
+                    "ip": addrs[0],
+                    "addrs": addrs,
+                    "port": port,
+                    "star": True,
+                }
+            )
+        )
+        self.status_msg = f"Waiting for {host.seats} players to connect (:{port})..."
+        self._refresh()
+
+        full = await host.wait_full(15.0)
+        if self._star is not host:
+            return  # dropped (re-queued) while waiting
+        if not full:
+            self._drop_link()
+            self.phase = "end"
+            self.status_msg = "Timeout — not every player connected."
+            self._refresh()
+            return
+        self._begin_star()
+        self._star_task = asyncio.create_task(self._run_star(host))
+
+    async def _run_star(self, host: StarHost) -> None:
+        """
+        Drive a hosted star match to its end, repainting after every tick.
+
+        Args:
+            host (StarHost): The host whose match this client plays in.
+        """
+        try:
+            await host.run(on_step=self._refresh)
+        finally:
+            if self._star is host:
+                self._end_star()
+
+    async def _join_star(self, addrs: Sequence[str], port: int) -> None:
+        """
+        Take a seat in the star match hosted at one of `addrs`.
+
+        Addresses are tried one after another in `dial_order`. The host's
+        map must match ours; as in `_agree_map`, an open arena of another
+        size is adopted. The seat the host hands out is this player's
+        index, and its snapshots are followed in `_star_task`.
+
+        Args:
+            addrs (Sequence[str]): The host's addresses, best first.
+            port (int): Port number of the host's star listener.
+        """
+        client = StarClient()
+        for addr in dial_order(addrs, await self._local_addrs()):
+            try:
+                await asyncio.wait_for(client.connect(addr, port), timeout=5.0)
+                break
+            except (OSError, ConnectionError, asyncio.TimeoutError) as exc:
+                log.warning("join star via %s failed: %s", addr, exc)
+                client.close()
+        else:
+            self.phase = "end"
+            self.status_msg = "Could not reach host."
+            self._refresh()
+            return
+
+        if client.map != self.terrain.digest:
+            if client.map != Terrain(client.w, client.h).digest:
+                client.close()
+                self.phase = "end"
+                self.status_msg = "Map mismatch — the host plays another map."
+                self._refresh()
+                return
+            log.debug("map: adopting host's open %dx%d arena", client.w, client.h)
+            self.terrain = Terrain(client.w, client.h)
+            self.query_one("#board", Board).set_terrain(self.terrain)
+        self._star_client = client
+        self._seat = client.me
+        self.state = GameState(0, 0, self.terrain, players=client.players)
+        self._begin_star()
+        self._star_task = asyncio.create_task(self._follow_star(client))
+
+    async def _follow_star(self, client: StarClient) -> None:
+        """
+        Mirror the host's snapshots into `state` until the match is decided
+        or the host goes away.
+
+        Args:
+            client (StarClient): The connection to the host.
+        """
+        st = self.state
+        try:
+            async for snap in client.snapshots():
+                st.tick, st.it = snap["tick"], snap["it"]
+                st.xs[:] = snap["xs"]
+                st.ys[:] = snap["ys"]
+                st.out[:] = [bool(o) for o in snap["out"]]
+                if all(o for i, o in enumerate(st.out) if i != st.it):
+                    st.winner = st.it
+                self._refresh()
+                if st.over:
+                    break
+        finally:
+            if self._star_client is client:
+                client.close()
+                self._end_star()
+
+    def _begin_star(self) -> None:
+        """
+        Start playing a star match once this client is seated.
+        """
+        self.state.reset()
+        self.phase = "playing"
+        self._refresh()
+        log.info("star match: seat %d of %d", self.me, len(self.state.xs))
+
+    def _end_star(self) -> None:
+        """
+        Show the result of a star match, or that the host went away.
+        """
+        st = self.state
+        if st.winner is None:
+            self.status_msg = "Host left — match abandoned."
+        elif st.winner == self.me:
+            self.status_msg = "You win — every runner tagged!"
+        else:
+            self.status_msg = f"Tagged — [{STAR_SYMS[st.winner]}] wins."
+        self.phase = "end"
+        self._refresh()
+
+    def _star_move(self, move: int) -> None:
+        """
+        Pass a key press to the star host, which applies it on its next tick.
+
+        Args:
+            move (int): MOVE_* constant.
+        """
+        if self._star is not None:
+            self._star.set_move(0, move)
+        elif self._star_client is not None:
+            self._star_client.send_move(move)
+
+    async def _start_game(self) -> None:
+        """
+        Perform the pre-game READY handshake and initialise gameplay for both peers.
+
+        Both the caller and callee execute this identical code path:
+          1. Send a JSON 'ready' message advertising our wire version and
+             map (size and content hash).
+          2. Block until a 'ready' message is received from the peer, then
+             switch to the highest wire format both sides speak and check
+             that both peers play on the same map (see `_agree_map`).
+          3. Assign starting positions (caller: top-left, callee: bottom-right).
+          4. Set the 'playing' phase and spawn the tick, receive and ping
+             tasks.
+
+        The caller starts as IT; the callee starts as the runner.
+        Both background tasks are held as instance attributes to prevent
+        premature garbage collection by the asyncio event loop.
+        """
+        log.debug("_start_game: sending READY")
+        self._codec = codec_for(WIRE_JSON)
+        if self._send is not None:
+            self._send.close()
+            self._send = None
+        if self._writer is not None and self._udp is None:
+            self._send = PeerWriter(self._writer, self.metrics)
+            self._send.start()
+        if self._reader is not None and self._udp is None:
+            self._inbox = PeerReader(self._reader)
+        self._tcp_send(
+            {
+                "type": "ready",
+                "wire": self.wire_max,
+                "rate": self.tick_rate,
+                **self.terrain.describe(),
+            }
+        )
+
+        try:
+            self._expect_within(10.0)
+            while True:
+                msgs = await self._peer_batch(limit=1)
+                if msgs is None:
+                    raise ConnectionError("peer closed before READY")
+                m = msgs[0]
+                if m.get("type") == "ready":
+                    self._codec = codec_for(negotiate(self.wire_max, m))
+                    log.debug(
+                        "_start_game: peer READY received, wire=%s", self._codec.name
+                    )
+                    self._agree_map(m)
+                    if m.get("rate", 1 / TICK) != self.tick_rate:
+                        log.warning(
+                            "_start_game: peer ticks at %s Hz, we tick at %s Hz",
+                            m.get("rate", 1 / TICK),
+                            self.tick_rate,
+                        )
+                    break
+        except Exception as exc:
+            log.error("_start_game READY handshake: %s", exc)
+            self.phase = "end"
+            self.status_msg = f"Handshake failed: {exc}"
+            self._refresh()
+            return
+
+        self._begin_match()
+
+        self._recv_task = asyncio.create_task(self._recv_loop())
+        self._recv_task.add_done_callback(
+            lambda t: (
+                log.error("recv task died: %s", t.exception())
+                if not t.cancelled() and t.exception()
+                else None
+            )
+        )
+
+        self._ping_task = asyncio.create_task(self._run_pings())
+
+    def _start_bot(self) -> None:
+        """
+        Start a match against a local bot instead of a peer.
+
+        The player takes the role the bot does not play: against a runner
+        bot the player is the caller (IT), against an IT bot the callee.
+        The bot's distance tables are built here, before the first tick
+        (see `bot.py`), so no tick pays for them.
+        """
+        from bot import Bot
+
+        self.am_caller = self.bot == "runner"
+        t0 = time.perf_counter()
+        self._bot = Bot(self.terrain, self.bot, self.bot_skill)  # type: ignore[arg-type]
+        log.info(
+            "bot: role=%s skill=%.2f tables %d cells in %.1f ms",
+            self.bot,
+            self.bot_skill,
+            self._bot.tables.cells,
+            (time.perf_counter() - t0) * 1000,
+        )
+        self._bot_moved_at = -self._move_every
+        self._begin_match()
+
+    def _request_rematch(self) -> None:
+        """
+        Ask for a rematch after a match has ended (R).
+
+        Against a bot the next match starts at once. Otherwise a 'rematch'
+        message goes over the peer link, and the match starts as soon as
+        both sides have asked (see `_rematch`); without a live link the
+        player goes back to the queue instead.
+        """
+        if self._bot is not None:
+            self._asked_at = time.perf_counter()
+            self._start_bot()
+            return
+        if self._recv_task is None or self._recv_task.done():
+            if self._ws is not None:
+                self._requeue("Opponent gone")
+            return
+        if self._rematch_me:
+            return
+        self._rematch_me = True
+        self._asked_at = time.perf_counter()
+        self._tcp_send({"type": "rematch"})
+        if self._rematch_peer:
+            self._rematch()
+        else:
+            self.status_msg = "Rematch? Waiting for opponent..."
+            self._refresh()
+
+    def _on_rematch(self) -> None:
+        """
+        Handle the peer's 'rematch' request.
+        """
+        if self.phase != "end":
+            return
+        self._rematch_peer = True
+        if self._rematch_me:
+            self._rematch()
+        else:
+            self.status_msg = "Opponent wants a rematch — press R"
+            self._refresh()
+
+    def _rematch(self) -> None:
+        """
+        Start the next match on the same peer link once both sides agreed.
+
+        Nothing is renegotiated: the wire format, map and tick rate from
+        READY still hold, and the receive and ping tasks keep running.
+        Roles swap, so the players take turns being IT; both sides swap
+        when they see the second request, so they stay in agreement.
+        """
+        log.info("rematch: same peer link, roles swap")
+        self.am_caller = not self.am_caller
+        self._begin_match()
+
+    def _requeue(self, reason: str) -> None:
+        """
+        Drop the peer link and re-enter the matchmaking queue on the open
+        signaling connection (N, or when the opponent is gone).
+
+        The server unpairs this client (its partner gets 'peer-left') and
+        queues it again; no new WebSocket, address probe or process is
+        needed.
+
+        Args:
+            reason (str): Shown in the status line while waiting.
+        """
+        self._drop_link()
+        if self._ws is None:
+            self.phase = "end"
+            self.status_msg = f"{reason}."
+            self._refresh()
+            return
+        log.info("requeue: %s", reason)
+        self._asked_at = time.perf_counter()
+        self.phase = "waiting"
+        self.status_msg = f"{reason}. Finding a new opponent..."
+        self._refresh()
+        self._ws_send = asyncio.ensure_future(self._ws.send(json.dumps({"type": "queue"})))
+
+    def _drop_link(self) -> None:
+        """
+        Stop the receive, ping and star tasks and close the peer link(s).
+        """
+        me = asyncio.current_task()
+        for t in (self._recv_task, self._ping_task, self._star_task):
+            if t is not None and t is not me and not t.done():
+                t.cancel()
+        self._recv_task = self._ping_task = self._star_task = None
+        if self._star is not None:
+            self._star.close()
+        if self._star_client is not None:
+            self._star_client.close()
+        self._star = self._star_client = None
+        if self._send is not None:
+            self._send.close()
+        elif self._writer is not None:
+            self._writer.transport.abort()
+        if self._udp is not None:
+            self._udp.close()
+        self._send = self._inbox = self._udp = None
+        self._reader = self._writer = None
+        self._rematch_me = self._rematch_peer = False
+
+    def _begin_match(self) -> None:
+        """
+        Reset the match state, open the recording and start the tick task.
+
+        A match that ended outside a tick (a peer's 'win', a dropped link)
+        leaves its tick loop asleep until the next deadline. That loop is
+        cancelled here and its match closed first, so it can neither
+        drive the new match nor close its recording.
+
+        With metrics enabled, the time since the player asked for this
+        match (rematch or re-queue) is recorded as `next_match`.
+        """
+        old = self._tick_task
+        if old is not None and not old.done():
+            old.cancel()
+            self._end_match()
+        self._match_gen += 1
+        self._rematch_me = self._rematch_peer = False
+        if self._asked_at is not None:
+            took = time.perf_counter() - self._asked_at
+            self._asked_at = None
+            log.info("next match after %.1f ms", took * 1000)
+            if self.metrics is not None:
+                self.metrics.observe("next_match", took)
+        self.state.reset()
+        self._op_hist.clear()
+        self.link = LatencyMonitor()
+        self.peer_tick = 0
+        self._moved_at = -self._move_every
+        self.inputs.clear()
+        self._sent_pos = None
+        if self.record:
+            self._recorded += 1
+            path = match_path(self.record, self._recorded)
+            try:
+                self._recorder = Recorder(path, self.terrain, self.me, self.tick_rate)
+            except OSError as exc:
+                log.warning("recording disabled: %s", exc)
+        if (
+            self.broadcast
+            and self._pub_task is None
+            and (self.am_caller or self._bot is not None)
+        ):
+            self._pub_task = asyncio.create_task(self._open_broadcast())
+
+        self.phase = "playing"
+        self._refresh()
+        log.info(
+            "game started: am_it=%s pos=(%d,%d)", self.am_it, self.my_x, self.my_y
+        )
+
+        self._tick_task = asyncio.create_task(self._run_tick(self._match_gen))
+        self._tick_task.add_done_callback(
+            lambda t: (
+                log.error("tick task died: %s", t.exception())
+                if not t.cancelled() and t.exception()
+                else None
+            )
+        )
+
+    def _end_match(self) -> None:
+        """
+        Close the match recording and publish the result to spectators.
+        """
+        rec, self._recorder = self._recorder, None
+        st = self.state
+        if rec is not None:
+            # A tag reported by the peer lands between ticks; keep it.
+            rec.tick(rec.ticks + 1, st.xs, st.ys, st.it)
+            rec.close(st.winner)
+            log.info("recorded %d ticks to %s", rec.ticks, rec.path)
+        if self._pub is not None:
+            self._pub.end(st.tick, st.xs, st.ys, st.it, st.winner)
+            log.info("broadcast: %s", self._pub.stats)
+
+    async def _open_broadcast(self) -> None:
+        """
+        Connect to the broadcast relay and publish this session's matches.
+
+        Runs once per session, alongside the first match; ticks before the
+        connection is up are simply not broadcast, as the first one after
+        it is a keyframe. Rematches and later opponents are published under
+        the same match name.
+        """
+        addr = self.broadcast or ""
+        try:
+            self._pub = await open_publisher(
+                addr, self.match_id, self.terrain, self.tick_rate
+            )
+        except (OSError, ValueError) as exc:
+            log.warning("broadcast disabled: %s", exc)
+            return
+        log.info("broadcasting as %s to %s", self.match_id, self.broadcast)
+        self._refresh()
+
+    def _agree_map(self, ready: dict) -> None:
+        """
+        Check that the peer's READY describes the same map as ours.
+
+        Peers that predate map negotiation are assumed to play on the
+        default open GRID_W×GRID_H board. If the hashes differ and the
+        caller's map is an open arena, the callee adopts the caller's size
+        (it can rebuild that map from the size alone) and the caller keeps
+        its own; any other mismatch aborts the handshake.
+
+        Args:
+            ready (dict): The peer's decoded 'ready' message.
+
+        Raises:
+            ValueError: If the maps differ and cannot be reconciled.
+        """
+        w = int(ready.get("w", GRID_W))
+        h = int(ready.get("h", GRID_H))
+        digest = ready.get("map") or Terrain(w, h).digest
+        if digest == self.terrain.digest:
+            return
+        if self.am_caller and "map" in ready and self.terrain.is_open_arena():
+            return
+        if not self.am_caller and digest == Terrain(w, h).digest:
+            log.debug("map: adopting host's open %dx%d arena", w, h)
+            self.terrain = Terrain(w, h)
+            self.state = GameState(0, 0, self.terrain)
+            self.query_one("#board", Board).set_terrain(self.terrain)
+            return
+        raise ValueError(f"map mismatch (peer {w}x{h} {digest})")
+
+    async def _run_tick(self, gen: int) -> None:
+        """
+        Drive the game tick loop at `tick_rate` until the game ends.
+
+        A `TickScheduler` calls `_game_tick` against absolute monotonic
+        deadlines, so processing time does not stretch the period; late
+        ticks are caught up or skipped explicitly and counted. Exits
+        automatically when the phase leaves 'playing' or a newer match
+        has begun, and closes its match (see `_end_match`) unless the
+        newer match already did.
+
+        Args:
+            gen (int): The match this loop drives (`_match_gen`).
+        """
+        log.debug("_run_tick started at %.1f Hz", self.tick_rate)
+        step = self._timed_tick if self.metrics is not None else self._game_tick
+        self.ticker = TickScheduler(step, self.tick_rate)
+        try:
+            await self.ticker.run(
+                lambda: self.phase == "playing" and self._match_gen == gen
+            )
+        finally:
+            if self._match_gen == gen:
+                self._end_match()
+        log.info(
+            "_run_tick ended (phase=%s) %s peer_tick=%d renders requested=%d performed=%d",
+            self.phase,
+            self.ticker.summary(),
+            self.peer_tick,
+            self._render.requested,
+            self._render.performed,
+        )
+        log.info(
+            "traffic: messages=%d %s",
+            self.traffic["messages"],
+            self._send.summary() if self._send is not None else "(udp)",
+        )
+        log.info("inputs: %s", self.inputs.summary())
+        if self._bot is not None:
+            t = self._bot.tables
+            log.info(
+                "bot: stale=%d field hits=%d misses=%d",
+                self._bot.stale,
+                t.hits,
+                t.misses,
+            )
+
+    async def _timed_tick(self, n: int) -> None:
+        """
+        `_game_tick` wrapped with the tick-duration histogram (metrics enabled).
+
+        Args:
+            n (int): Tick number from the scheduler.
+        """
+        t0 = time.perf_counter()
+        await self._game_tick(n)
+        self.metrics.observe("tick", time.perf_counter() - t0)  # type: ignore[union-attr]
+
+    async def _run_pings(self) -> None:
+        """
+        Ping the peer every PING_INTERVAL seconds while the link is in use.
+
+        The first ping goes out straight after READY so the link statistics
+        fill in during the opening moves. Pings continue between matches,
+        which keeps the link's idle deadline alive for a rematch. Replies
+        are handled in `_recv_loop`. A ping is skipped while the peer
+        writer is congested.
+        """
+        try:
+            while self.phase in ("playing", "end"):
+                if self._send is None or not self._send.congested:
+                    self._tcp_send(self.link.ping())
+                await asyncio.sleep(PING_INTERVAL)
+        finally:
+            log.info(
+                "link: %s sent=%d received=%d lost=%d offset=%s",
+                self.link.summary(),
+                self.link.sent,
+                self.link.received,
+                self.link.lost,
+                self.link.offset,
+            )
+
+    def _measure_recv(self, msgs: List[dict], waited: float, nbytes: int) -> None:
+        """
+        Record receive-side metrics for one batch of peer messages (metrics enabled).
+
+        Inbound bytes are what the stream delivered (on UDP, each message's
+        size in the agreed codec); each `pos` also yields a send→receive
+        delay once the ping exchange has estimated the peer's wall-clock
+        offset.
+
+        Args:
+            msgs (list[dict]): The decoded messages.
+            waited (float): Seconds spent waiting for the batch.
+            nbytes (int): Bytes received with it (0 to re-encode on UDP).
+        """
+        metrics = self.metrics
+        metrics.observe("recv_wait", waited)  # type: ignore[union-attr]
+        metrics.count("messages_in", len(msgs))  # type: ignore[union-attr]
+        if not nbytes:
+            nbytes = sum(len(self._codec.encode(m)) for m in msgs)
+        metrics.count("bytes_in", nbytes)  # type: ignore[union-attr]
+        now = time.time() * 1000
+        for m in msgs:
+            if m.get("type") == "pos" and "t" in m:
+                sent = self.link.wall_to_local(m["t"])
+                if sent is not None:
+                    metrics.observe("net_delay", (now - sent) / 1000)  # type: ignore[union-attr]
+
+    async def _recv_loop(self) -> None:
+        """
+        Continuously read and process incoming TCP messages from the peer.
+
+        Runs for as long as the peer link is in use — through the match
+        and the 'end' phase that follows, so a rematch can be agreed on
+        the same link (see `_request_rematch`). Every wake-up takes
+        all messages that have arrived (see `inbox.py`), decoded with the
+        codec agreed during READY, and dispatches them in order:
+          - 'pos' — every one in the batch is buffered as a timestamped
+                    sample for interpolation (late arrivals are slotted into
+                    order); only the newest is applied to the game state —
+                    it updates the opponent's coordinates, is checked for a
+                    tag and schedules a repaint for when it is due on screen.
+          - 'ping' — answered at once with a 'pong' (see `latency.py`).
+          - 'pong' — updates the RTT/jitter/loss/clock-offset statistics.
+          - 'win' — peer has caught this player; transitions to 'end' as a loss.
+          - 'rematch' — the peer asks for another match (see `_on_rematch`).
+
+        Positions and 'win' are ignored outside the 'playing' phase.
+
+        The peer sends a ping every second and a keepalive `pos` at least
+        every KEEPALIVE seconds, so PEER_TIMEOUT seconds of silence means the
+        link is dead and ends the match; the silence is measured by one
+        idle deadline for the whole loop rather than a timeout per read.
+        When the link dies or the peer closes it, this client goes back to
+        the matchmaking queue (see `_requeue`).
+        """
+        log.debug("_recv_loop started")
+        if self._reader is None and self._udp is None:
+            return
+        loop = asyncio.get_running_loop()
+        metrics = self.metrics
+        inbox = self._inbox
+        self._expect_within(PEER_TIMEOUT)
+        lost = True
+        try:
+            while self.phase in ("playing", "end"):
+                waited = time.perf_counter()
+                got = inbox.stats["bytes"] if inbox is not None else 0
+                try:
+                    msgs = await self._peer_batch()
+                except asyncio.TimeoutError:
+                    log.warning("_recv_loop: peer silent for %.0fs", PEER_TIMEOUT)
+                    break
+                if msgs is None:
+                    log.debug("_recv_loop: peer closed")
+                    break
+                arrived = now_ms()
+                if metrics is not None:
+                    got = inbox.stats["bytes"] - got if inbox is not None else 0
+                    self._measure_recv(msgs, time.perf_counter() - waited, got)
+
+                newest = -1
+                for i, m in enumerate(msgs):
+                    if m.get("type") == "pos":
+                        newest = i
+                latest = None
+                for i, m in enumerate(msgs):
+                    t = m.get("type")
+                    if t == "pos":
+                        if self.phase != "playing":
+                            continue
+                        x, y = int(m["x"]), int(m["y"])
+                        now = time.time() * 1000
+                        if self._op_hist.push(int(m.get("t") or now), x, y, now):
+                            latest = m
+                        if i != newest:
+                            continue
+                        if latest is not None:
+                            lx, ly = int(latest["x"]), int(latest["y"])
+                            self.state.place(self.op, lx, ly)
+                            self.peer_tick = int(latest.get("n", self.peer_tick))
+                        self._check_win()
+                        if self.phase == "playing":
+                            self._refresh()
+                            if self.interp_delay > 0:
+                                loop.call_later(self.interp_delay, self._refresh)
+                    elif t == "ping":
+                        self._tcp_send(LatencyMonitor.pong(m, arrived))
+                    elif t == "pong":
+                        if self.link.on_pong(m, arrived) is not None:
+                            self._refresh()
+                    elif t == "win":
+                        if self.phase != "playing":
+                            continue
+                        log.debug("received win from peer")
+                        self.state.winner = self.op
+                        self.phase = "end"
+                        self.status_msg = "YOU LOSE — opponent caught you!"
+                        self._refresh()
+                    elif t == "rematch":
+                        self._on_rematch()
+
+        except asyncio.CancelledError:
+            lost = False
+            raise
+        except Exception as exc:
+            log.error("_recv_loop: %s\n%s", exc, traceback.format_exc())
+        finally:
+            if inbox is not None:
+                inbox.close()
+            if lost and self.phase in ("playing", "end"):
+                self._requeue(
+                    "Connection lost" if self.phase == "playing" else "Opponent gone"
+                )
+            log.debug("_recv_loop ended")
+
@@ -0,0 +1,126 @@
+"""
+ASCII Tag Game — Peer Receive Buffer
+
+`PeerReader` is the receive side of a peer stream. Each wake-up reads
+whatever the transport has buffered (up to CHUNK bytes) into one
+bytearray, and the codec decodes every complete frame in it in a single
+pass (`decode_all`). The game gets them as a batch, so a burst of frames
+costs one wake-up instead of one per frame, and never waits on a frame
+boundary: a partial frame simply stays in the buffer.
+
+Idle detection uses one deadline per reader instead of a `wait_for` per
+read. Every chunk moves the deadline; a single timer handle checks it
+and re-arms itself only when it fires, at most once per timeout period.
+On expiry it ends the stream (`feed_eof`), so the pending read returns
+instead of being cancelled — a cancellation between a frame's header and
+its body would otherwise desynchronise the stream.
+"""
+
+import asyncio
+from typing import Dict, List, Optional
+
+CHUNK = 64 * 1024
+
+
+class PeerReader:
+    """
+    Buffered, batch-decoding reader for one peer stream.
+
+    Attributes:
+        idle (bool): True once the stream was ended by the idle deadline.
+        stats (dict): Counters — reads, bytes, frames, batches.
+    """
+
+    def __init__(self, reader: asyncio.StreamReader) -> None:
+        """
+        Wrap a stream reader.
+
+        Args:
+            reader (asyncio.StreamReader): The peer stream.
+        """
+        self.idle = False
+        self.stats: Dict[str, int] = {
+            "reads": 0,
+            "bytes": 0,
+            "frames": 0,
+            "batches": 0,
+        }
+        self._r = reader
+        self._buf = bytearray()
+        self._eof = False
+        self._timeout = 0.0
+        self._deadline = 0.0
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def expect_within(self, timeout: float) -> None:
+        """
+        (Re)start idle detection: end the stream after `timeout` seconds
+        without data.
+
+        Args:
+            timeout (float): Seconds of silence allowed; 0 disables it.
+        """
+        self._timeout = timeout
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if timeout > 0:
+            self._loop = loop = asyncio.get_running_loop()
+            self._deadline = loop.time() + timeout
+            self._timer = loop.call_at(self._deadline, self._check)
+
+    def close(self) -> None:
+        """
+        Stop idle detection.
+        """
+        self.expect_within(0)
+
+    async def batch(self, codec, limit: int = 0) -> Optional[List[dict]]:
+        """
+        Return every message that has arrived, waiting for at least one.
+
+        Args:
+            codec (JsonCodec | BinaryCodec): Codec to decode with. Pass
+                `limit=1` while the codec may change after a message (the
+                READY handshake) so the rest stays buffered.
+            limit (int): Stop after this many messages (0 = no limit).
+
+        Returns:
+            list[dict] | None: The messages (malformed ones as empty dicts),
+            or None once the peer closed or the idle deadline passed.
+        """
+        buf = self._buf
+        stats = self.stats
+        while True:
+            if buf:
+                msgs = codec.decode_all(buf, limit)
+                if msgs:
+                    stats["frames"] += len(msgs)
+                    stats["batches"] += 1
+                    return msgs
+            if self._eof:
+                return None
+            data = await self._r.read(CHUNK)
+            if not data:
+                self._eof = True
+                self.close()
+                return None
+            stats["reads"] += 1
+            stats["bytes"] += len(data)
+            buf += data
+            if self._timer is not None and self._loop is not None:
+                self._deadline = self._loop.time() + self._timeout
+
+    def _check(self) -> None:
+        """
+        Timer callback: re-arm for the current deadline, or end the stream.
+        """
+        loop = self._loop
+        assert loop is not None
+        if loop.time() < self._deadline:
+            self._timer = loop.call_at(self._deadline, self._check)
+            return
+        self._timer = None
+        self.idle = True
+        self._r.feed_eof()
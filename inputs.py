@@ -0,0 +1,113 @@
+"""
+ASCII Tag Game — Input Queue
+
+Bounded queue of directional key presses, each stamped with the
+monotonic time it arrived, so that several presses inside one tick are
+not collapsed into the last one and their latency can be measured.
+
+Policies decide what a game tick takes from the queue once the move
+cooldown allows a move:
+    one  — the oldest press; the rest wait for the following moves
+           (lossless, still at most one cell per TICK seconds)
+    all  — every queued press, applied in order within the tick
+    last — only the newest press; older ones are discarded on arrival
+           (the behaviour before the queue existed)
+
+When the queue is full the oldest press is dropped and counted.
+"""
+
+import time
+from collections import deque
+from typing import Deque, List, Optional, Tuple
+
+POLICIES = ("one", "all", "last")
+
+
+class InputQueue:
+    """
+    Timestamped, bounded input queue with a consume policy.
+
+    Attributes:
+        policy (str): One of POLICIES.
+        size (int): Maximum number of queued presses.
+        pushed (int): Presses accepted.
+        dropped (int): Presses discarded because the queue was full.
+        collapsed (int): Presses replaced by a newer one ("last" policy).
+    """
+
+    __slots__ = ("policy", "size", "pushed", "dropped", "collapsed", "_q")
+
+    def __init__(self, policy: str = "one", size: int = 8) -> None:
+        """
+        Create an empty queue.
+
+        Args:
+            policy (str): "one", "all" or "last".
+            size (int): Maximum number of queued presses (at least 1).
+
+        Raises:
+            ValueError: If the policy is unknown or the size is below 1.
+        """
+        if policy not in POLICIES:
+            raise ValueError(f"unknown input policy {policy!r}")
+        if size < 1:
+            raise ValueError("input queue size must be at least 1")
+        self.policy = policy
+        self.size = size
+        self.pushed = 0
+        self.dropped = 0
+        self.collapsed = 0
+        self._q: Deque[Tuple[int, float]] = deque()
+
+    def __len__(self) -> int:
+        return len(self._q)
+
+    def push(self, move: int, t: Optional[float] = None) -> None:
+        """
+        Queue one press.
+
+        Args:
+            move (int): Engine move code (see `engine.KEY_MOVES`).
+            t (float | None): Monotonic time of the press; defaults to now.
+        """
+        q = self._q
+        if self.policy == "last":
+            self.collapsed += len(q)
+            q.clear()
+        elif len(q) >= self.size:
+            q.popleft()
+            self.dropped += 1
+        q.append((move, time.monotonic() if t is None else t))
+        self.pushed += 1
+
+    def take(self) -> List[Tuple[int, float]]:
+        """
+        Remove and return the presses this tick applies, oldest first.
+
+        Returns:
+            list[tuple[int, float]]: (move, pressed_at) pairs — every queued
+            press under the "all" policy, otherwise at most one.
+        """
+        q = self._q
+        if not q:
+            return []
+        if self.policy == "all":
+            out = list(q)
+            q.clear()
+            return out
+        return [q.popleft()]
+
+    def clear(self) -> None:
+        """
+        Discard every queued press (counters are kept).
+        """
+        self._q.clear()
+
+    def summary(self) -> str:
+        """
+        Return a one-line description of the queue counters.
+        """
+        return (
+            f"policy={self.policy} pushed={self.pushed} dropped={self.dropped} "
+            f"collapsed={self.collapsed} queued={len(self._q)}"
+        )
@@ -0,0 +1,137 @@
+"""
+ASCII Tag Game — Opponent Interpolation
+
+Every `pos` message carries the sender's wall-clock timestamp in
+milliseconds. `SnapshotBuffer` keeps the last few of them in timestamp
+order and answers "where was the opponent at time T on the sender's
+clock", so the client can draw the opponent a fixed interpolation delay
+in the past. Updates that arrive with jitter still land inside that
+delay and are shown on time instead of in bursts.
+
+The sender's clock is never compared directly with ours. Instead the
+buffer tracks the smallest `(receive time - send time)` seen over its
+window; that is clock offset plus the best-case one-way delay, and
+subtracting it maps our clock onto the sender's timeline.
+
+Positions are grid cells, so "interpolating" means picking the newest
+snapshot that is not after the render time rather than blending
+coordinates.
+"""
+
+from bisect import insort
+from typing import List, Optional, Tuple
+
+BUFFER_SIZE = 32
+
+
+class SnapshotBuffer:
+    """
+    Timestamp-ordered ring buffer of one remote player's positions.
+
+    Attributes:
+        size (int): Snapshots kept; the oldest is dropped when full.
+        late (int): Snapshots that arrived out of order and were slotted in.
+        dropped (int): Snapshots discarded as older than the whole window
+                       or duplicated.
+    """
+
+    __slots__ = ("size", "_samples", "late", "dropped")
+
+    def __init__(self, size: int = BUFFER_SIZE) -> None:
+        """
+        Create an empty buffer.
+
+        Args:
+            size (int): Number of snapshots to keep.
+        """
+        self.size = size
+        self._samples: List[Tuple[int, int, int, float]] = []
+        self.late = 0
+        self.dropped = 0
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def clear(self) -> None:
+        """
+        Forget every snapshot (e.g. at the start of a match).
+        """
+        self._samples.clear()
+
+    def push(self, t: int, x: int, y: int, now: float) -> bool:
+        """
+        Record a snapshot, slotting late arrivals into timestamp order.
+
+        Args:
+            t (int): Sender timestamp in milliseconds.
+            x (int): Column.
+            y (int): Row.
+            now (float): Local receive time in milliseconds.
+
+        Returns:
+            bool: True if the snapshot is the newest one seen so far.
+        """
+        s = self._samples
+        if s:
+            if t < s[0][0] and len(s) >= self.size:
+                self.dropped += 1
+                return False
+            if t <= s[-1][0]:
+                if any(e[0] == t for e in s):
+                    self.dropped += 1
+                    return False
+                insort(s, (t, x, y, now))
+                self.late += 1
+                self._trim()
+                return False
+        s.append((t, x, y, now))
+        self._trim()
+        return True
+
+    def _trim(self) -> None:
+        s = self._samples
+        if len(s) > self.size:
+            del s[: len(s) - self.size]
+
+    def skew(self) -> float:
+        """
+        Return our clock minus the sender's, plus the best one-way delay.
+
+        Returns:
+            float: Milliseconds (0.0 with no snapshots).
+        """
+        return min((e[3] - e[0] for e in self._samples), default=0.0)
+
+    def at(self, t: float) -> Optional[Tuple[int, int]]:
+        """
+        Return the position at a time on the sender's clock.
+
+        Args:
+            t (float): Sender time in milliseconds.
+
+        Returns:
+            tuple | None: (x, y) of the newest snapshot not after `t`
+            (the oldest one if `t` precedes them all), or None when empty.
+        """
+        s = self._samples
+        if not s:
+            return None
+        best = s[0]
+        for e in s:
+            if e[0] > t:
+                break
+            best = e
+        return best[1], best[2]
+
+    def view(self, now: float, delay: float) -> Optional[Tuple[int, int]]:
+        """
+        Return the position to draw at local time `now`.
+
+        Args:
+            now (float): Local time in milliseconds.
+            delay (float): Interpolation delay in milliseconds.
+
+        Returns:
+            tuple | None: (x, y), or None when empty.
+        """
+        return self.at(now - self.skew() - delay)
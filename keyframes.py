@@ -0,0 +1,134 @@
+"""
+ASCII Tag Game — Keyframes and Deltas
+
+The two-player match state as full-state keyframes and per-tick deltas,
+shared by the match recording (`recording.py`) and the spectator
+broadcast (`broadcast.py`). Bodies, in network byte order:
+
+    KEY    tick u32, x0 y0 x1 y1 u16, flags u8   full state
+    DELTA  flags u8 [x y u16 per moved player]   one tick
+    END    tick u32, winner u8 (0xFF: none)      match over
+
+Flags: bit 0/1 — player 0/1 moved (DELTA only; their new cell follows),
+bit 2 — player 1 is IT. Bits 4–7 belong to the container: the
+recording stores the local input there. Each container frames the
+bodies its own way — the recording behind an opcode byte, the broadcast
+behind a type and length header, with the tick ahead of a DELTA.
+"""
+
+import struct
+from typing import List, Optional, Tuple
+
+KEY = struct.Struct("!IHHHHB")
+CELL = struct.Struct("!HH")
+END = struct.Struct("!IB")
+
+MOVED_0 = 1
+MOVED_1 = 2
+IT_SHIFT = 2
+NO_WINNER = 0xFF
+
+State = Tuple[int, int, int, int, int]  # (x0, y0, x1, y1, it)
+
+
+def pack_key(n: int, cur: State, extra: int = 0) -> bytes:
+    """
+    Encode a KEY body: the full state after tick `n`.
+
+    Args:
+        n (int): Tick number.
+        cur (tuple): (x0, y0, x1, y1, it).
+        extra (int): Container bits (4–7) or-ed into the flags.
+
+    Returns:
+        bytes: The body.
+    """
+    flags = (cur[4] & 1) << IT_SHIFT | extra
+    return KEY.pack(n & 0xFFFFFFFF, *cur[:4], flags)
+
+
+def pack_delta(cur: State, last: State, extra: int = 0) -> bytes:
+    """
+    Encode a DELTA body: what changed between `last` and `cur`.
+
+    Args:
+        cur (tuple): (x0, y0, x1, y1, it) after the tick.
+        last (tuple): The state the reader holds.
+        extra (int): Container bits (4–7) or-ed into the flags.
+
+    Returns:
+        bytes: The body.
+    """
+    flags = (cur[4] & 1) << IT_SHIFT | extra
+    moved = b""
+    if cur[0:2] != last[0:2]:
+        flags |= MOVED_0
+        moved += CELL.pack(cur[0], cur[1])
+    if cur[2:4] != last[2:4]:
+        flags |= MOVED_1
+        moved += CELL.pack(cur[2], cur[3])
+    return bytes((flags,)) + moved
+
+
+def delta_size(flags: int) -> int:
+    """
+    Return the length of a DELTA body from its flags byte.
+
+    Args:
+        flags (int): The body's first byte.
+
+    Returns:
+        int: Bytes in the body, flags included.
+    """
+    return 1 + CELL.size * ((flags & MOVED_0) + (flags >> 1 & 1))
+
+
+def apply_delta(buf, off: int, xs: List[int], ys: List[int]) -> Tuple[int, int]:
+    """
+    Apply the DELTA body at `buf[off:]` to the positions in place.
+
+    Args:
+        buf: Bytes-like object holding the body.
+        off (int): Offset of the flags byte.
+        xs (list[int]): Column of players 0 and 1, updated.
+        ys (list[int]): Row of players 0 and 1, updated.
+
+    Returns:
+        tuple: (flags, offset just past the body).
+    """
+    flags = buf[off]
+    off += 1
+    if flags & MOVED_0:
+        xs[0], ys[0] = CELL.unpack_from(buf, off)
+        off += CELL.size
+    if flags & MOVED_1:
+        xs[1], ys[1] = CELL.unpack_from(buf, off)
+        off += CELL.size
+    return flags, off
+
+
+def pack_end(n: int, winner: Optional[int]) -> bytes:
+    """
+    Encode an END body.
+
+    Args:
+        n (int): Last tick of the match.
+        winner (int | None): Index of the winning player, if decided.
+
+    Returns:
+        bytes: The body.
+    """
+    return END.pack(n & 0xFFFFFFFF, NO_WINNER if winner is None else winner)
+
+
+def winner_of(won: int) -> Optional[int]:
+    """
+    Decode the winner byte of an END body.
+
+    Args:
+        won (int): The stored byte.
+
+    Returns:
+        int | None: Index of the winning player, or None if undecided.
+    """
+    return None if won == NO_WINNER else won
@@ -0,0 +1,212 @@
+"""
+ASCII Tag Game — Peer Latency and Clock Offset
+
+Ping/pong timing between the two peers, NTP style. Each side stamps
+messages with its own `time.monotonic()` clock in milliseconds:
+
+    ping  {"id": n, "t0": sent}                      (our clock)
+    pong  {"id": n, "t0": .., "t1": recv, "t2": sent} (t1/t2 on the peer's)
+
+and the pong is stamped `t3` when it arrives back. Then
+
+    rtt    = (t3 - t0) - (t2 - t1)
+    offset = ((t1 - t0) + (t2 - t3)) / 2     (peer clock minus ours)
+
+The offset is taken from the lowest-RTT sample in the recent window —
+that exchange had the least queueing, so its midpoint is the most
+symmetric. Pongs also carry the peer's wall clock (`w`, taken with
+`t2`), which gives the same estimate for wall-clock timestamps such as
+the `t` field of `pos`. Jitter is the RFC 3550 running mean of RTT differences, and a
+ping still unanswered after `PING_TIMEOUT` counts as lost.
+"""
+
+import time
+from collections import deque
+from typing import Deque, Dict, Optional, Tuple
+
+PING_INTERVAL = 1.0
+PING_TIMEOUT = 3.0
+WINDOW = 16
+
+
+def now_ms() -> float:
+    """
+    Return the local monotonic clock in milliseconds.
+
+    Returns:
+        float: Milliseconds since an arbitrary, machine-local epoch.
+    """
+    return time.monotonic() * 1000
+
+
+class LatencyMonitor:
+    """
+    Round-trip, jitter, loss and clock-offset statistics for one peer link.
+
+    Attributes:
+        rtt (float | None): Latest round-trip time in ms.
+        jitter (float): Smoothed RTT variation in ms.
+        offset (float | None): Peer monotonic clock minus ours, in ms.
+        wall_offset (float | None): Peer wall clock minus ours, in ms
+                                    (None until a pong carries `w`).
+        sent (int): Pings sent.
+        received (int): Pongs matched to a ping.
+        lost (int): Pings that timed out unanswered.
+    """
+
+    def __init__(self, timeout: float = PING_TIMEOUT, window: int = WINDOW) -> None:
+        """
+        Create an empty monitor.
+
+        Args:
+            timeout (float): Seconds after which an unanswered ping is lost.
+            window (int): Samples kept for the averages and offset filter.
+        """
+        self.timeout_ms = timeout * 1000
+        self.rtt: Optional[float] = None
+        self.jitter = 0.0
+        self.offset: Optional[float] = None
+        self.wall_offset: Optional[float] = None
+        self.sent = 0
+        self.received = 0
+        self.lost = 0
+        self._next_id = 0
+        self._pending: Dict[int, float] = {}
+        self._samples: Deque[Tuple[float, float, Optional[float]]] = deque(
+            maxlen=window
+        )
+
+    def ping(self, now: Optional[float] = None) -> dict:
+        """
+        Build the next ping and start its timer.
+
+        Args:
+            now (float | None): Local time in ms (defaults to `now_ms()`).
+
+        Returns:
+            dict: The 'ping' message to send.
+        """
+        now = now_ms() if now is None else now
+        self._expire(now)
+        self._next_id += 1
+        self._pending[self._next_id] = now
+        self.sent += 1
+        return {"type": "ping", "id": self._next_id, "t0": now}
+
+    @staticmethod
+    def pong(ping: dict, received: float, now: Optional[float] = None) -> dict:
+        """
+        Build the reply to a peer's ping.
+
+        Args:
+            ping (dict): The peer's decoded 'ping'.
+            received (float): Local time in ms when the ping arrived.
+            now (float | None): Local time in ms of the reply.
+
+        Returns:
+            dict: The 'pong' message to send back.
+        """
+        return {
+            "type": "pong",
+            "id": ping.get("id"),
+            "t0": ping.get("t0"),
+            "t1": received,
+            "t2": now_ms() if now is None else now,
+            "w": time.time() * 1000,
+        }
+
+    def on_pong(self, pong: dict, now: Optional[float] = None) -> Optional[float]:
+        """
+        Record a pong.
+
+        Args:
+            pong (dict): The peer's decoded 'pong'.
+            now (float | None): Local time in ms when it arrived.
+
+        Returns:
+            float | None: The sample's RTT in ms, or None if the pong does
+            not match an outstanding ping (duplicate, expired or forged).
+        """
+        now = now_ms() if now is None else now
+        t0 = self._pending.pop(pong.get("id"), None)  # type: ignore[arg-type]
+        if t0 is None:
+            return None
+        try:
+            t1, t2 = float(pong["t1"]), float(pong["t2"])
+        except (KeyError, TypeError, ValueError):
+            return None
+        rtt = max(0.0, (now - t0) - (t2 - t1))
+        offset = ((t1 - t0) + (t2 - now)) / 2
+        wall = pong.get("w")
+        wall_offset = None
+        if isinstance(wall, (int, float)):
+            wall_offset = wall - (time.time() * 1000 - (now - t2 + t1 - t0) / 2)
+        if self.rtt is not None:
+            self.jitter += (abs(rtt - self.rtt) - self.jitter) / 16
+        self.rtt = rtt
+        self.received += 1
+        self._samples.append((rtt, offset, wall_offset))
+        best = min(self._samples, key=lambda s: s[0])
+        self.offset = best[1]
+        self.wall_offset = best[2]
+        return rtt
+
+    def _expire(self, now: float) -> None:
+        limit = now - self.timeout_ms
+        for pid in [p for p, t in self._pending.items() if t < limit]:
+            del self._pending[pid]
+            self.lost += 1
+
+    @property
+    def avg_rtt(self) -> Optional[float]:
+        """float | None: Mean RTT over the recent window, in ms."""
+        if not self._samples:
+            return None
+        return sum(s[0] for s in self._samples) / len(self._samples)
+
+    @property
+    def loss(self) -> float:
+        """float: Fraction of decided pings that were lost (0.0–1.0)."""
+        decided = self.received + self.lost
+        return self.lost / decided if decided else 0.0
+
+    def to_local(self, peer_ms: float) -> Optional[float]:
+        """
+        Convert a time on the peer's monotonic clock to ours.
+
+        Args:
+            peer_ms (float): Peer timestamp in ms.
+
+        Returns:
+            float | None: The same instant on our clock, or None before
+            the first pong.
+        """
+        return None if self.offset is None else peer_ms - self.offset
+
+    def wall_to_local(self, peer_wall_ms: float) -> Optional[float]:
+        """
+        Convert a peer wall-clock timestamp (e.g. `pos.t`) to our wall clock.
+
+        Args:
+            peer_wall_ms (float): Peer `time.time()` in ms.
+
+        Returns:
+            float | None: The same instant on our wall clock, or None until
+            the offset is known.
+        """
+        return None if self.wall_offset is None else peer_wall_ms - self.wall_offset
+
+    def summary(self) -> str:
+        """
+        Format the statistics for the status line.
+
+        The clock offset is left out: monotonic epochs are arbitrary per
+        machine, so its value only matters to `to_local`.
+
+        Returns:
+            str: e.g. "rtt 42ms ±3 loss 0%", or "rtt --" before the first
+            sample.
+        """
+        if self.rtt is None:
+            return "rtt --"
+        return f"rtt {self.rtt:.0f}ms ±{self.jitter:.0f} loss {self.loss:.0%}"
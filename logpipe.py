@@ -0,0 +1,126 @@
+"""
+ASCII Tag Game — Logging Pipeline
+
+Keeps log I/O off the asyncio loop. Records from the `game` logger (and
+its children such as `game.udp`) are put on an in-memory queue by a
+`QueueHandler`; a `QueueListener` thread formats them and writes the
+file. A `log.debug` call below the configured level costs one cached
+level check.
+
+Optionally the last N records of every level are kept in a ring buffer
+in memory without being formatted or written. They are flushed to the
+log only when an error is logged, so a session run at `warning` still
+leaves the debug trail that led up to a failure.
+"""
+
+import logging
+import logging.handlers
+import queue
+from collections import deque
+from typing import Deque, Optional
+
+FORMAT = "%(asctime)s [%(levelname)s] %(message)s"
+LEVELS = ("debug", "info", "warning", "error")
+
+
+class _ThreadQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler for a listener in the same process.
+
+    The stock `prepare` formats the whole record and copies it so it can
+    be pickled for another process. A thread only needs the message
+    merged with its arguments (which the caller may mutate later).
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+class RingHandler(logging.Handler):
+    """
+    In-memory ring of recent records, forwarded only when an error occurs.
+
+    Records at or above `threshold` are skipped (the normal handler
+    already writes them). A record at or above `flush_level` pushes the
+    buffered records to `target`, oldest first, and empties the ring.
+
+    Attributes:
+        records (deque): The buffered records.
+        dumps (int): Number of times the ring was flushed.
+    """
+
+    def __init__(
+        self,
+        capacity: int,
+        target: logging.Handler,
+        threshold: int,
+        flush_level: int = logging.ERROR,
+    ) -> None:
+        """
+        Create the ring.
+
+        Args:
+            capacity (int): Records to keep.
+            target (logging.Handler): Where buffered records are flushed.
+            threshold (int): Level from which records are not buffered.
+            flush_level (int): Level that triggers a flush.
+        """
+        super().__init__(logging.DEBUG)
+        self.records: Deque[logging.LogRecord] = deque(maxlen=capacity)
+        self.target = target
+        self.threshold = threshold
+        self.flush_level = flush_level
+        self.dumps = 0
+
+    def emit(self, record: logging.LogRecord) -> None:
+        if record.levelno < self.threshold:
+            self.records.append(record)
+            return
+        if record.levelno >= self.flush_level and self.records:
+            self.dumps += 1
+            while self.records:
+                self.target.handle(self.records.popleft())
+
+
+def setup_logging(
+    level: str = "info",
+    path: Optional[str] = "game_debug.log",
+    ring: int = 0,
+) -> logging.handlers.QueueListener:
+    """
+    Route the `game` logger through a background writer thread.
+
+    Args:
+        level (str): One of LEVELS; records below it are dropped (or only
+                     kept in the ring).
+        path (str | None): Log file, truncated on start; None or "" logs
+                           nowhere.
+        ring (int): Recent records kept for dumping on error (0 disables).
+
+    Returns:
+        logging.handlers.QueueListener: The started listener; call `stop()`
+        at exit to flush the remaining records.
+    """
+    threshold = getattr(logging, level.upper())
+    q: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    if path:
+        sink: logging.Handler = logging.FileHandler(path, mode="w", encoding="utf-8")
+    else:
+        sink = logging.NullHandler()
+    sink.setFormatter(logging.Formatter(FORMAT))
+    listener = logging.handlers.QueueListener(q, sink)
+
+    qh = _ThreadQueueHandler(q)
+    qh.setLevel(threshold)
+    log = logging.getLogger("game")
+    for h in list(log.handlers):
+        log.removeHandler(h)
+    if ring > 0:
+        log.addHandler(RingHandler(ring, qh, threshold))
+    log.addHandler(qh)
+    log.setLevel(logging.DEBUG if ring > 0 else threshold)
+    log.propagate = False
+    listener.start()
+    return listener
@@ -1,604 +1,41 @@
 """
-ASCII Tag Game — TUI Client
+ASCII Tag Game — Command Line
 
-A two-player real-time tag game played over a terminal UI.
-Players connect via a WebSocket signaling server, then establish
-a direct TCP peer-to-peer connection for low-latency gameplay.
+Entry point of the game client. Parses the command line, sets up logging
+and metrics, and only then imports the Textual application (`game.py`),
+so `--help`, argument errors and any other command that does not open
+the UI start without loading Textual, the WebSocket library or NumPy.
 
 Usage:
-    python game_client.py --server ws://localhost:8080
+    python main.py --server ws://localhost:8080
+    python main.py --players 8
+    python main.py --spectate MATCH --broadcast localhost:3479
 
 Dependencies:
     pip install textual websockets
 """
 
 import argparse
-import asyncio
-import json
+import importlib.util
 import logging
-import socket
 import sys
-import time
-import traceback
-from typing import Optional
 
-logging.basicConfig(
-    filename="game_debug.log",
-    filemode="w",
-    level=logging.DEBUG,
-    format="%(asctime)s [%(levelname)s] %(message)s",
+from config import (
+    BOT_SKILL,
+    GRID_H,
+    GRID_W,
+    INPUT_POLICY,
+    INPUT_QUEUE,
+    INTERP_DELAY,
+    STAR_SYMS,
+    TICK,
 )
-log = logging.getLogger("game")
-
-try:
-    import websockets
-    from textual import events
-    from textual.app import App, ComposeResult
-    from textual.widgets import Static
-except ImportError as e:
-    sys.exit(f"Missing dep: {e}\n  pip install textual websockets")
-
-GRID_W = 10
-GRID_H = 10
-SYM_A = "@"
-SYM_B = "#"
-EMPTY = "."
-TICK = 0.12
-
-
-def render(my_x, my_y, op_x, op_y, am_caller) -> str:
-    """
-    Build and return a formatted ASCII string representation of the game board.
-
-    Places both players on the grid using their respective symbols, then
-    wraps the grid in a border. The caller is always represented by SYM_A
-    and the callee by SYM_B, regardless of who is IT.
-
-    Args:
-        my_x (int): This player's column position (0-indexed).
-        my_y (int): This player's row position (0-indexed).
-        op_x (int): Opponent's column position (0-indexed).
-        op_y (int): Opponent's row position (0-indexed).
-        am_caller (bool): True if this player is the caller (host).
-
-    Returns:
-        str: A multi-line ASCII string of the rendered game board.
-    """
-    grid = [[EMPTY] * GRID_W for _ in range(GRID_H)]
-    grid[op_y][op_x] = SYM_B if am_caller else SYM_A
-    grid[my_y][my_x] = SYM_A if am_caller else SYM_B
-    sep = "+" + "-" * (GRID_W * 2 + 1) + "+"
-    return "\n".join([sep] + ["| " + " ".join(r) + " |" for r in grid] + [sep])
-
-
-def blank_board() -> str:
-    """
-    Build and return an empty ASCII game board with no players placed.
-
-    Used during non-playing phases (connecting, waiting, end) to show
-    the board layout without revealing any position information.
-
-    Returns:
-        str: A multi-line ASCII string of an empty bordered grid.
-    """
-    sep = "+" + "-" * (GRID_W * 2 + 1) + "+"
-    return "\n".join(
-        [sep] + ["| " + " ".join([EMPTY] * GRID_W) + " |"] * GRID_H + [sep]
-    )
-
-
-def local_ip() -> str:
-    """
-    Detect and return the machine's primary outbound IPv4 address.
-
-    Opens a temporary UDP socket toward a public DNS server to determine
-    which local interface the OS would use for external traffic, then
-    reads the bound address without actually sending any data.
-
-    Returns:
-        str: The local IPv4 address as a string (e.g. "192.168.1.42").
-             Falls back to "127.0.0.1" if detection fails.
-    """
-    try:
-        s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        s.connect(("8.8.8.8", 80))
-        ip = s.getsockname()[0]
-        s.close()
-        return ip
-    except Exception:
-        return "127.0.0.1"
-
-
-class Game(App):  # type: ignore[type-arg]
-    """
-    Main Textual application class for the ASCII Tag game.
-
-    Manages the full lifecycle of a game session: WebSocket signaling,
-    TCP peer-to-peer connection setup, game state, input handling,
-    and TUI rendering. The caller acts as the TCP host; the callee
-    connects to the caller's advertised address.
-
-    Attributes:
-        server (str): WebSocket signaling server URL.
-        phase (str): Current game phase — one of: connecting, waiting,
-                     matched, playing, end.
-        am_caller (bool): True if this client is the signaling caller (host).
-        am_it (bool): True if this player is currently "IT" (the chaser).
-        my_x / my_y (int): This player's current grid position.
-        op_x / op_y (int): Opponent's last known grid position.
-        pending_move (str | None): Buffered WASD keypress awaiting next tick.
-        status_msg (str): Message shown in the status bar when not playing.
-    """
-
-    CSS = """
-    Screen  { align: center middle; background: #111; }
-    #title  { width: 30; text-align: center; color: yellow; text-style: bold; margin-bottom: 1; }
-    #role   { width: 30; text-align: center; color: #88ff88; text-style: bold; }
-    #board  { width: 30; color: #ddd; margin-top: 1; margin-bottom: 1; }
-    #status { width: 30; text-align: center; color: #aaaaaa; }
-    #hint   { width: 30; text-align: center; color: #444444; margin-top: 1; }
-    """
-
-    def __init__(self, server: str) -> None:
-        """
-        Initialise the Game application with the given signaling server URL.
-
-        Args:
-            server (str): Full WebSocket URL of the signaling server
-                          (e.g. "ws://localhost:8080").
-        """
-        super().__init__()
-        self.server = server
-        self._writer: Optional[asyncio.StreamWriter] = None
-        self._reader: Optional[asyncio.StreamReader] = None
-        self._recv_task: Optional[asyncio.Task] = None
-        self._tick_task: Optional[asyncio.Task] = None
-
-        self.phase = "connecting"
-        self.am_caller = False
-        self.am_it = False
-        self.my_x = self.my_y = 0
-        self.op_x = self.op_y = 9
-        self.pending_move: Optional[str] = None
-        self.status_msg = "Connecting..."
-
-    def compose(self) -> ComposeResult:
-        """
-        Declare and yield the static TUI widgets that make up the game screen.
-
-        Widgets are stacked vertically: title banner, role indicator,
-        game board, status line, and key-hint footer.
-
-        Yields:
-            ComposeResult: Sequence of Textual Static widgets.
-        """
-        yield Static("◈  ASCII TAG  ◈", id="title")
-        yield Static("", id="role")
-        yield Static(blank_board(), id="board")
-        yield Static("Connecting...", id="status")
-        yield Static("WASD  move  |  Q quit", id="hint")
-
-    def on_mount(self) -> None:
-        """
-        Textual lifecycle hook called after the app mounts to the terminal.
-
-        Starts the network worker as an exclusive background task so that
-        WebSocket signaling and TCP setup run concurrently with the UI.
-        """
-        self.run_worker(self._network(), exclusive=True)
-
-    def _refresh(self) -> None:
-        """
-        Synchronise all TUI widgets with the current game state.
-
-        Updates the role indicator, board grid, and status message based
-        on the active phase. During 'playing', the live board and role/IT
-        status are rendered; all other phases show a blank board and the
-        generic status message.
-        """
-        board_w = self.query_one("#board", Static)
-        status_w = self.query_one("#status", Static)
-        role_w = self.query_one("#role", Static)
-
-        if self.phase in ("matched", "playing", "end"):
-            my_sym = SYM_A if self.am_caller else SYM_B
-            op_sym = SYM_B if self.am_caller else SYM_A
-            role_w.update(f"You=[{my_sym}]  Opponent=[{op_sym}]")
-        else:
-            role_w.update("")
-
-        if self.phase == "playing":
-            board_w.update(
-                render(self.my_x, self.my_y, self.op_x, self.op_y, self.am_caller)
-            )
-        else:
-            board_w.update(blank_board())
-
-        if self.phase == "playing":
-            my_sym = SYM_A if self.am_caller else SYM_B
-            op_sym = SYM_B if self.am_caller else SYM_A
-            msg = (
-                f"[{my_sym}] YOU ARE IT — chase [{op_sym}]!"
-                if self.am_it
-                else f"[{my_sym}] YOU ARE RUNNER — escape [{op_sym}]!"
-            )
-            status_w.update(msg)
-        else:
-            status_w.update(self.status_msg)
-
-    def on_key(self, event: events.Key) -> None:
-        """
-        Handle keyboard input and buffer the most recent directional key.
-
-        Only WASD keys are accepted and only during the 'playing' phase.
-        The move is not applied immediately; it is stored in `pending_move`
-        and consumed by the next game tick to enforce a fixed movement rate.
-
-        Args:
-            event (events.Key): The Textual key event fired on each keystroke.
-        """
-        if self.phase != "playing":
-            return
-        if event.key.lower() in ("w", "a", "s", "d"):
-            self.pending_move = event.key.lower()
-            log.debug("key buffered: %s  phase=%s", event.key, self.phase)
-
-    async def _game_tick(self) -> None:
-        """
-        Execute one game tick: apply buffered movement, broadcast position, check win.
-
-        Called every TICK seconds by the tick loop. Consumes the latest
-        buffered keypress (if any), clamps the new position to grid bounds,
-        sends the updated coordinates to the peer over TCP, and evaluates
-        the win condition. The board is re-rendered after each tick.
-        """
-        if self.phase != "playing":
-            return
-
-        mv = self.pending_move
-        self.pending_move = None
-
-        if mv:
-            dx, dy = {"w": (0, -1), "s": (0, 1), "a": (-1, 0), "d": (1, 0)}[mv]
-            nx, ny = self.my_x + dx, self.my_y + dy
-            if 0 <= nx < GRID_W and 0 <= ny < GRID_H:
-                self.my_x, self.my_y = nx, ny
-                log.debug("moved to %d,%d", self.my_x, self.my_y)
-
-        self._refresh()
-        self._tcp_send(
-            {
-                "type": "pos",
-                "x": self.my_x,
-                "y": self.my_y,
-                "t": int(time.time() * 1000),
-            }
-        )
-        self._check_win()
-
-    def _tcp_send(self, obj: dict) -> None:
-        """
-        Serialise a dictionary to JSON and write it to the peer TCP stream.
-
-        Appends a newline delimiter so the receiver can use readline().
-        Schedules an async drain without blocking the caller. Silently
-        drops the message if the writer is absent or already closing.
-
-        Args:
-            obj (dict): The message payload to serialise and send.
-        """
-        w = self._writer
-        if w is None or w.is_closing():
-            return
-        try:
-            w.write((json.dumps(obj) + "\n").encode())
-            t = asyncio.create_task(w.drain())
-            t.add_done_callback(lambda _: None)
-        except Exception as exc:
-            log.warning("_tcp_send: %s", exc)
+from inputs import POLICIES
+from logpipe import LEVELS, setup_logging
+from maps import Terrain, load_map, parse_size
+from metrics import EXPORT_EVERY, Metrics
 
-    def _check_win(self) -> None:
-        """
-        Evaluate the win condition by comparing both players' grid positions.
-
-        A tag occurs when both players occupy the same cell. If IT reaches
-        the runner's cell, IT wins and broadcasts a 'win' message to the
-        peer. If the runner lands on IT's cell (edge case), the runner loses
-        locally. Transitions the game phase to 'end' on conclusion.
-        """
-        if self.phase != "playing":
-            return
-        if self.my_x == self.op_x and self.my_y == self.op_y:
-            self.phase = "end"
-            if self.am_it:
-                self.status_msg = "YOU WIN — opponent caught!"
-                self._tcp_send({"type": "win"})
-            else:
-                self.status_msg = "YOU LOSE — you were caught!"
-            self._refresh()
-
-    async def _network(self) -> None:
-        """
-        Entry point for the background network worker.
-
-        Opens a WebSocket connection to the signaling server and delegates
-        all further signaling logic to `_signaling`. Catches and displays
-        any unhandled exception, transitioning the game to the 'end' phase
-        with an error message.
-        """
-        try:
-            async with websockets.connect(
-                self.server, ping_interval=None, ping_timeout=None
-            ) as ws:
-                log.debug("ws connected")
-                await self._signaling(ws)
-        except Exception as exc:
-            log.error("_network: %s\n%s", exc, traceback.format_exc())
-            self.phase = "end"
-            self.status_msg = f"Error: {exc}"
-            self._refresh()
-
-    async def _signaling(self, ws) -> None:
-        """
-        Process all WebSocket signaling messages from the server.
-
-        Handles the full pre-game handshake sequence:
-          - 'waiting'       — server queuing this client for a match.
-          - 'matched'       — pair found; role (caller/callee) assigned.
-          - 'ice-candidate' — caller's TCP address relayed to the callee.
-          - 'peer-left'     — opponent disconnected; award win by default.
-
-        The caller proceeds to `_host()` to open a TCP server; the callee
-        proceeds to `_join()` once the host address is received.
-
-        Args:
-            ws: An open websockets connection to the signaling server.
-        """
-        async for raw in ws:
-            msg = json.loads(raw)
-            kind = msg.get("type")
-            log.debug("ws ← %s", kind)
-
-            if kind == "waiting":
-                self.phase = "waiting"
-                self.status_msg = "Waiting for opponent..."
-                self._refresh()
-
-            elif kind == "matched":
-                self.am_caller = msg["role"] == "caller"
-                self.phase = "matched"
-                my_sym = SYM_A if self.am_caller else SYM_B
-                op_sym = SYM_B if self.am_caller else SYM_A
-                self.status_msg = f"Matched! You=[{my_sym}] Opp=[{op_sym}]"
-                self._refresh()
-
-                if self.am_caller:
-                    await self._host(ws)
-
-            elif kind == "ice-candidate":
-                if not self.am_caller:
-                    ip = msg.get("ip", "127.0.0.1")
-                    port = int(msg.get("port", 0))
-                    log.debug("callee: got tcp addr %s:%d", ip, port)
-                    self.status_msg = f"Connecting to host..."
-                    self._refresh()
-                    await self._join(ip, port)
-
-            elif kind == "peer-left":
-                if self.phase != "end":
-                    self.phase = "end"
-                    self.status_msg = "Opponent left — you win!"
-                    self._refresh()
-                break
-
-    async def _host(self, ws) -> None:
-        """
-        Open an ephemeral TCP server, advertise its address, and await the peer.
-
-        Binds a TCP listener on all interfaces at an OS-assigned port, then
-        relays the detected public IP and port to the callee via the signaling
-        channel using an 'ice-candidate' message. Waits up to 15 seconds for
-        the callee to connect before timing out. On a successful connection,
-        closes the listening server and proceeds to `_start_game`.
-
-        Args:
-            ws: An open websockets connection used to send the address relay.
-        """
-        log.debug("host: starting TCP server")
-        connected: asyncio.Future = asyncio.get_event_loop().create_future()
-
-        async def _accept(r: asyncio.StreamReader, w: asyncio.StreamWriter) -> None:
-            log.debug("host: client connected from %s", w.get_extra_info("peername"))
-            self._reader, self._writer = r, w
-            if not connected.done():
-                connected.set_result(True)
-
-        srv = await asyncio.start_server(_accept, "0.0.0.0", 0)
-        port = srv.sockets[0].getsockname()[1]
-        ip = local_ip()
-        log.debug("host: listening on %s:%d", ip, port)
-
-        await ws.send(json.dumps({"type": "ice-candidate", "ip": ip, "port": port}))
-        self.status_msg = f"Waiting for opponent to connect (:{port})..."
-        self._refresh()
-
-        try:
-            await asyncio.wait_for(connected, timeout=15.0)
-        except asyncio.TimeoutError:
-            self.phase = "end"
-            self.status_msg = "Timeout — opponent never connected."
-            self._refresh()
-            return
-
-        srv.close()
-        await self._start_game()
-
-    async def _join(self, ip: str, port: int) -> None:
-        """
-        Attempt to establish a TCP connection to the caller's game server.
-
-        Retries up to 7 times with a 400 ms delay between attempts to
-        accommodate network latency or the host not yet being ready.
-        On success, delegates immediately to `_start_game`. On total
-        failure, transitions the game to the 'end' phase with an error.
-
-        Args:
-            ip (str): IPv4 address of the caller's TCP server.
-            port (int): Port number of the caller's TCP server.
-        """
-        for attempt in range(1, 8):
-            try:
-                log.debug("join: attempt %d → %s:%d", attempt, ip, port)
-                r, w = await asyncio.wait_for(
-                    asyncio.open_connection(ip, port), timeout=3.0
-                )
-                self._reader, self._writer = r, w
-                log.debug("join: connected!")
-                await self._start_game()
-                return
-            except Exception as exc:
-                log.warning("join attempt %d failed: %s", attempt, exc)
-                self.status_msg = f"Connecting... (attempt {attempt})"
-                self._refresh()
-                await asyncio.sleep(0.4)
-
-        self.phase = "end"
-        self.status_msg = "Could not reach host."
-        self._refresh()
-
-    async def _start_game(self) -> None:
-        """
-        Perform the pre-game READY handshake and initialise gameplay for both peers.
-
-        Both the caller and callee execute this identical code path:
-          1. Send a 'ready' message over TCP.
-          2. Block until a 'ready' message is received from the peer.
-          3. Assign starting positions (caller: top-left, callee: bottom-right).
-          4. Set the 'playing' phase and spawn the tick and receive tasks.
-
-        The caller starts as IT; the callee starts as the runner.
-        Both background tasks are held as instance attributes to prevent
-        premature garbage collection by the asyncio event loop.
-        """
-        log.debug("_start_game: sending READY")
-        self._tcp_send({"type": "ready"})
-
-        reader = self._reader
-        assert reader is not None
-        try:
-            while True:
-                line = await asyncio.wait_for(reader.readline(), timeout=10.0)
-                if not line:
-                    raise ConnectionError("peer closed before READY")
-                m = json.loads(line.decode().strip())
-                if m.get("type") == "ready":
-                    log.debug("_start_game: peer READY received")
-                    break
-        except Exception as exc:
-            log.error("_start_game READY handshake: %s", exc)
-            self.phase = "end"
-            self.status_msg = f"Handshake failed: {exc}"
-            self._refresh()
-            return
-
-        self.am_it = self.am_caller
-        if self.am_caller:
-            self.my_x, self.my_y = 0, 0
-            self.op_x, self.op_y = 9, 9
-        else:
-            self.my_x, self.my_y = 9, 9
-            self.op_x, self.op_y = 0, 0
-
-        self.phase = "playing"
-        self._refresh()
-        log.debug(
-            "game started: am_it=%s pos=(%d,%d)", self.am_it, self.my_x, self.my_y
-        )
-
-        self._tick_task = asyncio.create_task(self._run_tick())
-        self._tick_task.add_done_callback(
-            lambda t: (
-                log.error("tick task died: %s", t.exception())
-                if t.exception()
-                else None
-            )
-        )
-
-        self._recv_task = asyncio.create_task(self._recv_loop())
-        self._recv_task.add_done_callback(
-            lambda t: (
-                log.error("recv task died: %s", t.exception())
-                if t.exception()
-                else None
-            )
-        )
-
-    async def _run_tick(self) -> None:
-        """
-        Drive the game tick loop at a fixed interval until the game ends.
-
-        Sleeps for TICK seconds between iterations, then calls `_game_tick`
-        to process input, broadcast position, and check the win condition.
-        Exits automatically when the phase leaves 'playing'.
-        """
-        log.debug("_run_tick started")
-        while self.phase == "playing":
-            await asyncio.sleep(TICK)
-            await self._game_tick()
-        log.debug("_run_tick ended (phase=%s)", self.phase)
-
-    async def _recv_loop(self) -> None:
-        """
-        Continuously read and process incoming TCP messages from the peer.
-
-        Runs for the duration of the 'playing' phase. Each newline-delimited
-        JSON message is parsed and dispatched:
-          - 'pos' — updates the opponent's coordinates and re-renders the board.
-          - 'win' — peer has caught this player; transitions to 'end' as a loss.
-
-        A 5-second readline timeout is used to keep the loop responsive to
-        phase changes without blocking indefinitely. Handles peer disconnection
-        and unexpected exceptions, always cleaning up the phase on exit.
-        """
-        log.debug("_recv_loop started")
-        reader = self._reader
-        if reader is None:
-            return
-        try:
-            while self.phase == "playing":
-                try:
-                    line = await asyncio.wait_for(reader.readline(), timeout=5.0)
-                except asyncio.TimeoutError:
-                    continue
-                if not line:
-                    log.debug("_recv_loop: peer closed")
-                    break
-                try:
-                    m = json.loads(line.decode().strip())
-                except Exception:
-                    continue
-
-                t = m.get("type")
-                if t == "pos":
-                    self.op_x, self.op_y = int(m["x"]), int(m["y"])
-                    self._check_win()
-                    if self.phase == "playing":
-                        self._refresh()
-                elif t == "win":
-                    log.debug("received win from peer")
-                    self.phase = "end"
-                    self.status_msg = "YOU LOSE — opponent caught you!"
-                    self._refresh()
-                    break
-
-        except Exception as exc:
-            log.error("_recv_loop: %s\n%s", exc, traceback.format_exc())
-        finally:
-            if self.phase == "playing":
-                self.phase = "end"
-                self.status_msg = "Connection lost."
-                self._refresh()
-            log.debug("_recv_loop ended")
+log = logging.getLogger("game")
 
 
 def main() -> None:
@@ -607,17 +44,154 @@ def main() -> None:
 
     Accepts an optional --server flag to override the default signaling
     server URL. Initialises and runs the Textual Game app, which blocks
-    until the user quits (Q key or terminal close).
+    until the user quits (Q key or terminal close). The app module is
+    imported only after the arguments have been validated.
 
     CLI Args:
         --server (str): WebSocket URL of the signaling server.
                         Defaults to "ws://localhost:8080".
+        --wire (str): Peer wire format to offer — "binary" (default) or
+                      "json" to force the legacy newline-delimited format.
+        --transport (str): Peer transport when hosting — "tcp" (default)
+                           or "udp" for sequenced datagrams.
+        --max-fps (float): Repaint cap during play. Defaults to 60.
+        --map (str): Text map file with walls (see `maps.py`).
+        --size (str): Open arena size as WxH when no map file is given.
+        --relay (str): Relay server "host:port" used when the direct TCP
+                       link cannot be established (see `relay.py`).
+        --interp-delay (float): Milliseconds the opponent is drawn behind
+                                its latest report. Defaults to 100.
+        --tick-rate (float): Game ticks per second (e.g. 60–120 for lower
+                             input latency). Defaults to 1/TICK (~8.3).
+        --log-level (str): debug, info (default), warning or error.
+        --log-file (str): Log file path. Defaults to "game_debug.log";
+                          an empty string disables the file.
+        --log-ring (int): Keep the last N records of every level in memory
+                          and write them out only when an error is logged.
+        --metrics (str): Enable instrumentation and export it to this file
+                         (Prometheus text if it ends in ".prom", else JSON).
+                         Press M in game for the overlay.
+        --metrics-every (float): Seconds between exports. Defaults to 5.
+        --record (str): Record the match to this file for `replay.py`;
+                        later matches of the session go to FILE-2,
+                        FILE-3, ... (before the extension).
+        --input-policy (str): How ticks consume queued key presses — "one"
+                              (default: every press, one move per TICK),
+                              "all" (every queued press in one tick) or
+                              "last" (only the newest press).
+        --input-queue (int): Key presses that can wait in the queue.
+                             Defaults to 8; the oldest is dropped beyond.
+        --bot (str): Play offline against a local bot in this role — "it"
+                     (it chases you) or "runner" (you chase it). Needs NumPy.
+        --bot-skill (float): Share (0–1) of the bot's moves that follow its
+                             distance field. Defaults to 0.8.
+        --broadcast (str): Broadcast relay "host[:port]" (see `broadcast.py`).
+                           Players publish their match to it; with
+                           --spectate it is the relay to watch from
+                           (defaults to localhost:3479).
+        --spectate (str): Watch the named match instead of playing. Needs
+                          only Textual.
+        --players (int): Players per match, 2 (default) to 26. Above 2 the
+                         first player to join hosts the match for the
+                         others (see `star.py`); this cannot be combined
+                         with --bot, --relay, --record, --broadcast or
+                         --transport udp.
     """
     ap = argparse.ArgumentParser(description="ASCII Tag Game")
     ap.add_argument("--server", default="ws://localhost:8080", metavar="URL")
+    ap.add_argument("--wire", choices=("binary", "json"), default="binary")
+    ap.add_argument("--transport", choices=("tcp", "udp"), default="tcp")
+    ap.add_argument("--max-fps", type=float, default=60.0, metavar="N")
+    ap.add_argument("--map", metavar="FILE")
+    ap.add_argument("--size", default=f"{GRID_W}x{GRID_H}", metavar="WxH")
+    ap.add_argument("--relay", metavar="HOST:PORT")
+    ap.add_argument(
+        "--interp-delay", type=float, default=INTERP_DELAY * 1000, metavar="MS"
+    )
+    ap.add_argument("--tick-rate", type=float, default=1 / TICK, metavar="HZ")
+    ap.add_argument("--log-level", choices=LEVELS, default="info")
+    ap.add_argument("--log-file", default="game_debug.log", metavar="PATH")
+    ap.add_argument("--log-ring", type=int, default=0, metavar="N")
+    ap.add_argument("--metrics", metavar="PATH")
+    ap.add_argument("--metrics-every", type=float, default=EXPORT_EVERY, metavar="SEC")
+    ap.add_argument("--record", metavar="FILE")
+    ap.add_argument("--input-policy", choices=POLICIES, default=INPUT_POLICY)
+    ap.add_argument("--input-queue", type=int, default=INPUT_QUEUE, metavar="N")
+    ap.add_argument("--bot", choices=("it", "runner"))
+    ap.add_argument("--bot-skill", type=float, default=BOT_SKILL, metavar="P")
+    ap.add_argument("--broadcast", metavar="HOST[:PORT]")
+    ap.add_argument("--spectate", metavar="MATCH")
+    ap.add_argument("--players", type=int, default=2, metavar="N")
     args = ap.parse_args()
-    log.debug("=== start server=%s ===", args.server)
-    Game(args.server).run()
+    if not 2 <= args.players <= len(STAR_SYMS):
+        ap.error(f"--players must be between 2 and {len(STAR_SYMS)}")
+    two_only = (args.bot, args.relay, args.record, args.broadcast)
+    if args.players > 2 and (any(two_only) or args.transport == "udp"):
+        ap.error(
+            "--players above 2 cannot be combined with --bot, --relay, "
+            "--record, --broadcast or --transport udp"
+        )
+    if not 0 < args.tick_rate <= 1000:
+        ap.error("--tick-rate must be between 0 and 1000 Hz")
+    if args.input_queue < 1:
+        ap.error("--input-queue must be at least 1")
+    if not 0 <= args.bot_skill <= 1:
+        ap.error("--bot-skill must be between 0 and 1")
+    try:
+        terrain = load_map(args.map) if args.map else Terrain(*parse_size(args.size))
+    except (OSError, ValueError) as exc:
+        ap.error(str(exc))
+    needed = ("textual", "numpy") if args.bot else ("textual", "websockets")
+    if args.spectate:
+        needed = ("textual",)
+    missing = [m for m in needed if not importlib.util.find_spec(m)]
+    if missing:
+        sys.exit(f"Missing dep: {', '.join(missing)}\n  pip install {' '.join(needed)}")
+    listener = setup_logging(args.log_level, args.log_file, args.log_ring)
+    log.info(
+        "=== start server=%s wire=%s transport=%s bot=%s players=%d ===",
+        args.server,
+        args.wire,
+        args.transport,
+        args.bot,
+        args.players,
+    )
+    if args.spectate:
+        from viewer import SpectateApp
+
+        try:
+            SpectateApp(args.broadcast or "localhost", args.spectate).run()
+        finally:
+            listener.stop()
+        return
+    from game import Game
+    from wire import WIRE_JSON, WIRE_VERSION
+
+    wire = WIRE_JSON if args.wire == "json" else WIRE_VERSION
+    metrics = Metrics(args.metrics, args.metrics_every) if args.metrics else None
+    try:
+        Game(
+            args.server,
+            wire=wire,
+            transport=args.transport,
+            max_fps=args.max_fps,
+            terrain=terrain,
+            relay=args.relay,
+            interp_delay=max(0.0, args.interp_delay) / 1000,
+            tick_rate=args.tick_rate,
+            metrics=metrics,
+            record=args.record,
+            input_policy=args.input_policy,
+            input_queue=args.input_queue,
+            bot=args.bot,
+            bot_skill=args.bot_skill,
+            broadcast=args.broadcast,
+            players=args.players,
+        ).run()
+    finally:
+        if metrics is not None:
+            metrics.stop()
+        listener.stop()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,208 @@
+"""
+ASCII Tag Game — Maps
+
+Terrain for arenas of any size. Walls are stored as a packed bitmap (one
+bit per cell in a `bytearray`), so a 1000×1000 arena costs 125 KB and a
+collision test is a single index and shift.
+
+Map files are plain text, one line per row:
+    .   floor
+    X   wall ('#' is accepted as an alias)
+Short lines are padded with floor to the width of the longest line.
+"""
+
+import hashlib
+import struct
+from typing import Dict, Iterable, Optional, Tuple
+
+WALL = "X"
+_WALL_CHARS = frozenset("X#")
+
+
+class Terrain:
+    """
+    Fixed-size arena with a packed wall bitmap.
+
+    Attributes:
+        w (int): Arena width in cells.
+        h (int): Arena height in cells.
+        bits (bytearray): Row-major wall bitmap, bit `y * w + x`.
+    """
+
+    __slots__ = ("w", "h", "bits", "_digest")
+
+    def __init__(self, w: int, h: int, walls: Iterable[Tuple[int, int]] = ()) -> None:
+        """
+        Create an arena, optionally with walls.
+
+        Args:
+            w (int): Arena width in cells (1–65535).
+            h (int): Arena height in cells (1–65535).
+            walls (Iterable[tuple]): (x, y) cells that are walls.
+
+        Raises:
+            ValueError: If the size is out of range.
+        """
+        if not (0 < w <= 0xFFFF and 0 < h <= 0xFFFF):
+            raise ValueError(f"map size {w}x{h} out of range")
+        self.w = w
+        self.h = h
+        self.bits = bytearray((w * h + 7) >> 3)
+        self._digest = ""
+        for x, y in walls:
+            i = y * w + x
+            self.bits[i >> 3] |= 1 << (i & 7)
+
+    def wall(self, x: int, y: int) -> bool:
+        """
+        Report whether a cell is a wall.
+
+        Args:
+            x (int): Column (must be on the map).
+            y (int): Row (must be on the map).
+
+        Returns:
+            bool: True for a wall cell.
+        """
+        i = y * self.w + x
+        return (self.bits[i >> 3] >> (i & 7)) & 1 == 1
+
+    def open_cell(self, x: int, y: int) -> bool:
+        """
+        Report whether a player may stand on a cell.
+
+        Args:
+            x (int): Column.
+            y (int): Row.
+
+        Returns:
+            bool: True if the cell is on the map and not a wall.
+        """
+        if 0 <= x < self.w and 0 <= y < self.h:
+            i = y * self.w + x
+            return not (self.bits[i >> 3] >> (i & 7)) & 1
+        return False
+
+    def nearest_open(self, x: int, y: int) -> Tuple[int, int]:
+        """
+        Find the open cell closest to (x, y), searching in growing squares.
+
+        Args:
+            x (int): Preferred column.
+            y (int): Preferred row.
+
+        Returns:
+            tuple: (x, y) of an open cell; (x, y) itself if the map is all wall.
+        """
+        for r in range(max(self.w, self.h)):
+            for dy in range(-r, r + 1):
+                for dx in (range(-r, r + 1) if abs(dy) == r else (-r, r)):
+                    if self.open_cell(x + dx, y + dy):
+                        return x + dx, y + dy
+        return x, y
+
+    def row_text(
+        self, y: int, empty: str, x0: int = 0, x1: Optional[int] = None
+    ) -> str:
+        """
+        Render one map row, or its columns `x0 .. x1 - 1`, as
+        space-separated cell characters.
+
+        Args:
+            y (int): Row to render.
+            empty (str): Character for floor cells.
+            x0 (int): First column.
+            x1 (int | None): End column (exclusive); None for the row's end.
+
+        Returns:
+            str: `2 * (x1 - x0) - 1` characters (cells separated by single
+            spaces).
+        """
+        w = self.w
+        x1 = w if x1 is None else min(x1, w)
+        cells = [empty] * (x1 - x0)
+        base = y * w
+        bits = self.bits
+        for x in range(x0, x1):
+            i = base + x
+            if (bits[i >> 3] >> (i & 7)) & 1:
+                cells[x - x0] = WALL
+        return " ".join(cells)
+
+    @property
+    def digest(self) -> str:
+        """
+        str: Short content hash of size and walls, exchanged during READY.
+        """
+        if not self._digest:
+            h = hashlib.blake2b(struct.pack("!HH", self.w, self.h), digest_size=8)
+            h.update(self.bits)
+            self._digest = h.hexdigest()
+        return self._digest
+
+    def is_open_arena(self) -> bool:
+        """
+        Report whether the map has no walls at all.
+
+        Returns:
+            bool: True if every cell is floor.
+        """
+        return not any(self.bits)
+
+    def describe(self) -> Dict[str, object]:
+        """
+        Build the map fields advertised in a READY message.
+
+        Returns:
+            dict: {"w": ..., "h": ..., "map": digest}.
+        """
+        return {"w": self.w, "h": self.h, "map": self.digest}
+
+
+def load_map(path: str) -> Terrain:
+    """
+    Load a text map file.
+
+    Args:
+        path (str): Path to the map file.
+
+    Returns:
+        Terrain: The parsed arena.
+
+    Raises:
+        ValueError: If the file has no rows.
+    """
+    with open(path, encoding="utf-8") as f:
+        lines = [ln.rstrip("\r\n") for ln in f]
+    while lines and not lines[-1].strip():
+        lines.pop()
+    if not lines:
+        raise ValueError(f"{path}: empty map")
+    w = max(len(ln) for ln in lines)
+    walls = [
+        (x, y)
+        for y, ln in enumerate(lines)
+        for x, c in enumerate(ln)
+        if c in _WALL_CHARS
+    ]
+    return Terrain(w, len(lines), walls)
+
+
+def parse_size(text: str) -> Tuple[int, int]:
+    """
+    Parse a "WxH" size string from the command line.
+
+    Args:
+        text (str): e.g. "1000x1000".
+
+    Returns:
+        tuple: (w, h).
+
+    Raises:
+        ValueError: If the string is malformed.
+    """
+    w, _, h = text.lower().partition("x")
+    try:
+        return int(w), int(h)
+    except ValueError:
+        raise ValueError(f"bad size {text!r}, expected WxH") from None
@@ -0,0 +1,353 @@
+"""
+ASCII Tag Game — Performance Metrics
+
+Optional instrumentation enabled with `--metrics`. `Metrics` holds a set
+of fixed-bucket latency histograms and plain counters, measures
+event-loop lag with a sleeping probe task, and periodically writes a
+snapshot to a local file — JSON, or Prometheus text format when the
+file name ends in `.prom`.
+
+When metrics are off the game keeps `Game.metrics` at None and every
+instrumented call site is a single `is not None` check.
+
+Histograms (seconds):
+    tick       — `_game_tick` duration
+    render     — `_paint` duration (widget sync, not terminal output)
+    net_delay  — peer `pos` send → our receive, via the clock offset
+    recv_wait  — time spent waiting for the next peer message
+    loop_lag   — how late the probe task wakes up
+    connect    — peer link setup: candidate advertised/raced → connected
+    input_wait   — key press → applied by a game tick
+    input_screen — key press → first repaint showing the move
+    input_peer   — key press → peer receives the position (est., + RTT/2)
+    drain_stall  — peer writer waiting for the send buffer to drain
+    bot_decide   — one decision of the local `--bot` opponent
+    next_match   — rematch or re-queue asked for → next match playing
+Counters:
+    messages_in, messages_out, bytes_in, bytes_out, send_coalesced
+Gauges:
+    send_queue, send_queue_peak — frames per peer write (latest and max)
+"""
+
+import asyncio
+import json
+import logging
+import os
+import time
+from bisect import bisect_left
+from typing import Dict, List, Optional, Sequence
+
+log = logging.getLogger("game.metrics")
+
+BUCKETS = (
+    0.00005,
+    0.0001,
+    0.00025,
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+)
+HISTOGRAMS = (
+    "tick",
+    "render",
+    "net_delay",
+    "recv_wait",
+    "loop_lag",
+    "connect",
+    "input_wait",
+    "input_screen",
+    "input_peer",
+    "drain_stall",
+    "bot_decide",
+    "next_match",
+)
+COUNTERS = ("messages_in", "messages_out", "bytes_in", "bytes_out", "send_coalesced")
+GAUGES = ("send_queue", "send_queue_peak")
+LAG_PROBE = 0.05
+EXPORT_EVERY = 5.0
+
+
+class Histogram:
+    """
+    Fixed-bucket latency histogram.
+
+    Attributes:
+        bounds (tuple): Bucket upper bounds in seconds (plus an implicit +Inf).
+        counts (list[int]): Observations per bucket (not cumulative).
+        count (int): Total observations.
+        sum (float): Sum of observed values.
+        max (float): Largest observed value.
+    """
+
+    __slots__ = ("bounds", "counts", "count", "sum", "max")
+
+    def __init__(self, bounds: Sequence[float] = BUCKETS) -> None:
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        """
+        Record one observation.
+
+        Args:
+            value (float): Seconds (negative values are clamped to 0).
+        """
+        if value < 0:
+            value = 0.0
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+        if value > self.max:
+            self.max = value
+
+    def quantile(self, q: float) -> float:
+        """
+        Estimate a quantile as the upper bound of the bucket that holds it.
+
+        Args:
+            q (float): Quantile in 0–1.
+
+        Returns:
+            float: Seconds (the observed max for the +Inf bucket, 0.0 if
+            empty).
+        """
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, c in enumerate(self.counts):
+            seen += c
+            if seen >= rank and c:
+                return self.bounds[i] if i < len(self.bounds) else self.max
+        return self.max
+
+    def snapshot(self) -> dict:
+        """
+        Summarise the histogram for export.
+
+        Returns:
+            dict: count, sum, max, p50, p90, p99 and the raw bucket counts.
+        """
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "max": self.max,
+            "p50": self.quantile(0.5),
+            "p90": self.quantile(0.9),
+            "p99": self.quantile(0.99),
+            "buckets": dict(zip([*map(str, self.bounds), "+Inf"], self.counts)),
+        }
+
+
+class Metrics:
+    """
+    Registry of the game's histograms and counters, plus exporters.
+
+    Attributes:
+        hist (dict): Name -> Histogram.
+        counters (dict): Name -> int.
+        gauges (dict): Name -> latest value.
+        path (str | None): File the periodic export writes to.
+        every (float): Seconds between periodic exports.
+        started (float): Wall-clock start time (seconds).
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        every: float = EXPORT_EVERY,
+        histograms: Sequence[str] = HISTOGRAMS,
+        counters: Sequence[str] = COUNTERS,
+        gauges: Sequence[str] = GAUGES,
+    ) -> None:
+        """
+        Create an empty registry.
+
+        Args:
+            path (str | None): Export file (".prom" selects Prometheus text).
+            every (float): Seconds between periodic exports.
+            histograms (Sequence[str]): Histogram names to create.
+            counters (Sequence[str]): Counter names to create.
+            gauges (Sequence[str]): Gauge names to create.
+        """
+        self.path = path
+        self.every = every
+        self.hist: Dict[str, Histogram] = {name: Histogram() for name in histograms}
+        self.counters: Dict[str, int] = {name: 0 for name in counters}
+        self.gauges: Dict[str, float] = {name: 0 for name in gauges}
+        self.started = time.time()
+        self._tasks: List[asyncio.Task] = []
+
+    def observe(self, name: str, value: float) -> None:
+        """
+        Record a duration in a histogram.
+
+        Args:
+            name (str): Histogram name.
+            value (float): Seconds.
+        """
+        self.hist[name].observe(value)
+
+    def count(self, name: str, n: int = 1) -> None:
+        """
+        Increase a counter.
+
+        Args:
+            name (str): Counter name.
+            n (int): Amount to add.
+        """
+        self.counters[name] += n
+
+    def gauge(self, name: str, value: float) -> None:
+        """
+        Set a gauge; a "<name>_peak" gauge, if registered, keeps the maximum.
+
+        Args:
+            name (str): Gauge name.
+            value (float): Current value.
+        """
+        g = self.gauges
+        g[name] = value
+        peak = f"{name}_peak"
+        if peak in g and value > g[peak]:
+            g[peak] = value
+
+    def snapshot(self) -> dict:
+        """
+        Build a JSON-ready view of every metric.
+
+        Returns:
+            dict: {"uptime": s, "counters": {...}, "gauges": {...},
+            "histograms": {...}}.
+        """
+        return {
+            "uptime": time.time() - self.started,
+            "counters": dict(self.counters),
+            "gauges": dict(self.gauges),
+            "histograms": {k: h.snapshot() for k, h in self.hist.items()},
+        }
+
+    def prometheus(self, prefix: str = "tag_") -> str:
+        """
+        Render every metric in the Prometheus text exposition format.
+
+        Args:
+            prefix (str): Metric name prefix.
+
+        Returns:
+            str: The exposition text.
+        """
+        lines = []
+        for name, value in self.counters.items():
+            lines.append(f"# TYPE {prefix}{name}_total counter")
+            lines.append(f"{prefix}{name}_total {value}")
+        for name, value in self.gauges.items():
+            lines.append(f"# TYPE {prefix}{name} gauge")
+            lines.append(f"{prefix}{name} {value}")
+        for name, h in self.hist.items():
+            base = f"{prefix}{name}_seconds"
+            lines.append(f"# TYPE {base} histogram")
+            cum = 0
+            for bound, c in zip([*map(repr, h.bounds), "+Inf"], h.counts):
+                cum += c
+                lines.append(f'{base}_bucket{{le="{bound}"}} {cum}')
+            lines.append(f"{base}_sum {h.sum}")
+            lines.append(f"{base}_count {h.count}")
+        return "\n".join(lines) + "\n"
+
+    def export(self, path: Optional[str] = None) -> None:
+        """
+        Write a snapshot to a file atomically (temp file then rename).
+
+        Args:
+            path (str | None): Target file; defaults to `self.path`.
+        """
+        path = path or self.path
+        if not path:
+            return
+        if path.endswith(".prom"):
+            text = self.prometheus()
+        else:
+            text = json.dumps(self.snapshot(), indent=1)
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp, path)
+
+    def overlay(self) -> str:
+        """
+        Format a compact multi-line summary for the in-game overlay.
+
+        Returns:
+            str: One line per histogram (p50/p99/max in ms), a traffic line
+            and a send-queue line.
+        """
+        rows = [
+            f"{name:<12} {h.quantile(0.5) * 1e3:6.2f} {h.quantile(0.99) * 1e3:6.2f} "
+            f"{h.max * 1e3:6.1f}"
+            for name, h in self.hist.items()
+        ]
+        c = self.counters
+        rows.append(
+            f"in {c.get('messages_in', 0)}m/{c.get('bytes_in', 0)}B  "
+            f"out {c.get('messages_out', 0)}m/{c.get('bytes_out', 0)}B"
+        )
+        g = self.gauges
+        rows.append(
+            f"sendq {g.get('send_queue', 0)} peak {g.get('send_queue_peak', 0)}  "
+            f"coalesced {c.get('send_coalesced', 0)}"
+        )
+        head = f"{'ms':<12} {'p50':>6} {'p99':>6} {'max':>6}"
+        return head + "\n" + "\n".join(rows)
+
+    def start(self, probe: float = LAG_PROBE) -> None:
+        """
+        Start the loop-lag probe and the periodic exporter on the running loop.
+
+        Args:
+            probe (float): Loop-lag probe interval in seconds.
+        """
+        self._tasks = [asyncio.create_task(self._probe_lag(probe))]
+        if self.path and self.every > 0:
+            self._tasks.append(asyncio.create_task(self._export_every(self.every)))
+
+    def stop(self) -> None:
+        """
+        Stop background tasks and write a final export.
+        """
+        for t in self._tasks:
+            t.cancel()
+        self._tasks = []
+        try:
+            self.export()
+        except OSError as exc:
+            log.warning("metrics export failed: %s", exc)
+
+    async def _probe_lag(self, interval: float) -> None:
+        clock = time.monotonic
+        lag = self.hist["loop_lag"]
+        while True:
+            t0 = clock()
+            await asyncio.sleep(interval)
+            lag.observe(clock() - t0 - interval)
+
+    async def _export_every(self, every: float) -> None:
+        while True:
+            await asyncio.sleep(every)
+            try:
+                self.export()
+            except OSError as exc:
+                log.warning("metrics export failed: %s", exc)
@@ -0,0 +1,184 @@
+"""
+ASCII Tag Game — Peer Send Queue
+
+Every frame for the peer stream goes through one `PeerWriter`: a bounded
+queue drained by a single writer task per connection. The task joins
+everything queued since its last write into one `write()`, so a game
+tick's output (and any pong answered meanwhile) still leaves together,
+and there is no per-message drain task.
+
+Latest-value frames — `pos`, `ping` and `pong` — hold one slot each: a
+newer one replaces the queued one in place, because only the newest
+position matters and a stale ping would only measure the queue. Control
+frames (`ready`, `win`, ...) are never replaced or dropped.
+
+Backpressure: the transport's write buffer is capped at `high_water`
+bytes. Above it the writer awaits `drain()` (a stall, timed) and
+`congested` tells producers to hold back optional traffic; meanwhile
+positions keep coalescing in their slot. A queue that still grows past
+`limit` frames means the peer stopped reading — the link is aborted
+rather than buffering without bound.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Dict, List, Optional
+
+from metrics import Metrics
+
+log = logging.getLogger("game.outbox")
+
+LATEST_VALUE = ("pos", "ping", "pong")
+HIGH_WATER = 64 * 1024
+SEND_QUEUE = 64
+
+
+class PeerWriter:
+    """
+    Single-writer send queue for one peer stream.
+
+    Attributes:
+        limit (int): Queued frames beyond which the link is aborted.
+        high_water (int): Transport buffer size (bytes) that stalls writing.
+        stalled (bool): True while the writer waits for the buffer to drain.
+        closed (bool): True once the writer has stopped.
+        stats (dict): Counters — frames, writes, bytes, coalesced, stalls,
+                      peak (deepest queue written at once).
+    """
+
+    def __init__(
+        self,
+        writer: asyncio.StreamWriter,
+        metrics: Optional[Metrics] = None,
+        limit: int = SEND_QUEUE,
+        high_water: int = HIGH_WATER,
+    ) -> None:
+        """
+        Wrap a stream writer; call `start()` to run the writer task.
+
+        Args:
+            writer (asyncio.StreamWriter): The peer stream.
+            metrics (Metrics | None): Registry for queue depth and stalls.
+            limit (int): Maximum queued frames.
+            high_water (int): Write buffer limit in bytes.
+        """
+        self.limit = limit
+        self.high_water = high_water
+        self.stalled = False
+        self.closed = False
+        self.stats = {
+            "frames": 0,
+            "writes": 0,
+            "bytes": 0,
+            "coalesced": 0,
+            "stalls": 0,
+            "peak": 0,
+        }
+        self._w = writer
+        self._metrics = metrics
+        self._q: List[list] = []
+        self._slots: Dict[str, list] = {}
+        self._wake = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        writer.transport.set_write_buffer_limits(high=high_water)
+
+    @property
+    def congested(self) -> bool:
+        """bool: True while optional traffic should be held back."""
+        return self.stalled or len(self._q) >= self.limit // 2
+
+    def __len__(self) -> int:
+        return len(self._q)
+
+    def start(self) -> None:
+        """
+        Start the writer task on the running loop.
+        """
+        self._task = asyncio.create_task(self._run())
+
+    def send(self, frame: bytes, key: Optional[str] = None) -> None:
+        """
+        Queue one encoded frame.
+
+        Args:
+            frame (bytes): The frame.
+            key (str | None): Latest-value slot (see LATEST_VALUE); a queued
+                              frame with the same key is replaced.
+        """
+        if self.closed:
+            return
+        if key is not None:
+            slot = self._slots.get(key)
+            if slot is not None:
+                slot[1] = frame
+                self.stats["coalesced"] += 1
+                if self._metrics is not None:
+                    self._metrics.count("send_coalesced")
+                return
+        entry = [key, frame]
+        self._q.append(entry)
+        if key is not None:
+            self._slots[key] = entry
+        if len(self._q) > self.limit:
+            log.error("peer stopped reading: %d frames queued, closing", len(self._q))
+            self.close()
+            return
+        self._wake.set()
+
+    def close(self) -> None:
+        """
+        Stop the writer task and abort the stream; queued frames are lost.
+        """
+        self.closed = True
+        self._q.clear()
+        self._slots.clear()
+        if self._task is not None:
+            self._task.cancel()
+        self._w.transport.abort()
+
+    def summary(self) -> str:
+        """
+        Return a one-line description of the writer counters.
+        """
+        return " ".join(f"{k}={v}" for k, v in self.stats.items())
+
+    async def _run(self) -> None:
+        """
+        Write queued frames in batches until the stream closes.
+        """
+        w = self._w
+        stats = self.stats
+        m = self._metrics
+        try:
+            while not self.closed:
+                if not self._q:
+                    self._wake.clear()
+                    await self._wake.wait()
+                    continue
+                if w.is_closing():
+                    break
+                batch, self._q = self._q, []
+                self._slots.clear()
+                data = b"".join(e[1] for e in batch)
+                w.write(data)
+                stats["frames"] += len(batch)
+                stats["writes"] += 1
+                stats["bytes"] += len(data)
+                if len(batch) > stats["peak"]:
+                    stats["peak"] = len(batch)
+                if m is not None:
+                    m.gauge("send_queue", len(batch))
+                if w.transport.get_write_buffer_size() > self.high_water:
+                    self.stalled = True
+                    t0 = time.perf_counter()
+                    await w.drain()
+                    self.stalled = False
+                    stats["stalls"] += 1
+                    if m is not None:
+                        m.observe("drain_stall", time.perf_counter() - t0)
+        except (ConnectionError, OSError) as exc:
+            log.warning("peer writer: %s", exc)
+        finally:
+            self.closed = True
+            self.stalled = False
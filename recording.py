@@ -0,0 +1,491 @@
+"""
+ASCII Tag Game — Match Recording
+
+With `--record FILE` the client appends every game tick of a match to a
+compact binary file. Replays read it through `mmap` (see `replay.py`).
+Each match of a session gets its own file (see `match_path`).
+
+File layout (network byte order):
+
+    header   "TAGREC1\\n", me u8, w u16, h u16, started f64 (wall s),
+             tick rate f32, keyframe interval u16, map length u32,
+             then the zlib-compressed wall bitmap (`Terrain.bits`)
+    records  one opcode byte followed by:
+               KEY   a KEY body (`keyframes.py`)           full state
+               STEP  a DELTA body                          one tick
+               IDLE  count u16                             ticks with no change
+               MOVES count u8, MOVE_* u8 per input         see below
+               END   an END body
+    index    (tick u32, offset u64) per keyframe, then the footer
+             "TIDX", count u32, index offset u64
+
+Flags as in `keyframes.py` (bit 0/1 — player 0/1 moved, bit 2 — player
+1 is IT), plus bits 4–6 — the (last) MOVE_* input this client consumed
+on the tick. A tick that consumed several inputs (input policy "all")
+is preceded by a MOVES record holding the ones before the last, so
+every input is kept. A tick where nothing changes costs nothing until
+the run ends, so an idle minute is three bytes. A change after `KEY_EVERY`
+records is written as a keyframe instead of a STEP, which bounds a seek
+to that many records after a binary search of the index (an idle run is
+one record however many ticks it covers).
+
+The index and footer are written on `close`. A file cut short (crash,
+kill) has neither; the reader then rebuilds the index with one scan and
+ignores a trailing partial record.
+"""
+
+import mmap
+import os
+import struct
+import time
+import zlib
+from bisect import bisect_right
+from typing import BinaryIO, Dict, List, Optional, Sequence, Tuple, Union
+
+from keyframes import (
+    END,
+    KEY,
+    apply_delta,
+    delta_size,
+    pack_delta,
+    pack_end,
+    pack_key,
+    winner_of,
+)
+from maps import Terrain
+
+MAGIC = b"TAGREC1\n"
+HEAD = struct.Struct("!8sBHHdfHI")
+IDLE = struct.Struct("!BH")
+ENTRY = struct.Struct("!IQ")
+FOOTER = struct.Struct("!4sIQ")
+FOOT_MAGIC = b"TIDX"
+
+OP_KEY = 1
+OP_STEP = 2
+OP_IDLE = 3
+OP_END = 4
+OP_MOVES = 5
+
+KEY_EVERY = 256
+_MAX_IDLE = 0xFFFF
+_MAX_MOVES = 0xFF
+
+
+def match_path(path: str, n: int) -> str:
+    """
+    File name for the `n`-th match recorded in one session.
+
+    The first match is written to `path` itself, later ones get "-2",
+    "-3", ... before the extension (match.tagrec, match-2.tagrec).
+
+    Args:
+        path (str): The `--record` file.
+        n (int): Match number, starting at 1.
+
+    Returns:
+        str: The file to record match `n` to.
+    """
+    if n <= 1:
+        return path
+    root, ext = os.path.splitext(path)
+    return f"{root}-{n}{ext}"
+
+
+class Recorder:
+    """
+    Append-only writer for one match.
+
+    Attributes:
+        path (str): File being written.
+        ticks (int): Last tick recorded.
+        keyframes (list): (tick, offset) of every keyframe written.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        terrain: Terrain,
+        me: int,
+        tick_rate: float,
+        key_every: int = KEY_EVERY,
+    ) -> None:
+        """
+        Create (truncate) the file and write the header.
+
+        Args:
+            path (str): Output file.
+            terrain (Terrain): The arena, stored so replays can draw walls.
+            me (int): Index of the recording player (0 = caller).
+            tick_rate (float): Ticks per second, for real-time playback.
+            key_every (int): Records between keyframes.
+        """
+        self.path = path
+        self.key_every = key_every
+        walls = zlib.compress(bytes(terrain.bits))
+        self._f: BinaryIO = open(path, "wb")
+        self._f.write(
+            HEAD.pack(
+                MAGIC,
+                me,
+                terrain.w,
+                terrain.h,
+                time.time(),
+                tick_rate,
+                key_every,
+                len(walls),
+            )
+        )
+        self._f.write(walls)
+        self._off = HEAD.size + len(walls)
+        self._last: Optional[Tuple[int, int, int, int, int]] = None
+        self._since_key = 0
+        self._idle = 0
+        self.ticks = 0
+        self.keyframes: List[Tuple[int, int]] = []
+
+    def _put(self, data: bytes) -> None:
+        self._f.write(data)
+        self._off += len(data)
+        self._since_key += 1
+
+    def _flush_idle(self) -> None:
+        while self._idle:
+            n = min(self._idle, _MAX_IDLE)
+            self._put(IDLE.pack(OP_IDLE, n))
+            self._idle -= n
+
+    def tick(
+        self,
+        n: int,
+        xs: Sequence[int],
+        ys: Sequence[int],
+        it: int,
+        move: Union[int, Sequence[int]] = 0,
+    ) -> None:
+        """
+        Record the state after tick `n`.
+
+        Args:
+            n (int): Tick number (increasing; skipped numbers count as idle).
+            xs (Sequence[int]): Column of players 0 and 1.
+            ys (Sequence[int]): Row of players 0 and 1.
+            it (int): Index of the player who is IT.
+            move (int | Sequence[int]): MOVE_* input consumed on this tick
+                (0 for none), or every input it consumed, oldest first.
+        """
+        if n <= self.ticks:
+            return
+        if self.ticks:
+            self._idle += n - self.ticks - 1
+        self.ticks = n
+        earlier: Sequence[int] = ()
+        if not isinstance(move, int):
+            earlier, move = move[-_MAX_MOVES - 1 : -1], move[-1] if move else 0
+        cur = (xs[0], ys[0], xs[1], ys[1], it)
+        last = self._last
+        if last is not None and cur == last and not move:
+            self._idle += 1
+            return
+        self._flush_idle()
+        self._last = cur
+        at = self._off
+        if earlier:
+            self._put(bytes((OP_MOVES, len(earlier), *earlier)))
+        if last is None or self._since_key >= self.key_every:
+            self.keyframes.append((n, at))
+            self._put(bytes((OP_KEY,)) + pack_key(n, cur, move << 4))
+            self._since_key = 0
+            return
+        self._put(bytes((OP_STEP,)) + pack_delta(cur, last, move << 4))
+
+    def close(self, winner: Optional[int] = None) -> None:
+        """
+        Write the end marker, the keyframe index and the footer.
+
+        Args:
+            winner (int | None): Index of the winning player, if decided.
+        """
+        if self._f.closed:
+            return
+        self._flush_idle()
+        self._put(bytes((OP_END,)) + pack_end(self.ticks, winner))
+        index_at = self._off
+        for entry in self.keyframes:
+            self._f.write(ENTRY.pack(*entry))
+        self._f.write(FOOTER.pack(FOOT_MAGIC, len(self.keyframes), index_at))
+        self._f.close()
+
+
+class Playhead:
+    """
+    Replay position within a recording.
+
+    Attributes:
+        tick (int): Tick the state below belongs to (0 before the first).
+        xs (list[int]): Column of players 0 and 1.
+        ys (list[int]): Row of players 0 and 1.
+        it (int): Index of the player who is IT.
+        move (int): Input recorded on `tick` (0 if none), the last one if
+            it consumed several.
+        moves (tuple): Every input recorded on `tick`, oldest first.
+    """
+
+    __slots__ = ("rec", "tick", "xs", "ys", "it", "move", "moves", "_off", "_idle")
+
+    def __init__(self, rec: "Recording") -> None:
+        self.rec = rec
+        self.tick = 0
+        self.xs = [0, 0]
+        self.ys = [0, 0]
+        self.it = 0
+        self.move = 0
+        self.moves: Tuple[int, ...] = ()
+        self._off = rec.data_start
+        self._idle = 0
+
+    def seek(self, tick: int) -> "Playhead":
+        """
+        Jump to the state at `tick` via the nearest keyframe at or before it.
+
+        Args:
+            tick (int): Target tick (clamped to the recording).
+
+        Returns:
+            Playhead: self, for chaining.
+        """
+        keys = self.rec.keyframes
+        if not keys:
+            return self
+        i = max(0, bisect_right(self.rec.key_ticks, tick) - 1)
+        k, off = keys[i]
+        tick = max(tick, k)
+        if not k <= self.tick <= tick:
+            self._off = off
+            self._idle = 0
+            self.tick = k - 1
+        return self.advance(tick)
+
+    def advance(self, tick: int) -> "Playhead":
+        """
+        Play forward until the state at `tick` (or the end) is reached.
+
+        Args:
+            tick (int): Target tick; earlier than the current one is a no-op.
+
+        Returns:
+            Playhead: self, for chaining.
+        """
+        buf = self.rec.buf
+        end = self.rec.data_end
+        off = self._off
+        t = self.tick
+        xs, ys = self.xs, self.ys
+        earlier: Tuple[int, ...] = ()
+        while t < tick:
+            if self._idle:
+                n = min(self._idle, tick - t)
+                t += n
+                self._idle -= n
+                self.move, self.moves = 0, ()
+                continue
+            if off >= end:
+                break
+            op = buf[off]
+            if op == OP_STEP:
+                flags, off = apply_delta(buf, off + 1, xs, ys)
+                t += 1
+            elif op == OP_IDLE:
+                self._idle = IDLE.unpack_from(buf, off)[1]
+                off += IDLE.size
+                continue
+            elif op == OP_MOVES:
+                count = buf[off + 1]
+                earlier = tuple(buf[off + 2 : off + 2 + count])
+                off += 2 + count
+                continue
+            elif op == OP_KEY:
+                t, xs[0], ys[0], xs[1], ys[1], flags = KEY.unpack_from(buf, off + 1)
+                off += 1 + KEY.size
+            else:  # OP_END
+                break
+            self.it = flags >> 2 & 1
+            self.move = flags >> 4 & 7
+            self.moves = earlier + (self.move,) if self.move else ()
+            earlier = ()
+        self._off = off
+        self.tick = t
+        return self
+
+
+class Recording:
+    """
+    Memory-mapped, read-only view of a recorded match.
+
+    Attributes:
+        path (str): The file.
+        me (int): Index of the player who recorded it.
+        terrain (Terrain): The arena.
+        started (float): Wall-clock start (seconds since the epoch).
+        tick_rate (float): Ticks per second during the match.
+        keyframes (list): (tick, offset) per keyframe.
+        last_tick (int): Final tick recorded.
+        winner (int | None): Winner from the end marker, if any.
+        complete (bool): True if the file has its index (closed cleanly).
+    """
+
+    def __init__(self, path: str) -> None:
+        """
+        Open and map a recording.
+
+        Args:
+            path (str): Recording file.
+
+        Raises:
+            ValueError: If the file is not a recording.
+        """
+        self.path = path
+        self._file = open(path, "rb")
+        self.buf = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self.buf) < HEAD.size:
+            raise ValueError(f"{path}: not a match recording")
+        magic, self.me, w, h, self.started, self.tick_rate, self.key_every, size = (
+            HEAD.unpack_from(self.buf, 0)
+        )
+        if magic != MAGIC:
+            raise ValueError(f"{path}: not a match recording")
+        self.terrain = Terrain(w, h)
+        self.terrain.bits[:] = zlib.decompress(self.buf[HEAD.size : HEAD.size + size])
+        self.data_start = HEAD.size + size
+        self.winner: Optional[int] = None
+        self.complete = self._read_index()
+        if not self.complete:
+            self._scan_index()
+        self.key_ticks = [k[0] for k in self.keyframes]
+
+    def __enter__(self) -> "Recording":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """
+        Unmap and close the file.
+        """
+        self.buf.close()
+        self._file.close()
+
+    def _read_index(self) -> bool:
+        buf = self.buf
+        if len(buf) < self.data_start + FOOTER.size:
+            return False
+        magic, count, at = FOOTER.unpack_from(buf, len(buf) - FOOTER.size)
+        if magic != FOOT_MAGIC or at + count * ENTRY.size + FOOTER.size != len(buf):
+            return False
+        self.keyframes = [
+            ENTRY.unpack_from(buf, at + i * ENTRY.size) for i in range(count)
+        ]
+        self.data_end = at
+        self.last_tick, winner = END.unpack_from(buf, at - END.size)
+        self.winner = winner_of(winner)
+        return True
+
+    def _scan_index(self) -> None:
+        buf = self.buf
+        off, end, t = self.data_start, len(buf), 0
+        keys: List[Tuple[int, int]] = []
+        moves_at = None  # offset of a MOVES record ahead of the next tick
+        while off < end:
+            op = buf[off]
+            if op == OP_MOVES:
+                if off + 2 > end or off + 2 + buf[off + 1] > end:
+                    break
+                moves_at = off
+                off += 2 + buf[off + 1]
+                continue
+            if op == OP_KEY:
+                if off + 1 + KEY.size > end:
+                    break
+                t = KEY.unpack_from(buf, off + 1)[0]
+                keys.append((t, off if moves_at is None else moves_at))
+                size = 1 + KEY.size
+            elif op == OP_STEP:
+                flags = buf[off + 1] if off + 1 < end else 0
+                size = 1 + delta_size(flags)
+                t += 1
+            elif op == OP_IDLE:
+                if off + IDLE.size > end:
+                    break
+                t += IDLE.unpack_from(buf, off)[1]
+                size = IDLE.size
+            elif op == OP_END and off + 1 + END.size <= end:
+                t, winner = END.unpack_from(buf, off + 1)
+                self.winner = winner_of(winner)
+                off += 1 + END.size
+                break
+            else:
+                break
+            if off + size > end:
+                t -= op == OP_STEP
+                break
+            off += size
+            moves_at = None
+        self.keyframes = keys
+        self.data_end = off if moves_at is None else moves_at
+        self.last_tick = t
+
+    def playhead(self, tick: int = 0) -> Playhead:
+        """
+        Create a playhead positioned at `tick`.
+
+        Args:
+            tick (int): Starting tick (0: before the first).
+
+        Returns:
+            Playhead: The replay position.
+        """
+        return Playhead(self).seek(tick) if tick else Playhead(self)
+
+    def summary(self) -> Dict[str, object]:
+        """
+        Walk the whole match once and collect statistics.
+
+        Returns:
+            dict: ticks, seconds, moves per player, inputs, keyframes,
+            winner and the file size in bytes.
+        """
+        buf, off, end = self.buf, self.data_start, self.data_end
+        moves = [0, 0]
+        inputs = 0
+        ticks = 0
+        while off < end:
+            op = buf[off]
+            if op == OP_STEP:
+                flags = buf[off + 1]
+                moves[0] += flags & 1
+                moves[1] += flags >> 1 & 1
+                inputs += flags >> 4 != 0
+                off += 1 + delta_size(flags)
+                ticks += 1
+            elif op == OP_IDLE:
+                ticks += IDLE.unpack_from(buf, off)[1]
+                off += IDLE.size
+            elif op == OP_KEY:
+                ticks, _, _, _, _, flags = KEY.unpack_from(buf, off + 1)
+                inputs += flags >> 4 != 0
+                off += 1 + KEY.size
+            elif op == OP_MOVES:
+                inputs += buf[off + 1]
+                off += 2 + buf[off + 1]
+            else:
+                break
+        return {
+            "ticks": ticks,
+            "seconds": ticks / self.tick_rate if self.tick_rate else 0.0,
+            "moves": moves,
+            "inputs": inputs,
+            "keyframes": len(self.keyframes),
+            "winner": self.winner,
+            "bytes": len(buf),
+        }
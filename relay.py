@@ -0,0 +1,263 @@
+"""
+ASCII Tag Game — Relay Server
+
+A TURN-like fallback for peers that cannot reach each other directly
+(typically because of NAT). Both peers open an outbound TCP connection to
+the relay and send one line naming a shared session token:
+
+    RELAY1 <token>\\n
+
+When the second peer with the same token arrives the relay answers both
+with `OK\\n` and from then on forwards raw bytes between them. Game
+frames are not parsed or re-encoded: each connection reads into its own
+preallocated buffer (`asyncio.BufferedProtocol`) and hands a memoryview
+of the received bytes straight to the partner's transport (a fresh
+buffer is swapped in only if the transport kept a reference to unsent
+bytes). If the partner falls behind, reading from the sender is paused until the
+partner's buffer drains, so memory per match stays bounded.
+
+Unpaired tokens expire after `PAIR_TIMEOUT` seconds.
+
+Usage:
+    python relay.py [--host 0.0.0.0] [--port 3478]
+"""
+
+import argparse
+import asyncio
+import logging
+import secrets
+from typing import Dict, Optional, Tuple
+
+log = logging.getLogger("relay")
+
+MAGIC = b"RELAY1 "
+OK = b"OK\n"
+BUF_SIZE = 4096
+MAX_HELLO = 80
+PAIR_TIMEOUT = 60.0
+
+
+def new_token() -> str:
+    """
+    Generate a random session token for a relayed match.
+
+    Returns:
+        str: 32 hex characters.
+    """
+    return secrets.token_hex(16)
+
+
+def parse_addr(text: str, default_port: int = 3478) -> Tuple[str, int]:
+    """
+    Parse a "host[:port]" relay address (":port" means localhost).
+
+    Args:
+        text (str): e.g. "relay.example.com:3478".
+        default_port (int): Port used when none is given.
+
+    Returns:
+        tuple: (host, port).
+    """
+    host, sep, port = text.rpartition(":")
+    if not sep:
+        return text, default_port
+    return host or "localhost", int(port)
+
+
+class _Leg(asyncio.BufferedProtocol):
+    """
+    One side of a relayed match.
+    """
+
+    __slots__ = ("relay", "transport", "peer", "buf", "view", "hello", "token", "timer")
+
+    def __init__(self, relay: "Relay") -> None:
+        self.relay = relay
+        self.transport: Optional[asyncio.Transport] = None
+        self.peer: Optional["_Leg"] = None
+        self.buf = bytearray(BUF_SIZE)
+        self.view = memoryview(self.buf)
+        self.hello = bytearray()
+        self.token: Optional[bytes] = None
+        self.timer: Optional[asyncio.TimerHandle] = None
+
+    def connection_made(self, transport) -> None:  # type: ignore[override]
+        self.transport = transport
+        self.relay.legs += 1
+
+    def get_buffer(self, sizehint: int):
+        return self.view
+
+    def buffer_updated(self, nbytes: int) -> None:
+        peer = self.peer
+        if peer is not None:
+            t = peer.transport
+            t.write(self.view[:nbytes])  # type: ignore[union-attr]
+            if t.get_write_buffer_size():  # type: ignore[union-attr]
+                self.buf = bytearray(BUF_SIZE)
+                self.view = memoryview(self.buf)
+            self.relay.bytes += nbytes
+            return
+        self.hello += self.view[:nbytes]
+        if b"\n" in self.hello:
+            line, _, rest = bytes(self.hello).partition(b"\n")
+            self.hello = bytearray(rest)
+            self.relay.register(self, line)
+        elif len(self.hello) > MAX_HELLO:
+            self.transport.close()  # type: ignore[union-attr]
+
+    def pause_writing(self) -> None:
+        if self.peer is not None:
+            self.peer.transport.pause_reading()  # type: ignore[union-attr]
+
+    def resume_writing(self) -> None:
+        if self.peer is not None:
+            self.peer.transport.resume_reading()  # type: ignore[union-attr]
+
+    def connection_lost(self, exc: Optional[Exception]) -> None:
+        self.relay.legs -= 1
+        self.relay.unregister(self)
+        peer, self.peer = self.peer, None
+        if peer is not None:
+            peer.peer = None
+            peer.transport.close()  # type: ignore[union-attr]
+
+
+class Relay:
+    """
+    Token-paired TCP byte relay.
+
+    Attributes:
+        waiting (dict): Token -> the leg waiting for its partner.
+        legs (int): Open connections.
+        pairs (int): Matches paired since start.
+        bytes (int): Payload bytes forwarded since start.
+    """
+
+    def __init__(self, pair_timeout: float = PAIR_TIMEOUT) -> None:
+        self.pair_timeout = pair_timeout
+        self.waiting: Dict[bytes, _Leg] = {}
+        self.legs = 0
+        self.pairs = 0
+        self.bytes = 0
+
+    async def start(self, host: str = "0.0.0.0", port: int = 3478):
+        """
+        Start listening.
+
+        Args:
+            host (str): Interface to bind.
+            port (int): Port to bind, 0 for an OS-assigned one.
+
+        Returns:
+            asyncio.AbstractServer: The listening server.
+        """
+        loop = asyncio.get_event_loop()
+        return await loop.create_server(lambda: _Leg(self), host, port)
+
+    def register(self, leg: _Leg, line: bytes) -> None:
+        if not line.startswith(MAGIC):
+            leg.transport.close()  # type: ignore[union-attr]
+            return
+        token = line[len(MAGIC) :].strip()
+        other = self.waiting.pop(token, None)
+        if other is None:
+            leg.token = token
+            self.waiting[token] = leg
+            leg.timer = asyncio.get_event_loop().call_later(
+                self.pair_timeout, leg.transport.close  # type: ignore[union-attr]
+            )
+            return
+        if other.timer is not None:
+            other.timer.cancel()
+        other.token = None
+        leg.peer, other.peer = other, leg
+        self.pairs += 1
+        for side in (other, leg):
+            side.transport.write(OK)  # type: ignore[union-attr]
+        for side, pending in ((leg, leg.hello), (other, other.hello)):
+            if pending:
+                side.peer.transport.write(bytes(pending))  # type: ignore[union-attr]
+                pending.clear()
+
+    def unregister(self, leg: _Leg) -> None:
+        if leg.timer is not None:
+            leg.timer.cancel()
+        if leg.token is not None and self.waiting.get(leg.token) is leg:
+            del self.waiting[leg.token]
+
+
+async def open_relayed(
+    host: str, port: int, token: str
+) -> Tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+    """
+    Connect to a relay and wait until the partner with `token` arrives.
+
+    Args:
+        host (str): Relay address.
+        port (int): Relay port.
+        token (str): Session token shared with the partner.
+
+    Returns:
+        tuple: (reader, writer) for the relayed stream.
+
+    Raises:
+        ConnectionError: If the relay closed without pairing.
+    """
+    r, w = await asyncio.open_connection(host, port)
+    try:
+        w.write(MAGIC + token.encode() + b"\n")
+        if await r.readline() != OK:
+            raise ConnectionError("relay closed before pairing")
+    except BaseException:
+        w.close()
+        raise
+    return r, w
+
+
+async def serve(host: str, port: int, stats_every: float = 10.0) -> None:
+    """
+    Run the relay forever.
+
+    Args:
+        host (str): Interface to bind.
+        port (int): Port to listen on.
+        stats_every (float): Seconds between stats log lines (0 disables).
+    """
+    relay = Relay()
+    srv = await relay.start(host, port)
+    log.info("relay on %s:%d", host, port)
+    async with srv:
+        while True:
+            await asyncio.sleep(stats_every or 3600)
+            if stats_every:
+                log.info(
+                    "legs=%d waiting=%d pairs=%d bytes=%d",
+                    relay.legs,
+                    len(relay.waiting),
+                    relay.pairs,
+                    relay.bytes,
+                )
+
+
+def main() -> None:
+    """
+    Parse command-line arguments and run the relay.
+
+    CLI Args:
+        --host (str): Interface to bind. Defaults to "0.0.0.0".
+        --port (int): Port to listen on. Defaults to 3478.
+    """
+    ap = argparse.ArgumentParser(description="ASCII Tag relay server")
+    ap.add_argument("--host", default="0.0.0.0")
+    ap.add_argument("--port", type=int, default=3478)
+    args = ap.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+    try:
+        asyncio.run(serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
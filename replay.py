@@ -0,0 +1,91 @@
+"""
+ASCII Tag Game — Replay
+
+Plays back a match recorded with `python main.py --record FILE`. The file
+is memory-mapped, so opening even a long recording costs only the header
+and its keyframe index.
+
+Usage:
+    python replay.py match.tagrec                  # watch at recorded speed
+    python replay.py match.tagrec --speed 8 --seek 1200
+    python replay.py match.tagrec --headless       # statistics, no terminal UI
+    python replay.py match.tagrec --headless --json
+
+Headless mode never imports Textual: it walks every record once and
+prints the match statistics and the replay rate, for analytics or to
+check a recording in a regression test.
+"""
+
+import argparse
+import json
+import sys
+import time
+
+from recording import Recording
+
+
+def headless(rec: Recording, as_json: bool = False) -> dict:
+    """
+    Replay a recording without a UI and report what happened.
+
+    Args:
+        rec (Recording): The recording.
+        as_json (bool): Print JSON instead of a table.
+
+    Returns:
+        dict: The statistics from `Recording.summary`, plus the replay
+        rate in ticks per second.
+    """
+    t0 = time.perf_counter()
+    stats = rec.summary()
+    took = time.perf_counter() - t0
+    stats["replay_ticks_per_s"] = stats["ticks"] / took if took else 0.0
+    if as_json:
+        print(json.dumps(stats))
+        return stats
+    winner = stats["winner"]
+    print(f"{rec.path}: {rec.terrain.w}x{rec.terrain.h}, {rec.tick_rate:g} Hz")
+    print(f"  ticks      {stats['ticks']} ({stats['seconds']:.1f} s)")
+    print(f"  moves      caller {stats['moves'][0]}  callee {stats['moves'][1]}")
+    print(f"  inputs     {stats['inputs']} (recorded by player {rec.me})")
+    print(f"  winner     {'-' if winner is None else ('caller', 'callee')[winner]}")
+    print(f"  file       {stats['bytes']} bytes, {stats['keyframes']} keyframes")
+    print(f"  replayed   {stats['replay_ticks_per_s'] / 1e6:.1f} M ticks/s")
+    return stats
+
+
+def main() -> None:
+    """
+    Parse command-line arguments and replay a recording.
+
+    CLI Args:
+        file (str): Recording to open.
+        --speed (float): Playback speed multiplier. Defaults to 1.
+        --seek (int): Tick to start from. Defaults to the first.
+        --headless: Print statistics instead of opening the viewer.
+        --json: With --headless, print the statistics as JSON.
+    """
+    ap = argparse.ArgumentParser(description="ASCII Tag match replay")
+    ap.add_argument("file")
+    ap.add_argument("--speed", type=float, default=1.0, metavar="X")
+    ap.add_argument("--seek", type=int, default=0, metavar="TICK")
+    ap.add_argument("--headless", action="store_true")
+    ap.add_argument("--json", action="store_true")
+    args = ap.parse_args()
+    try:
+        rec = Recording(args.file)
+    except (OSError, ValueError) as exc:
+        ap.error(str(exc))
+    with rec:
+        if args.headless:
+            headless(rec, args.json)
+            return
+        try:
+            from viewer import ReplayApp
+        except ImportError as e:
+            sys.exit(f"Missing dep: {e}\n  pip install textual")
+        ReplayApp(rec, max(args.speed, 1 / 16), args.seek).run()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+"""
+ASCII Tag Game — Schedulers
+
+`RenderScheduler` coalesces repaint requests so the screen is flushed at
+most once per display frame, no matter how many game ticks or peer
+messages asked for a refresh in between.
+
+`TickScheduler` runs the fixed-timestep game loop. Tick `n` is due at
+`start + n * period` on the monotonic clock, so the time spent inside a
+tick never stretches the period and two peers at the same rate stay in
+step.
+"""
+
+import asyncio
+import time
+from typing import Awaitable, Callable, Optional
+
+MAX_CATCHUP = 3
+
+
+class RenderScheduler:
+    """
+    Frame-rate-capped, coalescing trigger for a paint callback.
+
+    `request()` marks the display dirty. The first request after a flush
+    schedules one paint for the start of the next frame slot; further
+    requests before then are absorbed. An urgent request paints at once
+    and cancels any pending scheduled paint.
+
+    Attributes:
+        max_fps (float): Frame cap; 0 or less paints on every request.
+        requested (int): Number of refresh requests received.
+        performed (int): Number of paints actually executed.
+    """
+
+    def __init__(self, paint: Callable[[], None], max_fps: float = 60.0) -> None:
+        """
+        Initialise the scheduler.
+
+        Args:
+            paint (Callable): Zero-argument callback that repaints the UI.
+            max_fps (float): Maximum paints per second.
+        """
+        self.paint = paint
+        self.max_fps = max_fps
+        self.requested = 0
+        self.performed = 0
+        self._interval = 1.0 / max_fps if max_fps > 0 else 0.0
+        self._last = 0.0
+        self._handle: Optional[asyncio.TimerHandle] = None
+
+    def request(self, urgent: bool = False) -> None:
+        """
+        Ask for a repaint.
+
+        Args:
+            urgent (bool): Paint immediately instead of at the next frame slot.
+        """
+        self.requested += 1
+        if urgent or self._interval == 0.0:
+            self.flush()
+            return
+        if self._handle is not None:
+            return
+        delay = self._last + self._interval - time.monotonic()
+        self._handle = asyncio.get_event_loop().call_later(max(0.0, delay), self.flush)
+
+    def flush(self) -> None:
+        """
+        Paint now and clear any pending scheduled paint.
+        """
+        self.cancel()
+        self._last = time.monotonic()
+        self.performed += 1
+        self.paint()
+
+    def cancel(self) -> None:
+        """
+        Drop a pending scheduled paint, if any.
+        """
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+
+
+class TickScheduler:
+    """
+    Drift-free fixed-timestep loop with numbered ticks.
+
+    Each tick is awaited against an absolute deadline rather than a
+    relative sleep. A tick that starts late is still run; if the loop
+    falls more than `max_catchup` periods behind (a long GC pause, a
+    suspended laptop), the excess ticks are skipped explicitly — their
+    numbers are consumed and counted, so tick numbers keep tracking
+    elapsed time — and the remaining backlog is run back to back.
+
+    Attributes:
+        rate (float): Ticks per second.
+        period (float): Seconds per tick.
+        tick (int): Number of the last tick run (ticks start at 1).
+        overruns (int): Ticks whose step took longer than one period.
+        skipped (int): Tick numbers dropped while catching up.
+        jitter (float): Smoothed lateness of tick starts, in seconds.
+        max_late (float): Largest lateness of a tick start, in seconds.
+    """
+
+    def __init__(
+        self,
+        step: Callable[[int], Awaitable[None]],
+        rate: float,
+        max_catchup: int = MAX_CATCHUP,
+    ) -> None:
+        """
+        Initialise the scheduler.
+
+        Args:
+            step (Callable): Coroutine function called with each tick number.
+            rate (float): Ticks per second (must be positive).
+            max_catchup (int): Late ticks run back to back before skipping.
+
+        Raises:
+            ValueError: If `rate` is not positive.
+        """
+        if rate <= 0:
+            raise ValueError(f"tick rate must be positive, got {rate}")
+        self.step = step
+        self.rate = rate
+        self.period = 1.0 / rate
+        self.max_catchup = max_catchup
+        self.tick = 0
+        self.overruns = 0
+        self.skipped = 0
+        self.jitter = 0.0
+        self.max_late = 0.0
+
+    async def run(self, running: Callable[[], bool]) -> None:
+        """
+        Run ticks until `running()` returns False.
+
+        Args:
+            running (Callable): Checked before every tick.
+        """
+        period = self.period
+        clock = time.monotonic
+        deadline = clock() + period
+        while running():
+            delay = deadline - clock()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            else:
+                await asyncio.sleep(0)
+            if not running():
+                break
+
+            start = clock()
+            late = start - deadline
+            behind = int(late / period)
+            if behind > self.max_catchup:
+                drop = behind - self.max_catchup
+                self.skipped += drop
+                self.tick += drop
+                deadline += drop * period
+                late = start - deadline
+            self.jitter += (late - self.jitter) / 16
+            self.max_late = max(self.max_late, late)
+
+            self.tick += 1
+            await self.step(self.tick)
+            if clock() - start > period:
+                self.overruns += 1
+            deadline += period
+
+    def summary(self) -> str:
+        """
+        Format the counters for logs.
+
+        Returns:
+            str: e.g. "ticks=120 rate=8.3Hz overruns=0 skipped=0 jitter=0.4ms".
+        """
+        return (
+            f"ticks={self.tick} rate={self.rate:.1f}Hz overruns={self.overruns} "
+            f"skipped={self.skipped} jitter={self.jitter * 1000:.1f}ms "
+            f"max_late={self.max_late * 1000:.1f}ms"
+        )
@@ -0,0 +1,281 @@
+"""
+ASCII Tag Game — Signaling Server
+
+Reference matchmaking/signaling server for the TUI client. Speaks the
+protocol `Game._signaling` expects:
+  - 'waiting'   — sent on connect while no opponent is queued.
+  - 'matched'   — sent to both clients of a new pair with role
+                  "caller" (first in the queue) or "callee".
+  - anything a matched client sends (e.g. 'ice-candidate') is forwarded
+    verbatim to its partner, without re-encoding.
+  - 'peer-left' — sent to the partner when one side disconnects.
+  - 'queue'     — from a client: leave the current partner (who gets
+                  'peer-left') and wait for a new one on the same
+                  connection. Clients stay connected between matches.
+                  The partner just left is skipped while anyone else
+                  is waiting, so 'queue' finds a new opponent.
+
+N-player (star) matches: a client that connects with `?players=N`
+(N > 2) waits in the lobby for N instead of the pair queue. When the
+lobby is full every member gets 'matched' with "players": N and its
+"seat"; seat 0 is the "caller" and hosts. The host's messages are
+forwarded to every member and each member's to the host. When the host
+leaves, every member gets 'peer-left'; a member leaving only drops out
+of the host's group (the host sees the TCP link close instead).
+
+Built to hold 10k+ idle WebSocket connections in one process: matching
+takes the head of an insertion-ordered queue (at most one entry is
+skipped), each client costs one `Session` with `__slots__`,
+per-message compression is off and the WebSocket read/write buffers
+are kept small. Raise the open-file limit (`ulimit -n`) accordingly.
+
+Usage:
+    python server.py [--host 0.0.0.0] [--port 8080]
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+from collections import OrderedDict
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs, urlsplit
+
+try:
+    import websockets
+except ImportError as e:
+    raise SystemExit(f"Missing dep: {e}\n  pip install websockets")
+
+log = logging.getLogger("server")
+
+MSG_WAITING = json.dumps({"type": "waiting"})
+MSG_CALLER = json.dumps({"type": "matched", "role": "caller"})
+MSG_CALLEE = json.dumps({"type": "matched", "role": "callee"})
+MSG_PEER_LEFT = json.dumps({"type": "peer-left"})
+QUEUE = "queue"
+MAX_PLAYERS = 64
+
+WS_OPTIONS = dict(
+    compression=None,
+    max_size=4096,
+    max_queue=4,
+    read_limit=4096,
+    write_limit=4096,
+    ping_interval=20,
+    ping_timeout=20,
+)
+
+
+class Session:
+    """
+    Per-connection state: the socket and, once matched, the partner.
+
+    Attributes:
+        ws: The client's WebSocket connection.
+        peer (Session | None): The matched partner (a star member's
+            host), if any.
+        last (Session | None): The most recent partner, kept after the
+            pair splits so a requeue does not pair the two again.
+        size (int): Players per match this client asked for.
+        group (list[Session] | None): A star host's members.
+    """
+
+    __slots__ = ("ws", "peer", "last", "size", "group")
+
+    def __init__(self, ws, size: int = 2) -> None:
+        self.ws = ws
+        self.peer: Optional["Session"] = None
+        self.last: Optional["Session"] = None
+        self.size = size
+        self.group: Optional[List["Session"]] = None
+
+
+class Matchmaker:
+    """
+    Pairs clients in arrival order and relays messages within each pair.
+
+    Attributes:
+        queue (OrderedDict): Waiting sessions, oldest first.
+        lobbies (dict): Waiting star sessions per match size, oldest first.
+        online (int): Connected clients.
+        matches (int): Pairs formed since start.
+    """
+
+    def __init__(self) -> None:
+        self.queue: "OrderedDict[Session, None]" = OrderedDict()
+        self.lobbies: Dict[int, "OrderedDict[Session, None]"] = {}
+        self.online = 0
+        self.matches = 0
+
+    async def handler(self, ws) -> None:
+        """
+        Serve one client connection from connect to disconnect.
+
+        Args:
+            ws: The accepted WebSocket connection.
+        """
+        s = Session(ws, _players(ws))
+        self.online += 1
+        try:
+            await self._enqueue(s)
+            async for raw in ws:
+                if QUEUE in raw and _kind(raw) == QUEUE:
+                    await self._requeue(s)
+                    continue
+                if s.group:
+                    for m in s.group:
+                        await _send(m.ws, raw)
+                    continue
+                peer = s.peer
+                if peer is not None:
+                    await _send(peer.ws, raw)
+        except websockets.ConnectionClosed:
+            pass
+        finally:
+            self.online -= 1
+            await self._leave(s)
+            s.last = None
+
+    async def _enqueue(self, s: Session) -> None:
+        if s.size > 2:
+            await self._enqueue_star(s)
+            return
+        other = None
+        for cand in self.queue:
+            other = cand
+            if cand is not s.last:
+                break
+        if other is not None:
+            del self.queue[other]
+            other.peer, s.peer = s, other
+            other.last, s.last = s, other
+            self.matches += 1
+            await _send(other.ws, MSG_CALLER)
+            await _send(s.ws, MSG_CALLEE)
+        else:
+            self.queue[s] = None
+            await _send(s.ws, MSG_WAITING)
+
+    async def _enqueue_star(self, s: Session) -> None:
+        lobby = self.lobbies.setdefault(s.size, OrderedDict())
+        lobby[s] = None
+        if len(lobby) < s.size:
+            await _send(s.ws, MSG_WAITING)
+            return
+        members = list(lobby)
+        lobby.clear()
+        host = members[0]
+        host.group = members[1:]
+        for m in host.group:
+            m.peer = host
+        self.matches += 1
+        for seat, m in enumerate(members):
+            role = "caller" if seat == 0 else "callee"
+            msg = {"type": "matched", "role": role, "players": s.size, "seat": seat}
+            await _send(m.ws, json.dumps(msg))
+
+    async def _requeue(self, s: Session) -> None:
+        if s in self.queue or s in self.lobbies.get(s.size, ()):
+            return
+        await self._leave(s)
+        await self._enqueue(s)
+
+    async def _leave(self, s: Session) -> None:
+        self.queue.pop(s, None)
+        lobby = self.lobbies.get(s.size)
+        if lobby:
+            lobby.pop(s, None)
+        if s.group is not None:
+            members, s.group = s.group, None
+            for m in members:
+                m.peer = None
+                await _send(m.ws, MSG_PEER_LEFT)
+            return
+        peer = s.peer
+        if peer is not None and peer.group is not None:
+            s.peer = None
+            if s in peer.group:
+                peer.group.remove(s)
+        elif peer is not None:
+            s.peer = peer.peer = None
+            await _send(peer.ws, MSG_PEER_LEFT)
+
+
+def _players(ws) -> int:
+    """
+    Return the match size a client asked for in its URL (`?players=N`).
+
+    Args:
+        ws: The accepted WebSocket connection.
+
+    Returns:
+        int: N clamped to 2..MAX_PLAYERS; 2 when absent or malformed.
+    """
+    path = getattr(ws, "path", None)
+    if path is None:
+        path = getattr(getattr(ws, "request", None), "path", "/")
+    try:
+        n = int(parse_qs(urlsplit(path).query).get("players", ["2"])[0])
+    except ValueError:
+        return 2
+    return max(2, min(n, MAX_PLAYERS))
+
+
+def _kind(raw) -> Optional[str]:
+    try:
+        return json.loads(raw).get("type")
+    except (ValueError, AttributeError):
+        return None
+
+
+async def _send(ws, msg: str) -> None:
+    try:
+        await ws.send(msg)
+    except websockets.ConnectionClosed:
+        pass
+
+
+async def serve(host: str, port: int, stats_every: float = 10.0) -> None:
+    """
+    Run the signaling server forever.
+
+    Args:
+        host (str): Interface to bind.
+        port (int): TCP port to listen on.
+        stats_every (float): Seconds between stats log lines (0 disables).
+    """
+    mm = Matchmaker()
+    async with websockets.serve(mm.handler, host, port, **WS_OPTIONS):
+        log.info("signaling server on ws://%s:%d", host, port)
+        while True:
+            await asyncio.sleep(stats_every or 3600)
+            if stats_every:
+                log.info(
+                    "online=%d waiting=%d matches=%d",
+                    mm.online,
+                    len(mm.queue) + sum(map(len, mm.lobbies.values())),
+                    mm.matches,
+                )
+
+
+def main() -> None:
+    """
+    Parse command-line arguments and run the signaling server.
+
+    CLI Args:
+        --host (str): Interface to bind. Defaults to "0.0.0.0".
+        --port (int): Port to listen on. Defaults to 8080.
+    """
+    ap = argparse.ArgumentParser(description="ASCII Tag signaling server")
+    ap.add_argument("--host", default="0.0.0.0")
+    ap.add_argument("--port", type=int, default=8080)
+    args = ap.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+    try:
+        asyncio.run(serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,388 @@
+"""
+ASCII Tag Game — Star Matches
+
+Host-authoritative matches for more than two players. Instead of every
+peer sending its position to every other peer (N×(N-1) messages per
+tick), each peer sends only its inputs to the host. The host applies the
+rules for everybody on its own tick and writes one combined snapshot
+frame — encoded once — to every peer.
+
+A peer that reads slowly cannot stall the host: writes never await
+`drain()`, and while a peer's transport buffer is above the high-water
+mark its snapshots are skipped (the next one supersedes them anyway).
+Nor can a peer crash it: an `input` outside the MOVE_* range disconnects
+that peer, which then counts as tagged like any peer that leaves.
+
+Protocol (binary wire format only):
+    peer → host   ready            then `input` frames (one move code each)
+    host → peer   welcome (JSON)   {"you": index, "players": n, "w": .., "h": ..}
+                  snap             one per host tick
+
+`main.py --players N` plays one: every client asks the signaling server
+for an N-player lobby (`lobby_url`); when it is full, the first client
+hosts with `StarHost` and the others join with `StarClient` (see
+`Game._host_star` / `Game._join_star`).
+"""
+
+import asyncio
+import logging
+import time
+from typing import AsyncIterator, Callable, List, Optional
+from urllib.parse import urlsplit, urlunsplit
+
+from config import TICK
+from engine import MOVE_NONE, MOVE_RIGHT, GameState
+from maps import Terrain
+from scheduler import TickScheduler
+from wire import WIRE_BIN1, BinaryCodec, encode_snapshot
+
+log = logging.getLogger("game.star")
+
+HIGH_WATER = 64 * 1024
+MAX_PLAYERS = 255
+
+_codec = BinaryCodec()
+
+
+def lobby_url(server: str, players: int) -> str:
+    """
+    Return the signaling URL that queues for an N-player match.
+
+    Args:
+        server (str): Signaling server URL (e.g. "ws://localhost:8080").
+        players (int): Players per match; 2 leaves the URL unchanged.
+
+    Returns:
+        str: The URL with a `players` query parameter added.
+    """
+    if players <= 2:
+        return server
+    u = urlsplit(server)
+    query = f"{u.query}&players={players}" if u.query else f"players={players}"
+    return urlunsplit((u.scheme, u.netloc, u.path or "/", query, u.fragment))
+
+
+class PeerLink:
+    """
+    The host's view of one connected peer.
+
+    Attributes:
+        index (int): The peer's player index in the match.
+        move (int): Latest move code received, consumed by the next tick.
+        sent_bytes (int): Snapshot bytes handed to this peer's transport.
+        skipped (int): Snapshots not sent because the peer was backed up.
+    """
+
+    __slots__ = ("index", "reader", "writer", "move", "sent_bytes", "skipped", "task")
+
+    def __init__(
+        self, index: int, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        self.index = index
+        self.reader = reader
+        self.writer = writer
+        self.move = MOVE_NONE
+        self.sent_bytes = 0
+        self.skipped = 0
+        self.task: Optional[asyncio.Task] = None
+
+    def push(self, frame: bytes, high_water: int) -> bool:
+        """
+        Queue a frame for this peer without ever blocking.
+
+        Args:
+            frame (bytes): The encoded snapshot.
+            high_water (int): Buffered bytes above which the frame is skipped.
+
+        Returns:
+            bool: True if the frame was written.
+        """
+        w = self.writer
+        if w.is_closing():
+            return False
+        if w.transport.get_write_buffer_size() > high_water:
+            self.skipped += 1
+            return False
+        w.write(frame)
+        self.sent_bytes += len(frame)
+        return True
+
+
+class StarHost:
+    """
+    Authoritative host for one N-player match.
+
+    Player 0 is the host's own player (its moves are set with
+    `set_move`); peers take seats 1..n-1 in connection order.
+
+    Attributes:
+        state (GameState): The authoritative match state.
+        links (list[PeerLink]): Connected peers.
+        stats (dict): ticks, bytes_out, frames_out, skipped, step_time (s).
+        ticker (TickScheduler | None): The loop driving `run()`, once started.
+    """
+
+    def __init__(
+        self, state: GameState, tick: float = TICK, high_water: int = HIGH_WATER
+    ) -> None:
+        """
+        Initialise the host.
+
+        Args:
+            state (GameState): Match state sized for every player.
+            tick (float): Seconds per host tick for `run()`.
+            high_water (int): Per-peer buffered-bytes limit (see `PeerLink.push`).
+        """
+        if len(state.xs) > MAX_PLAYERS:
+            raise ValueError(f"at most {MAX_PLAYERS} players per match")
+        self.state = state
+        self.tick = tick
+        self.high_water = high_water
+        self.links: List[PeerLink] = []
+        self.stats = {
+            "ticks": 0,
+            "bytes_out": 0,
+            "frames_out": 0,
+            "skipped": 0,
+            "step_time": 0.0,
+        }
+        self.ticker: Optional[TickScheduler] = None
+        self._moves = [MOVE_NONE] * len(state.xs)
+        self._full = asyncio.Event()
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    @property
+    def seats(self) -> int:
+        """int: Number of peer seats (players minus the host)."""
+        return len(self.state.xs) - 1
+
+    async def listen(self, host: str = "0.0.0.0", port: int = 0) -> int:
+        """
+        Start accepting peers.
+
+        Args:
+            host (str): Interface to bind.
+            port (int): Port to bind, 0 for an OS-assigned one.
+
+        Returns:
+            int: The bound port.
+        """
+        self._server = await asyncio.start_server(self._accept, host, port)
+        return self._server.sockets[0].getsockname()[1]
+
+    async def wait_full(self, timeout: float) -> bool:
+        """
+        Wait until every seat is taken.
+
+        Args:
+            timeout (float): Seconds to wait.
+
+        Returns:
+            bool: True if the match is full.
+        """
+        try:
+            await asyncio.wait_for(self._full.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    def set_move(self, i: int, move: int) -> None:
+        """
+        Set the move a player will make on the next tick.
+
+        Args:
+            i (int): Player index.
+            move (int): MOVE_* constant.
+        """
+        self._moves[i] = move
+
+    def step(self) -> bytes:
+        """
+        Run one authoritative tick and broadcast the resulting snapshot.
+
+        Returns:
+            bytes: The snapshot frame that was sent.
+        """
+        t0 = time.perf_counter()
+        moves = self._moves
+        for link in self.links:
+            moves[link.index] = link.move
+            link.move = MOVE_NONE
+        st = self.state
+        st.step(moves)
+        for i in range(len(moves)):
+            moves[i] = MOVE_NONE
+
+        frame = encode_snapshot(st.tick, st.it, st.xs, st.ys, st.out)
+        hw = self.high_water
+        sent = 0
+        for link in self.links:
+            if link.push(frame, hw):
+                sent += 1
+            else:
+                self.stats["skipped"] += 1
+        self.stats["ticks"] += 1
+        self.stats["frames_out"] += sent
+        self.stats["bytes_out"] += sent * len(frame)
+        self.stats["step_time"] += time.perf_counter() - t0
+        return frame
+
+    async def run(self, on_step: Optional[Callable[[], None]] = None) -> None:
+        """
+        Tick until the match is decided, then send the final snapshot.
+
+        A `TickScheduler` runs `step` against absolute deadlines, as
+        `Game._run_tick` does, so the time a step takes (which grows with
+        the player count) never stretches the tick period.
+
+        Args:
+            on_step (Callable | None): Called after every tick (e.g. to
+                                       repaint the host's own view).
+        """
+
+        async def tick(_n: int) -> None:
+            self.step()
+            if on_step is not None:
+                on_step()
+
+        self.ticker = TickScheduler(tick, 1.0 / self.tick)
+        await self.ticker.run(lambda: not self.state.over)
+        self.step()  # a tag decided between ticks reaches every peer
+
+    def close(self) -> None:
+        """
+        Stop accepting peers and close every peer connection.
+        """
+        if self._server is not None:
+            self._server.close()
+        for link in self.links:
+            if link.task is not None:
+                link.task.cancel()
+            link.writer.close()
+
+    async def _accept(self, r: asyncio.StreamReader, w: asyncio.StreamWriter) -> None:
+        if len(self.links) >= self.seats:
+            w.close()
+            return
+        try:
+            m = await asyncio.wait_for(_codec.read(r), timeout=10.0)
+        except asyncio.TimeoutError:
+            m = None
+        if not m or m.get("type") != "ready" or len(self.links) >= self.seats:
+            w.close()  # not a peer, or the seats filled during the read
+            return
+        link = PeerLink(len(self.links) + 1, r, w)
+        self.links.append(link)
+        st = self.state
+        terrain = st.terrain or Terrain(st.w, st.h)
+        w.write(
+            _codec.encode(
+                {
+                    "type": "welcome",
+                    "you": link.index,
+                    "players": len(st.xs),
+                    **terrain.describe(),
+                }
+            )
+        )
+        log.debug("star: seat %d taken by %s", link.index, w.get_extra_info("peername"))
+        link.task = asyncio.create_task(self._read_inputs(link))
+        if len(self.links) == self.seats:
+            self._full.set()
+
+    async def _read_inputs(self, link: PeerLink) -> None:
+        try:
+            while True:
+                m = await _codec.read(link.reader)
+                if m is None:
+                    break
+                if m.get("type") == "input":
+                    move = m.get("m")
+                    if not isinstance(move, int) or not MOVE_NONE <= move <= MOVE_RIGHT:
+                        log.warning("star: seat %d sent move %r", link.index, move)
+                        link.writer.close()
+                        break
+                    link.move = move
+        finally:
+            log.debug("star: seat %d left", link.index)
+            st = self.state
+            if not st.over and link.index != st.it and not st.out[link.index]:
+                st.tag(link.index)
+
+
+class StarClient:
+    """
+    A peer in a star match: sends moves, receives snapshots.
+
+    Attributes:
+        me (int): This peer's player index (set by `connect`).
+        players (int): Number of players in the match.
+        w (int): Board width announced by the host.
+        h (int): Board height announced by the host.
+        map (str): The host's map digest (see `Terrain.digest`).
+    """
+
+    def __init__(self) -> None:
+        self.me = -1
+        self.players = 0
+        self.w = self.h = 0
+        self.map = ""
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+
+    async def connect(self, ip: str, port: int, timeout: float = 10.0) -> None:
+        """
+        Connect to a star host and take a seat.
+
+        Args:
+            ip (str): Host address.
+            port (int): Host port.
+            timeout (float): Seconds to wait for the welcome.
+
+        Raises:
+            ConnectionError: If the host refused the seat.
+        """
+        r, w = await asyncio.open_connection(ip, port)
+        self._reader, self._writer = r, w
+        w.write(_codec.encode({"type": "ready", "wire": WIRE_BIN1}))
+        m = await asyncio.wait_for(_codec.read(r), timeout)
+        if not m or m.get("type") != "welcome":
+            w.close()
+            raise ConnectionError("star host refused the connection")
+        self.me = int(m["you"])
+        self.players = int(m["players"])
+        self.w, self.h = int(m["w"]), int(m["h"])
+        self.map = m.get("map", "")
+
+    def send_move(self, move: int) -> None:
+        """
+        Send this peer's move for the next host tick.
+
+        Args:
+            move (int): MOVE_* constant.
+        """
+        w = self._writer
+        if w is not None and not w.is_closing():
+            w.write(_codec.encode({"type": "input", "m": move}))
+
+    async def snapshots(self) -> AsyncIterator[dict]:
+        """
+        Yield snapshots from the host until it disconnects.
+
+        Yields:
+            dict: Decoded 'snap' messages.
+        """
+        assert self._reader is not None
+        while True:
+            m = await _codec.read(self._reader)
+            if m is None:
+                return
+            if m.get("type") == "snap":
+                yield m
+
+    def close(self) -> None:
+        """
+        Close the connection to the host.
+        """
+        if self._writer is not None:
+            self._writer.close()
@@ -0,0 +1,56 @@
+import asyncio
+
+from textual.app import App
+
+from board import Board
+from maps import Terrain
+
+
+class _BoardApp(App):
+    def __init__(self, terrain):
+        super().__init__()
+        self.terrain = terrain
+
+    def compose(self):
+        yield Board(self.terrain, ".", id="board")
+
+
+def test_only_changed_rows_repaint():
+    async def run():
+        app = _BoardApp(Terrain(10, 10))
+        async with app.run_test() as pilot:
+            board = app.query_one(Board)
+            board.place({"#": (9, 9), "@": (0, 0)})
+            await pilot.pause()
+            base = board.repainted
+
+            board.place({"#": (9, 9), "@": (1, 0)})
+            await pilot.pause()
+            assert board.repainted == base + 1
+
+            board.place({"#": (9, 9), "@": (1, 0)})
+            await pilot.pause()
+            assert board.repainted == base + 1
+
+            assert board.text().splitlines()[1] == "| . @ . . . . . . . . |"
+            assert board.text().splitlines()[10] == "| . . . . . . . . . # |"
+
+    asyncio.run(run())
+
+
+def test_large_map_draws_only_the_viewport():
+    async def run():
+        app = _BoardApp(Terrain(1000, 1000, [(500, 500)]))
+        async with app.run_test(size=(40, 20)) as pilot:
+            board = app.query_one(Board)
+            board.place({"@": (501, 500)}, focus=(501, 500))
+            await pilot.pause()
+            cols, rows = board.view_size()
+            assert cols == 18 and rows <= 18
+            lines = board.text().splitlines()
+            assert len(lines) == rows + 2
+            assert all(len(line) == 2 * cols + 3 <= 40 for line in lines)
+            mid = lines[1 + rows // 2]
+            assert "X @" in mid
+
+    asyncio.run(run())
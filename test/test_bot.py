@@ -0,0 +1,126 @@
+import asyncio
+import random
+import time
+from collections import deque
+
+import bot
+from bot import Bot, DistanceTables, tables_for
+from engine import MOVE_DOWN, MOVE_NONE, MOVE_RIGHT, GameState
+from game import Game
+from maps import Terrain
+
+
+def _bfs(terrain, start):
+    dist = {start: 0}
+    q = deque([start])
+    while q:
+        x, y = q.popleft()
+        for nx, ny in ((x, y - 1), (x, y + 1), (x - 1, y), (x + 1, y)):
+            if terrain.open_cell(nx, ny) and (nx, ny) not in dist:
+                dist[(nx, ny)] = dist[(x, y)] + 1
+                q.append((nx, ny))
+    return dist
+
+
+def _walled(w, h, seed):
+    rng = random.Random(seed)
+    walls = [(x, y) for y in range(h) for x in range(w) if rng.random() < 0.25]
+    return Terrain(w, h, [c for c in walls if c not in ((0, 0), (w - 1, h - 1))])
+
+
+def test_fields_match_plain_bfs(monkeypatch):
+    terrain = _walled(12, 9, 1)
+    small = DistanceTables(terrain)
+    monkeypatch.setattr(bot, "ALL_PAIRS_MAX", 0)
+    searched = DistanceTables(terrain)
+    assert small.all_pairs and not searched.all_pairs
+
+    for target in ((0, 0), (11, 8), (5, 4)):
+        if not terrain.open_cell(*target):
+            continue
+        want = _bfs(terrain, target)
+        t = small.index(*target)
+        for y in range(terrain.h):
+            for x in range(terrain.w):
+                p = small.index(x, y)
+                for tables in (small, searched):
+                    # the search stops once it has covered p
+                    assert tables.search(t, p)[p] == want.get((x, y), -1)
+        assert searched.field(t, small.index(0, 0)) is not None
+    assert searched.hits == 3
+
+
+def test_all_pairs_is_gated_on_table_size_not_open_cells():
+    terrain = Terrain(1000, 1000)
+    terrain.bits[:] = b"\xff" * len(terrain.bits)
+    terrain.bits[:100] = bytes(100)  # one 800-cell corridor along the top
+    tables = DistanceTables(terrain)
+    assert tables.cells == 800 and not tables.all_pairs
+    t, p = tables.index(0, 0), tables.index(799, 0)
+    assert tables.search(t, p)[p] == 799
+
+
+def test_chaser_closes_in_and_runner_backs_off():
+    terrain = Terrain(8, 8)
+    it, runner = Bot(terrain, "it", seed=1), Bot(terrain, "runner", seed=1)
+    assert it.decide((0, 0), (5, 0)) == MOVE_RIGHT
+    assert it.decide((3, 3), (3, 3)) == MOVE_NONE
+    assert runner.decide((5, 0), (0, 0)) == MOVE_DOWN  # more ways out
+    # cornered on the far side: stay rather than walk towards IT
+    assert runner.decide((7, 7), (0, 0)) == MOVE_NONE
+    assert it.tables is runner.tables is tables_for(Terrain(8, 8))
+
+
+def test_large_map_decisions_stay_within_deadline():
+    terrain = Terrain(400, 400)
+    b = Bot(terrain, "it", seed=1)
+    assert not b.tables.all_pairs
+    first = b.decide((0, 0), (399, 399), time.perf_counter())
+    assert first == MOVE_NONE  # no field yet, and none complete before
+    for _ in range(10_000):
+        t0 = time.perf_counter()
+        move = b.decide((0, 0), (399, 399), t0 + 0.002)
+        assert time.perf_counter() - t0 < 0.05
+        if move != MOVE_NONE:
+            break
+    assert move in (MOVE_RIGHT, MOVE_DOWN)
+    assert b.stale >= 1
+    assert b.decide((0, 0), (399, 399)) != MOVE_NONE
+    assert b.tables.hits >= 1
+    # a search stops once it has reached the bot and its neighbours
+    near = Bot(terrain, "runner", seed=1)
+    assert near.decide((200, 205), (200, 200)) == MOVE_DOWN
+    assert (near._field >= 0).sum() < 100
+
+
+def test_game_plays_against_a_bot_without_a_peer():
+    async def run():
+        g = Game("ws://unused", terrain=Terrain(6, 1), bot="it", bot_skill=1.0)
+        g._refresh = lambda: None
+        g._start_bot()
+        assert not g.am_caller and not g.am_it and g.phase == "playing"
+        for n in range(1, 200):
+            await g._game_tick(n)
+            if g.phase != "playing":
+                break
+        g._tick_task.cancel()
+        assert g.phase == "end" and g.state.winner == g.op
+        assert g.traffic == {"messages": 0}
+
+    asyncio.run(run())
+
+
+def test_bots_finish_matches_headless():
+    pillars = [(x, y) for x in range(1, 9, 2) for y in range(1, 9, 2)]
+    terrain = Terrain(10, 10, pillars)
+    for seed in range(5):
+        st = GameState(0, 0, terrain)
+        st.reset()
+        it = Bot(terrain, "it", 0.9, seed)
+        runner = Bot(terrain, "runner", 0.7, seed)
+        for n in range(5000):
+            a = it.decide((st.xs[0], st.ys[0]), (st.xs[1], st.ys[1]))
+            b = runner.decide((st.xs[1], st.ys[1]), (st.xs[0], st.ys[0]))
+            if st.step((a, b)) is not None:
+                break
+        assert st.winner == 0
@@ -0,0 +1,159 @@
+import asyncio
+
+from broadcast import (
+    BroadcastRelay,
+    Spectator,
+    _Conn,
+    encode_delta,
+    encode_end,
+    encode_info,
+    encode_key,
+    open_publisher,
+)
+from maps import Terrain
+
+
+class _FakeTransport:
+    def __init__(self):
+        self.chunks = []
+        self.buffered = 0
+
+    def get_write_buffer_size(self):
+        return self.buffered
+
+    def write(self, data):
+        self.chunks.append(data)
+
+    def get_extra_info(self, name):
+        return None
+
+    def close(self):
+        pass
+
+
+async def _until(cond, timeout=2.0):
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while not cond():
+        assert loop.time() < deadline, "timed out"
+        await asyncio.sleep(0.005)
+
+
+def test_spectators_follow_the_match_and_late_joiners_catch_up():
+    async def run():
+        relay = BroadcastRelay()
+        srv = await relay.start("127.0.0.1", 0)
+        addr = "127.0.0.1:%d" % srv.sockets[0].getsockname()[1]
+        terrain = Terrain(6, 4, [(2, 2)])
+        early = Spectator()
+        await early.connect(addr, "m1")
+        pub = await open_publisher(addr, "m1", terrain, 10.0)
+        watch = asyncio.create_task(_drain(early))
+
+        xs, ys = [0, 5], [0, 3]
+        pub.tick(1, xs, ys, 0)
+        for n in range(2, 40):
+            if n % 3 == 0:
+                xs[0] += n % 2 or -1
+            pub.tick(n, xs, ys, 0)
+        assert pub.stats["keys"] == 4 and pub.stats["deltas"] < 35  # idle ticks
+
+        late = Spectator()
+        await late.connect(addr, "m1")
+        late_watch = asyncio.create_task(_drain(late))
+        for sp in (early, late):
+            await _until(lambda: sp.tick == 39 and sp.xs == xs)
+            assert sp.terrain.bits == terrain.bits and sp.live
+        assert late.stats["deltas"] < early.stats["deltas"]  # from the last KEY
+
+        xs[1] = 0
+        pub.end(40, xs, ys, 0, 0)
+        await _until(lambda: not early.live and not late.live)
+        assert early.winner == late.winner == 0 and late.xs == xs
+        assert relay.spectators == 2
+
+        pub.close()
+        await asyncio.wait_for(asyncio.gather(watch, late_watch), 2.0)
+        assert not relay.channels
+        srv.close()
+
+    asyncio.run(run())
+
+
+async def _drain(sp):
+    async for _ in sp.updates():
+        pass
+
+
+def test_frames_are_written_once_and_slow_viewers_skip_to_the_next_key():
+    relay = BroadcastRelay(high_water=100)
+    pub, fast, slow = _Conn(relay), _Conn(relay), _Conn(relay)
+    for c in (pub, fast, slow):
+        c.connection_made(_FakeTransport())
+    relay.attach(pub, b"PUB1 m")
+    relay.attach(fast, b"SUB1 m")
+    relay.attach(slow, b"SUB1 m")
+
+    a, b, c = (0, 0, 3, 3, 0), (1, 0, 3, 3, 0), (1, 0, 3, 2, 0)
+    pub.data_received(encode_info(Terrain(4, 4), 10.0) + encode_key(1, a))
+    pub.data_received(encode_delta(2, b, a))
+    assert fast.transport.chunks == slow.transport.chunks
+    assert all(x is y for x, y in zip(fast.transport.chunks, slow.transport.chunks))
+
+    slow.transport.buffered = 500
+    delta = encode_delta(3, c, b)
+    pub.data_received(delta[:4])  # a partial frame is held back
+    pub.data_received(delta[4:])
+    assert fast.transport.chunks[-1] == delta and slow.behind
+    slow.transport.buffered = 0
+    pub.data_received(encode_delta(4, b, c))
+    assert len(slow.transport.chunks) == 2  # still waiting for a keyframe
+    key = encode_key(5, b)
+    pub.data_received(encode_delta(5, c, b) + key)
+    assert slow.transport.chunks[-1] == key and not slow.behind
+    assert relay.stats["skipped"] == 2 and relay.stats["resyncs"] == 1
+
+    late = _Conn(relay)
+    late.connection_made(_FakeTransport())
+    relay.attach(late, b"SUB1 m")
+    pub.data_received(encode_end(6, 1))
+    sp = Spectator()
+    for chunk in late.transport.chunks:
+        sp.feed(chunk)
+    assert (sp.tick, sp.xs, sp.ys, sp.winner) == (6, [1, 3], [0, 3], 1)
+
+
+def test_game_against_a_bot_publishes_every_match():
+    from game import Game
+
+    async def run():
+        relay = BroadcastRelay()
+        srv = await relay.start("127.0.0.1", 0)
+        addr = "127.0.0.1:%d" % srv.sockets[0].getsockname()[1]
+        terrain = Terrain(6, 1)
+        g = Game("ws://unused", terrain=terrain, bot="it", bot_skill=1.0, broadcast=addr)
+        g._refresh = lambda: None
+        g._start_bot()
+        await _until(lambda: g._pub is not None)
+        sp = Spectator()
+        await sp.connect(addr, g.match_id)
+        watch = asyncio.create_task(_drain(sp))
+        for n in range(1, 200):
+            await g._game_tick(n)
+            if g.phase != "playing":
+                break
+        await asyncio.wait_for(g._tick_task, 1.0)
+        await _until(lambda: sp.stats["ends"] == 1)
+        st = g.state
+        assert (sp.xs, sp.ys, sp.winner) == (st.xs, st.ys, st.winner)
+        assert sp.terrain.w == 6 and abs(sp.tick_rate - g.tick_rate) < 1e-3
+
+        g._start_bot()  # rematch: same broadcast, a new keyframe
+        await g._game_tick(1)
+        await _until(lambda: sp.live and sp.tick == 1)
+        g._tick_task.cancel()
+        g._pub.close()
+        await asyncio.wait_for(watch, 1.0)
+        srv.close()
+
+    asyncio.run(run())
@@ -0,0 +1,75 @@
+import asyncio
+import ipaddress
+import socket
+
+import pytest
+
+from candidates import dial_order, listen_socket, local_addresses, race
+
+
+async def _serve(host):
+    accepted = []
+
+    async def on_conn(r, w):
+        accepted.append(w)
+
+    srv = await asyncio.start_server(on_conn, host, 0)
+    return srv, srv.sockets[0].getsockname()[1], accepted
+
+
+def test_race_skips_a_refused_candidate():
+    async def run():
+        srv, port, _ = await _serve("127.0.0.1")
+        async with srv:
+            r, w, addr = await race(["127.0.0.2", "127.0.0.1"], port, stagger=5.0)
+            w.close()
+        return addr
+
+    assert asyncio.run(run()) == "127.0.0.1"
+
+
+def test_race_keeps_the_first_and_never_starts_the_rest():
+    async def run():
+        srv, port, accepted = await _serve("0.0.0.0")
+        async with srv:
+            r, w, addr = await race(["127.0.0.1", "127.0.0.3"], port, stagger=0.5)
+            await asyncio.sleep(0.6)
+            w.close()
+        return addr, len(accepted)
+
+    assert asyncio.run(run()) == ("127.0.0.1", 1)
+
+
+def test_race_reports_when_nothing_answers():
+    async def run():
+        srv, port, _ = await _serve("127.0.0.1")
+        srv.close()
+        await srv.wait_closed()
+        await race(["127.0.0.1", "127.0.0.2"], port, stagger=0.05)
+
+    with pytest.raises(ConnectionError):
+        asyncio.run(run())
+
+
+def test_dial_order_adds_loopback_only_on_the_same_machine():
+    assert dial_order(["10.0.0.5", "fd00::5"], ["10.0.0.9"]) == ["10.0.0.5", "fd00::5"]
+    assert dial_order(["10.0.0.5"], ["10.0.0.5"]) == ["127.0.0.1", "::1", "10.0.0.5"]
+
+
+def test_local_addresses_are_routable():
+    for addr in local_addresses():
+        ip = ipaddress.ip_address(addr)
+        assert not (ip.is_loopback or ip.is_link_local)
+
+
+@pytest.mark.skipif(not socket.has_dualstack_ipv6(), reason="no dual-stack IPv6")
+def test_listen_socket_accepts_ipv4_and_ipv6():
+    async def run():
+        srv = await asyncio.start_server(lambda r, w: w.close(), sock=listen_socket())
+        port = srv.sockets[0].getsockname()[1]
+        async with srv:
+            for host in ("127.0.0.1", "::1"):
+                _, w = await asyncio.open_connection(host, port)
+                w.close()
+
+    asyncio.run(run())
@@ -0,0 +1,47 @@
+import random
+
+import numpy as np
+
+from engine import (
+    MOVE_LEFT,
+    MOVE_NONE,
+    MOVE_RIGHT,
+    MOVE_UP,
+    BatchState,
+    GameState,
+)
+
+
+def test_moves_stay_on_board():
+    st = GameState(3, 3)
+    assert not st.move(0, MOVE_UP)
+    assert not st.move(0, MOVE_LEFT)
+    assert st.move(0, MOVE_RIGHT)
+    assert (st.xs[0], st.ys[0]) == (1, 0)
+
+
+def test_step_detects_tag_and_freezes():
+    st = GameState(2, 1)
+    assert st.step([MOVE_NONE, MOVE_NONE]) is None
+    assert st.step([MOVE_RIGHT, MOVE_NONE]) == 1
+    assert st.over and st.winner == 0
+    assert st.step([MOVE_LEFT, MOVE_NONE]) is None
+    assert st.tick == 2
+
+
+def test_batch_matches_scalar_rules():
+    rng = random.Random(5)
+    n, w, h = 64, 6, 5
+    scalar = [GameState(w, h) for _ in range(n)]
+    batch = BatchState(n, w, h)
+    for _ in range(200):
+        moves = np.array(
+            [[rng.randrange(5), rng.randrange(5)] for _ in range(n)], dtype=np.int64
+        )
+        batch.step(moves)
+        for st, mv in zip(scalar, moves.tolist()):
+            st.step(mv)
+    assert batch.over.tolist() == [st.over for st in scalar]
+    live = [i for i, st in enumerate(scalar) if not st.over]
+    assert batch.x[live].tolist() == [scalar[i].xs for i in live]
+    assert batch.y[live].tolist() == [scalar[i].ys for i in live]
@@ -0,0 +1,245 @@
+import asyncio
+import time
+
+import websockets
+
+import game
+from engine import MOVE_LEFT, MOVE_RIGHT
+from game import Game
+from outbox import PeerWriter
+from recording import Recording
+from server import WS_OPTIONS, Matchmaker
+
+
+class _Transport:
+    def set_write_buffer_limits(self, high):
+        pass
+
+    def get_write_buffer_size(self):
+        return 0
+
+    def abort(self):
+        pass
+
+
+class _Writer:
+    def __init__(self):
+        self.writes = []
+        self.transport = _Transport()
+
+    def write(self, data):
+        self.writes.append(data)
+
+    def is_closing(self):
+        return False
+
+    async def drain(self):
+        pass
+
+
+def _attach(g):
+    g._writer = w = _Writer()
+    g._send = PeerWriter(w)
+    g._send.start()
+    return w
+
+
+def test_idle_ticks_send_nothing_until_keepalive(monkeypatch):
+    async def run():
+        g = Game("ws://unused")
+        g._refresh = lambda: None
+        w = _attach(g)
+        g.state.reset()
+        g.phase = "playing"
+
+        for n in (1, 2):
+            await g._game_tick(n)
+            await asyncio.sleep(0)
+        assert len(w.writes) == 1
+
+        g.inputs.push(MOVE_LEFT)
+        await g._game_tick(3)
+        await asyncio.sleep(0)
+        assert len(w.writes) == 2
+
+        monkeypatch.setattr(game, "KEEPALIVE", 0.0)
+        await g._game_tick(4)
+        await asyncio.sleep(0)
+        assert len(w.writes) == 3
+        assert g.traffic == {"messages": 3}
+        assert g._send.stats["bytes"] == 3 * len(w.writes[0])
+
+    asyncio.run(run())
+
+
+def test_tick_output_goes_out_in_one_write():
+    async def run():
+        g = Game("ws://unused")
+        g._refresh = lambda: None
+        w = _attach(g)
+        g.am_caller = True
+        g.state.reset()
+        g.state.place(1, 1, 0)
+        g.phase = "playing"
+
+        g.inputs.push(MOVE_RIGHT)
+        await g._game_tick(1)
+        await asyncio.sleep(0)
+        assert g.phase == "end"
+        assert len(w.writes) == 1 and g.traffic["messages"] == 2
+
+    asyncio.run(run())
+
+
+def test_every_pos_in_a_batch_is_buffered_and_the_newest_applied():
+    async def run():
+        g = Game("ws://unused")
+        g._refresh = lambda: None
+        _attach(g)
+        g.state.reset()
+        g.phase = "playing"
+        burst = [
+            {"type": "pos", "x": 0, "y": y, "t": 1000 + 100 * y, "n": y}
+            for y in (3, 4, 5)
+        ]
+        batches = [burst, None]
+
+        async def batch(limit=0):
+            return batches.pop(0)
+
+        g._peer_batch = batch
+        g._reader = asyncio.StreamReader()
+        await g._recv_loop()
+        assert [p[1:3] for p in g._op_hist._samples] == [(0, 3), (0, 4), (0, 5)]
+        assert (g.state.xs[g.op], g.state.ys[g.op], g.peer_tick) == (0, 5, 5)
+
+    asyncio.run(run())
+
+
+async def _until(cond, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not cond():
+        assert time.monotonic() < deadline, "timed out"
+        await asyncio.sleep(0.01)
+
+
+def test_session_rematches_on_the_same_link_and_requeues():
+    async def run():
+        mm = Matchmaker()
+        async with websockets.serve(mm.handler, "127.0.0.1", 0, **WS_OPTIONS) as srv:
+            url = "ws://127.0.0.1:%d" % srv.sockets[0].getsockname()[1]
+            a, b = Game(url), Game(url)
+            for g in (a, b):
+                g._refresh = lambda: None
+            tasks = [asyncio.create_task(g._network()) for g in (a, b)]
+            await _until(lambda: a.phase == b.phase == "playing")
+
+            it = a if a.am_it else b
+            it.state.place(it.op, it.my_x, it.my_y)
+            it._check_win()
+            await _until(lambda: a.phase == b.phase == "end")
+
+            link = a._writer
+            caller = a.am_caller
+            a._request_rematch()
+            await asyncio.sleep(0.05)
+            assert a.phase == "end" and b._rematch_peer
+            b._request_rematch()
+            await _until(lambda: a.phase == b.phase == "playing")
+            assert a._writer is link and a.am_caller is not caller
+            assert a.am_it != b.am_it and mm.matches == 1
+
+            c = Game(url)
+            c._refresh = lambda: None
+            tasks.append(asyncio.create_task(c._network()))
+            await _until(lambda: c.phase == "waiting")
+            a._requeue("New opponent")
+            await _until(lambda: a.phase == c.phase == "playing")
+            await _until(lambda: b.phase == "waiting")
+            assert a._writer is not link and mm.matches == 2 and mm.online == 3
+            assert a.am_it != c.am_it and list(mm.queue)
+
+            for t in tasks:
+                t.cancel()
+            for g in (a, b, c):
+                g.phase = "end"
+                g._drop_link()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    asyncio.run(run())
+
+
+def test_star_match_is_hosted_by_the_first_of_n_players():
+    async def run():
+        mm = Matchmaker()
+        async with websockets.serve(mm.handler, "127.0.0.1", 0, **WS_OPTIONS) as srv:
+            url = "ws://127.0.0.1:%d" % srv.sockets[0].getsockname()[1]
+            games = [Game(url, players=3) for _ in range(3)]
+            for g in games:
+                g._refresh = lambda: None
+            tasks = [asyncio.create_task(g._network()) for g in games]
+            await _until(lambda: all(g.phase == "playing" for g in games))
+
+            host = next(g for g in games if g.am_caller)
+            peers = [g for g in games if g is not host]
+            assert host._star is not None and host.me == 0
+            assert sorted(g.me for g in peers) == [1, 2]
+            assert all(len(g.state.xs) == 3 for g in games)
+
+            p = peers[0]
+            x = host.state.xs[p.me]
+            p._star_move(MOVE_LEFT)
+            await _until(lambda: all(g.state.xs[p.me] == x - 1 for g in games))
+
+            host.state.tag(1)
+            host.state.tag(2)
+            await _until(lambda: all(g.phase == "end" for g in games))
+            assert all(g.state.winner == 0 for g in games)
+            assert host.status_msg.startswith("You win")
+            assert mm.matches == 1
+
+            for t in tasks:
+                t.cancel()
+            for g in games:
+                g._drop_link()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    asyncio.run(run())
+
+
+def test_rematch_inside_one_tick_period_stops_the_old_tick_loop(tmp_path):
+    async def run():
+        mm = Matchmaker()
+        async with websockets.serve(mm.handler, "127.0.0.1", 0, **WS_OPTIONS) as srv:
+            url = "ws://127.0.0.1:%d" % srv.sockets[0].getsockname()[1]
+            path = str(tmp_path / "m.tagrec")
+            a, b = Game(url, tick_rate=2.0, record=path), Game(url, tick_rate=2.0)
+            for g in (a, b):
+                g._refresh = lambda: None
+            tasks = [asyncio.create_task(g._network()) for g in (a, b)]
+            await _until(lambda: a.phase == b.phase == "playing")
+            await asyncio.sleep(0.6)
+
+            it = a if a.am_it else b
+            it.state.place(it.op, it.my_x, it.my_y)
+            it._check_win()  # ends outside a tick; a's loop is asleep
+            await _until(lambda: a.phase == b.phase == "end")
+            old = a._tick_task
+            a._request_rematch()
+            b._request_rematch()
+            await _until(lambda: a.phase == b.phase == "playing")
+            await asyncio.sleep(0.6)  # past the old loop's next deadline
+            assert old.done() and not a._tick_task.done()
+            assert a._recorder is not None and a._recorder.path.endswith("m-2.tagrec")
+            assert not a._recorder._f.closed
+            with Recording(path) as first:
+                assert first.complete and first.winner is not None
+
+            for t in tasks:
+                t.cancel()
+            for g in (a, b):
+                g.phase = "end"
+                g._drop_link()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    asyncio.run(run())
@@ -0,0 +1,57 @@
+import asyncio
+import time
+
+from inbox import PeerReader
+from wire import BinaryCodec, JsonCodec
+
+
+def test_batches_split_frames_and_keep_partial_ones():
+    async def run():
+        codec = BinaryCodec()
+        data = b"".join(
+            codec.encode({"type": "pos", "x": i, "y": 1, "t": 5, "n": i})
+            for i in range(3)
+        ) + codec.encode({"type": "win"})
+        reader = asyncio.StreamReader()
+        inbox = PeerReader(reader)
+        reader.feed_data(data[:5])
+        reader.feed_data(data[5:-2])
+        msgs = await inbox.batch(codec)
+        assert [m.get("x") for m in msgs] == [0, 1, 2]
+        reader.feed_data(data[-2:])
+        reader.feed_eof()
+        assert await inbox.batch(codec) == [{"type": "win"}]
+        assert await inbox.batch(codec) is None and not inbox.idle
+
+    asyncio.run(run())
+
+
+def test_limit_leaves_the_rest_for_a_new_codec():
+    async def run():
+        reader = asyncio.StreamReader()
+        inbox = PeerReader(reader)
+        binary = BinaryCodec()
+        reader.feed_data(
+            b'{"type": "ready", "wire": 2}\n' + binary.encode({"type": "win", "n": 9})
+        )
+        assert await inbox.batch(JsonCodec(), limit=1) == [{"type": "ready", "wire": 2}]
+        assert await inbox.batch(binary) == [{"type": "win", "n": 9}]
+
+    asyncio.run(run())
+
+
+def test_idle_deadline_ends_a_silent_stream():
+    async def run():
+        reader = asyncio.StreamReader()
+        inbox = PeerReader(reader)
+        inbox.expect_within(0.1)
+        codec = JsonCodec()
+        t0 = time.monotonic()
+        for _ in range(3):
+            await asyncio.sleep(0.06)
+            reader.feed_data(b'{"type": "pong"}\n')
+            assert await inbox.batch(codec) == [{"type": "pong"}]
+        assert await inbox.batch(codec) is None
+        assert inbox.idle and time.monotonic() - t0 >= 0.28
+
+    asyncio.run(run())
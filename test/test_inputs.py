@@ -0,0 +1,54 @@
+import asyncio
+
+import pytest
+
+from engine import MOVE_DOWN, MOVE_LEFT, MOVE_RIGHT, MOVE_UP
+from game import Game
+from inputs import InputQueue
+from maps import Terrain
+
+
+def test_policies_take_what_they_promise():
+    q = InputQueue("one", size=3)
+    for mv in (MOVE_UP, MOVE_LEFT, MOVE_DOWN, MOVE_RIGHT):
+        q.push(mv)
+    assert q.dropped == 1
+    assert [m for m, _ in q.take()] == [MOVE_LEFT]
+    assert [m for m, _ in q.take()] == [MOVE_DOWN]
+
+    q = InputQueue("all")
+    q.push(MOVE_UP, 1.0)
+    q.push(MOVE_LEFT, 2.0)
+    assert q.take() == [(MOVE_UP, 1.0), (MOVE_LEFT, 2.0)] and not q.take()
+
+    q = InputQueue("last")
+    q.push(MOVE_UP)
+    q.push(MOVE_LEFT)
+    assert [m for m, _ in q.take()] == [MOVE_LEFT] and q.collapsed == 1
+
+    with pytest.raises(ValueError):
+        InputQueue("newest")
+
+
+@pytest.mark.parametrize(
+    "policy, after_one, after_two", [("one", 1, 2), ("all", 2, 2), ("last", 1, 1)]
+)
+def test_presses_inside_one_tick(policy, after_one, after_two):
+    async def run():
+        g = Game("ws://unused", terrain=Terrain(20, 20), input_policy=policy)
+        g._refresh = lambda: None
+        g.am_caller = True
+        g.state.reset()
+        g.state.place(0, 0, 0)
+        g.state.place(1, 19, 19)
+        g._moved_at = -g._move_every
+        g.phase = "playing"
+        g.inputs.push(MOVE_RIGHT)
+        g.inputs.push(MOVE_RIGHT)
+
+        await g._game_tick(1)
+        assert g.my_x == after_one
+        await g._game_tick(1 + g._move_every)
+        assert g.my_x == after_two
+
+    asyncio.run(run())
@@ -0,0 +1,32 @@
+from interp import SnapshotBuffer
+
+
+def test_view_lags_by_delay_on_the_senders_clock():
+    buf = SnapshotBuffer()
+    # Sender clock is 5000 ms behind ours; best one-way delay is 20 ms.
+    for i, t in enumerate(range(1000, 1600, 120)):
+        buf.push(t, i, 0, t + 5020 + (i % 2) * 30)
+    assert buf.skew() == 5020
+    now = 1480 + 5020
+    assert buf.view(now, 0) == (4, 0)
+    assert buf.view(now, 100) == (3, 0)
+    assert buf.view(now, 10_000) == (0, 0)
+
+
+def test_late_snapshot_is_slotted_in_without_becoming_newest():
+    buf = SnapshotBuffer()
+    assert buf.push(100, 1, 1, 100)
+    assert buf.push(300, 3, 3, 300)
+    assert not buf.push(200, 2, 2, 400)
+    assert not buf.push(200, 9, 9, 401)
+    assert (buf.late, buf.dropped) == (1, 1)
+    assert buf.at(250) == (2, 2)
+
+
+def test_buffer_keeps_only_the_newest_snapshots():
+    buf = SnapshotBuffer(size=4)
+    for t in range(10):
+        buf.push(t, t, 0, t)
+    assert len(buf) == 4
+    assert not buf.push(1, 1, 0, 20)
+    assert buf.at(0) == (6, 0)
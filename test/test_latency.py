@@ -0,0 +1,28 @@
+from latency import LatencyMonitor
+
+
+def test_rtt_and_offset_from_one_exchange():
+    mon = LatencyMonitor()
+    # Peer clock runs 1000 ms ahead; 20 ms each way; peer holds it 5 ms.
+    ping = mon.ping(now=100.0)
+    pong = LatencyMonitor.pong(ping, received=1120.0, now=1125.0)
+    assert mon.on_pong(pong, now=145.0) == 40.0
+    assert mon.offset == 1000.0
+    assert mon.to_local(1125.0) == 125.0
+    assert mon.on_pong(pong, now=150.0) is None
+
+
+def test_offset_tracks_least_queued_sample_and_loss_is_counted():
+    mon = LatencyMonitor(timeout=1.0)
+    p1 = mon.ping(now=0.0)
+    mon.on_pong(LatencyMonitor.pong(p1, 1010.0, 1010.0), now=20.0)
+    p2 = mon.ping(now=100.0)
+    # Queued 80 ms on the way back only: RTT 100, naive offset skewed by 40.
+    mon.on_pong(LatencyMonitor.pong(p2, 1110.0, 1110.0), now=200.0)
+    assert (mon.rtt, mon.offset) == (100.0, 1000.0)
+    assert mon.jitter > 0
+
+    mon.ping(now=300.0)
+    mon.ping(now=2000.0)
+    assert (mon.lost, mon.loss) == (1, 1 / 3)
+    assert mon.summary().startswith("rtt 100ms")
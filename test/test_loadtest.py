@@ -0,0 +1,48 @@
+import asyncio
+
+import websockets
+
+from bench.loadtest import STAGES, run_clients, summarize
+from server import WS_OPTIONS, Matchmaker
+
+OPTS = {
+    "ramp": 0.0,
+    "ticks": 20,
+    "tick_rate": 100.0,
+    "w": 6,
+    "h": 6,
+    "moves": "random",
+    "skill": 0.8,
+    "addr": "127.0.0.1",
+    "timeout": 5.0,
+}
+
+
+def test_clients_play_full_matches_and_report():
+    async def run():
+        mm = Matchmaker()
+        async with websockets.serve(mm.handler, "127.0.0.1", 0, **WS_OPTIONS) as srv:
+            url = "ws://127.0.0.1:%d" % srv.sockets[0].getsockname()[1]
+            return await run_clients(url, 4, OPTS), mm.matches
+
+    recs, matches = asyncio.run(run())
+    assert matches == 2
+    assert [r["fail"] for r in recs] == [None] * 4
+    assert all(r["ready"] is not None and r["late"] for r in recs)
+
+    report = summarize(recs, 1.0, OPTS)
+    assert report["completed"] == 4 and report["failure_rate"] == 0.0
+    assert set(report["failures"]) == set(STAGES)
+    assert report["time_to_connect_ms"]["n"] == 4
+    assert report["tick_jitter_ms"]["n"] == sum(len(r["late"]) for r in recs)
+
+
+def test_unmatched_client_fails_at_match_stage():
+    async def run():
+        mm = Matchmaker()
+        async with websockets.serve(mm.handler, "127.0.0.1", 0, **WS_OPTIONS) as srv:
+            url = "ws://127.0.0.1:%d" % srv.sockets[0].getsockname()[1]
+            return await run_clients(url, 1, {**OPTS, "timeout": 0.2})
+
+    report = summarize(asyncio.run(run()), 1.0, OPTS)
+    assert report["failures"]["match"] == 1 and report["failure_rate"] == 1.0
@@ -0,0 +1,43 @@
+import logging
+
+import pytest
+
+from logpipe import setup_logging
+
+
+@pytest.fixture
+def game_log():
+    log = logging.getLogger("game")
+    yield log
+    for h in list(log.handlers):
+        log.removeHandler(h)
+    log.setLevel(logging.NOTSET)
+    log.propagate = True
+
+
+def test_records_below_level_are_dropped(tmp_path, game_log):
+    path = tmp_path / "game.log"
+    listener = setup_logging("info", str(path))
+    game_log.debug("noise")
+    logging.getLogger("game.udp").info("kept %d", 1)
+    listener.stop()
+    text = path.read_text()
+    assert "kept 1" in text and "noise" not in text
+
+
+def test_ring_is_written_only_when_an_error_is_logged(tmp_path, game_log):
+    path = tmp_path / "game.log"
+    listener = setup_logging("warning", str(path), ring=3)
+    for i in range(5):
+        game_log.debug("step %d", i)
+    game_log.warning("odd")
+    listener.stop()
+    assert "step" not in path.read_text()
+
+    listener = setup_logging("warning", str(path), ring=3)
+    for i in range(5):
+        game_log.debug("step %d", i)
+    game_log.error("boom")
+    listener.stop()
+    lines = path.read_text().splitlines()
+    assert [ln.split("] ")[1] for ln in lines] == ["step 2", "step 3", "step 4", "boom"]
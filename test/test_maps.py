@@ -0,0 +1,24 @@
+from engine import MOVE_RIGHT, GameState
+from maps import Terrain, load_map
+
+
+def test_load_map_and_walls_block(tmp_path):
+    p = tmp_path / "arena.txt"
+    p.write_text("X..\n.X\n...\n")
+    t = load_map(str(p))
+    assert (t.w, t.h) == (3, 3)
+    assert t.wall(0, 0) and t.wall(1, 1) and not t.wall(2, 1)
+    assert not t.open_cell(3, 0)
+
+    st = GameState(0, 0, t)
+    assert (st.xs[0], st.ys[0]) == (1, 0)
+    assert st.move(0, MOVE_RIGHT)
+    assert not st.move(0, MOVE_RIGHT)
+
+
+def test_digest_depends_on_size_and_walls():
+    assert Terrain(10, 10).digest == Terrain(10, 10).digest
+    assert Terrain(10, 10).digest != Terrain(10, 11).digest
+    assert Terrain(10, 10).digest != Terrain(10, 10, [(3, 3)]).digest
+    assert Terrain(10, 10).is_open_arena()
+    assert not Terrain(10, 10, [(3, 3)]).is_open_arena()
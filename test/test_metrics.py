@@ -0,0 +1,32 @@
+import json
+
+from metrics import Histogram, Metrics
+
+
+def test_histogram_quantiles_come_from_bucket_bounds():
+    h = Histogram((0.001, 0.01, 0.1))
+    for v in [0.0005] * 90 + [0.005] * 9 + [3.0]:
+        h.observe(v)
+    assert (h.count, h.max) == (100, 3.0)
+    assert h.quantile(0.5) == 0.001
+    assert h.quantile(0.95) == 0.01
+    assert h.quantile(1.0) == 3.0
+
+
+def test_exports_json_and_prometheus(tmp_path):
+    m = Metrics()
+    m.observe("tick", 0.0002)
+    m.observe("tick", 0.02)
+    m.count("bytes_out", 15)
+
+    m.export(str(tmp_path / "m.json"))
+    snap = json.loads((tmp_path / "m.json").read_text())
+    assert snap["counters"]["bytes_out"] == 15
+    assert snap["histograms"]["tick"]["count"] == 2
+
+    m.export(str(tmp_path / "m.prom"))
+    text = (tmp_path / "m.prom").read_text()
+    assert "tag_bytes_out_total 15" in text
+    assert 'tag_tick_seconds_bucket{le="0.00025"} 1' in text
+    assert 'tag_tick_seconds_bucket{le="+Inf"} 2' in text
+    assert "tag_tick_seconds_count 2" in text
@@ -0,0 +1,88 @@
+import asyncio
+
+from outbox import PeerWriter
+
+
+class _Transport:
+    def __init__(self):
+        self.buffered = 0
+        self.aborted = False
+
+    def set_write_buffer_limits(self, high):
+        self.high = high
+
+    def get_write_buffer_size(self):
+        return self.buffered
+
+    def abort(self):
+        self.aborted = True
+
+
+class _Writer:
+    def __init__(self):
+        self.writes = []
+        self.transport = _Transport()
+        self.drained = asyncio.Event()
+
+    def write(self, data):
+        self.writes.append(data)
+
+    def is_closing(self):
+        return False
+
+    async def drain(self):
+        await self.drained.wait()
+        self.transport.buffered = 0
+
+
+def test_latest_value_frames_coalesce_and_control_frames_stay():
+    async def run():
+        w = _Writer()
+        pw = PeerWriter(w)
+        pw.start()
+        pw.send(b"pos1;", "pos")
+        pw.send(b"win;")
+        pw.send(b"pos2;", "pos")
+        pw.send(b"ping;", "ping")
+        await asyncio.sleep(0)
+        assert w.writes == [b"pos2;win;ping;"]
+        assert pw.stats["coalesced"] == 1 and pw.stats["frames"] == 3
+
+    asyncio.run(run())
+
+
+def test_stall_applies_backpressure_until_drained():
+    async def run():
+        w = _Writer()
+        pw = PeerWriter(w, high_water=10)
+        pw.start()
+        w.transport.buffered = 100
+        pw.send(b"a", "pos")
+        await asyncio.sleep(0)
+        assert pw.stalled and pw.congested
+        for i in range(50):
+            pw.send(b"p%d" % i, "pos")
+        pw.send(b"win")
+        await asyncio.sleep(0)
+        assert len(w.writes) == 1 and len(pw) == 2
+
+        w.drained.set()
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+        assert w.writes[1] == b"p49win" and not pw.stalled
+        assert pw.stats["stalls"] == 1
+
+    asyncio.run(run())
+
+
+def test_overflow_aborts_the_link():
+    async def run():
+        w = _Writer()
+        pw = PeerWriter(w, limit=4)
+        for i in range(5):
+            pw.send(b"ctl")
+        assert pw.closed and w.transport.aborted
+        pw.send(b"late")
+        assert len(pw) == 0
+
+    asyncio.run(run())
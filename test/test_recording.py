@@ -0,0 +1,95 @@
+import random
+
+from engine import GameState
+from maps import Terrain
+from recording import Recorder, Recording, match_path
+
+
+def _record(path, ticks=2000, seed=1, gap_at=None):
+    """Record a random walk and return the true state after every tick."""
+    rng = random.Random(seed)
+    terrain = Terrain(20, 12, walls=[(5, y) for y in range(3, 9)])
+    state = GameState(0, 0, terrain)
+    rec = Recorder(str(path), terrain, me=1, tick_rate=60.0, key_every=64)
+    truth = {}
+    n = 0
+    for _ in range(ticks):
+        n += 3 if n == gap_at else 1
+        mv = rng.choice((0, 0, 0, 0, 1, 2, 3, 4))
+        state.move(1, mv)
+        if rng.random() < 0.1:
+            state.move(0, rng.randint(1, 4))
+        rec.tick(n, state.xs, state.ys, state.it, mv)
+        truth[n] = (list(state.xs), list(state.ys), mv)
+    return rec, truth, terrain
+
+
+def test_seek_matches_every_recorded_tick(tmp_path):
+    path = tmp_path / "m.tagrec"
+    rec, truth, terrain = _record(path, gap_at=500)
+    rec.close(winner=0)
+    with Recording(str(path)) as r:
+        assert r.complete and r.winner == 0 and r.me == 1
+        assert r.terrain.digest == terrain.digest
+        assert r.last_tick == max(truth)
+        head = r.playhead()
+        for n in sorted(truth, key=lambda _: random.random())[:300]:
+            head.seek(n)
+            assert (head.xs, head.ys, head.move) == truth[n]
+        head = r.playhead()
+        for n in sorted(truth):
+            head.advance(n)
+            assert (head.tick, head.xs, head.ys) == (n, *truth[n][:2])
+
+
+def test_idle_ticks_are_run_length_encoded(tmp_path):
+    path = tmp_path / "idle.tagrec"
+    rec = Recorder(str(path), Terrain(10, 10), me=0, tick_rate=8.0)
+    for n in range(1, 100_001):
+        rec.tick(n, (0, 9), (0, 9), 0)
+    rec.close()
+    with Recording(str(path)) as r:
+        s = r.summary()
+        assert s["ticks"] == 100_000 and s["moves"] == [0, 0]
+        assert s["winner"] is None
+        assert s["bytes"] < 10_000
+
+
+def test_every_input_of_a_tick_is_kept(tmp_path):
+    path = tmp_path / "all.tagrec"
+    rec = Recorder(str(path), Terrain(10, 10), me=0, tick_rate=8.0, key_every=2)
+    rec.tick(1, (0, 9), (0, 9), 0, 2)
+    for n in range(2, 6):
+        rec.tick(n, (n, 9), (0, 9), 0, [1, 2, 2])
+    rec.tick(6, (6, 9), (0, 9), 0, [])
+    rec.close()
+    with Recording(str(path)) as r:
+        assert r.summary()["inputs"] == 1 + 4 * 3
+        for n in range(2, 6):
+            head = r.playhead(n)
+            assert (head.xs[0], head.move, head.moves) == (n, 2, (1, 2, 2))
+        assert r.playhead(6).moves == ()
+        keys, data_end = r.keyframes, r.data_end
+    path.write_bytes(path.read_bytes()[: data_end - 1])
+    with Recording(str(path)) as cut:
+        assert not cut.complete and cut.keyframes == keys
+        assert cut.playhead(5).moves == (1, 2, 2)
+
+
+def test_truncated_file_is_still_readable(tmp_path):
+    path = tmp_path / "cut.tagrec"
+    rec, truth, _ = _record(path, ticks=1000)
+    rec._f.flush()
+    data = path.read_bytes()
+    path.write_bytes(data[:-1])
+    with Recording(str(path)) as r:
+        assert not r.complete
+        assert r.keyframes
+        head = r.playhead(500)
+        assert (head.xs, head.ys) == tuple(truth[500][:2])
+
+
+def test_each_match_of_a_session_gets_its_own_file():
+    assert match_path("m.tagrec", 1) == "m.tagrec"
+    assert match_path("runs/m.tagrec", 3) == "runs/m-3.tagrec"
+    assert match_path("m", 2) == "m-2"
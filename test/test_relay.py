@@ -0,0 +1,45 @@
+import asyncio
+
+from relay import Relay, open_relayed
+
+
+def test_relay_pairs_by_token_and_forwards_both_ways():
+    async def run():
+        relay = Relay()
+        srv = await relay.start("127.0.0.1", 0)
+        port = srv.sockets[0].getsockname()[1]
+        (ra, wa), (rb, wb) = await asyncio.gather(
+            open_relayed("127.0.0.1", port, "t1"),
+            open_relayed("127.0.0.1", port, "t1"),
+        )
+        assert relay.pairs == 1 and not relay.waiting
+
+        wa.write(b"ping\n")
+        assert await asyncio.wait_for(rb.readline(), 1.0) == b"ping\n"
+        wb.write(b"x" * 100_000)
+        assert len(await asyncio.wait_for(ra.readexactly(100_000), 2.0)) == 100_000
+
+        wa.close()
+        assert await asyncio.wait_for(rb.read(), 1.0) == b""
+        wb.close()
+        srv.close()
+
+    asyncio.run(run())
+
+
+def test_unpaired_token_expires():
+    async def run():
+        relay = Relay(pair_timeout=0.05)
+        srv = await relay.start("127.0.0.1", 0)
+        port = srv.sockets[0].getsockname()[1]
+        try:
+            await asyncio.wait_for(open_relayed("127.0.0.1", port, "lonely"), 1.0)
+        except ConnectionError:
+            pass
+        else:
+            raise AssertionError("expected the relay to give up")
+        await asyncio.sleep(0.01)
+        assert not relay.waiting and relay.legs == 0
+        srv.close()
+
+    asyncio.run(run())
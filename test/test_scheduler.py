@@ -0,0 +1,69 @@
+import asyncio
+import time
+
+from scheduler import RenderScheduler, TickScheduler
+
+
+def test_render_requests_coalesce_within_a_frame():
+    async def run():
+        paints = []
+        rs = RenderScheduler(lambda: paints.append(1), max_fps=50)
+        for _ in range(10):
+            rs.request()
+        await asyncio.sleep(0.05)
+        assert (rs.requested, rs.performed) == (10, 1)
+
+        rs.request()
+        rs.request(urgent=True)
+        assert rs.performed == 2
+        await asyncio.sleep(0.05)
+        assert rs.performed == 2
+
+    asyncio.run(run())
+
+
+def test_uncapped_paints_every_request():
+    async def run():
+        rs = RenderScheduler(lambda: None, max_fps=0)
+        for _ in range(5):
+            rs.request()
+        assert rs.performed == 5
+
+    asyncio.run(run())
+
+
+def test_tick_period_does_not_include_step_time():
+    async def run():
+        seen = []
+
+        async def step(n):
+            seen.append(n)
+            time.sleep(0.004)
+
+        ts = TickScheduler(step, rate=100)
+        t0 = time.monotonic()
+        await ts.run(lambda: len(seen) < 30)
+        elapsed = time.monotonic() - t0
+        assert seen == list(range(1, 31))
+        assert 0.29 <= elapsed < 0.36
+        assert ts.skipped == 0
+
+    asyncio.run(run())
+
+
+def test_stalled_loop_skips_ticks_beyond_catchup():
+    async def run():
+        seen = []
+
+        async def step(n):
+            seen.append(n)
+            if n == 2:
+                time.sleep(0.1)
+
+        ts = TickScheduler(step, rate=100, max_catchup=2)
+        await ts.run(lambda: len(seen) < 6)
+        assert ts.overruns == 1 and ts.skipped >= 5
+        assert seen[:2] == [1, 2] and seen[2] > 3
+        assert seen[3:] == [seen[2] + 1, seen[2] + 2, seen[2] + 3]
+
+    asyncio.run(run())
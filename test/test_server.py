@@ -1,13 +1,113 @@
 import asyncio
+import json
+
 import websockets
-from src.config import CENTRAL_SERVER_URL
 
-async def test_connection():
-    try:
-        async with websockets.connect(CENTRAL_SERVER_URL) as websocket:
-            print("✅ Connected to central server!")
-    except Exception as e:
-        print(f"❌ Connection failed: {e}")
+from server import WS_OPTIONS, Matchmaker
+
+
+async def _recv(ws):
+    return json.loads(await asyncio.wait_for(ws.recv(), 2.0))
+
+
+def test_pairs_relays_and_reports_peer_left():
+    async def run():
+        mm = Matchmaker()
+        async with websockets.serve(mm.handler, "127.0.0.1", 0, **WS_OPTIONS) as srv:
+            url = "ws://127.0.0.1:%d" % srv.sockets[0].getsockname()[1]
+            a = await websockets.connect(url)
+            assert await _recv(a) == {"type": "waiting"}
+            b = await websockets.connect(url)
+            assert await _recv(a) == {"type": "matched", "role": "caller"}
+            assert await _recv(b) == {"type": "matched", "role": "callee"}
+            assert not mm.queue
+
+            cand = {"type": "ice-candidate", "ip": "10.0.0.1", "port": 4242}
+            await a.send(json.dumps(cand))
+            assert await _recv(b) == cand
+
+            await a.close()
+            assert await _recv(b) == {"type": "peer-left"}
+            await b.close()
+            await asyncio.sleep(0.05)
+            assert mm.online == 0 and mm.matches == 1
+
+    asyncio.run(run())
+
+
+def test_waiting_client_that_leaves_is_dequeued():
+    async def run():
+        mm = Matchmaker()
+        async with websockets.serve(mm.handler, "127.0.0.1", 0, **WS_OPTIONS) as srv:
+            url = "ws://127.0.0.1:%d" % srv.sockets[0].getsockname()[1]
+            a = await websockets.connect(url)
+            await _recv(a)
+            await a.close()
+            await asyncio.sleep(0.05)
+            assert not mm.queue
+
+            b = await websockets.connect(url)
+            assert await _recv(b) == {"type": "waiting"}
+            await b.close()
+
+    asyncio.run(run())
+
+
+def test_queue_message_rematches_on_the_same_connection():
+    async def run():
+        mm = Matchmaker()
+        async with websockets.serve(mm.handler, "127.0.0.1", 0, **WS_OPTIONS) as srv:
+            url = "ws://127.0.0.1:%d" % srv.sockets[0].getsockname()[1]
+            a = await websockets.connect(url)
+            b = await websockets.connect(url)
+            c = await websockets.connect(url)
+            await _recv(a), await _recv(a), await _recv(b), await _recv(c)
+
+            await a.send(json.dumps({"type": "queue"}))
+            assert await _recv(b) == {"type": "peer-left"}
+            assert await _recv(c) == {"type": "matched", "role": "caller"}
+            assert await _recv(a) == {"type": "matched", "role": "callee"}
+
+            await b.send(json.dumps({"type": "queue"}))
+            await b.send(json.dumps({"type": "queue"}))
+            assert await _recv(b) == {"type": "waiting"}
+            await asyncio.sleep(0.05)
+            assert list(mm.queue) and mm.matches == 2 and mm.online == 3
+            for ws in (a, b, c):
+                await ws.close()
+
+    asyncio.run(run())
+
+
+def test_star_lobby_fills_then_fans_out_from_the_host():
+    async def run():
+        mm = Matchmaker()
+        async with websockets.serve(mm.handler, "127.0.0.1", 0, **WS_OPTIONS) as srv:
+            url = "ws://127.0.0.1:%d" % srv.sockets[0].getsockname()[1]
+            pair = await websockets.connect(url)
+            assert await _recv(pair) == {"type": "waiting"}
+            a, b, c = [await websockets.connect(url + "/?players=3") for _ in "abc"]
+            for ws in (a, b):
+                assert await _recv(ws) == {"type": "waiting"}
+            for seat, ws in enumerate((a, b, c)):
+                role = "caller" if seat == 0 else "callee"
+                assert await _recv(ws) == {
+                    "type": "matched",
+                    "role": role,
+                    "players": 3,
+                    "seat": seat,
+                }
+            assert list(mm.queue) and not mm.lobbies[3]
+
+            cand = {"type": "ice-candidate", "port": 4242, "star": True}
+            await a.send(json.dumps(cand))
+            assert await _recv(b) == cand and await _recv(c) == cand
+
+            await c.close()
+            await asyncio.sleep(0.05)
+            await a.close()
+            assert await _recv(b) == {"type": "peer-left"}
+            for ws in (b, pair):
+                await ws.close()
 
-if __name__ == "__main__":
-    asyncio.run(test_connection())
+    asyncio.run(run())
@@ -0,0 +1,115 @@
+import asyncio
+import time
+
+from engine import MOVE_RIGHT, MOVE_UP, GameState
+from star import StarClient, StarHost, lobby_url
+
+
+def test_host_applies_peer_inputs_and_broadcasts_one_snapshot():
+    async def run():
+        host = StarHost(GameState(10, 10, players=3))
+        port = await host.listen("127.0.0.1")
+        a, b = StarClient(), StarClient()
+        await a.connect("127.0.0.1", port)
+        await b.connect("127.0.0.1", port)
+        assert await host.wait_full(1.0)
+        assert (a.me, b.me, a.players) == (1, 2, 3)
+
+        a.send_move(MOVE_UP)
+        b.send_move(MOVE_RIGHT)
+        await asyncio.sleep(0.05)
+        frame = host.step()
+
+        snaps = [await it.__anext__() for it in (a.snapshots(), b.snapshots())]
+        assert snaps[0] == snaps[1]
+        assert (snaps[0]["xs"][1], snaps[0]["ys"][1]) == (9, 8)
+        assert (snaps[0]["xs"][2], snaps[0]["ys"][2]) == (9, 0)
+        assert host.stats["bytes_out"] == 2 * len(frame)
+        a.close()
+        b.close()
+        host.close()
+
+    asyncio.run(run())
+
+
+def test_backed_up_peer_is_skipped_not_awaited():
+    async def run():
+        host = StarHost(GameState(10, 10, players=2), high_water=-1)
+        port = await host.listen("127.0.0.1")
+        c = StarClient()
+        await c.connect("127.0.0.1", port)
+        await host.wait_full(1.0)
+        host.step()
+        assert host.stats["skipped"] == 1 and host.links[0].skipped == 1
+        c.close()
+        host.close()
+
+    asyncio.run(run())
+
+
+def test_concurrent_joiners_never_take_more_seats_than_there_are():
+    async def run():
+        host = StarHost(GameState(10, 10, players=4))
+        port = await host.listen("127.0.0.1")
+        clients = [StarClient() for _ in range(host.seats + 2)]
+        got = await asyncio.gather(
+            *(c.connect("127.0.0.1", port) for c in clients), return_exceptions=True
+        )
+        refused = [g for g in got if isinstance(g, ConnectionError)]
+        assert len(refused) == 2 and await host.wait_full(1.0)
+        assert sorted(link.index for link in host.links) == [1, 2, 3]
+        host.step()
+        for c in clients:
+            c.close()
+        host.close()
+
+    asyncio.run(run())
+
+
+def test_a_bad_move_code_disconnects_only_that_peer():
+    async def run():
+        host = StarHost(GameState(10, 10, players=3))
+        port = await host.listen("127.0.0.1")
+        good, bad = StarClient(), StarClient()
+        await good.connect("127.0.0.1", port)
+        await bad.connect("127.0.0.1", port)
+        await host.wait_full(1.0)
+        bad.send_move(200)
+        good.send_move(MOVE_UP)
+        await asyncio.sleep(0.05)
+        host.step()
+        assert host.state.out[bad.me] and not host.state.out[good.me]
+        assert host.state.ys[good.me] == 8
+        good.close()
+        bad.close()
+        host.close()
+
+    asyncio.run(run())
+
+
+def test_run_keeps_the_tick_rate_when_steps_are_slow():
+    async def run():
+        host = StarHost(GameState(10, 10, players=2), tick=0.02)
+        step = host.step
+
+        def slow_step():
+            t0 = time.perf_counter()
+            while time.perf_counter() - t0 < 0.01:
+                pass
+            return step()
+
+        host.step = slow_step
+        task = asyncio.create_task(host.run())
+        await asyncio.sleep(0.4)
+        host.state.tag(1)
+        await asyncio.wait_for(task, 1.0)
+        assert host.stats["ticks"] >= 17  # a sleep-then-step loop gets ~13
+        host.close()
+
+    asyncio.run(run())
+
+
+def test_lobby_url_asks_for_the_match_size():
+    assert lobby_url("ws://h:8080", 2) == "ws://h:8080"
+    assert lobby_url("ws://h:8080", 8) == "ws://h:8080/?players=8"
+    assert lobby_url("ws://h/s?k=1", 3) == "ws://h/s?k=1&players=3"
@@ -0,0 +1,28 @@
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+PROBE = """
+import sys
+import main
+sys.argv = ["main.py", "--help"]
+try:
+    main.main()
+except SystemExit:
+    pass
+print("loaded:" + ",".join(m for m in ("textual", "websockets", "numpy") if m in sys.modules))
+"""
+
+
+def test_help_does_not_import_the_ui():
+    out = subprocess.run(
+        [sys.executable, "-c", PROBE],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    assert "usage:" in out
+    assert out.splitlines()[-1] == "loaded:"
@@ -0,0 +1,68 @@
+import asyncio
+
+from bench.netsim import LossyDatagramProxy
+from udp import D_POS, D_REL, DGRAM, REL_WINDOW, open_udp_client, open_udp_host
+from wire import POS, BinaryCodec
+
+
+def test_stale_positions_are_dropped():
+    async def run():
+        host, _ = await open_udp_host()
+        addr = ("127.0.0.1", 1)
+        for seq, x in ((2, 5), (1, 4), (2, 5), (3, 6)):
+            host.datagram_received(DGRAM.pack(D_POS, seq) + POS.pack(x, 0, 0), addr)
+        got = [host._inbox.get_nowait()["x"] for _ in range(host._inbox.qsize())]
+        assert got == [5, 6]
+        assert host.stats["stale"] == 2
+        host.close()
+
+    asyncio.run(run())
+
+
+def test_pos_carries_the_tick_even_when_it_restarts():
+    async def run():
+        host, port = await open_udp_host()
+        client = await open_udp_client("127.0.0.1", port)
+        for n in (40, 41, 1, 2):  # a rematch restarts the tick numbering
+            client.send({"type": "pos", "x": n, "y": 0, "t": 0, "n": n})
+        client.send({"type": "pos", "x": 3, "y": 0, "t": 0})
+        got = [await asyncio.wait_for(host.recv(), 1.0) for _ in range(5)]
+        assert [m.get("n") for m in got] == [40, 41, 1, 2, None]
+        assert [m["x"] for m in got] == [40, 41, 1, 2, 3]
+        client.close()
+        host.close()
+
+    asyncio.run(run())
+
+
+def test_reliable_duplicates_are_dropped_in_constant_space():
+    async def run():
+        host, _ = await open_udp_host()
+        addr = ("127.0.0.1", 1)
+        body = BinaryCodec().encode({"type": "ready", "wire": 1})
+        seqs = [2, 1, 2, 3, 1] + list(range(5, 5 + 3 * REL_WINDOW)) + [4, 6]
+        for seq in seqs:
+            host.datagram_received(DGRAM.pack(D_REL, seq) + body, addr)
+        assert host._inbox.qsize() == 3 + 3 * REL_WINDOW
+        assert host.stats["dup"] == 4  # 2, 1, then 4 and 6 behind the window
+        assert len(host._rel_above) <= REL_WINDOW
+        host.close()
+
+    asyncio.run(run())
+
+
+def test_reliable_messages_survive_loss():
+    async def run():
+        host, port = await open_udp_host(rto=0.01)
+        proxy = LossyDatagramProxy(("127.0.0.1", port), loss=0.3, seed=7)
+        client = await open_udp_client(*(await proxy.start()), rto=0.01)
+        for i in range(20):
+            client.send({"type": "ready", "wire": i % 2})
+        got = [await asyncio.wait_for(host.recv(), 2.0) for _ in range(20)]
+        assert all(m["type"] == "ready" for m in got)
+        assert client.stats["retransmits"] > 0
+        client.close()
+        host.close()
+        proxy.close()
+
+    asyncio.run(run())
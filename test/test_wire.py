@@ -0,0 +1,60 @@
+import asyncio
+
+from wire import (
+    WIRE_BIN1,
+    WIRE_BIN2,
+    WIRE_JSON,
+    BinaryCodec,
+    JsonCodec,
+    codec_for,
+    negotiate,
+)
+
+
+def test_negotiate_falls_back_to_json_for_old_peers():
+    assert negotiate(WIRE_BIN1, {"type": "ready"}) == WIRE_JSON
+    assert negotiate(WIRE_BIN1, {"type": "ready", "wire": 1}) == WIRE_BIN1
+    assert negotiate(WIRE_JSON, {"type": "ready", "wire": 1}) == WIRE_JSON
+    assert negotiate(WIRE_BIN1, {"type": "ready", "wire": 99}) == WIRE_BIN1
+
+
+def test_binary_round_trip():
+    c = BinaryCodec()
+    for msg in (
+        {"type": "pos", "x": 3, "y": 9, "t": 1_700_000_000_123},
+        {"type": "win"},
+        {"type": "ready", "wire": 1},
+        {"type": "chat", "text": "gg"},
+    ):
+        assert c.decode(c.encode(msg)) == msg
+    assert len(c.encode({"type": "pos", "x": 1, "y": 2, "t": 3})) == 15
+
+
+def test_tick_numbers_ride_on_v2_frames_only():
+    pos = {"type": "pos", "x": 1, "y": 2, "t": 3, "n": 70_000}
+    win = {"type": "win", "n": 9}
+    v1, v2 = codec_for(WIRE_BIN1), codec_for(WIRE_BIN2)
+    assert v2.decode(v2.encode(pos)) == pos
+    assert v2.decode(v2.encode(win)) == win
+    assert len(v2.encode(pos)) == 19
+    assert v1.decode(v1.encode(pos)) == {"type": "pos", "x": 1, "y": 2, "t": 3}
+    assert v1.encode(win) == v1.encode({"type": "win"})
+    assert negotiate(WIRE_BIN2, {"type": "ready", "wire": 1}) == WIRE_BIN1
+
+
+def test_stream_read_both_codecs():
+    async def run():
+        for codec in (JsonCodec(), BinaryCodec()):
+            r = asyncio.StreamReader()
+            r.feed_data(codec.encode({"type": "pos", "x": 1, "y": 2, "t": 3}))
+            r.feed_data(codec.encode({"type": "win"}))
+            r.feed_eof()
+            assert await codec.read(r) == {"type": "pos", "x": 1, "y": 2, "t": 3}
+            assert await codec.read(r) == {"type": "win"}
+            assert await codec.read(r) is None
+
+    asyncio.run(run())
+
+
+def test_codec_for_unknown_version_is_json():
+    assert codec_for(42).version == WIRE_JSON
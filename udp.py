@@ -0,0 +1,319 @@
+"""
+ASCII Tag Game — UDP Peer Transport
+
+An alternative to the peer TCP stream for lossy links. Position updates
+are sent as sequence-numbered datagrams and anything older than the
+newest position already received is dropped, so one lost packet never
+delays the ones behind it. Control messages (`ready`, `win`, ...) are sent
+reliably: each carries its own sequence number, is retransmitted until
+acknowledged, and is delivered at most once.
+
+Datagram layout (all big-endian):
+    type (1 byte) | seq (4 bytes) | body
+      D_POS — body is `wire.POS` (x, y, t); unreliable, newest wins.
+      D_TPOS — as D_POS with the sender's tick number: body is
+              `wire.TPOS` (x, y, t, n), and `n` is delivered as `"n"`.
+              The seq stays the link's own counter (ticks restart at 1
+              on a rematch; the seq never goes back).
+      D_REL — body is one `wire.BinaryCodec` frame; acked and retransmitted.
+      D_ACK — empty body; acknowledges the D_REL with the same seq.
+
+Duplicate D_REL frames are detected with a sliding window: every seq up
+to the highest contiguous one received is done, and only the seqs above
+it that arrived early are kept (at most `REL_WINDOW`; a gap older than
+that is given up on), so a long session keeps constant state.
+"""
+
+import asyncio
+import logging
+import struct
+from typing import Dict, List, Optional, Set, Tuple
+
+from wire import POS, TPOS, BinaryCodec
+
+log = logging.getLogger("game.udp")
+
+D_POS = 1
+D_REL = 2
+D_ACK = 3
+D_TPOS = 4
+
+DGRAM = struct.Struct("!BI")
+
+RTO = 0.1
+MAX_RETRIES = 30
+REL_WINDOW = 1024
+
+_codec = BinaryCodec()
+
+
+class UdpPeer(asyncio.DatagramProtocol):
+    """
+    One end of a UDP game link, usable as an asyncio datagram protocol.
+
+    The host side is created without a remote address and locks onto the
+    first peer that sends it a datagram; the joining side is created with
+    the host's address. Received messages are decoded to the same dicts
+    the TCP path produces and queued for `recv()`.
+
+    Attributes:
+        remote (tuple | None): The peer's (ip, port), once known.
+        peer_seen (asyncio.Future): Resolves when the first datagram arrives.
+        stats (dict): Counters — sent, received, stale, dup, retransmits.
+    """
+
+    def __init__(
+        self,
+        remote: Optional[Tuple[str, int]] = None,
+        rto: float = RTO,
+        max_retries: int = MAX_RETRIES,
+    ) -> None:
+        """
+        Initialise the protocol state.
+
+        Args:
+            remote (tuple | None): The peer address, or None to learn it.
+            rto (float): Seconds to wait for an ack before retransmitting.
+            max_retries (int): Retransmits before the peer is declared gone.
+        """
+        loop = asyncio.get_event_loop()
+        self.remote = remote
+        self.rto = rto
+        self.max_retries = max_retries
+        self.transport: Optional[asyncio.DatagramTransport] = None
+        self.peer_seen: asyncio.Future = loop.create_future()
+        self.stats = {"sent": 0, "received": 0, "stale": 0, "dup": 0, "retransmits": 0}
+
+        self._inbox: asyncio.Queue = asyncio.Queue()
+        self._pos_tx = 0
+        self._pos_rx = 0
+        self._rel_tx = 0
+        self._rel_floor = 0  # every reliable seq up to this one arrived
+        self._rel_above: Set[int] = set()  # arrived ahead of a gap
+        self._unacked: Dict[int, Tuple[bytes, int, asyncio.TimerHandle]] = {}
+        self._closed = False
+
+    # ── asyncio.DatagramProtocol ────────────────────────────────────────
+
+    def connection_made(self, transport) -> None:  # type: ignore[override]
+        self.transport = transport
+
+    def datagram_received(self, data: bytes, addr) -> None:
+        if self._closed or len(data) < DGRAM.size:
+            return
+        if self.remote is None:
+            self.remote = addr
+        elif addr != self.remote:
+            return
+        if not self.peer_seen.done():
+            self.peer_seen.set_result(addr)
+
+        kind, seq = DGRAM.unpack_from(data)
+        body = data[DGRAM.size :]
+        self.stats["received"] += 1
+
+        if kind == D_POS or kind == D_TPOS:
+            if seq <= self._pos_rx:
+                self.stats["stale"] += 1
+                return
+            self._pos_rx = seq
+            if kind == D_TPOS:
+                x, y, t, n = TPOS.unpack(body)
+                m = {"type": "pos", "x": x, "y": y, "t": t, "n": n}
+            else:
+                x, y, t = POS.unpack(body)
+                m = {"type": "pos", "x": x, "y": y, "t": t}
+            self._inbox.put_nowait(m)
+        elif kind == D_REL:
+            self._sendto(DGRAM.pack(D_ACK, seq))
+            if not self._rel_new(seq):
+                self.stats["dup"] += 1
+                return
+            try:
+                self._inbox.put_nowait(_codec.decode(body))
+            except Exception as exc:
+                log.warning("udp: bad reliable frame: %s", exc)
+        elif kind == D_ACK:
+            pending = self._unacked.pop(seq, None)
+            if pending is not None:
+                pending[2].cancel()
+
+    def _rel_new(self, seq: int) -> bool:
+        """
+        Mark a reliable seq as received.
+
+        Args:
+            seq (int): Sequence number of a D_REL datagram.
+
+        Returns:
+            bool: False if it was delivered before (or fell out of the
+            window), True if the message is new.
+        """
+        floor, above = self._rel_floor, self._rel_above
+        if seq <= floor or seq in above:
+            return False
+        above.add(seq)
+        if seq - floor > REL_WINDOW:
+            floor = seq - REL_WINDOW
+            above.difference_update([s for s in above if s <= floor])
+        while floor + 1 in above:
+            floor += 1
+            above.remove(floor)
+        self._rel_floor = floor
+        return True
+
+    def error_received(self, exc: Exception) -> None:
+        log.debug("udp: error_received: %s", exc)
+
+    def connection_lost(self, exc: Optional[Exception]) -> None:
+        self._shutdown()
+
+    # ── public API ──────────────────────────────────────────────────────
+
+    def send(self, obj: dict) -> None:
+        """
+        Send one message to the peer.
+
+        A plain `pos` update (optionally with its tick number `"n"`) goes
+        out as an unreliable sequenced datagram; every other message is
+        sent reliably.
+
+        Args:
+            obj (dict): The message payload.
+        """
+        if self._closed or self.remote is None:
+            return
+        if obj.get("type") == "pos" and len(obj) - ("n" in obj) == 4:
+            self._pos_tx += 1
+            x, y, t = obj["x"], obj["y"], obj["t"]
+            if "n" in obj:
+                frame = DGRAM.pack(D_TPOS, self._pos_tx) + TPOS.pack(
+                    x, y, t, obj["n"] & 0xFFFFFFFF
+                )
+            else:
+                frame = DGRAM.pack(D_POS, self._pos_tx) + POS.pack(x, y, t)
+            self._sendto(frame)
+            return
+        self._rel_tx += 1
+        seq = self._rel_tx
+        frame = DGRAM.pack(D_REL, seq) + _codec.encode(obj)
+        self._sendto(frame)
+        handle = asyncio.get_event_loop().call_later(self.rto, self._retransmit, seq)
+        self._unacked[seq] = (frame, 0, handle)
+
+    async def recv(self) -> Optional[dict]:
+        """
+        Wait for the next delivered message.
+
+        Returns:
+            dict | None: The message, or None once the link is closed or
+                         the peer stopped acknowledging reliable messages.
+        """
+        return await self._inbox.get()
+
+    async def recv_batch(self) -> Optional[List[dict]]:
+        """
+        Wait for the next delivered message and take every one queued behind it.
+
+        Returns:
+            list[dict] | None: The messages, or None once the link is closed
+                               (a close queued behind messages is kept for
+                               the next call).
+        """
+        first = await self._inbox.get()
+        if first is None:
+            return None
+        out = [first]
+        q = self._inbox
+        while not q.empty():
+            m = q.get_nowait()
+            if m is None:
+                q.put_nowait(None)
+                break
+            out.append(m)
+        return out
+
+    def is_closing(self) -> bool:
+        """
+        Report whether the link has been closed.
+
+        Returns:
+            bool: True after `close()` or a reliable-delivery failure.
+        """
+        return self._closed
+
+    def close(self) -> None:
+        """
+        Close the socket and wake any pending `recv()` with None.
+        """
+        if self.transport is not None:
+            self.transport.close()
+        self._shutdown()
+
+    # ── internals ───────────────────────────────────────────────────────
+
+    def _sendto(self, data: bytes) -> None:
+        if self.transport is None or self.transport.is_closing():
+            return
+        self.transport.sendto(data, self.remote)
+        self.stats["sent"] += 1
+
+    def _retransmit(self, seq: int) -> None:
+        pending = self._unacked.get(seq)
+        if pending is None or self._closed:
+            return
+        frame, tries, _ = pending
+        if tries >= self.max_retries:
+            log.warning("udp: reliable seq %d never acked — peer gone", seq)
+            self.close()
+            return
+        self.stats["retransmits"] += 1
+        self._sendto(frame)
+        handle = asyncio.get_event_loop().call_later(self.rto, self._retransmit, seq)
+        self._unacked[seq] = (frame, tries + 1, handle)
+
+    def _shutdown(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        for _, _, handle in self._unacked.values():
+            handle.cancel()
+        self._unacked.clear()
+        self._inbox.put_nowait(None)
+
+
+async def open_udp_host(port: int = 0, **kw) -> Tuple[UdpPeer, int]:
+    """
+    Bind a UDP endpoint on all interfaces for the hosting peer.
+
+    Args:
+        port (int): Local port, or 0 for an OS-assigned one.
+        **kw: Extra keyword arguments for `UdpPeer`.
+
+    Returns:
+        tuple: The protocol instance and the bound port.
+    """
+    loop = asyncio.get_event_loop()
+    transport, peer = await loop.create_datagram_endpoint(
+        lambda: UdpPeer(**kw), local_addr=("0.0.0.0", port)
+    )
+    return peer, transport.get_extra_info("sockname")[1]
+
+
+async def open_udp_client(ip: str, port: int, **kw) -> UdpPeer:
+    """
+    Open a UDP endpoint that talks to the host at `ip:port`.
+
+    Args:
+        ip (str): The host's advertised address.
+        port (int): The host's UDP port.
+        **kw: Extra keyword arguments for `UdpPeer`.
+
+    Returns:
+        UdpPeer: The protocol instance.
+    """
+    loop = asyncio.get_event_loop()
+    _, peer = await loop.create_datagram_endpoint(
+        lambda: UdpPeer(remote=(ip, port), **kw), local_addr=("0.0.0.0", 0)
+    )
+    return peer
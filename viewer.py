@@ -0,0 +1,265 @@
+"""
+ASCII Tag Game — Replay and Spectator Viewers
+
+Textual apps that show a match without playing in it, on the same board
+widget as the game.
+
+`ReplayApp` plays a recorded match (see `recording.py`). The playback
+clock runs at `speed` times the match's tick rate; every frame the
+playhead either steps forward from where it is or, after a jump, seeks
+from the nearest keyframe, so skipping to any tick is instant regardless
+of the match length.
+
+Keys: Space pause, ←/→ back/forward 5 s, ↑/↓ double/halve the speed,
+Home/End first/last tick, Q quit.
+
+`SpectateApp` follows a live match through a broadcast relay (see
+`broadcast.py`): it repaints after every read from the relay, so a burst
+of frames costs one repaint. Keys: Q quit.
+"""
+
+import time
+from typing import Optional
+
+from textual.app import App, ComposeResult
+from textual.widgets import Static
+
+from board import Board
+from broadcast import Spectator
+from config import EMPTY, GRID_H, GRID_W, SYM_A, SYM_B
+from maps import Terrain
+from recording import Recording
+
+FPS = 30.0
+JUMP = 5.0
+
+
+class ReplayApp(App):  # type: ignore[type-arg]
+    """
+    Replay player for one recording.
+
+    Attributes:
+        rec (Recording): The mapped recording.
+        speed (float): Playback speed multiplier.
+        paused (bool): True while playback is stopped.
+    """
+
+    CSS = """
+    Screen  { align: center middle; background: #111; }
+    #title  { width: 30; text-align: center; color: yellow; text-style: bold; margin-bottom: 1; }
+    #board  { min-width: 30; max-width: 100%; max-height: 60vh; color: #ddd; margin-top: 1; margin-bottom: 1; }
+    #status { width: 40; text-align: center; color: #aaaaaa; }
+    #hint   { width: 40; text-align: center; color: #444444; margin-top: 1; }
+    """
+
+    BINDINGS = [
+        ("q", "quit", "Quit"),
+        ("space", "toggle", "Pause"),
+        ("left", "jump(-1)", "Back"),
+        ("right", "jump(1)", "Forward"),
+        ("up", "speed(2)", "Faster"),
+        ("down", "speed(0.5)", "Slower"),
+        ("home", "goto(0)", "Start"),
+        ("end", "goto(-1)", "End"),
+    ]
+
+    def __init__(self, rec: Recording, speed: float = 1.0, start: int = 0) -> None:
+        """
+        Create the viewer.
+
+        Args:
+            rec (Recording): Recording to play.
+            speed (float): Initial playback speed multiplier.
+            start (int): Tick to start at.
+        """
+        super().__init__()
+        self.rec = rec
+        self.speed = speed
+        self.paused = False
+        self.head = rec.playhead(start)
+        self._base_tick = float(self.head.tick)
+        self._base_time = time.monotonic()
+
+    def compose(self) -> ComposeResult:
+        """
+        Yield the title, board, status line and key hints.
+        """
+        yield Static(f"◈  REPLAY  ◈  {self.rec.path}", id="title")
+        yield Board(self.rec.terrain, EMPTY, id="board")
+        yield Static("", id="status")
+        yield Static(
+            "SPACE pause  ←/→ 5 s  ↑/↓ speed  HOME/END  Q quit", id="hint"
+        )
+
+    def on_mount(self) -> None:
+        """
+        Start the frame timer and draw the starting tick.
+        """
+        self.set_interval(1 / FPS, self._frame)
+        self._show()
+
+    def _clock(self) -> float:
+        """
+        Return the (fractional) tick the playback clock points at.
+        """
+        if self.paused:
+            return self._base_tick
+        elapsed = time.monotonic() - self._base_time
+        return self._base_tick + elapsed * self.rec.tick_rate * self.speed
+
+    def _rebase(self, tick: Optional[float] = None) -> None:
+        self._base_tick = self._clock() if tick is None else tick
+        self._base_time = time.monotonic()
+
+    def _frame(self) -> None:
+        """
+        Advance the playhead to the clock; pause at the last tick.
+        """
+        if self.paused:
+            return
+        target = int(self._clock())
+        if target >= self.rec.last_tick:
+            target = self.rec.last_tick
+            self.paused = True
+            self._rebase(target)
+        if target != self.head.tick:
+            self.head.advance(target)
+            self._show()
+
+    def _show(self) -> None:
+        """
+        Draw the playhead's state on the board and status line.
+        """
+        h = self.head
+        self.query_one("#board", Board).place(
+            {SYM_A: (h.xs[0], h.ys[0]), SYM_B: (h.xs[1], h.ys[1])},
+            focus=(h.xs[self.rec.me], h.ys[self.rec.me]),
+        )
+        state = "⏸" if self.paused else "▶"
+        text = f"{state} tick {h.tick}/{self.rec.last_tick}  ×{self.speed:g}"
+        if h.tick >= self.rec.last_tick and self.rec.winner is not None:
+            who = ("caller", "callee")[self.rec.winner]
+            text += f"  — {who} ({(SYM_A, SYM_B)[self.rec.winner]}) wins"
+        self.query_one("#status", Static).update(text)
+
+    def _seek(self, tick: float) -> None:
+        tick = max(0.0, min(float(self.rec.last_tick), tick))
+        self._rebase(tick)
+        self.head.seek(int(tick))
+        self._show()
+
+    def action_toggle(self) -> None:
+        """
+        Pause or resume; resuming at the end starts over.
+        """
+        self._rebase()
+        self.paused = not self.paused
+        if not self.paused and self.head.tick >= self.rec.last_tick:
+            self._rebase(0)
+            self.head.seek(0)
+        self._show()
+
+    def action_jump(self, direction: int) -> None:
+        """
+        Seek JUMP seconds of match time back (-1) or forward (1).
+        """
+        self._seek(self._clock() + direction * JUMP * self.rec.tick_rate)
+
+    def action_speed(self, factor: float) -> None:
+        """
+        Multiply the playback speed by `factor` (kept within 1/16–1024).
+        """
+        self._rebase()
+        self.speed = min(1024.0, max(1 / 16, self.speed * factor))
+        self._show()
+
+    def action_goto(self, where: int) -> None:
+        """
+        Jump to the first tick (0) or the last one (-1).
+        """
+        self._seek(self.rec.last_tick if where < 0 else 0)
+
+
+class SpectateApp(App):  # type: ignore[type-arg]
+    """
+    Live view of a broadcast match.
+
+    Attributes:
+        addr (str): "host[:port]" of the broadcast relay.
+        match (str): Name of the match to watch.
+        spectator (Spectator): The local copy of the match.
+    """
+
+    CSS = ReplayApp.CSS
+
+    BINDINGS = [("q", "quit", "Quit")]
+
+    def __init__(self, addr: str, match: str) -> None:
+        """
+        Create the viewer.
+
+        Args:
+            addr (str): "host[:port]" of the broadcast relay.
+            match (str): Name of the match to watch.
+        """
+        super().__init__()
+        self.addr = addr
+        self.match = match
+        self.spectator = Spectator()
+
+    def compose(self) -> ComposeResult:
+        """
+        Yield the title, board, status line and key hint.
+        """
+        yield Static(f"◈  LIVE  ◈  {self.match}", id="title")
+        yield Board(Terrain(GRID_W, GRID_H), EMPTY, id="board")
+        yield Static(f"Waiting for {self.match}...", id="status")
+        yield Static("Q quit", id="hint")
+
+    def on_mount(self) -> None:
+        """
+        Start following the broadcast.
+        """
+        self.run_worker(self._watch(), exclusive=True)
+
+    async def _watch(self) -> None:
+        """
+        Subscribe and repaint after every batch of frames until the relay
+        closes the stream.
+        """
+        sp = self.spectator
+        status = self.query_one("#status", Static)
+        try:
+            await sp.connect(self.addr, self.match)
+        except (OSError, ValueError) as exc:
+            status.update(f"Error: {exc}")
+            return
+        terrain = None
+        async for _ in sp.updates():
+            if sp.terrain is not terrain:
+                terrain = sp.terrain
+                self.query_one("#board", Board).set_terrain(terrain)
+            self._show()
+        sp.close()
+        status.update("Broadcast ended.")
+
+    def _show(self) -> None:
+        """
+        Draw the spectator's state on the board and status line.
+        """
+        sp = self.spectator
+        if sp.terrain is None:
+            return
+        it = sp.it
+        self.query_one("#board", Board).place(
+            {SYM_A: (sp.xs[0], sp.ys[0]), SYM_B: (sp.xs[1], sp.ys[1])},
+            focus=(sp.xs[it], sp.ys[it]),
+        )
+        syms = (SYM_A, SYM_B)
+        if sp.live:
+            text = f"● tick {sp.tick}  {syms[it]} is IT"
+        elif sp.winner is not None:
+            text = f"{syms[sp.winner]} wins — waiting for the next match"
+        else:
+            text = "Match over — waiting for the next match"
+        self.query_one("#status", Static).update(text)
@@ -0,0 +1,380 @@
+"""
+ASCII Tag Game — Peer Wire Protocol
+
+Encoders and decoders for the messages exchanged over the peer TCP link.
+
+Two formats are supported:
+  - JSON (version 0) — one newline-delimited JSON object per message.
+    Spoken by every client and used for the READY handshake itself.
+  - Binary (version 1) — a 3-byte header (type, body length) followed by
+    a struct-packed body for the hot messages (`pos`, `win`, `ready`, and
+    the star-match `snap`/`input`). Any other message is carried as a
+    JSON body inside a `T_JSON` frame, so the binary format can transport
+    everything.
+  - Binary (version 2) — version 1 plus the sender's tick number (`"n"`)
+    on `pos` (a `T_TPOS` frame) and `win` (a 4-byte body that version 1
+    decoders ignore). Version 1 has nowhere to put it, so the tick number
+    is left out when talking to a version 1 peer.
+
+The format is agreed during the READY exchange: each side advertises the
+highest version it speaks in a `"wire"` field and both switch to the
+lower of the two once the peer's READY has arrived. A peer that omits the
+field is treated as version 0, so old clients keep working over JSON.
+"""
+
+import asyncio
+import json
+import struct
+from typing import List, Optional
+
+WIRE_JSON = 0
+WIRE_BIN1 = 1
+WIRE_BIN2 = 2
+WIRE_VERSION = WIRE_BIN2
+
+T_JSON = 0
+T_READY = 1
+T_POS = 2
+T_WIN = 3
+T_SNAP = 4
+T_INPUT = 5
+T_TPOS = 6
+
+HEADER = struct.Struct("!BH")
+POS = struct.Struct("!HHQ")
+TPOS = struct.Struct("!HHQI")
+TICK = struct.Struct("!I")
+READY = struct.Struct("!B")
+INPUT = struct.Struct("!B")
+SNAP_HEAD = struct.Struct("!IBB")
+SNAP_PLAYER = struct.Struct("!HHB")
+
+_POS_HDR = HEADER.pack(T_POS, POS.size)
+_TPOS_HDR = HEADER.pack(T_TPOS, TPOS.size)
+_WIN_FRAME = HEADER.pack(T_WIN, 0)
+_TWIN_HDR = HEADER.pack(T_WIN, TICK.size)
+
+
+def encode_snapshot(tick: int, it: int, xs, ys, out) -> bytes:
+    """
+    Pack a full star-match snapshot into one binary frame.
+
+    Body layout: tick (u32), IT index (u8), player count (u8), then per
+    player x (u16), y (u16), out flag (u8).
+
+    Args:
+        tick (int): Host tick number.
+        it (int): Index of the player who is IT.
+        xs (Sequence[int]): Column of each player.
+        ys (Sequence[int]): Row of each player.
+        out (Sequence[bool]): Tagged-out flag of each player.
+
+    Returns:
+        bytes: Header plus body, ready to write to every peer.
+    """
+    n = len(xs)
+    pack = SNAP_PLAYER.pack
+    body = SNAP_HEAD.pack(tick & 0xFFFFFFFF, it, n) + b"".join(
+        [pack(xs[i], ys[i], out[i]) for i in range(n)]
+    )
+    return HEADER.pack(T_SNAP, len(body)) + body
+
+
+def _decode_snapshot(body: bytes) -> dict:
+    tick, it, n = SNAP_HEAD.unpack_from(body)
+    xs, ys, out = [], [], []
+    for x, y, o in SNAP_PLAYER.iter_unpack(body[SNAP_HEAD.size :]):
+        xs.append(x)
+        ys.append(y)
+        out.append(bool(o))
+    return {"type": "snap", "tick": tick, "it": it, "xs": xs, "ys": ys, "out": out}
+
+
+def negotiate(mine: int, peer_ready: dict) -> int:
+    """
+    Pick the wire version to use after a READY exchange.
+
+    Args:
+        mine (int): Highest version this client speaks.
+        peer_ready (dict): The decoded 'ready' message received from the peer.
+
+    Returns:
+        int: The lower of both advertised versions (0 if the peer sent none).
+    """
+    try:
+        theirs = int(peer_ready.get("wire", WIRE_JSON))
+    except (TypeError, ValueError):
+        theirs = WIRE_JSON
+    return max(WIRE_JSON, min(mine, theirs))
+
+
+class JsonCodec:
+    """
+    Newline-delimited JSON codec — the original peer format.
+
+    Attributes:
+        version (int): Wire version number (always WIRE_JSON).
+        name (str): Human-readable codec name for logs and benchmarks.
+    """
+
+    version = WIRE_JSON
+    name = "json"
+
+    def encode(self, obj: dict) -> bytes:
+        """
+        Serialise a message dictionary to a newline-terminated JSON line.
+
+        Args:
+            obj (dict): The message payload.
+
+        Returns:
+            bytes: UTF-8 encoded JSON followed by a newline.
+        """
+        return (json.dumps(obj) + "\n").encode()
+
+    def decode(self, frame: bytes) -> dict:
+        """
+        Parse a single JSON line back into a message dictionary.
+
+        Args:
+            frame (bytes): One line as returned by `readline()`.
+
+        Returns:
+            dict: The decoded message.
+        """
+        return json.loads(frame.decode().strip())
+
+    def decode_all(self, buf: bytearray, limit: int = 0) -> List[dict]:
+        """
+        Decode every complete line in a receive buffer and remove them from it.
+
+        Blank lines are skipped and malformed ones yield an empty dict, as
+        in `read`. A trailing partial line stays in the buffer.
+
+        Args:
+            buf (bytearray): Bytes received so far; consumed in place.
+            limit (int): Stop after this many messages (0 = no limit).
+
+        Returns:
+            list[dict]: The decoded messages, in order.
+        """
+        out: List[dict] = []
+        start = 0
+        while True:
+            end = buf.find(b"\n", start)
+            if end < 0:
+                break
+            line = bytes(buf[start:end])
+            start = end + 1
+            if line.strip():
+                try:
+                    out.append(json.loads(line))
+                except ValueError:
+                    out.append({})
+                if len(out) == limit:
+                    break
+        del buf[:start]
+        return out
+
+    async def read(self, reader: asyncio.StreamReader) -> Optional[dict]:
+        """
+        Read the next message from a stream.
+
+        Blank or malformed lines yield an empty dict so the caller can skip
+        them without tearing down the connection.
+
+        Args:
+            reader (asyncio.StreamReader): The peer stream.
+
+        Returns:
+            dict | None: The decoded message, or None when the peer closed.
+        """
+        line = await reader.readline()
+        if not line:
+            return None
+        try:
+            return self.decode(line)
+        except Exception:
+            return {}
+
+
+class BinaryCodec:
+    """
+    Length-prefixed binary codec (wire versions 1 and 2).
+
+    Every frame starts with `HEADER` (type byte, big-endian body length).
+    `pos` carries x/y as unsigned 16-bit cells and the sender timestamp
+    as an unsigned 64-bit millisecond count; `win` has an empty body;
+    `ready` carries the sender's wire version; `input` carries one move
+    code; `snap` is a whole star-match state (see `encode_snapshot`).
+    Anything else is wrapped in a `T_JSON` frame. At version 2 a `pos` or
+    `win` with a tick number `"n"` also carries it as an unsigned 32-bit
+    count. Every version decodes every frame type.
+
+    Attributes:
+        version (int): Wire version number this instance encodes.
+        name (str): Human-readable codec name for logs and benchmarks.
+    """
+
+    def __init__(self, version: int = WIRE_VERSION) -> None:
+        """
+        Create a codec.
+
+        Args:
+            version (int): WIRE_BIN1 or WIRE_BIN2.
+        """
+        self.version = version
+        self.name = "binary" if version == WIRE_BIN1 else f"binary{version}"
+
+    def encode(self, obj: dict) -> bytes:
+        """
+        Serialise a message dictionary to a single binary frame.
+
+        Args:
+            obj (dict): The message payload.
+
+        Returns:
+            bytes: Header plus body.
+        """
+        kind = obj.get("type")
+        ticked = "n" in obj
+        if kind == "pos" and len(obj) - ticked == 4:
+            if ticked and self.version >= WIRE_BIN2:
+                return _TPOS_HDR + TPOS.pack(
+                    obj["x"], obj["y"], obj["t"], obj["n"] & 0xFFFFFFFF
+                )
+            return _POS_HDR + POS.pack(obj["x"], obj["y"], obj["t"])
+        if kind == "win" and len(obj) - ticked == 1:
+            if ticked and self.version >= WIRE_BIN2:
+                return _TWIN_HDR + TICK.pack(obj["n"] & 0xFFFFFFFF)
+            return _WIN_FRAME
+        if kind == "snap":
+            return encode_snapshot(
+                obj["tick"], obj["it"], obj["xs"], obj["ys"], obj["out"]
+            )
+        if kind == "input" and len(obj) == 2:
+            return HEADER.pack(T_INPUT, INPUT.size) + INPUT.pack(obj["m"])
+        if kind == "ready" and len(obj) <= 2:
+            return HEADER.pack(T_READY, READY.size) + READY.pack(
+                obj.get("wire", WIRE_BIN1)
+            )
+        body = json.dumps(obj, separators=(",", ":")).encode()
+        return HEADER.pack(T_JSON, len(body)) + body
+
+    def decode_body(self, kind: int, body: bytes) -> dict:
+        """
+        Decode the body of a frame whose header has already been parsed.
+
+        Args:
+            kind (int): The frame type byte.
+            body (bytes): The frame body.
+
+        Returns:
+            dict: The decoded message; an empty dict for unknown types.
+        """
+        if kind == T_POS:
+            x, y, t = POS.unpack(body)
+            return {"type": "pos", "x": x, "y": y, "t": t}
+        if kind == T_TPOS:
+            x, y, t, n = TPOS.unpack(body)
+            return {"type": "pos", "x": x, "y": y, "t": t, "n": n}
+        if kind == T_WIN:
+            if len(body) == TICK.size:
+                return {"type": "win", "n": TICK.unpack(body)[0]}
+            return {"type": "win"}
+        if kind == T_READY:
+            return {"type": "ready", "wire": READY.unpack(body)[0]}
+        if kind == T_SNAP:
+            return _decode_snapshot(body)
+        if kind == T_INPUT:
+            return {"type": "input", "m": INPUT.unpack(body)[0]}
+        if kind == T_JSON:
+            return json.loads(body)
+        return {}
+
+    def decode(self, frame: bytes) -> dict:
+        """
+        Decode one complete frame (header included).
+
+        Args:
+            frame (bytes): A full frame as produced by `encode`.
+
+        Returns:
+            dict: The decoded message.
+        """
+        kind, size = HEADER.unpack_from(frame)
+        return self.decode_body(kind, frame[HEADER.size : HEADER.size + size])
+
+    def decode_all(self, buf: bytearray, limit: int = 0) -> List[dict]:
+        """
+        Decode every complete frame in a receive buffer and remove them from it.
+
+        Undecodable bodies yield an empty dict, as in `read`. A trailing
+        partial frame stays in the buffer.
+
+        Args:
+            buf (bytearray): Bytes received so far; consumed in place.
+            limit (int): Stop after this many messages (0 = no limit).
+
+        Returns:
+            list[dict]: The decoded messages, in order.
+        """
+        out: List[dict] = []
+        start = 0
+        have = len(buf)
+        head = HEADER.size
+        while have - start >= head:
+            kind, size = HEADER.unpack_from(buf, start)
+            end = start + head + size
+            if end > have:
+                break
+            try:
+                out.append(self.decode_body(kind, bytes(buf[start + head : end])))
+            except Exception:
+                out.append({})
+            start = end
+            if len(out) == limit:
+                break
+        del buf[:start]
+        return out
+
+    async def read(self, reader: asyncio.StreamReader) -> Optional[dict]:
+        """
+        Read the next frame from a stream.
+
+        Args:
+            reader (asyncio.StreamReader): The peer stream.
+
+        Returns:
+            dict | None: The decoded message, or None when the peer closed.
+        """
+        try:
+            head = await reader.readexactly(HEADER.size)
+            kind, size = HEADER.unpack(head)
+            body = await reader.readexactly(size) if size else b""
+        except asyncio.IncompleteReadError:
+            return None
+        try:
+            return self.decode_body(kind, body)
+        except Exception:
+            return {}
+
+
+CODECS = {
+    WIRE_JSON: JsonCodec(),
+    WIRE_BIN1: BinaryCodec(WIRE_BIN1),
+    WIRE_BIN2: BinaryCodec(WIRE_BIN2),
+}
+
+
+def codec_for(version: int):
+    """
+    Return the shared codec instance for a negotiated wire version.
+
+    Args:
+        version (int): A value returned by `negotiate`.
+
+    Returns:
+        JsonCodec | BinaryCodec: The matching codec (JSON for unknown values).
+    """
+    return CODECS.get(version, CODECS[WIRE_JSON])